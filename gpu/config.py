@@ -133,6 +133,10 @@ class TestParametersConfig(BaseModel):
     default_blocks: int
     format: str
     default_pattern: str
+    golden_model: str = Field(
+        default="emulator",
+        description="Golden model for --truth emu: emulator (external script) or functional (in-process simulator.functional)"
+    )
 
 
 # ============================================================================
@@ -163,6 +167,35 @@ class SMConfig(BaseModel):
         default="RR",
         description="Warp scheduling policy: RR (round-robin) or GTO (greedy-then-oldest)"
     )
+    event_driven: bool = Field(
+        default=False,
+        description="Jump over runs of idle cycles instead of ticking every stage each cycle (cycle counts and perf summaries are unchanged)"
+    )
+    num_sms: int = Field(
+        default=1,
+        description="Number of SMs; above 1 the GPU top level shares memory and the TBS across them"
+    )
+    parallel_sms: bool = Field(
+        default=False,
+        description="With num_sms above 1, run each SM in its own worker process (results match the serial run)"
+    )
+    fast_forward: int = Field(
+        default=0,
+        description="Warp instructions to run functionally before handing the state to the cycle-accurate SM (0 = off)"
+    )
+
+
+class DramConfig(BaseModel):
+    """DRAM timing backend configuration (used when [memory] backend = "dram")."""
+    channels: int = Field(default=2, ge=1, description="Independent channels, each with its own data bus")
+    banks: int = Field(default=8, ge=1, description="Banks per channel")
+    row_size: int = Field(default=2048, ge=1, description="Row (page) size in bytes")
+    t_rcd: int = Field(default=14, ge=0, description="Activate to column command, in cycles")
+    t_cas: int = Field(default=14, ge=0, description="Column command to first data, in cycles")
+    t_rp: int = Field(default=14, ge=0, description="Precharge time, in cycles")
+    t_burst: int = Field(default=2, ge=0, description="Data bus cycles per burst")
+    burst_bytes: int = Field(default=32, ge=1, description="Bytes per burst")
+    page_policy: str = Field(default="open", description='"open" keeps rows open, "closed" precharges after every access')
 
 
 class MemoryConfig(BaseModel):
@@ -170,6 +203,15 @@ class MemoryConfig(BaseModel):
     start_pc: int = 0x0
     latency: int = 2
     policy: str = "rr"
+    backend: str = Field(default="fixed", description='"fixed" answers after `latency` cycles, "dram" uses the [memory.dram] timing model')
+    max_inflight: int = Field(default=1, ge=1, description="Requests the memory controller services at once")
+    completions_per_cycle: int = Field(default=1, ge=1, description="Responses the memory controller returns per cycle")
+    queue_depth: int = Field(default=0, ge=0, description="Per-SM I$ and D$ request FIFO depth in the controller; 0 takes requests straight from the latches")
+    image_cache_dir: str = Field(
+        default="",
+        description="Where parsed program images are cached by source hash (~ is expanded); empty disables the cache"
+    )
+    dram: DramConfig = Field(default_factory=DramConfig)
 
 
 class KernelConfig(BaseModel):
@@ -184,6 +226,8 @@ class ICacheConfig(BaseModel):
     block_size: int = 4
     associativity: int = 1
     hit_latency: int = Field(default=1, description="Cache hit pipeline depth in cycles")
+    prefetch: str = Field(default="none", description='Instruction prefetcher: "none", "next_line" or "stream"')
+    prefetch_degree: int = Field(default=1, ge=0, description="Lines the prefetcher requests ahead of the fetch stream")
 
 
 class DCacheConfig(BaseModel):
@@ -250,6 +294,7 @@ class FunctionalUnitsConfig(BaseModel):
     fp_unit_count: int = Field(default=1, description="Number of FP execution units")
     special_unit_count: int = Field(default=1, description="Number of special execution units")
     membranchjump_unit_count: int = Field(default=1, description="Number of memory/branch/jump units")
+    differential_check: bool = Field(default=False, description="Run the per-lane reference compute alongside the vectorized one and fail on any mismatch")
     
     # Nested unit configurations
     int_unit: IntUnitConfigSettings = Field(default_factory=IntUnitConfigSettings)
@@ -336,9 +381,29 @@ class PerformanceCounterConfig(BaseModel):
     summary_only: bool = True
     enabled_units: list[str] = Field(default_factory=list)  # empty = all units
     buffer_limit: int = 100_000
+    trace_writer_depth: int = 1  # flushes written in the background at once (0 = synchronous)
     flight_recorder_enabled: bool = False
 
 
+class TraceConfig(BaseModel):
+    """Per-unit trace levels (see simulator/utils/trace.py)."""
+    default_level: str = Field(default="warning", description="Level for units not listed in units: off, error, warning, info or debug")
+    units: Dict[str, str] = Field(default_factory=dict, description="Per-unit level overrides, e.g. {dcache = \"debug\"}")
+    output_file: str = Field(default="", description="File the trace is written to (empty = stdout)")
+
+
+class SamplingConfig(BaseModel):
+    """SimPoint-style sampled simulation (see simulator/sampling.py)."""
+    enabled: bool = Field(default=False, description="Estimate performance from representative intervals instead of a full cycle-accurate run")
+    interval: int = Field(default=1000, ge=1, description="Warp instructions per interval")
+    warmup: int = Field(default=1000, ge=0, description="Cycle-accurate warm-up instructions before each measured interval")
+    max_clusters: int = Field(default=10, ge=1, description="Upper bound on the number of interval clusters")
+    samples_per_cluster: int = Field(default=2, ge=1, description="Intervals simulated per cluster, closest to the centroid first")
+    projection_dims: int = Field(default=15, ge=1, description="Dimensions basic-block vectors are randomly projected to before clustering")
+    seed: int = Field(default=0, description="Seed for the projection and k-means")
+    checkpoint_dir: str = Field(default="results/checkpoints", description="Where sample start checkpoints are kept for reuse (empty = not kept)")
+
+
 # ============================================================================
 # TOML Loading
 # ============================================================================
@@ -401,6 +466,8 @@ class Settings(BaseSettings):
     mmio: MMIOConfig = Field(default_factory=MMIOConfig)
     test: TestConfig
     perf_counter: PerformanceCounterConfig = Field(default_factory=PerformanceCounterConfig)
+    trace: TraceConfig = Field(default_factory=TraceConfig)
+    sampling: SamplingConfig = Field(default_factory=SamplingConfig)
     
     @classmethod
     def settings_customise_sources(
@@ -471,6 +538,8 @@ class Settings(BaseSettings):
             "block_size": self.icache.block_size,
             "associativity": self.icache.associativity,
             "hit_latency": self.icache.hit_latency,
+            "prefetch": self.icache.prefetch,
+            "prefetch_degree": self.icache.prefetch_degree,
         }
 
     def to_dcache_dict(self) -> Dict[str, Any]:
@@ -1,21 +1,20 @@
 from aenum import MultiValueEnum
 from enum import Enum
-from bitstring import Bits
 
 # ISA Teal Card v2 (used for Enum declarations): https://docs.google.com/spreadsheets/d/1quvfY0Q_mLP5VfUaNGiiruGoqjCMpCyCKM9KlqbujYM/edit?usp=sharing
 
 # Instruction Type Enum (first 4 MSBs of 7-bit opcode)
 class Instr_Type(MultiValueEnum):
-    R_TYPE = Bits(bin='0000', length=4), Bits(bin='0001', length=4)  # 0000, 0001
-    I_TYPE = Bits(bin='0010', length=4), Bits(bin='0011', length=4), Bits(bin='0100', length=4)  # 0010, 0011, 0100
-    F_TYPE = Bits(bin='0101', length=4)    # 0101 (FP/conversion operations)
-    S_TYPE = Bits(bin='0110', length=4), Bits(bin='0111', length=4)  # 0110, 0111
-    B_TYPE = Bits(bin='1000', length=4), Bits(bin='1001', length=4)  # 1000, 1001
-    U_TYPE = Bits(bin='1010', length=4)    # 1010
-    C_TYPE = Bits(bin='1011', length=4)    # 1011
-    J_TYPE = Bits(bin='1100', length=4)    # 1100
-    P_TYPE = Bits(bin='1101', length=4)    # 1101
-    H_TYPE = Bits(bin='1111', length=4)    # 1111 (Halt)
+    R_TYPE = 0b0000, 0b0001  # 0000, 0001
+    I_TYPE = 0b0010, 0b0011, 0b0100  # 0010, 0011, 0100
+    F_TYPE = 0b0101    # 0101 (FP/conversion operations)
+    S_TYPE = 0b0110, 0b0111  # 0110, 0111
+    B_TYPE = 0b1000, 0b1001  # 1000, 1001
+    U_TYPE = 0b1010    # 1010
+    C_TYPE = 0b1011    # 1011
+    J_TYPE = 0b1100    # 1100
+    P_TYPE = 0b1101    # 1101
+    H_TYPE = 0b1111    # 1111 (Halt)
 
 class Op(Enum):
     pass
@@ -23,97 +22,97 @@ class Op(Enum):
 # R-Type Operations (opcode: 0000xxx and 0001xxx)
 class R_Op(Op):
     # From R_Op_0 (0000xxx)
-    ADD = Bits(bin='0000000', length=7)   # 0000 000
-    SUB = Bits(bin='0000001', length=7)   # 0000 001
-    MUL = Bits(bin='0000010', length=7)   # 0000 010
-    DIV = Bits(bin='0000011', length=7)   # 0000 011
-    AND = Bits(bin='0000100', length=7)   # 0000 100
-    OR = Bits(bin='0000101', length=7)    # 0000 101
-    XOR = Bits(bin='0000110', length=7)   # 0000 110
-    SLT = Bits(bin='0000111', length=7)   # 0000 111
+    ADD = 0b0000000   # 0000 000
+    SUB = 0b0000001   # 0000 001
+    MUL = 0b0000010   # 0000 010
+    DIV = 0b0000011   # 0000 011
+    AND = 0b0000100   # 0000 100
+    OR = 0b0000101    # 0000 101
+    XOR = 0b0000110   # 0000 110
+    SLT = 0b0000111   # 0000 111
     # From R_Op_1 (0001xxx)
-    SLTU = Bits(bin='0001000', length=7)  # 0001 000
-    ADDF = Bits(bin='0001001', length=7)  # 0001 001
-    SUBF = Bits(bin='0001010', length=7)  # 0001 010
-    MULF = Bits(bin='0001011', length=7)  # 0001 011
-    DIVF = Bits(bin='0001100', length=7)  # 0001 100
-    SLL = Bits(bin='0001101', length=7)   # 0001 101
-    SRL = Bits(bin='0001110', length=7)   # 0001 110
-    SRA = Bits(bin='0001111', length=7)   # 0001 111
+    SLTU = 0b0001000  # 0001 000
+    ADDF = 0b0001001  # 0001 001
+    SUBF = 0b0001010  # 0001 010
+    MULF = 0b0001011  # 0001 011
+    DIVF = 0b0001100  # 0001 100
+    SLL = 0b0001101   # 0001 101
+    SRL = 0b0001110   # 0001 110
+    SRA = 0b0001111   # 0001 111
 
-    SLTF = Bits(bin='1001011', length=7)  # 1001 011
-    SGE =  Bits(bin='1001101', length=7)  # 1001 101
-    SGEU = Bits(bin='1001110', length=7)  # 1001 110
-    SGEF = Bits(bin='1001111', length=7)  # 1001 111
+    SLTF = 0b1001011  # 1001 011
+    SGE =  0b1001101  # 1001 101
+    SGEU = 0b1001110  # 1001 110
+    SGEF = 0b1001111  # 1001 111
 
 # I-Type Operations (opcode: 0010xxx, 0011xxx, 0100xxx)
 class I_Op(Op):
     # From I_Op_0 (0010xxx)
-    ADDI = Bits(bin='0010000', length=7)   # 0010 000
-    SUBI = Bits(bin='0010001', length=7)   # 0010 001
-    XORI = Bits(bin='0010100', length=7)   # 0010 100
-    ORI = Bits(bin='0010101', length=7)    # 0010 101
-    SLTI = Bits(bin='0010111', length=7)   # 0010 111
+    ADDI = 0b0010000   # 0010 000
+    SUBI = 0b0010001   # 0010 001
+    XORI = 0b0010100   # 0010 100
+    ORI = 0b0010101    # 0010 101
+    SLTI = 0b0010111   # 0010 111
     # From I_Op_1 (0011xxx)
-    SLTIU = Bits(bin='0011000', length=7)  # 0011 000
-    SLLI = Bits(bin='0011101', length=7)   # 0011 101
-    SRLI = Bits(bin='0011110', length=7)   # 0011 110
-    SRAI = Bits(bin='0011111', length=7)   # 0011 111
+    SLTIU = 0b0011000  # 0011 000
+    SLLI = 0b0011101   # 0011 101
+    SRLI = 0b0011110   # 0011 110
+    SRAI = 0b0011111   # 0011 111
     # From I_Op_2 (0100xxx)
-    LW = Bits(bin='0100000', length=7)     # 0100 000
-    LH = Bits(bin='0100001', length=7)     # 0100 001
-    LB = Bits(bin='0100010', length=7)     # 0100 010
-    JALR = Bits(bin='0100011', length=7)   # 0100 011
+    LW = 0b0100000     # 0100 000
+    LH = 0b0100001     # 0100 001
+    LB = 0b0100010     # 0100 010
+    JALR = 0b0100011   # 0100 011
 
 # F-Type Operations (opcode: 0101xxx) - Floating Point and Type Conversion
 class F_Op(Op):
-    ISQRT = Bits(bin='0101000', length=7)  # 0101 000
-    SIN = Bits(bin='0101001', length=7)    # 0101 001
-    COS = Bits(bin='0101010', length=7)    # 0101 010
-    ITOF = Bits(bin='0101011', length=7)   # 0101 011
-    FTOI = Bits(bin='0101100', length=7)   # 0101 100
+    ISQRT = 0b0101000  # 0101 000
+    SIN = 0b0101001    # 0101 001
+    COS = 0b0101010    # 0101 010
+    ITOF = 0b0101011   # 0101 011
+    FTOI = 0b0101100   # 0101 100
 
 # S-Type Operations (opcode: 0110xxx, 0111xxx)
 class S_Op(Op):
     # From S_Op_0 (0110xxx)
-    SW = Bits(bin='0110000', length=7)     # 0110 000
-    SH = Bits(bin='0110001', length=7)     # 0110 001
-    SB = Bits(bin='0110010', length=7)     # 0110 010
+    SW = 0b0110000     # 0110 000
+    SH = 0b0110001     # 0110 001
+    SB = 0b0110010     # 0110 010
     # S_Op_1 (0111xxx) - Currently unused but reserved
 
 # B-Type Operations (opcode: 1000xxx, 1001xxx)
 class B_Op(Op):
     # From B_Op_0 (1000xxx) - Predicate Write
-    BEQ = Bits(bin='1000000', length=7)    # 1000 000
-    BNE = Bits(bin='1000001', length=7)    # 1000 001
-    BGE = Bits(bin='1000010', length=7)    # 1000 010
-    BGEU = Bits(bin='1000011', length=7)   # 1000 011
-    BLT = Bits(bin='1000100', length=7)    # 1000 100
-    BLTU = Bits(bin='1000101', length=7)   # 1000 101
+    BEQ = 0b1000000    # 1000 000
+    BNE = 0b1000001    # 1000 001
+    BGE = 0b1000010    # 1000 010
+    BGEU = 0b1000011   # 1000 011
+    BLT = 0b1000100    # 1000 100
+    BLTU = 0b1000101   # 1000 101
     # B_Op_1 (1001xxx) - Currently unused but reserved
 
 # U-Type Operations (opcode: 1010xxx)
 class U_Op(Op):
-    AUIPC = Bits(bin='1010000', length=7)  # 1010 000
-    LLI = Bits(bin='1010001', length=7)    # 1010 001
-    LMI = Bits(bin='1010010', length=7)    # 1010 010
-    LUI = Bits(bin='1010100', length=7)    # 1010 100
+    AUIPC = 0b1010000  # 1010 000
+    LLI = 0b1010001    # 1010 001
+    LMI = 0b1010010    # 1010 010
+    LUI = 0b1010100    # 1010 100
 
 # C-Type Operations (opcode: 1011xxx)
 class C_Op(Op):
-    CSRR = Bits(bin='1011000', length=7)   # 1011 000
-    CSRW = Bits(bin='1011001', length=7)   # 1011 001
+    CSRR = 0b1011000   # 1011 000
+    CSRW = 0b1011001   # 1011 001
 
 # J-Type Operations (opcode: 1100xxx)
 class J_Op(Op):
-    JAL = Bits(bin='1100000', length=7)    # 1100 000
+    JAL = 0b1100000    # 1100 000
 
 # P-Type Operations (opcode: 1101xxx)
 class P_Op(Op):
-    JPNZ = Bits(bin='1101000', length=7)   # 1101 000
-    PRSW = Bits(bin='1101100', length=7)   # 1101 100
-    PRLW = Bits(bin='1101101', length=7)   # 1101 101
+    JPNZ = 0b1101000   # 1101 000
+    PRSW = 0b1101100   # 1101 100
+    PRLW = 0b1101101   # 1101 101
 
 # H-Type Operations (opcode: 1111xxx)
 class H_Op(Op):
-    HALT = Bits(bin='1111111', length=7)   # 1111 111
\ No newline at end of file
+    HALT = 0b1111111   # 1111 111
\ No newline at end of file
@@ -14,5 +14,6 @@ from .warp import Warp, WarpGroup, WarpState
 from .mem_types import MemRequest, PredRequest, DecodeType, ICacheEntry, FetchRequest
 from .utils.data_structures.circular_buffer import CircularBuffer
 from .utils.data_structures.compact_queue import CompactQueue
+from .utils.data_structures.pipeline_queue import PipelineQueue
 from .utils.data_structures.stack import Stack
 
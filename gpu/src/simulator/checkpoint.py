@@ -0,0 +1,621 @@
+"""
+Checkpoints of a standalone SM's simulation state.
+
+A checkpoint is a NumPy .npz archive that np.load reads with allow_pickle=False:
+
+    manifest   JSON (stored as uint8): magic, version, cycle, test file, the
+               Settings the SM was built with, the state below and the records
+    a<N>       one blob per array, memory image and long int/float list
+
+The state is written explicitly, one section per component, each holding the
+fields listed for it in this module:
+
+    sm          cycle, finished, skipped cycles
+    mem         the allocated pages
+    memc        completion heap, request counters, per-port FIFOs, DRAM bank/bus state
+    tbs         block list, pending/finished blocks, per-SM warp budget
+    scheduler   warp table and issue-order state (the state masks are rebuilt)
+    csr_table, kbp, fust
+    icache      tags, LRU stamps, words, prefetch queue, the pending miss
+    issue       instruction buffers, staged instructions, countdowns
+    ex          every functional sub-unit's pipeline, Ldst queues and buffers
+    wb          the writeback buffers
+    dcache      3C bookkeeping, per-bank tag/valid/dirty/LRU/data arrays, FSM
+                and hit pipeline, MSHRs (tag and block lookups are rebuilt)
+    prf, pipeline_rf, golden_rf
+    latches     payload and handshake of every latch and forwarding IF, by where it is wired
+    counters    the accumulators of every performance counter, by unit name
+
+Values are plain JSON, a few tagged containers (tuple, dict, set, deque),
+Op and WarpState members by name, arrays as blobs, and in-flight records
+(instructions, memory requests and responses, D-cache requests, frames and
+MSHR entries, Ldst pending accesses) as indices into the records table, so a
+record held in two places (an instruction in a latch and a writeback buffer)
+is restored as one object. Any other type is refused when saving.
+
+Not saved: anything the settings and test file rebuild (configuration,
+wiring, the loaded kernel), per-cycle trace rows and flight-recorder state,
+and derived perf statistics, which finalize() recomputes.
+
+Restoring builds a fresh SM from the saved settings and writes each section
+into it. CHECKPOINT_VERSION changes with every change to the saved state, and
+files of another version are refused.
+
+    sim.save_checkpoint("warm.ckpt")
+    sim = SM.from_checkpoint("warm.ckpt")
+"""
+from __future__ import annotations
+import collections
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from common.custom_enums_multi import Op
+from config import Settings
+from simulator.execute.arithmetic_sub_unit import ArithmeticSubUnit
+from simulator.execute.functional_sub_unit import Branch, Jump, Ldst_Fu, pending_mem
+from simulator.instruction import Instruction
+from simulator.interfaces import LatchIF
+from simulator.mem.dcache import DCacheAddr, DCacheFrame, DCacheRequest, MSHREntry
+from simulator.mem.memory import PAGE_SIZE
+from simulator.mem_types import MemRequest, dMemResponse
+from simulator.utils.data_structures.circular_buffer import CircularBuffer
+from simulator.utils.data_structures.pipeline_queue import PipelineQueue
+from simulator.utils.data_structures.stack import Stack
+from simulator.utils.performance_counter.cache import CachePerfCount
+from simulator.utils.performance_counter.dram import DramBankPerfCount, DramChannelPerfCount
+from simulator.utils.performance_counter.execute import BranchPerfCount, ExecutePerfCount
+from simulator.utils.performance_counter.ldst import LdstPerfCount
+from simulator.utils.performance_counter.perf_counter_base import PerfCounterBase
+from simulator.utils.performance_counter.predicate_reg_file import PredicateRegFilePerfCount
+from simulator.utils.performance_counter.scheduler import SchedulerPerfCount
+from simulator.utils.performance_counter.writeback import WritebackPerfCount
+from simulator.warp import WarpState
+
+CHECKPOINT_MAGIC = "CARDCKPT"
+# bump with every change to the fields below or their encoding
+CHECKPOINT_VERSION = 2
+
+# lists of at least this many plain ints or floats are stored as blobs
+_PACK_MIN = 16
+
+# ── saved fields ───────────────────────────────────────────────────────────────
+
+_SM_FIELDS = ("cycle", "finished", "skipped_cycles")
+_MEMC_FIELDS = ("completions", "cycle", "started", "arrivals", "port_rr")
+_MEM_PORT_FIELDS = ("rr", "ic_queue", "dc_queue")
+_DRAM_BANK_FIELDS = ("open_row", "ready", "busy_until")
+_DRAM_CHANNEL_FIELDS = ("bus_free",)
+_TBS_FIELDS = ("blocks_not_sent", "blocks_done", "kern_finished", "kernel_arg_ptr")
+_THREAD_BLOCK_FIELDS = ("bidx", "bdim", "spc", "apc", "assigned_sm")
+_SCHEDULER_FIELDS = (
+    "at_barrier", "start_flush", "warp_init", "free_warp", "oldest", "unissued", "rr_index",
+    "gto_index", "eop", "warp_id", "halt_sent", "issued_warp_last_cycle", "stop_fetching",
+    "system_finished",
+)
+_WARP_GROUP_FIELDS = ("halt", "last_issue_even", "halt_mask_even", "halt_mask_odd")
+_WARP_FIELDS = ("pc", "state", "finished_packet", "in_flight")
+_ICACHE_FIELDS = (
+    "tags", "last_used", "prefetched", "words", "prefetch_queue", "prefetch_inflight",
+    "req_latched", "pending", "pending_block", "pending_fetch", "stalled", "cycle",
+)
+_ISSUE_FIELDS = (
+    "dispatched", "iBuffer", "iBufferCapacity", "iBufferHead", "iBufferTail", "iBuff_Full_Flags",
+    "curr_wg", "staged_even", "staged_odd", "even_read_progress", "odd_read_progress",
+    "ready_to_dispatch", "fust_busy_countdown", "cycle", "issued_count",
+)
+_LDST_FIELDS = ("ldst_q", "wb_buffer", "outstanding", "halting", "waiting_for_flush", "current_cycle", "ready_out")
+_BRANCH_JUMP_FIELDS = ("ready_out", "data")
+_DCACHE_FIELDS = (
+    "pending_request", "active_misses", "compulsory_misses", "conflict_misses", "capacity_misses",
+    "seen_blocks", "shadow_fa_queue", "cycle_count", "output_buffer", "stall", "flushing",
+)
+_CACHE_BANK_ARRAYS = ("tags", "valid", "dirty", "last_use", "data")
+_CACHE_BANK_FIELDS = (
+    "lru_clock", "state", "active_mshr", "latched_victim", "latched_victim_way", "fill_buffer",
+    "busy", "waiting_for_mem", "incoming_mem_data", "flush_set_idx", "flush_way_idx",
+    "hit_pipeline", "hit_pipeline_busy",
+)
+_MSHR_FIELDS = ("buffer", "bank_stall", "now", "local_uuid_counter", "last_issued_uuid")
+_LATCH_FIELDS = ("payload", "valid", "read")
+_FORWARDING_FIELDS = ("payload", "wait")
+
+# checked in order, so a subclass (ArithmeticSubUnitPipeline) finds its base
+_BUFFER_FIELDS: Tuple[Tuple[type, Tuple[str, ...]], ...] = (
+    (PipelineQueue, ("slots", "head", "occupied")),
+    (Stack, ("items",)),
+    (CircularBuffer, ("buffer", "head", "tail", "size")),
+)
+
+# each class adds its own accumulators to those of its bases; derived rates are not saved
+_COUNTER_FIELDS: Dict[type, Tuple[str, ...]] = {
+    PerfCounterBase: ("total_cycles", "stall_cycles", "busy_cycles", "idle_cycles"),
+    CachePerfCount: ("hit_count", "miss_count", "eviction_count", "prefetch_issued", "prefetch_useful", "prefetch_late"),
+    ExecutePerfCount: ("instruction_counts", "overflow_counts", "overflow_details"),
+    BranchPerfCount: ("divergent_branches", "non_divergent_branches", "total_branches"),
+    LdstPerfCount: ("instruction_counts", "instruction_latencies", "q_occupancy_history", "q_full_cycles"),
+    PredicateRegFilePerfCount: ("full_cycles", "_occupancy_samples"),
+    SchedulerPerfCount: ("range", "std_dev"),
+    WritebackPerfCount: ("occupancy_history", "full_cycles", "store_cycles", "writeback_cycles", "instruction_latencies"),
+    DramBankPerfCount: ("window_start", "bytes", "reads", "writes", "row_hits", "row_empty", "row_conflicts"),
+    DramChannelPerfCount: ("window_start", "bytes", "requests"),
+}
+
+# records that travel through the pipeline, with the fields they are rebuilt from
+_RECORD_TYPES: Dict[str, Tuple[type, Tuple[str, ...]]] = {
+    "Instruction": (Instruction, Instruction.__slots__),
+    # inst, src and port are set by the memory controller when it starts the request
+    "MemRequest": (MemRequest, ("addr", "size", "uuid", "warp_id", "pc", "data", "rw_mode", "remaining",
+                                "inst", "src", "port")),
+    "dMemResponse": (dMemResponse, ("type", "req", "address", "replay", "is_secondary", "data", "miss",
+                                    "hit", "stall", "uuid", "flushed")),
+    "DCacheRequest": (DCacheRequest, ("addr_val", "rw_mode", "size", "store_value", "halt", "addr")),
+    "DCacheFrame": (DCacheFrame, ("block_size_words", "valid", "dirty", "tag", "block")),
+    "MSHREntry": (MSHREntry, ("block_size_words", "valid", "uuid", "block_addr_val", "write_status",
+                              "write_block", "original_request", "ready_cycle")),
+    "pending_mem": (pending_mem, ("instr", "block_size_words", "word_size_bytes", "finished_idx", "mshr_idx",
+                                  "addrs", "write", "size", "is_signed")),
+}
+_RECORD_NAMES = {cls: name for name, (cls, _) in _RECORD_TYPES.items()}
+
+_ENUMS: Dict[str, type] = {cls.__name__: cls for cls in (*Op.__subclasses__(), WarpState)}
+
+
+# ── values ─────────────────────────────────────────────────────────────────────
+
+class _Writer:
+    """Encodes state values as JSON, arrays as blobs and records as table indices."""
+
+    def __init__(self):
+        self.blobs: Dict[str, np.ndarray] = {}
+        self.records: List[Optional[dict]] = []
+        self._index: Dict[int, int] = {}
+        self._held: List[Any] = []  # keeps every record alive so ids stay unique
+
+    def blob(self, array: np.ndarray) -> str:
+        name = f"a{len(self.blobs)}"
+        self.blobs[name] = array
+        return name
+
+    def value(self, v: Any) -> Any:
+        t = type(v)
+        if v is None or t in (bool, int, float, str):
+            return v
+        if t is list:
+            return self._list(v)
+        if t is tuple:
+            return {"tuple": [self.value(x) for x in v]}
+        if t is dict:
+            return {"dict": [[self.value(k), self.value(x)] for k, x in v.items()]}
+        if t is collections.OrderedDict:
+            return {"odict": [[self.value(k), self.value(x)] for k, x in v.items()]}
+        if t is set:
+            return {"set": [self.value(x) for x in v]}
+        if t is collections.deque:
+            return {"deque": [self.value(x) for x in v], "maxlen": v.maxlen}
+        if t is np.ndarray:
+            if v.dtype.hasobject:
+                raise TypeError("object arrays cannot be checkpointed")
+            return {"array": self.blob(v)}
+        if t in (bytes, bytearray):
+            return {t.__name__: self.blob(np.frombuffer(v, dtype=np.uint8))}
+        if isinstance(v, np.generic):
+            return {"scalar": v.dtype.str, "value": v.item()}
+        if t is DCacheAddr:
+            return {"dcache_addr": list(v)}
+        if _ENUMS.get(t.__name__) is t:
+            return {"enum": t.__name__, "name": v.name}
+        if t in _RECORD_NAMES:
+            return {"record": self._record(v)}
+        raise TypeError(f"a {t.__name__} cannot be checkpointed")
+
+    def _list(self, v: list) -> Any:
+        if len(v) >= _PACK_MIN:
+            kinds = {type(x) for x in v}
+            if kinds == {int}:
+                try:
+                    return {"list": self.blob(np.array(v, dtype=np.int64))}
+                except OverflowError:
+                    pass
+            elif kinds == {float}:
+                return {"list": self.blob(np.array(v, dtype=np.float64))}
+        return [self.value(x) for x in v]
+
+    def _record(self, obj: Any) -> int:
+        idx = self._index.get(id(obj))
+        if idx is None:
+            idx = self._index[id(obj)] = len(self.records)
+            self._held.append(obj)
+            self.records.append(None)  # taken before the fields, which may lead back here
+            name = _RECORD_NAMES[type(obj)]
+            self.records[idx] = {"type": name, "fields": _save_fields(obj, _RECORD_TYPES[name][1], self)}
+        return idx
+
+
+class _Reader:
+    """Decodes values written by _Writer; records are rebuilt before any state is laid down."""
+
+    def __init__(self, records: List[dict], blobs: Dict[str, np.ndarray]):
+        self.blobs = blobs
+        types = []
+        for entry in records:
+            if entry["type"] not in _RECORD_TYPES:
+                raise ValueError(f"checkpoint holds an unknown record type {entry['type']}")
+            types.append(_RECORD_TYPES[entry["type"]])
+        # all records exist before any is filled in, as they refer to each other
+        self.records = [cls.__new__(cls) for cls, _ in types]
+        for obj, (_, fields), entry in zip(self.records, types, records):
+            _load_fields(obj, entry["fields"], fields, self)
+
+    def value(self, v: Any) -> Any:
+        if isinstance(v, list):
+            return [self.value(x) for x in v]
+        if not isinstance(v, dict):
+            return v
+        if "record" in v:
+            return self.records[v["record"]]
+        if "list" in v:
+            return self.blobs[v["list"]].tolist()
+        if "tuple" in v:
+            return tuple(self.value(x) for x in v["tuple"])
+        if "dict" in v:
+            return {self.value(k): self.value(x) for k, x in v["dict"]}
+        if "odict" in v:
+            return collections.OrderedDict((self.value(k), self.value(x)) for k, x in v["odict"])
+        if "set" in v:
+            return {self.value(x) for x in v["set"]}
+        if "deque" in v:
+            return collections.deque((self.value(x) for x in v["deque"]), maxlen=v["maxlen"])
+        if "array" in v:
+            return np.array(self.blobs[v["array"]])
+        if "bytes" in v:
+            return self.blobs[v["bytes"]].tobytes()
+        if "bytearray" in v:
+            return bytearray(self.blobs[v["bytearray"]].tobytes())
+        if "scalar" in v:
+            return np.dtype(v["scalar"]).type(v["value"])
+        if "dcache_addr" in v:
+            return DCacheAddr(*v["dcache_addr"])
+        if "enum" in v:
+            return _ENUMS[v["enum"]][v["name"]]
+        raise ValueError(f"checkpoint holds an unknown value {sorted(v)}")
+
+
+def _save_fields(obj: Any, names: Iterable[str], w: _Writer) -> dict:
+    return {name: w.value(getattr(obj, name)) for name in names}
+
+
+def _load_fields(obj: Any, state: dict, names: Iterable[str], r: _Reader) -> None:
+    for name in names:
+        setattr(obj, name, r.value(state[name]))
+
+
+def _load_array(array: np.ndarray, value: Any, r: _Reader, what: str) -> None:
+    saved = r.value(value)
+    if saved.shape != array.shape or saved.dtype != array.dtype:
+        raise ValueError(f"checkpoint {what} is {saved.dtype}{list(saved.shape)}, "
+                         f"this SM has {array.dtype}{list(array.shape)}")
+    array[...] = saved
+
+
+def _pairs(fresh: List[Any], saved: List[Any], what: str) -> Iterable[Tuple[Any, Any]]:
+    if len(fresh) != len(saved):
+        raise ValueError(f"checkpoint has {len(saved)} {what}, this SM has {len(fresh)}")
+    return zip(fresh, saved)
+
+
+def _buffer_fields(buffer: Any) -> Tuple[str, ...]:
+    for cls, names in _BUFFER_FIELDS:
+        if isinstance(buffer, cls):
+            return names
+    raise TypeError(f"a {type(buffer).__name__} buffer cannot be checkpointed")
+
+
+def _counter_fields(unit: PerfCounterBase) -> List[str]:
+    if type(unit) not in _COUNTER_FIELDS:
+        raise TypeError(f"{unit.unit_name}: a {type(unit).__name__} cannot be checkpointed")
+    names: List[str] = []
+    for cls in reversed(type(unit).__mro__):
+        names += [name for name in _COUNTER_FIELDS.get(cls, ()) if name not in names]
+    return names
+
+
+def _subunit_fields(sub: Any) -> Tuple[str, ...]:
+    if isinstance(sub, Ldst_Fu):
+        return _LDST_FIELDS
+    if isinstance(sub, (Branch, Jump)):
+        return _BRANCH_JUMP_FIELDS
+    if isinstance(sub, ArithmeticSubUnit):
+        return ("ready_out",)
+    raise TypeError(f"{sub.name}: a {type(sub).__name__} cannot be checkpointed")
+
+
+# ── what is saved where ────────────────────────────────────────────────────────
+
+def _interfaces(sm) -> Dict[str, Any]:
+    """Every latch and forwarding IF of the SM, keyed by where it is first found.
+
+    Interfaces are keyed by place rather than by their `name`, which most
+    latches leave at the default.
+    """
+    p = sm.pipeline
+    found: List[Tuple[str, Any]] = []
+    for key in ("scheduler", "icache", "decode", "issue", "ex", "dcache", "wb", "tbs"):
+        stage = p.get(key)
+        if stage is not None:
+            found += [(f"{key}.behind_latch", stage.behind_latch), (f"{key}.ahead_latch", stage.ahead_latch)]
+            found += [(f"{key}.read.{name}", i) for name, i in (stage.forward_ifs_read or {}).items()]
+            found += [(f"{key}.write.{name}", i) for name, i in (stage.forward_ifs_write or {}).items()]
+    for key in ("icache", "dcache"):
+        found += [(f"{key}.mem_req_if", p[key].mem_req_if), (f"{key}.mem_resp_if", p[key].mem_resp_if)]
+    for idx, port in enumerate(p["memc"].ports):
+        found += [(f"memc.{idx}.{name}", getattr(port, name))
+                  for name in ("ic_req_latch", "dc_req_latch", "ic_serve_latch", "dc_serve_latch")]
+    found += [(f"ex.ahead.{name}", i) for name, i in p["ex"].ahead_latches.items()]
+    found += [(f"wb.behind.{name}", i) for name, i in p["wb"].behind_latches.items()]
+    for fu_name, fu in p["ex"].functional_units.items():
+        for sub_name, sub in fu.subunits.items():
+            key = f"ex.{fu_name}.{sub_name}"
+            found.append((f"{key}.ex_wb_interface", sub.ex_wb_interface))
+            if isinstance(sub, Jump):
+                found.append((f"{key}.schedule_if", sub.schedule_if))
+            elif isinstance(sub, Ldst_Fu):
+                found += [(f"{key}.{name}", getattr(sub, name))
+                          for name in ("dcache_if", "sched_ldst_if", "ldst_sched_if")]
+
+    interfaces: Dict[str, Any] = {}
+    seen = set()
+    for key, interface in found:
+        if interface is not None and id(interface) not in seen:
+            seen.add(id(interface))
+            interfaces[key] = interface
+    return interfaces
+
+
+def _counters(sm) -> Dict[str, PerfCounterBase]:
+    """Every performance counter of the SM, by unit name."""
+    p = sm.pipeline
+    found: List[PerfCounterBase] = [p["scheduler"].perf_count, p["icache"].perf_count,
+                                    p["dcache"].perf_count, p["prf_perf_count"]]
+    for fu in p["ex"].functional_units.values():
+        found += [sub.perf_count for sub in fu.subunits.values()]
+    found += p["wb"].wb_buffer.perf_counts.values()
+    timing = p["memc"].timing
+    if timing is not None:
+        found += [*timing.bank_perf, *timing.channel_perf]
+
+    counters: Dict[str, PerfCounterBase] = {}
+    for unit in found:
+        other = counters.setdefault(unit.unit_name, unit)
+        if other is not unit:
+            raise ValueError(f"{sm.name} has two performance counters named {unit.unit_name!r}")
+    return counters
+
+
+def _save_state(sm, w: _Writer) -> dict:
+    p = sm.pipeline
+    state: Dict[str, Any] = {"sm": _save_fields(sm, _SM_FIELDS, w)}
+
+    pages = list(p["mem"].pages)
+    data = b"".join(p["mem"].pages[page] for page in pages)
+    state["mem"] = {"pages": pages, "data": w.blob(np.frombuffer(data, dtype=np.uint8))}
+
+    memc = p["memc"]
+    state["memc"] = _save_fields(memc, _MEMC_FIELDS, w)
+    state["memc"]["ports"] = [_save_fields(port, _MEM_PORT_FIELDS, w) for port in memc.ports]
+    if memc.timing is not None:
+        state["memc"]["dram_banks"] = [_save_fields(bank, _DRAM_BANK_FIELDS, w) for bank in memc.timing.bank_state]
+        state["memc"]["dram_channels"] = [_save_fields(ch, _DRAM_CHANNEL_FIELDS, w) for ch in memc.timing.channel_state]
+
+    if "tbs" in p:
+        tbs = p["tbs"]
+        state["tbs"] = _save_fields(tbs, _TBS_FIELDS, w)
+        state["tbs"]["blocks"] = [_save_fields(block, _THREAD_BLOCK_FIELDS, w) for block in tbs.block_list]
+        # `working` is only set once an SM was given threads
+        state["tbs"]["sms"] = [{"avail_warps": rec.avail_warps, "working": getattr(rec, "working", False)}
+                               for rec in tbs.SMs]
+
+    sched = p["scheduler"]
+    state["scheduler"] = _save_fields(sched, _SCHEDULER_FIELDS, w)
+    state["scheduler"]["warp_table"] = [
+        {**_save_fields(group, _WARP_GROUP_FIELDS, w),
+         "warps": [_save_fields(warp, _WARP_FIELDS, w) for warp in group.warps]}
+        for group in sched.warp_table
+    ]
+    state["csr_table"] = _save_fields(p["csr_table"], ("table", "active_blks"), w)
+    state["kbp"] = _save_fields(p["kbp"], ("regs",), w)
+    state["fust"] = w.value(dict(p["fust"]))
+
+    icache = p["icache"]
+    state["icache"] = _save_fields(icache, _ICACHE_FIELDS, w)
+    # the last memory request; not set before the first miss
+    state["icache"]["req"] = w.value(getattr(icache, "req", None))
+
+    state["issue"] = _save_fields(p["issue"], _ISSUE_FIELDS, w)
+
+    ex = p["ex"]
+    units = {}
+    for fu_name, fu in ex.functional_units.items():
+        units[fu_name] = {}
+        for sub_name, sub in fu.subunits.items():
+            sub_state = _save_fields(sub, _subunit_fields(sub), w)
+            if isinstance(sub, ArithmeticSubUnit):
+                sub_state["pipeline"] = _save_fields(sub.pipeline, _buffer_fields(sub.pipeline), w)
+            units[fu_name][sub_name] = sub_state
+    state["ex"] = {"cycle": ex.cycle, "units": units}
+
+    wb = p["wb"]
+    state["wb"] = {
+        "values_to_writeback": w.value(wb.values_to_writeback),
+        "cycle": wb.wb_buffer.cycle,
+        "buffers": {name: _save_fields(buf, _buffer_fields(buf), w) for name, buf in wb.wb_buffer.buffers.items()},
+    }
+
+    dcache = p["dcache"]
+    state["dcache"] = _save_fields(dcache, _DCACHE_FIELDS, w)
+    state["dcache"]["banks"] = [
+        {**_save_fields(bank, _CACHE_BANK_ARRAYS, w), **_save_fields(bank, _CACHE_BANK_FIELDS, w)}
+        for bank in dcache.banks
+    ]
+    state["dcache"]["mshrs"] = [_save_fields(mshr, _MSHR_FIELDS, w) for mshr in dcache.mshrs]
+
+    state["prf"] = w.value(p["prf"].reg_file)
+    state["pipeline_rf"] = w.value(p["pipeline_rf"].regs)
+    state["golden_rf"] = w.value(p["golden_rf"].regs)
+
+    state["latches"] = {
+        name: _save_fields(interface, _LATCH_FIELDS if isinstance(interface, LatchIF) else _FORWARDING_FIELDS, w)
+        for name, interface in _interfaces(sm).items()
+    }
+    state["counters"] = {name: _save_fields(unit, _counter_fields(unit), w) for name, unit in _counters(sm).items()}
+    return state
+
+
+def _load_state(sm, state: dict, r: _Reader) -> None:
+    p = sm.pipeline
+    _load_fields(sm, state["sm"], _SM_FIELDS, r)
+
+    pages = r.blobs[state["mem"]["data"]].reshape(-1, PAGE_SIZE)
+    p["mem"].pages.clear()
+    p["mem"].pages.update((page, bytearray(data.tobytes())) for page, data in zip(state["mem"]["pages"], pages))
+
+    memc, memc_state = p["memc"], state["memc"]
+    _load_fields(memc, memc_state, _MEMC_FIELDS, r)
+    for port, saved in _pairs(memc.ports, memc_state["ports"], "memory controller ports"):
+        _load_fields(port, saved, _MEM_PORT_FIELDS, r)
+    if (memc.timing is None) != ("dram_banks" not in memc_state):
+        raise ValueError("checkpoint and SM disagree on whether the memory has DRAM timing")
+    if memc.timing is not None:
+        for bank, saved in _pairs(memc.timing.bank_state, memc_state["dram_banks"], "DRAM banks"):
+            _load_fields(bank, saved, _DRAM_BANK_FIELDS, r)
+        for ch, saved in _pairs(memc.timing.channel_state, memc_state["dram_channels"], "DRAM channels"):
+            _load_fields(ch, saved, _DRAM_CHANNEL_FIELDS, r)
+
+    if ("tbs" in p) != ("tbs" in state):
+        raise ValueError("checkpoint and SM disagree on whether there is a thread block scheduler")
+    if "tbs" in p:
+        tbs = p["tbs"]
+        _load_fields(tbs, state["tbs"], _TBS_FIELDS, r)
+        for block, saved in _pairs(tbs.block_list, state["tbs"]["blocks"], "thread blocks"):
+            _load_fields(block, saved, _THREAD_BLOCK_FIELDS, r)
+        for rec, saved in _pairs(tbs.SMs, state["tbs"]["sms"], "SM records"):
+            _load_fields(rec, saved, ("avail_warps", "working"), r)
+
+    sched = p["scheduler"]
+    _load_fields(sched, state["scheduler"], _SCHEDULER_FIELDS, r)
+    for group, saved in _pairs(sched.warp_table, state["scheduler"]["warp_table"], "warp groups"):
+        _load_fields(group, saved, _WARP_GROUP_FIELDS, r)
+        for warp, saved_warp in _pairs(group.warps, saved["warps"], "warps per group"):
+            _load_fields(warp, saved_warp, _WARP_FIELDS, r)
+    sched.sync_masks()
+    _load_fields(p["csr_table"], state["csr_table"], ("table", "active_blks"), r)
+    _load_fields(p["kbp"], state["kbp"], ("regs",), r)
+    # decode, issue and ex share the one dict
+    p["fust"].update(r.value(state["fust"]))
+
+    _load_fields(p["icache"], state["icache"], (*_ICACHE_FIELDS, "req"), r)
+    _load_fields(p["issue"], state["issue"], _ISSUE_FIELDS, r)
+
+    ex = p["ex"]
+    ex.cycle = state["ex"]["cycle"]
+    for fu_name, fu in ex.functional_units.items():
+        for sub_name, sub in fu.subunits.items():
+            saved = state["ex"]["units"][fu_name][sub_name]
+            _load_fields(sub, saved, _subunit_fields(sub), r)
+            if isinstance(sub, ArithmeticSubUnit):
+                _load_fields(sub.pipeline, saved["pipeline"], _buffer_fields(sub.pipeline), r)
+
+    wb = p["wb"]
+    wb.values_to_writeback = r.value(state["wb"]["values_to_writeback"])
+    wb.wb_buffer.cycle = state["wb"]["cycle"]
+    for name, buf in wb.wb_buffer.buffers.items():
+        _load_fields(buf, state["wb"]["buffers"][name], _buffer_fields(buf), r)
+
+    dcache = p["dcache"]
+    _load_fields(dcache, state["dcache"], _DCACHE_FIELDS, r)
+    for idx, (bank, saved) in enumerate(_pairs(dcache.banks, state["dcache"]["banks"], "D-cache banks")):
+        for name in _CACHE_BANK_ARRAYS:
+            _load_array(getattr(bank, name), saved[name], r, f"D-cache bank {idx} {name}")
+        _load_fields(bank, saved, _CACHE_BANK_FIELDS, r)
+        bank.tag_ways = [{int(bank.tags[s, way]): int(way) for way in np.flatnonzero(bank.valid[s])}
+                         for s in range(bank.num_sets)]
+    for mshr, saved in _pairs(dcache.mshrs, state["dcache"]["mshrs"], "MSHR buffers"):
+        _load_fields(mshr, saved, _MSHR_FIELDS, r)
+        mshr.by_block = {entry.block_addr_val: entry for entry in mshr.buffer}
+
+    _load_array(p["prf"].reg_file, state["prf"], r, "predicate register file")
+    _load_array(p["pipeline_rf"].regs, state["pipeline_rf"], r, "register file")
+    _load_array(p["golden_rf"].regs, state["golden_rf"], r, "golden register file")
+
+    interfaces = _interfaces(sm)
+    if set(interfaces) != set(state["latches"]):
+        raise ValueError(f"checkpoint latches {sorted(state['latches'])} do not match this SM's {sorted(interfaces)}")
+    for name, interface in interfaces.items():
+        fields = _LATCH_FIELDS if isinstance(interface, LatchIF) else _FORWARDING_FIELDS
+        _load_fields(interface, state["latches"][name], fields, r)
+
+    counters = _counters(sm)
+    if set(counters) != set(state["counters"]):
+        raise ValueError(f"checkpoint counters {sorted(state['counters'])} do not match this SM's {sorted(counters)}")
+    for name, unit in counters.items():
+        _load_fields(unit, state["counters"][name], _counter_fields(unit), r)
+
+
+# ── files ──────────────────────────────────────────────────────────────────────
+
+def save_checkpoint(sm, path: Path) -> None:
+    """Write the simulation state of a standalone SM; goes through a temporary file."""
+    if sm.shared_mem is not None or sm.shared_memc is not None or sm.shared_tbs is not None:
+        raise ValueError(f"{sm.name} shares units with a GPU; only standalone SMs can be checkpointed")
+
+    writer = _Writer()
+    state = _save_state(sm, writer)
+    manifest = {
+        "magic": CHECKPOINT_MAGIC,
+        "version": CHECKPOINT_VERSION,
+        "cycle": sm.cycle,
+        "test_file": str(sm.test_file),
+        "test_file_type": sm.test_file_type,
+        "settings": sm.config.model_dump(mode="json"),
+        "state": state,
+        "records": writer.records,
+    }
+    raw = np.frombuffer(json.dumps(manifest, separators=(",", ":")).encode(), dtype=np.uint8)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        np.savez_compressed(f, manifest=raw, **writer.blobs)
+    os.replace(tmp, path)
+
+
+def read_checkpoint(path: Path) -> tuple[dict, Dict[str, np.ndarray]]:
+    """Return (manifest, blobs) of a checkpoint file."""
+    with np.load(Path(path), allow_pickle=False) as archive:
+        if "manifest" not in archive.files:
+            raise ValueError(f"{path} is not a checkpoint")
+        manifest = json.loads(archive["manifest"].tobytes())
+        if manifest.get("magic") != CHECKPOINT_MAGIC:
+            raise ValueError(f"{path} is not a checkpoint")
+        if manifest.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path}: checkpoint version {manifest.get('version')}, expected {CHECKPOINT_VERSION}")
+        blobs = {name: archive[name] for name in archive.files if name != "manifest"}
+    return manifest, blobs
+
+
+def load_checkpoint(path: Path, sm_cls: type, config: Optional[Settings] = None):
+    """Build an SM of class sm_cls and restore a checkpoint into it.
+
+    Without a config the SM is built with the settings saved in the checkpoint.
+    The test file is loaded again to build the SM, so it must still exist.
+    """
+    manifest, blobs = read_checkpoint(path)
+    if config is None:
+        config = Settings.model_validate(manifest["settings"])
+    sm = sm_cls(test_file=Path(manifest["test_file"]), test_file_type=manifest["test_file_type"], config=config)
+    _load_state(sm, manifest["state"], _Reader(manifest["records"], blobs))
+    return sm
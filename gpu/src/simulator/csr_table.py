@@ -1,6 +1,5 @@
 from dataclasses import dataclass, field
 from typing import Any, List
-from bitstring import Bits
 
 @dataclass
 class CsrTable:
@@ -15,7 +15,11 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from collections import deque
 from datetime import datetime
-from bitstring import Bits 
+import numpy as np
+from simulator.word import FULL_MASK, lanes_to_mask
+from simulator.utils.trace import get_channel
+
+_trace = get_channel("prf")
 
 class PredicateRegFile():
     def __init__(self, num_preds_per_warp: int, num_warps: int):
@@ -24,52 +28,65 @@ class PredicateRegFile():
         self.banks = 1 # used in creation of writeback buffer (signifies number of physical banks in hardware)
         # ^^^ idk if this will ever be more than 1 but just leave this for now
 
-        self.reg_file: List[List[List]] = field(init=False)
-        # # 2D structure: warp -> predicate -> [bits per thread]
-        # self.reg_file = [
-        #     [[[True] * self.num_threads]
-        #       for _ in range(self.num_preds_per_warp)]
-        #     for _ in range(num_warps)
-        # ]
+        # 2D structure: warp -> predicate -> thread mask (lane i = bit i)
+        self.reg_file: np.ndarray = None
         self.reset(num_warps=num_warps)
     
     def read_predicate(self, prf_rd_en: int, prf_rd_wsel: int, prf_rd_psel: int, prf_neg: int):
         "Predicate register file reads by selecting a 1 from 32 warps, 1 from 16 predicates,"
         " and whether it wants the inverted version or not..."
+        " Returns the predicate as an int thread mask (lane i = bit i)."
 
         if (prf_rd_en):
-            return self.reg_file[prf_rd_wsel][prf_rd_psel] # no need to select the true/false
+            return int(self.reg_file[prf_rd_wsel, prf_rd_psel]) # no need to select the true/false
         else: 
             return None
     
     def write_predicate(self, prf_wr_en: int, prf_wr_wsel: int, prf_wr_psel: int, prf_wr_data):
-        # Warp granularity (prf_wr_data must be a list of 32 bools representing the predicate value for each thread in the warp)
+        # Warp granularity (prf_wr_data is an int thread mask or a sequence of 32 bools, one per thread)
         # the write will autopopulate the negated version in the table)
-        print("dest_pred =", prf_wr_psel)
-        print("num_preds_per_warp =", self.num_preds_per_warp)
+        if _trace.debug:
+            _trace.debug(f"dest_pred = {prf_wr_psel}, num_preds_per_warp = {self.num_preds_per_warp}")
         if (prf_wr_en):
-                # Convert int to bit array if needed
+            # Convert bool lanes to a thread mask if needed
             if isinstance(prf_wr_data, int):
-                bits = [(prf_wr_data >> i) & 1 == 1 for i in range(self.num_threads)]
+                mask = prf_wr_data & FULL_MASK
             else:
-                bits = prf_wr_data  # assume already a list of bools
+                mask = lanes_to_mask(prf_wr_data)
 
             # Store one version
-            self.reg_file[prf_wr_wsel][prf_wr_psel] = bits
+            self.reg_file[prf_wr_wsel, prf_wr_psel] = mask
+
+    def write_predicate_masked(self, prf_wr_en: int, prf_wr_wsel: int, prf_wr_psel: int, prf_wr_data: int, lane_mask: int):
+        # Warp granularity under a lane mask: only lanes set in lane_mask take their bit of prf_wr_data (an int thread mask)
+        if (prf_wr_en):
+            mask = int(self.reg_file[prf_wr_wsel, prf_wr_psel])
+            mask = (mask & ~lane_mask) | (prf_wr_data & lane_mask)
+            self.reg_file[prf_wr_wsel, prf_wr_psel] = mask & FULL_MASK
 
     def write_predicate_thread_gran(self, prf_wr_en: int, prf_wr_wsel: int, prf_wr_psel: int, prf_wr_tsel, prf_wr_data):
         # Thread granularity (prf_wr_data must be a single bool representing the predicate value for a single thread)
         # the write will autopopulate the negated version in the table)
         if (prf_wr_en):
             # Store just one version
-            self.reg_file[prf_wr_wsel][prf_wr_psel][prf_wr_tsel] = bool(prf_wr_data.uint)
+            mask = int(self.reg_file[prf_wr_wsel, prf_wr_psel])
+            if prf_wr_data:
+                mask |= 1 << prf_wr_tsel
+            else:
+                mask &= ~(1 << prf_wr_tsel)
+            self.reg_file[prf_wr_wsel, prf_wr_psel] = mask & FULL_MASK
 
     def reset(self, num_warps):
-        self.reg_file =[
-            [[[True] * self.num_threads]
-              for _ in range(self.num_preds_per_warp)]
-            for _ in range(num_warps)
-        ]
+        # every predicate starts all-True
+        self.reg_file = np.full((num_warps, self.num_preds_per_warp), FULL_MASK, dtype=np.uint32)
+
+    def occupancy(self) -> tuple[int, bool]:
+        """Return (written_slots, any_warp_full) in one pass over the mask array.
+
+        A (warp, pred) slot counts as written once its mask is no longer all-True.
+        """
+        written_per_warp = np.count_nonzero(self.reg_file != FULL_MASK, axis=1)
+        return int(written_per_warp.sum()), bool((written_per_warp == self.num_preds_per_warp).any())
 
     def dump(self, file=None):
         """
@@ -86,20 +103,12 @@ class PredicateRegFile():
 
         active_warps_found = False
 
-        for w in range(len(self.reg_file)):
-
-            warp_is_default = True
+        # Default = all threads True in every predicate of the warp
+        warp_is_default = (self.reg_file == FULL_MASK).all(axis=1)
 
-            # Check if warp is default state
-            for p in range(self.num_preds_per_warp):
-                entry = self.reg_file[w][p]
-
-                # Default = all threads True
-                if not all(entry):
-                    warp_is_default = False
-                    break
+        for w in range(len(self.reg_file)):
 
-            if warp_is_default:
+            if warp_is_default[w]:
                 continue
 
             active_warps_found = True
@@ -109,13 +118,12 @@ class PredicateRegFile():
 
             for p in range(self.num_preds_per_warp):
 
-                entry = self.reg_file[w][p]
+                mask = int(self.reg_file[w, p])
 
                 print(f"  P{p:<2}:", file=out)
 
                 for i in range(0, self.num_threads, 8):
-                    chunk = entry[i:i+8]
-                    formatted = [f"{int(b):>3}" for b in chunk]
+                    formatted = [f"{(mask >> t) & 1:>3}" for t in range(i, i + 8)]
                     print(f"    T{i:02d}-T{i+7:02d}: {' '.join(formatted)}", file=out)
 
                 print("", file=out)
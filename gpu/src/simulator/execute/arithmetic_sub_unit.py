@@ -3,17 +3,51 @@ from simulator.interfaces import LatchIF
 from common.custom_enums_multi import Op, R_Op, I_Op, F_Op, C_Op, H_Op, U_Op, B_Op, P_Op, J_Op
 from typing import Optional
 from simulator.instruction import Instruction
-from bitstring import Bits
+import numpy as np
+import copy
 import math
-from simulator.utils.data_structures.compact_queue import CompactQueue
+from simulator.word import WARP_SIZE, WORD_MASK, f32_bits, bits_f32, mask_to_lanes
+from simulator.utils.data_structures.pipeline_queue import PipelineQueue
 from simulator.utils.performance_counter.execute import ExecutePerfCount as PerfCount
 from simulator.utils.performance_counter.telemeter import Telemeter
+from simulator.utils.trace import get_channel
+
+_trace = get_channel("alu")
 
 # 32-bit signed integer limits
 MIN_INT32 = -(2**31)      # -2147483648
 MAX_INT32 = 2**31 - 1     # 2147483647
 
-class ArithmeticSubUnitPipeline(CompactQueue):
+def _lane_values(data: Optional[np.ndarray]) -> tuple[Optional[list], Optional[list]]:
+    """Signed-int and float views of a warp operand as plain Python lists."""
+    if data is None:
+        return None, None
+    return data.view(np.int32).tolist(), data.view(np.float32).tolist()
+
+def _lane_arrays(data: Optional[np.ndarray]) -> tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Signed-int (int64) and float (float64) views of a warp operand for vectorized compute."""
+    if data is None:
+        return None, None
+    # widening a signalling NaN raises the invalid flag; the value itself is fine
+    with np.errstate(invalid="ignore"):
+        return data.view(np.int32).astype(np.int64), data.view(np.float32).astype(np.float64)
+
+def _int_words(result) -> np.ndarray:
+    """Low 32 bits of integer lane results as uint32 words."""
+    return (np.asarray(result).astype(np.int64) & WORD_MASK).astype(np.uint32)
+
+def _float_words(result) -> np.ndarray:
+    """Float lane results rounded to single precision, as uint32 words."""
+    with np.errstate(over="ignore"):
+        return np.asarray(result, dtype=np.float64).astype(np.float32).view(np.uint32)
+
+# lane index operand used by CSRR when csr_param selects the thread id
+_LANE_IDS = np.arange(WARP_SIZE, dtype=np.int64)
+
+# opcodes whose lane results are floats (checked loosely for NaN payloads in differential mode)
+_FLOAT_RESULT_OPS = {R_Op.ADDF, R_Op.SUBF, R_Op.MULF, R_Op.DIVF, F_Op.ITOF, F_Op.SIN, F_Op.COS, F_Op.ISQRT}
+
+class ArithmeticSubUnitPipeline(PipelineQueue):
     def __init__(self, latency: int):
         super().__init__(length=latency, type_=Instruction)
         
@@ -51,12 +85,70 @@ class ArithmeticSubUnit(FunctionalSubUnit):
             if old_name in telemeter._units:
                 del telemeter._units[old_name]
             telemeter.register_unit(self.perf_count)
+        if telemeter:
+            telemeter.declare_trace_fields(overflow=bool)
 
         self.ex_wb_interface = LatchIF(name=f"{self.name}_EX_WB_Interface")
 
         # the way stages are connected in the SM class, we need (latency - 1) latches
         self.pipeline = ArithmeticSubUnitPipeline(latency=max(1, latency-1))
 
+        # when set, every compute also runs the per-lane reference path and
+        # compares the two bit-for-bit (see FunctionalUnitsConfig.differential_check)
+        self.differential_check = False
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        """Vectorized compute over all active lanes; writes instr.wdat and returns the overflow lane count."""
+        raise NotImplementedError()
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
+        """Per-lane reference implementation of _compute_lanes."""
+        raise NotImplementedError()
+
+    def _evaluate(self, instr: Instruction) -> int:
+        if not self.differential_check:
+            return self._compute_lanes(instr)
+
+        reference = copy.copy(instr)
+        reference.wdat = instr.wdat.copy()
+        expected_count = self._compute_lanes_scalar(reference)
+        count = self._compute_lanes(instr)
+
+        differs = reference.wdat != instr.wdat
+        if instr.opcode in _FLOAT_RESULT_OPS:
+            # which NaN payload survives an op on two NaNs is up to the host FPU/compiler
+            differs &= ~(np.isnan(reference.wdat.view(np.float32)) & np.isnan(instr.wdat.view(np.float32)))
+        mismatched = np.flatnonzero(differs)
+        if mismatched.size or expected_count != count:
+            raise RuntimeError(
+                f"[{self.name}] differential check failed for {instr.opcode} at pc {instr.pc:#010x}: "
+                f"lanes {mismatched.tolist()} differ (scalar {[f'{int(v):#010x}' for v in reference.wdat[mismatched]]}, "
+                f"vector {[f'{int(v):#010x}' for v in instr.wdat[mismatched]]}), "
+                f"overflow lanes scalar={expected_count} vector={count}"
+            )
+        return count
+
+    def _record_overflow(self, instr: Instruction, count: int):
+        if count:
+            # Record overflow immediately with the instruction that caused it
+            self.perf_count._record_unit_cycle(
+                instr=instr,
+                overflow=True,
+                pc=instr.pc,
+                overflow_thread_count=count
+            )
+
+    def cycles_until_active(self) -> Optional[int]:
+        if not self.ready_out or self.ex_wb_interface.snoop() is not None:
+            return 0
+        # the oldest instruction leaves the pipeline on the (idx + 1)-th advance
+        return self.pipeline.first_occupied()
+
+    def skip_cycles(self, cycles: int) -> None:
+        # same as `cycles` advances with no input; only empty head slots fall off
+        self.pipeline.advance_empty(cycles)
+        self._record_idle_cycles(cycles, overflow=False)
+
     def single_cycle_latency_compute_tick(self):
         if self.latency != 1 or self.ready_out is False:
             return
@@ -179,7 +271,7 @@ class Alu(ArithmeticSubUnit):
 
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -189,33 +281,148 @@ class Alu(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"ALU does not support operation {instr.opcode} for type {self.type_}")
 
+        self._record_overflow(instr, self._evaluate(instr))
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        opcode = instr.opcode
+        is_float = opcode in self.SUPPORTED_OPS[float]
+        operand_type = np.float64 if is_float else np.int64
+        rdat1_int, rdat1_float = _lane_arrays(instr.rdat1)
+        rdat2_int, rdat2_float = _lane_arrays(instr.rdat2)
+
+        if isinstance(opcode, C_Op):
+            a = instr.csr_value
+        elif is_float:
+            a = rdat1_float
+        elif isinstance(opcode, U_Op):
+            a = instr.imm
+        else:
+            a = rdat1_int
+
+        if isinstance(opcode, I_Op):
+            b = instr.imm
+        elif isinstance(opcode, C_Op):
+            b = 0 if instr.csr_param != 0 else _LANE_IDS
+        elif is_float:
+            b = rdat2_float
+        elif isinstance(opcode, U_Op):
+            if opcode == U_Op.AUIPC:
+                b = instr.pc
+            else:
+                b = rdat1_int
+        else:
+            b = rdat2_int
+
+        a = np.broadcast_to(np.asarray(a, dtype=operand_type), (WARP_SIZE,))
+        b = np.broadcast_to(np.asarray(b, dtype=operand_type), (WARP_SIZE,))
+        overflow = np.zeros(WARP_SIZE, dtype=bool)
+
+        with np.errstate(all="ignore"):
+            match opcode:
+                case R_Op.ADD | I_Op.ADDI | C_Op.CSRR | R_Op.ADDF | U_Op.AUIPC:
+                    result = a + b
+                    if opcode == R_Op.ADD or opcode == I_Op.ADDI:
+                        overflow = (result > MAX_INT32) | (result < MIN_INT32)
+                        for i in np.flatnonzero(overflow & mask):
+                            if _trace.debug:
+                                _trace.debug(f"Overflow detected in ADD/ADDI: {a[i]} + {b[i]} = {result[i]}")
+                case R_Op.SUB | I_Op.SUBI | R_Op.SUBF:
+                    result = a - b
+                    if opcode == R_Op.SUB:
+                        overflow = (result > MAX_INT32) | (result < MIN_INT32)
+                        for i in np.flatnonzero(overflow & mask):
+                            if _trace.debug:
+                                _trace.debug(f"Overflow detected in SUB/SUBI: {a[i]} - {b[i]} = {result[i]}")
+                case R_Op.AND:
+                    result = a & b
+                case R_Op.OR | I_Op.ORI:
+                    result = a | b
+                case R_Op.XOR | I_Op.XORI:
+                    result = a ^ b
+                case R_Op.SLT | I_Op.SLTI:
+                    result = a < b
+                case R_Op.SGE:
+                    result = a >= b
+                case R_Op.SGEU:
+                    result = (a & WORD_MASK) >= (b & WORD_MASK)
+                case R_Op.SLTU | I_Op.SLTIU:
+                    result = (a & WORD_MASK) < (b & WORD_MASK)
+                case R_Op.SLL | I_Op.SLLI | R_Op.SRL | I_Op.SRLI | R_Op.SRA | I_Op.SRAI:
+                    if (mask & (b < 0)).any():
+                        raise ValueError("negative shift count")
+                    # shifts of 32 or more clear the word (SRA saturates to the sign)
+                    if opcode == R_Op.SLL or opcode == I_Op.SLLI:
+                        result = np.where(b >= 32, 0, a << np.clip(b, 0, 31))
+                    elif opcode == R_Op.SRL or opcode == I_Op.SRLI:
+                        result = np.where(b >= 32, 0, (a & WORD_MASK) >> np.clip(b, 0, 31))
+                    else:
+                        result = a >> np.clip(b, 0, 63)
+                    overflow = (b >= 32) | (b < 0)
+                case R_Op.SLTF:
+                    overflow = ~np.isfinite(a) | ~np.isfinite(b)
+                    result = a < b
+                case R_Op.SGEF:
+                    overflow = ~np.isfinite(a) | ~np.isfinite(b)
+                    result = a >= b
+                case U_Op.LLI:
+                    # {old[31:12], imm[11:0]}
+                    result = (b & 0xFFFFF000) | (a & 0xFFF)
+                case U_Op.LMI:
+                    # {old[31:24], imm[11:0], old[11:0]}
+                    result = (b & 0xFF000FFF) | ((a & 0xFFF) << 12)
+                case U_Op.LUI:
+                    # {imm[7:0], old[23:0]}
+                    result = ((a & 0xFF) << 24) | (b & 0x00FFFFFF)
+                case _:
+                    raise ValueError(f"Unsupported operation {instr.opcode} in ALU_{self.type_}.")
+
+        if opcode in self.OUTPUT_TYPE[int]:
+            np.copyto(instr.wdat, _int_words(result), where=mask)
+        elif opcode in self.OUTPUT_TYPE[float]:
+            np.copyto(instr.wdat, _float_words(result), where=mask)
+        else:
+            raise ValueError(f"Opcode {instr.opcode} doesnt have an output type listed in {self.__class__.__name__}.OUTPUT_TYPE.")
+
+        return int(np.count_nonzero(overflow & mask))
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
         overflow_threads = []  # Track which thread lanes have overflow
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
+        rdat2_int, rdat2_float = _lane_values(instr.rdat2)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
 
             if isinstance(instr.opcode, C_Op):
-                a = instr.csr_value if instr.csr_param != 3 else instr.csr_value.uint
+                a = instr.csr_value
             elif instr.opcode in self.SUPPORTED_OPS[float]:
-                a = instr.rdat1[i].float
+                a = rdat1_float[i]
             elif isinstance(instr.opcode, U_Op):
-                a = instr.imm.int
+                a = instr.imm
             else:
-                a = instr.rdat1[i].int
+                a = rdat1_int[i]
             
             if isinstance(instr.opcode, I_Op):
-                b = instr.imm.int
+                b = instr.imm
             elif isinstance(instr.opcode, C_Op):
                 b = 0 if instr.csr_param != 0 else i
             elif instr.opcode in self.SUPPORTED_OPS[float]:
-                b = instr.rdat2[i].float
+                b = rdat2_float[i]
             elif isinstance(instr.opcode, U_Op):
                 if instr.opcode == U_Op.AUIPC:
-                    b = instr.pc.uint
+                    b = instr.pc
                 else:
-                    b = instr.rdat1[i].int
+                    b = rdat1_int[i]
             else:
-                b = instr.rdat2[i].int
+                b = rdat2_int[i]
 
             match instr.opcode:
                 # case R_Op.ADD | I_Op.ADDI:
@@ -225,14 +432,16 @@ class Alu(ArithmeticSubUnit):
                     if instr.opcode == R_Op.ADD or instr.opcode == I_Op.ADDI:
                         if result > MAX_INT32 or result < MIN_INT32:
                             overflow_threads.append(i)
-                            print(f"Overflow detected in ADD/ADDI: {a} + {b} = {result}")
+                            if _trace.debug:
+                                _trace.debug(f"Overflow detected in ADD/ADDI: {a} + {b} = {result}")
                 case R_Op.SUB | I_Op.SUBI | R_Op.SUBF:
                     result = a - b
                     # Check for signed overflow using range checking
                     if instr.opcode == R_Op.SUB:
                         if result > MAX_INT32 or result < MIN_INT32:
                             overflow_threads.append(i)
-                            print(f"Overflow detected in SUB/SUBI: {a} - {b} = {result}")
+                            if _trace.debug:
+                                _trace.debug(f"Overflow detected in SUB/SUBI: {a} - {b} = {result}")
                 case R_Op.AND:
                     result = a & b
                 case R_Op.OR | I_Op.ORI:
@@ -287,23 +496,13 @@ class Alu(ArithmeticSubUnit):
                     raise ValueError(f"Unsupported operation {instr.opcode} in ALU_{self.type_}.")
                 
             if instr.opcode in self.OUTPUT_TYPE[int]:
-                instr.wdat[i] = Bits(length=32, uint=result & 0xFFFFFFFF)
+                instr.wdat[i] = result & WORD_MASK
             elif instr.opcode in self.OUTPUT_TYPE[float]:
-                instr.wdat[i] = Bits(length=32, float=result)
+                instr.wdat[i] = f32_bits(result)
             else:
                 raise ValueError(f"Opcode {instr.opcode} doesnt have an output type listed in {self.__class__.__name__}.OUTPUT_TYPE.")
         
-        if overflow_threads:
-            # Record overflow immediately with the instruction that caused it
-            self.perf_count._record_unit_cycle(
-                instr=instr, 
-                overflow=True,
-                pc=instr.pc.uint,
-                overflow_thread_count=len(overflow_threads)
-            )
-
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
+        return len(overflow_threads)
 
 class Mul(ArithmeticSubUnit):
     SUPPORTED_OPS = {
@@ -318,7 +517,7 @@ class Mul(ArithmeticSubUnit):
         super().__init__(latency=latency, type_=type_, num=num, telemeter=telemeter)
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -328,42 +527,65 @@ class Mul(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"MUL does not support operation {instr.opcode} for type {self.type_}")
 
+        self._record_overflow(instr, self._evaluate(instr))
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        rdat1_int, rdat1_float = _lane_arrays(instr.rdat1)
+        rdat2_int, rdat2_float = _lane_arrays(instr.rdat2)
+
+        with np.errstate(all="ignore"):
+            match instr.opcode:
+                case R_Op.MUL:
+                    result = rdat1_int * rdat2_int
+                    overflow = (result > MAX_INT32) | (result < MIN_INT32)
+                    words = _int_words(result)
+                case R_Op.MULF:
+                    result = rdat1_float * rdat2_float
+                    overflow = ~np.isfinite(result)
+                    words = _float_words(result)
+                case _:
+                    raise ValueError(f"Unsupported operation {instr.opcode} in MUL.")
+
+        np.copyto(instr.wdat, words, where=mask)
+        return int(np.count_nonzero(overflow & mask))
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
         overflow_threads = []
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
+        rdat2_int, rdat2_float = _lane_values(instr.rdat2)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
 
             match instr.opcode:
                 case R_Op.MUL:
-                    a = instr.rdat1[i].int
-                    b = instr.rdat2[i].int
+                    a = rdat1_int[i]
+                    b = rdat2_int[i]
                     result = a * b
                     # Check for signed overflow using range checking
                     if result > MAX_INT32 or result < MIN_INT32:
                         overflow_threads.append(i)
-                    instr.wdat[i] = Bits(length=32, uint=result & 0xFFFFFFFF)
+                    instr.wdat[i] = result & WORD_MASK
                 case R_Op.MULF:
-                    a = instr.rdat1[i].float
-                    b = instr.rdat2[i].float
+                    a = rdat1_float[i]
+                    b = rdat2_float[i]
                     result = a * b
                     # Check for floating-point overflow
                     if math.isinf(result) or math.isnan(result):
                         overflow_threads.append(i)
-                    instr.wdat[i] = Bits(length=32, float=result)
+                    instr.wdat[i] = f32_bits(result)
                 case _:
                     raise ValueError(f"Unsupported operation {instr.opcode} in MUL.")
         
-        if overflow_threads:
-            # Record overflow immediately with the instruction that caused it
-            self.perf_count._record_unit_cycle(
-                instr=instr,
-                overflow=True,
-                pc=instr.pc.uint,
-                overflow_thread_count=len(overflow_threads)
-            )
-        
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
+        return len(overflow_threads)
 
 class Div(ArithmeticSubUnit):
     SUPPORTED_OPS = {
@@ -378,7 +600,7 @@ class Div(ArithmeticSubUnit):
         super().__init__(latency=latency, type_=type_, num=num, telemeter=telemeter)
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -388,15 +610,51 @@ class Div(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"DIV does not support operation {instr.opcode} for type {self.type_}")
 
+        self._record_overflow(instr, self._evaluate(instr))
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        rdat1_int, rdat1_float = _lane_arrays(instr.rdat1)
+        rdat2_int, rdat2_float = _lane_arrays(instr.rdat2)
+
+        with np.errstate(all="ignore"):
+            match instr.opcode:
+                case R_Op.DIV:
+                    # division by zero yields 0; MIN_INT / -1 wraps back to MIN_INT
+                    zero = rdat2_int == 0
+                    result = np.where(zero, 0, np.floor_divide(rdat1_int, np.where(zero, 1, rdat2_int)))
+                    overflow = zero | ((rdat1_int == MIN_INT32) & (rdat2_int == -1))
+                    words = _int_words(result)
+                case R_Op.DIVF:
+                    zero = rdat2_float == 0.0
+                    result = np.where(zero, 0.0, rdat1_float / rdat2_float)
+                    overflow = zero | ~np.isfinite(result)
+                    words = _float_words(result)
+                case _:
+                    raise ValueError(f"Unsupported operation {instr.opcode} in DIV.")
+
+        np.copyto(instr.wdat, words, where=mask)
+        return int(np.count_nonzero(overflow & mask))
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
         overflow_threads = []
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
+        rdat2_int, rdat2_float = _lane_values(instr.rdat2)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
                 
             match instr.opcode:
                 case R_Op.DIV:
-                    a = instr.rdat1[i].int
-                    b = instr.rdat2[i].int
+                    a = rdat1_int[i]
+                    b = rdat2_int[i]
                     if b == 0:
                         result = 0
                         overflow_threads.append(i)  # Division by zero
@@ -406,10 +664,10 @@ class Div(ArithmeticSubUnit):
                         if a == -2147483648 and b == -1:
                             overflow_threads.append(i)
                     # print(f"[EX: DIV] {a} / {b} = ", result)
-                    instr.wdat[i] = Bits(length=32, uint=result & 0xFFFFFFFF)
+                    instr.wdat[i] = result & WORD_MASK
                 case R_Op.DIVF:
-                    a = instr.rdat1[i].float
-                    b = instr.rdat2[i].float
+                    a = rdat1_float[i]
+                    b = rdat2_float[i]
                     if b == 0.0:
                         result = 0.0
                         overflow_threads.append(i)  # Division by zero
@@ -419,21 +677,11 @@ class Div(ArithmeticSubUnit):
                         if math.isinf(result) or math.isnan(result):
                             overflow_threads.append(i)
                     # print(f"[EX: DIV] {a} / {b} = ", result)
-                    instr.wdat[i] = Bits(length=32, float=result)
+                    instr.wdat[i] = f32_bits(result)
                 case _:
                     raise ValueError(f"Unsupported operation {instr.opcode} in DIV.")
         
-        if overflow_threads:
-            # Record overflow immediately with the instruction that caused it
-            self.perf_count._record_unit_cycle(
-                instr=instr,
-                overflow=True,
-                pc=instr.pc.uint,
-                overflow_thread_count=len(overflow_threads)
-            )
-        
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
+        return len(overflow_threads)
 
 class Conv(ArithmeticSubUnit):
     SUPPORTED_OPS = {
@@ -450,7 +698,7 @@ class Conv(ArithmeticSubUnit):
 
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -460,40 +708,68 @@ class Conv(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"Conversion does not support operation {instr.opcode}")
 
+        self._record_overflow(instr, self._evaluate(instr))
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        rdat1_int, rdat1_float = _lane_arrays(instr.rdat1)
+
+        with np.errstate(all="ignore"):
+            match instr.opcode:
+                case F_Op.ITOF:
+                    result = rdat1_int.astype(np.float64)
+                    overflow = (result > 3.4028235e+38) | (result < -3.4028235e+38)
+                    words = _float_words(result)
+                case F_Op.FTOI:
+                    invalid = np.flatnonzero(mask & ~np.isfinite(rdat1_float))
+                    if invalid.size:
+                        if np.isinf(rdat1_float[invalid[0]]):
+                            raise OverflowError("cannot convert float infinity to integer")
+                        raise ValueError("cannot convert float NaN to integer")
+                    result = np.trunc(rdat1_float)
+                    overflow = (result > MAX_INT32) | (result < MIN_INT32)
+                    # anything this large is a multiple of 2**32, so its low word is 0
+                    result = np.where(np.abs(result) >= 2.0**63, 0.0, result).astype(np.int64)
+                    words = _int_words(result)
+                case _:
+                    raise ValueError(f"Unsupported operation {instr.opcode} in Conversion.")
+
+        np.copyto(instr.wdat, words, where=mask)
+        return int(np.count_nonzero(overflow & mask))
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
         overflow_threads = []
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
 
             match instr.opcode:
                 case F_Op.ITOF:
-                    a = instr.rdat1[i].int
+                    a = rdat1_int[i]
                     result = float(a)
                     # Check for overflow (exceeding max float or min float)
                     if result > 3.4028235e+38 or result < -3.4028235e+38:
                         overflow_threads.append(i)
-                    instr.wdat[i] = Bits(length=32, float=result)
+                    instr.wdat[i] = f32_bits(result)
                 case F_Op.FTOI:
-                    a = instr.rdat1[i].float
+                    a = rdat1_float[i]
                     result = int(a)
                     # Check for overflow (exceeding max int or min int)
                     if result > 2147483647 or result < -2147483648:
                         overflow_threads.append(i)
-                    instr.wdat[i] = Bits(length=32, uint=result & 0xFFFFFFFF)
+                    instr.wdat[i] = result & WORD_MASK
                 case _:
                     raise ValueError(f"Unsupported operation {instr.opcode} in Conversion.")
         
-        if overflow_threads:
-            # Record overflow immediately with the instruction that caused it
-            self.perf_count._record_unit_cycle(
-                instr=instr,
-                overflow=True,
-                pc=instr.pc.uint,
-                overflow_thread_count=len(overflow_threads)
-            )
-        
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
+        return len(overflow_threads)
 
 class Sqrt(ArithmeticSubUnit):
     SUPPORTED_OPS = {
@@ -508,7 +784,7 @@ class Sqrt(ArithmeticSubUnit):
         super().__init__(latency=latency, type_=type_, num=num, telemeter=telemeter)
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -518,19 +794,39 @@ class Sqrt(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"SQRT does not support operation {instr.opcode} for type {self.type_}")
 
+        self._evaluate(instr)
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        rdat1_int, rdat1_float = _lane_arrays(instr.rdat1)
+        with np.errstate(all="ignore"):
+            # <= so that -0.0 also yields +0.0, as (-0.0) ** 0.5 does
+            result = np.where(rdat1_float <= 0.0, 0.0, np.sqrt(rdat1_float))
+
+        np.copyto(instr.wdat, _float_words(result), where=mask)
+        return 0
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
 
-            a = instr.rdat1[i].float
+            a = rdat1_float[i]
             if a < 0.0:
                 result = 0.0
             else:
                 result = a ** 0.5
-            instr.wdat[i] = Bits(length=32, float=result)
+            instr.wdat[i] = f32_bits(result)
         
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
+        return 0
 
 class Trig(ArithmeticSubUnit):
     SUPPORTED_OPS = {
@@ -582,9 +878,27 @@ class Trig(ArithmeticSubUnit):
         
         return x * self._K_n, y * self._K_n
 
+    def _cordic_lanes(self, alpha: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Lane-parallel version of _cordic: same iterations and rounding, one
+        rotation direction per lane.
+        """
+        theta = np.zeros_like(alpha)
+        x = np.ones_like(alpha)
+        y = np.zeros_like(alpha)
+        P2i = 1.0  # This will be 2**(-i) in the loop
+
+        for arc_tangent in self._theta_table:
+            sigma = np.where(theta < alpha, 1.0, -1.0)
+            theta = theta + sigma * arc_tangent
+            x, y = x - sigma * y * P2i, sigma * P2i * x + y
+            P2i /= 2.0
+
+        return x * self._K_n, y * self._K_n
+
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -594,12 +908,41 @@ class Trig(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"TRIG does not support operation {instr.opcode} for type {self.type_}")
 
+        self._record_overflow(instr, self._evaluate(instr))
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        rdat1_int, rdat1_float = _lane_arrays(instr.rdat1)
+
+        with np.errstate(all="ignore"):
+            cos_result, sin_result = self._cordic_lanes(rdat1_float)
+
+        match instr.opcode:
+            case F_Op.SIN:
+                result = sin_result
+            case F_Op.COS:
+                result = cos_result
+            case _:
+                raise ValueError(f"Unsupported operation {instr.opcode} in TRIG.")
+
+        np.copyto(instr.wdat, _float_words(result), where=mask)
+        return int(np.count_nonzero(~np.isfinite(result) & mask))
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
         overflow_threads = []
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
 
-            a = instr.rdat1[i].float
+            a = rdat1_float[i]
             cos_result, sin_result = self._cordic(a)
             
             match instr.opcode:
@@ -614,19 +957,9 @@ class Trig(ArithmeticSubUnit):
             if math.isinf(result) or math.isnan(result):
                 overflow_threads.append(i)
             
-            instr.wdat[i] = Bits(length=32, float=result)
-        
-        if overflow_threads:
-            # Record overflow immediately with the instruction that caused it
-            self.perf_count._record_unit_cycle(
-                instr=instr,
-                overflow=True,
-                pc=instr.pc.uint,
-                overflow_thread_count=len(overflow_threads)
-            )
+            instr.wdat[i] = f32_bits(result)
         
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
+        return len(overflow_threads)
 
 class InvSqrt(ArithmeticSubUnit):
     SUPPORTED_OPS = {
@@ -641,7 +974,7 @@ class InvSqrt(ArithmeticSubUnit):
     
     def compute(self):
         # Use current_instr if pipeline is empty (latency=1), else use last queue entry
-        instr = self.pipeline.queue[-1]
+        instr = self.pipeline.snoop_tail()
         if instr is None:
             return
 
@@ -651,14 +984,47 @@ class InvSqrt(ArithmeticSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS[self.type_]:
             raise ValueError(f"InvSqrt does not support operation {instr.opcode} for type {self.type_}")
 
+        self._record_overflow(instr, self._evaluate(instr))
+
+        if self.latency == 1:
+            self.single_cycle_latency_compute_tick()
+
+    def _compute_lanes(self, instr: Instruction) -> int:
+        if not instr.predicate:
+            return 0
+        mask = mask_to_lanes(instr.predicate)
+
+        if instr.opcode != F_Op.ISQRT:
+            raise ValueError(f"Unsupported operation {instr.opcode} in InvSqrt for type {self.type_}.")
+
+        rdat1_int, a = _lane_arrays(instr.rdat1)
+        valid = ~(a <= 0.0)
+
+        with np.errstate(all="ignore"):
+            # Fast inverse square root (Quake III) on every lane at once
+            i_bits = a.astype(np.float32).view(np.uint32).astype(np.int64)
+            i_bits = (0x5f3759df - (i_bits >> 1)) & WORD_MASK
+            y = i_bits.astype(np.uint32).view(np.float32).astype(np.float64)
+
+            num_iterations = max(1, self.latency - 1)
+            for _ in range(num_iterations):
+                y = y * (1.5 - 0.5 * a * y * y)
+
+        result = np.where(valid, y, 0.0)
+        np.copyto(instr.wdat, _float_words(result), where=mask)
+        return int(np.count_nonzero((~valid | ~np.isfinite(result)) & mask))
+
+    def _compute_lanes_scalar(self, instr: Instruction) -> int:
         overflow_threads = []
+        predicate = mask_to_lanes(instr.predicate).tolist()
+        rdat1_int, rdat1_float = _lane_values(instr.rdat1)
         for i in range(32):
-            if instr.predicate[i].bin == "0":
+            if not predicate[i]:
                 continue
                 
             match instr.opcode:
                 case F_Op.ISQRT:
-                    a = instr.rdat1[i].float
+                    a = rdat1_float[i]
                     if a <= 0.0:
                         result = 0.0
                         overflow_threads.append(i)  # Invalid input
@@ -666,15 +1032,14 @@ class InvSqrt(ArithmeticSubUnit):
                         # Fast inverse square root algorithm (Quake III)
                         # Convert float to int representation for bit manipulation
                         
-                        # Get the bit representation using Bits
-                        bits_obj = Bits(length=32, float=a)
-                        i_bits = bits_obj.int
+                        # Get the bit representation (a > 0, so the sign bit is clear)
+                        i_bits = f32_bits(a)
                         
                         # Magic constant for fast inverse square root
                         i_bits = 0x5f3759df - (i_bits >> 1)
                         
-                        # Convert back to float using Bits
-                        y = Bits(length=32, uint=i_bits).float
+                        # Convert back to float
+                        y = bits_f32(i_bits)
                         
                         # Newton-Raphson iterations based on latency
                         # More iterations = more accuracy, simulating more cycles
@@ -688,18 +1053,8 @@ class InvSqrt(ArithmeticSubUnit):
                         if math.isinf(result) or math.isnan(result):
                             overflow_threads.append(i)
                     
-                    instr.wdat[i] = Bits(length=32, float=result)
+                    instr.wdat[i] = f32_bits(result)
                 case _:
                     raise ValueError(f"Unsupported operation {instr.opcode} in InvSqrt for type {self.type_}.")
         
-        if overflow_threads:
-            # Record overflow immediately with the instruction that caused it
-            self.perf_count._record_unit_cycle(
-                instr=instr,
-                overflow=True,
-                pc=instr.pc.uint,
-                overflow_thread_count=len(overflow_threads)
-            )
-        
-        if self.latency == 1:
-            self.single_cycle_latency_compute_tick()
\ No newline at end of file
+        return len(overflow_threads)
@@ -1,8 +1,7 @@
 from builtins import range
 from abc import ABC, abstractmethod
-import logging
 from typing import Optional, List
-from bitstring import Bits
+import numpy as np
 from simulator.utils.performance_counter.telemeter import Telemeter
 from common.custom_enums_multi import Op, R_Op, I_Op, F_Op, B_Op, P_Op, J_Op, C_Op, H_Op, U_Op, S_Op
 from simulator.utils.performance_counter.execute import ExecutePerfCount as PerfCount, BranchPerfCount
@@ -11,8 +10,10 @@ from simulator.interfaces import LatchIF, ForwardingIF
 from simulator.instruction import Instruction
 from simulator.mem.dMemPackets import dMemResponse
 from simulator.mem_types import dCacheRequest
+from simulator.word import WARP_SIZE, warp_zeros, warp_fill, mask_to_lanes, lanes_to_mask
+from simulator.utils.trace import get_channel
 
-logger = logging.getLogger(__name__)
+_trace = get_channel("ldst")
 
 class FunctionalSubUnit(ABC):
     def __init__(self, num: int, telemeter: Telemeter = None):
@@ -23,6 +24,8 @@ class FunctionalSubUnit(ABC):
 
         if telemeter:
             telemeter.register_unit(self.perf_count)
+            # the columns _record_cycle traces
+            telemeter.declare_trace_fields(warp_id=int, opcode=str, pc=int, is_stalled=bool, pipeline_full=bool)
 
         # the way stages are connected in the SM class, we need (latency - 1) latches
         self.ex_wb_interface = LatchIF(name=f"{self.name}_EX_WB_Interface")
@@ -34,6 +37,24 @@ class FunctionalSubUnit(ABC):
     @abstractmethod
     def compute(self):
         pass
+
+    # see Stage.cycles_until_active; sub-units that do not override this are always ticked
+    def cycles_until_active(self) -> Optional[int]:
+        return 0
+
+    def skip_cycles(self, cycles: int) -> None:
+        raise NotImplementedError(f"{self.name} does not support skipping idle cycles")
+
+    def _record_idle_cycles(self, cycles: int, **record_kwargs):
+        # what _record_cycle records for a tick with no input, no output and no backpressure
+        self.perf_count.record_cycles(
+            cycles,
+            is_stalled=False,
+            is_busy=False,
+            pipeline_full=False,
+            instr=None,
+            **record_kwargs,
+        )
     
     # This method can be overridden in subclasses if they want to record additional custom performance data beyond the standard data.
     def _record_cycle(
@@ -63,7 +84,7 @@ class FunctionalSubUnit(ABC):
                 unit_name=self.name,
                 warp_id=instr.warp_group_id if instr is not None else None,
                 opcode=instr.opcode if instr is not None else None,
-                pc=instr.pc.uint if instr is not None else None,
+                pc=instr.pc if instr is not None else None,
                 is_stalled=not ex_wb_interface_ready,
                 pipeline_full=not ready_out,
                 **trace_kwargs,
@@ -76,7 +97,7 @@ class FunctionalSubUnit(ABC):
                 cycle=cycle,
                 warp_id=instr.warp_id if instr is not None else None,
                 opcode=instr.opcode if instr is not None else None,
-                pc=instr.pc.uint if instr is not None else None,
+                pc=instr.pc if instr is not None else None,
                 is_stalled=not ex_wb_interface_ready,
                 pipeline_full=not ready_out,
                 **trigger_kwargs,
@@ -136,9 +157,26 @@ class Ldst_Fu(FunctionalSubUnit):
 
     def compute(self):
         pass
+
+    def cycles_until_active(self) -> Optional[int]:
+        if (self.ldst_q or self.wb_buffer or self.outstanding or self.halting or self.waiting_for_flush
+                or self.sched_ldst_if.payload is not None or self.dcache_if.forward_if.payload is not None):
+            return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        self.perf_count.record_cycles(
+            cycles,
+            is_stalled=False,
+            is_busy=False,
+            instr=None,
+            q_occupancy=0,
+            q_capacity=self.ldst_q_size,
+        )
+        self.current_cycle += cycles
     
     def print_dcache_resp(self, dcache_response):
-        if dcache_response:
+        if dcache_response and _trace.debug:
             msg_type = dcache_response.type
             uuid = dcache_response.uuid
             data = dcache_response.data
@@ -152,27 +190,28 @@ class Ldst_Fu(FunctionalSubUnit):
             # ----------------------------------
 
             if (msg_type == 'MISS_ACCEPTED'):
-                print(f"[LSU] Received: MISS ACCEPTED (UUID: {uuid})")
+                _trace.debug(f"Received: MISS ACCEPTED (UUID: {uuid})")
             elif (msg_type == 'HIT_COMPLETE'):
-                print(f"[LSU] Received: HIT COMPLETE (Data: {data_hex})")
+                _trace.debug(f"Received: HIT COMPLETE (Data: {data_hex})")
             elif (msg_type == 'MISS_COMPLETE'):
-                print(f"[LSU] Received: MISS COMPLETE (UUID: {uuid}) - Data is in cache")
+                _trace.debug(f"Received: MISS COMPLETE (UUID: {uuid}) - Data is in cache")
             elif (msg_type == 'HIT_STALL'):
-                print(f"[LSU] Received: HIT STALL")
+                _trace.debug(f"Received: HIT STALL")
         
     def tick(self, issue_if: Optional[LatchIF]) -> Optional[Instruction]:
         return_instr = False
         current_instr = None
-        if issue_if and hasattr(issue_if, 'valid'):
-            print(f"[DEBUG] Cycle Start: QueueLen={len(self.ldst_q)}, LatchValid={issue_if.valid}")
+        if issue_if and hasattr(issue_if, 'valid') and _trace.debug:
+            _trace.debug(f"Cycle Start: QueueLen={len(self.ldst_q)}, LatchValid={issue_if.valid}")
 
         if issue_if and len(self.ldst_q) < self.ldst_q_size:
             instr = issue_if.pop()
             if instr != None:
-                print(f"LDST_FU: Accepting instruction from latch pc: {instr.pc}")
-                print(f"Servicing instruction: op: {instr.opcode} rd: {instr.rd} rs1: {instr.rs1} rs2: {instr.rs2} rdat1: {instr.rdat1} rdat2: {instr.rdat2}")
-                pm = pending_mem(instr, self.block_size_words, self.word_size_bytes)
-                print(f"Formatting the instr into a pending mem type..: {pm.__dict__}")
+                if _trace.debug:
+                    _trace.debug(f"Accepting instruction from latch pc: {instr.pc}")
+                    _trace.debug(f"Servicing instruction: op: {instr.opcode} rd: {instr.rd} rs1: {instr.rs1} rs2: {instr.rs2} rdat1: {instr.rdat1} rdat2: {instr.rdat2}")
+                    pm = pending_mem(instr, self.block_size_words, self.word_size_bytes)
+                    _trace.debug(f"Formatting the instr into a pending mem type..: {pm.__dict__}")
                 self.ldst_q.append(pending_mem(instr))
                 current_instr = instr
         
@@ -180,12 +219,14 @@ class Ldst_Fu(FunctionalSubUnit):
         if self.sched_ldst_if.payload != None:
             sched_payload = self.sched_ldst_if.pop()
             if sched_payload.get('halt', False):
-                print("[LSU] Received HALT command from Scheduler.")
+                if _trace.info:
+                    _trace.info("Received HALT command from Scheduler.")
                 self.halting = True
 
         #apply backpressure if ldst_q full
         if len(self.ldst_q) == self.ldst_q_size:
-            print(f"[LSU]: The queue is full")
+            if _trace.debug:
+                _trace.debug("The queue is full")
             # issue_if.forward_if.set_wait(True)
             self.ready_out = False
         else:
@@ -198,7 +239,8 @@ class Ldst_Fu(FunctionalSubUnit):
         if payload:
             self.dcache_if.forward_if.payload = None
             if len(self.ldst_q) == 0 and payload.type != 'FLUSH_COMPLETE':
-                print(f"LSQ is length 0 and recieved a dcache response. Should never happen!")
+                if _trace.error:
+                    _trace.error("LSQ is length 0 and recieved a dcache response. Should never happen!")
 
             self.print_dcache_resp(payload)
             match payload.type:
@@ -222,7 +264,8 @@ class Ldst_Fu(FunctionalSubUnit):
         
         #move mem_req to wb_buffer if finished
         if self.outstanding == False and len(self.ldst_q) > 0 and  self.ldst_q[0].readyWB() and len(self.wb_buffer) < self.wb_buffer_size:
-            print(f"LDST_FU: Finished processing Instruction pc: {self.ldst_q[0].instr.pc}")
+            if _trace.debug:
+                _trace.debug(f"Finished processing Instruction pc: {self.ldst_q[0].instr.pc}")
             completed_instr = self.ldst_q.pop(0).instr
             self.wb_buffer.append(completed_instr)
         
@@ -238,7 +281,8 @@ class Ldst_Fu(FunctionalSubUnit):
             elif len(self.ldst_q) > 0:
                 req = self.ldst_q[0].genReq()
                 if req:
-                    print(f"Sending request to dcache {req}")
+                    if _trace.debug:
+                        _trace.debug(f"Sending request to dcache {req}")
                     self.dcache_if.push(req)
                     self.outstanding = True
 
@@ -249,7 +293,8 @@ class Ldst_Fu(FunctionalSubUnit):
                 self.perf_count.record_instruction_completion(return_instr, self.current_cycle)
             # self.ex_wb_interface.push(return_instr) # REMOVE THIS LATER, JUST FOR TESTING
             if (return_instr):
-                print(f"LDST_FU: Pushing Instruction for WB pc: {return_instr.pc}")
+                if _trace.debug:
+                    _trace.debug(f"Pushing Instruction for WB pc: {return_instr.pc}")
         
         # Record performance metrics this cycle
         self.perf_count.record_cycle(
@@ -312,18 +357,19 @@ class pending_mem():
                 self.size = "word"
             
             case _:
-                logger.error(f"Err: instr in ldst cannot be decoded")
-                print(f"\t{instr}")
+                if _trace.error:
+                    _trace.error(f"Err: instr in ldst cannot be decoded\n\t{instr}")
         
         offset = 0
         if hasattr(self.instr, 'imm') and self.instr.imm is not None:
-            offset = self.instr.imm.int
+            offset = self.instr.imm
 
+        predicate = mask_to_lanes(self.instr.predicate).tolist()
         for i in range(32):
-            self.finished_idx[i] = 1-self.instr.predicate[i].uint #iirc pred=1'b1
-            if self.instr.predicate[i].uint == 1:
-                # self.addrs[i] = (self.instr.rdat1[i].uint + offset) & 0xFFFFFFFF
-                self.addrs[i] = (self.instr.rdat1[i].uint + offset)
+            self.finished_idx[i] = 1-int(predicate[i]) #iirc pred=1'b1
+            if predicate[i]:
+                # self.addrs[i] = (int(self.instr.rdat1[i]) + offset) & 0xFFFFFFFF
+                self.addrs[i] = (int(self.instr.rdat1[i]) + offset)
 
     def readyWB(self):
         return all(self.finished_idx)
@@ -333,7 +379,7 @@ class pending_mem():
             if self.finished_idx[i] == 0 and self.mshr_idx[i] == 0:
                 st_val = 0
                 if self.write:
-                    raw_val = self.instr.rdat2[i].int
+                    raw_val = int(self.instr.rdat2[i])
 
                     if self.size == "byte":
                         st_val = raw_val & 0xFF
@@ -351,8 +397,8 @@ class pending_mem():
         return None
     
     def parseHit(self, payload):
-        if self.write == False and not self.instr.wdat:
-            self.instr.wdat = [None for _ in range(32)]
+        if self.write == False and self.instr.wdat is None:
+            self.instr.wdat = warp_zeros()
         
         for i in range(32):
             if self.addrs[i] == payload.address:
@@ -379,10 +425,10 @@ class pending_mem():
                         #     raw_val = raw_val - 0x10000000
 
                     # if raw_val < 0:
-                    #     self.instr.wdat[i] = Bits(int = raw_val, length=32)
+                    #     self.instr.wdat[i] = raw_val & 0xFFFFFFFF
                     # else:
-                    #     self.instr.wdat[i] = Bits(uint = raw_val, length=32)
-                    self.instr.wdat[i] = Bits(uint = raw_val, length=32)
+                    #     self.instr.wdat[i] = raw_val
+                    self.instr.wdat[i] = raw_val
 
     
     def parseMshrHit(self, payload, block_size_words: int = 32, word_size_bytes: int = 4):
@@ -398,7 +444,8 @@ class pending_mem():
                     self.mshr_idx[i] = 0
                     self.finished_idx[i] = 1
                 else:
-                    print(f"[LSU] Wakeup thread {i} (Addr {hex(thread_addr)}) due to Block Match")
+                    if _trace.debug:
+                        _trace.debug(f"Wakeup thread {i} (Addr {hex(thread_addr)}) due to Block Match")
                     self.mshr_idx[i] = 0
                 
     
@@ -427,22 +474,26 @@ class Branch(FunctionalSubUnit):
         if instr.opcode not in self.SUPPORTED_OPS:
             raise ValueError(f"Branch does not support operation {instr.opcode}")
         
-        # FIX: initializng w-dat predicabtee becaue it yelling
-        instr.wdat_pred = [Bits(uint=0, length=1) for _ in range(32)]
-        for i in range(32):
-            if instr.predicate[i].bin == "0":
-                continue
-            match instr.opcode:
-                case B_Op.BEQ:
-                    instr.wdat_pred[i] = Bits(uint=(instr.rdat1[i].uint == instr.rdat2[i].uint), length=1)
-                case B_Op.BNE:
-                    instr.wdat_pred[i] = Bits(uint=(instr.rdat1[i].uint != instr.rdat2[i].uint), length=1)
-                case H_Op.HALT:
-                    continue
-                case _:
-                    raise ValueError(f"Unsupported operation {instr.opcode} in Branch.")
+        # result predicate as a lane mask; lanes outside the instruction's predicate stay 0
+        match instr.opcode:
+            case B_Op.BEQ:
+                instr.wdat_pred = lanes_to_mask(instr.rdat1 == instr.rdat2) & instr.predicate
+            case B_Op.BNE:
+                instr.wdat_pred = lanes_to_mask(instr.rdat1 != instr.rdat2) & instr.predicate
+            case H_Op.HALT:
+                instr.wdat_pred = 0
+            case _:
+                raise ValueError(f"Unsupported operation {instr.opcode} in Branch.")
         self.data = instr
         
+    def cycles_until_active(self) -> Optional[int]:
+        if self.data is not None or not self.ready_out or self.ex_wb_interface.snoop() is not None:
+            return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        self._record_idle_cycles(cycles)
+
     def tick(self, behind_latch: LatchIF) -> Instruction:
         # Branch unit is assumed to have single-cycle latency for simplicity
         if isinstance(behind_latch, LatchIF):
@@ -503,20 +554,28 @@ class Jump(FunctionalSubUnit):
         
         match instr.opcode:
             case J_Op.JAL:
-                schedule_if_value = {"warp": instr.warp_id, "dest": instr.pc.uint + instr.imm.int}
-                instr.wdat = [Bits(uint=(instr.pc.uint + 4) & 0xFFFFFFFF, length=32) for x in range(32)]
+                schedule_if_value = {"warp": instr.warp_id, "dest": instr.pc + instr.imm}
+                instr.wdat = warp_fill(instr.pc + 4)
             case I_Op.JALR:
-                if not all(data == instr.rdat1[0] for data in instr.rdat1):
+                if not (instr.rdat1 == instr.rdat1[0]).all():
                       raise ValueError("JALR requires all rdat1 values to be the same for correct scheduling.")
-                schedule_if_value = {"warp": instr.warp_id, "dest": instr.rdat1[0].uint + instr.imm.int}
-                instr.wdat = [Bits(uint=(instr.pc.uint + 4) & 0xFFFFFFFF, length=32) for x in range(32)]
+                schedule_if_value = {"warp": instr.warp_id, "dest": int(instr.rdat1[0]) + instr.imm}
+                instr.wdat = warp_fill(instr.pc + 4)
             case P_Op.JPNZ:
-                schedule_if_value = {"warp": instr.warp_id, "dest": instr.pc.uint + instr.imm.int if not all(x == Bits(uint=0, length=1) for x in instr.predicate) else instr.pc.uint + 4}
+                schedule_if_value = {"warp": instr.warp_id, "dest": instr.pc + instr.imm if instr.predicate else instr.pc + 4}
             case _:
                 raise ValueError(f"Unsupported operation {instr.opcode} in Jump.")
             
         self.schedule_if.push(schedule_if_value)
         
+    def cycles_until_active(self) -> Optional[int]:
+        if self.data is not None or not self.ready_out or self.ex_wb_interface.snoop() is not None:
+            return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        self._record_idle_cycles(cycles)
+
     def tick(self, behind_latch: LatchIF) -> Instruction:
         if self.schedule_if is None:
             raise ValueError("Jump unit requires a forwarding interface to the Schedule stage for correct operation.")
@@ -1,11 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from abc import ABC
-from typing import List
+from typing import List, Optional
 from simulator.execute.functional_sub_unit import FunctionalSubUnit, Branch, Jump, Ldst_Fu
 from simulator.execute.arithmetic_sub_unit import Alu, Mul, Div, Sqrt, Trig, InvSqrt, Conv
 from simulator.utils.data_structures.compact_queue import CompactQueue
 from simulator.instruction import Instruction
+from simulator.stage import earliest_wakeup
 
 @dataclass
 class MemBranchJumpUnitConfig:
@@ -108,6 +109,13 @@ class FunctionalUnit(ABC):
         for subunit in self.subunits.values():
             subunit.compute()
 
+    def cycles_until_active(self) -> Optional[int]:
+        return earliest_wakeup(subunit.cycles_until_active() for subunit in self.subunits.values())
+
+    def skip_cycles(self, cycles: int) -> None:
+        for subunit in self.subunits.values():
+            subunit.skip_cycles(cycles)
+
     def tick(self, behind_latch: LatchIF, fust: dict[str, bool]) -> List[Instruction]:
         out_data = {}
         for subunit_name, subunit in self.subunits.items():
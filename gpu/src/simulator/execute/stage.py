@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from simulator.stage import Stage
+from simulator.stage import Stage, earliest_wakeup
 from simulator.interfaces import LatchIF
 from simulator.instruction import Instruction
+from simulator.execute.arithmetic_sub_unit import ArithmeticSubUnit
 from simulator.execute.functional_unit import MemBranchJumpUnitConfig, IntUnitConfig, FpUnitConfig, SpecialUnitConfig, IntUnit, FpUnit, SpecialUnit, MemBranchJumpUnit
 from typing import Dict, Optional
 
@@ -20,6 +21,8 @@ class FunctionalUnitConfig:
     special_config: SpecialUnitConfig
     membranchjump_config: MemBranchJumpUnitConfig
 
+    differential_check: bool = False
+
     @classmethod
     def get_default_config(cls) -> FunctionalUnitConfig:
         return cls(
@@ -101,6 +104,8 @@ class ExecuteStage(Stage):
             for fsu_name, fsu in fu.subunits.items():
                 self.ahead_latches[fsu.ex_wb_interface.name] = fsu.ex_wb_interface
                 self.fsu_perf_counts[fsu.name] = fsu.perf_count
+                if isinstance(fsu, ArithmeticSubUnit):
+                    fsu.differential_check = config.differential_check
               
 
     def compute(self) -> None:
@@ -136,6 +141,16 @@ class ExecuteStage(Stage):
 
         self.cycle += 1
     
+    def cycles_until_active(self) -> Optional[int]:
+        if self.behind_latch.snoop() is not None:
+            return 0
+        return earliest_wakeup(fu.cycles_until_active() for fu in self.functional_units.values())
+
+    def skip_cycles(self, cycles: int) -> None:
+        for fu in self.functional_units.values():
+            fu.skip_cycles(cycles)
+        self.cycle += cycles
+
     def get_data(self) -> Optional[Instruction]:
         raise NotImplementedError()
     
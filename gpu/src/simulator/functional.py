@@ -0,0 +1,368 @@
+# this is the instruction-accurate counterpart of the SM: same architectural
+# state, no latches, one instruction at a time.
+from __future__ import annotations
+import atexit
+import copy
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+# ── simulator imports ──────────────────────────────────────────────────────────
+from common.custom_enums_multi import B_Op, H_Op, I_Op, P_Op, S_Op
+from simulator.interfaces import LatchIF, ForwardingIF
+from simulator.instruction import Instruction
+from simulator.mem_types import DecodeType
+from simulator.execute.stage import ExecuteStage
+from simulator.execute.arithmetic_sub_unit import ArithmeticSubUnit
+from simulator.execute.functional_sub_unit import Branch, Jump
+from simulator.issue.regfile import RegisterFile
+from simulator.scheduler.csrtable import CsrTable
+from simulator.kernel_base_pointers import KernelBasePointers
+from simulator.scheduler.scheduler import SchedulerStage
+from simulator.decode.decode_class import DecodeStage
+from simulator.decode.predicate_reg_file import PredicateRegFile
+from simulator.mem.dcache import SIZE_MASKS
+from simulator.mem.memory import Mem
+from simulator.sm import SM, build_functional_unit_config
+from simulator.tbs.tbs import ThreadBlockScheduler
+from simulator.utils import trace
+from simulator.utils.performance_counter import PerfConfig, Telemeter
+from simulator.warp import WarpState
+from simulator.word import FULL_MASK, mask_to_lanes
+from config import Settings, get_settings
+
+_trace = trace.get_channel("functional")
+
+# opcode -> (access size, is a store), as the LSU's pending_mem decodes them
+_LDST_ACCESS = {
+    I_Op.LW: ("word", False),
+    I_Op.LH: ("half", False),
+    I_Op.LB: ("byte", False),
+    S_Op.SW: ("word", True),
+    S_Op.SH: ("half", True),
+    S_Op.SB: ("byte", True),
+}
+
+
+class FunctionalSM:
+    """Instruction-accurate execution of a kernel on one SM.
+
+    Architectural state is held in the same objects the SM pipeline uses
+    (RegisterFile, PredicateRegFile, Mem, CsrTable, the scheduler's warp table
+    and the ThreadBlockScheduler), and every instruction goes through the real
+    DecodeStage and execute sub-units, so results match the cycle-accurate SM
+    for race-free kernels. Warps take turns a packet at a time in warp order;
+    loads and stores go straight to memory in lane order.
+
+    run(max_instructions) fast-forwards; hand_off(sm) then copies the state into
+    a freshly built SM, which carries on cycle-accurately from there.
+    """
+
+    def __init__(self,
+        test_file: Path,
+        test_file_type: str = "bin",
+        config: Optional[Settings] = None,
+        config_path: Optional[Path] = None,
+    ):
+        """Initialize the functional SM.
+
+        Args:
+            test_file: Path to binary/hex test file
+            test_file_type: File format ("bin" or "hex")
+            config: Pre-loaded Settings (optional)
+            config_path: Path to config file (optional, uses default if not provided)
+        """
+        if config is None:
+            self.config = get_settings(config_path) if config_path else get_settings()
+        else:
+            self.config = config
+
+        self.test_file = test_file
+        self.test_file_type = test_file_type
+
+        # warp instructions executed so far
+        self.instructions = 0
+        # called with (warp_id, pc) for every instruction fetched: the PC stream the ICache would see
+        self.on_fetch: Optional[Callable[[int, int], None]] = None
+
+        sm_cfg = self.config.sm
+        warp_count = sm_cfg.num_warps
+
+        self.mem = Mem(
+            start_pc=self.config.memory.start_pc,
+            input_file=str(test_file),
+            fmt=test_file_type,
+            cache_dir=self.config.memory.image_cache_dir or None,
+        )
+        # memsim.hex at exit belongs to the SM; golden output is dumped explicitly
+        atexit.unregister(self.mem.dump_on_exit)
+
+        self.rf = RegisterFile()
+        self.prf = PredicateRegFile(num_preds_per_warp=sm_cfg.num_preds, num_warps=warp_count)
+        self.csr_table = CsrTable()
+        self.kernel_base_ptrs = KernelBasePointers(max_kernels_per_SM=1)
+
+        # blocks arrive on the same latch / finish IF pair the SM's scheduler uses
+        self.launch_latch = LatchIF("TBS-WS Latch")
+        self.finish_if = ForwardingIF(name="scheduler_tbs_if")
+        if sm_cfg.enable_tbs:
+            self.tbs = ThreadBlockScheduler(
+                name="Thread_Block_Scheduler",
+                behind_latch=None,
+                ahead_latch=self.launch_latch,
+                forward_ifs_read={"Scheduler_TBS": self.finish_if},
+                forward_ifs_write=None,
+                threads_per_sm=warp_count * sm_cfg.threads_per_warp,
+                min_thread_division=2 * sm_cfg.threads_per_warp,
+                input_file=Path(test_file),
+            )
+            self.tbs.add_SM()
+            kernel_pointer_addr = self.tbs.load()
+        else:
+            self.tbs = None
+            self.launch_latch.push([0, sm_cfg.tb_size, self.config.memory.start_pc])
+            kernel_pointer_addr = sm_cfg.kernel_pointer_addr
+        self.kernel_base_ptrs.write(0, kernel_pointer_addr)
+
+        telemeter = Telemeter(PerfConfig.disabled())
+        self.scheduler = SchedulerStage(
+            name="Scheduler_Stage",
+            behind_latch=self.launch_latch,
+            ahead_latch=None,
+            forward_ifs_read={},
+            forward_ifs_write={},
+            csrtable=self.csr_table,
+            warp_count=warp_count,
+            policy=sm_cfg.scheduler_policy,
+            telemeter=telemeter,
+        )
+
+        fu_config = build_functional_unit_config(self.config)
+        fust = fu_config.generate_fust_dict()
+        self.ex_stage = ExecuteStage.create_pipeline_stage(functional_unit_config=fu_config, fust=fust, telemeter=telemeter)
+        self.units = {name: fsu for fu in self.ex_stage.functional_units.values() for name, fsu in fu.subunits.items()}
+        self.jump_if = ForwardingIF(name="branch_forward_if")
+        for unit in self.units.values():
+            if isinstance(unit, Jump):
+                unit.schedule_if = self.jump_if
+
+        self.decode_in = LatchIF("ICache-Decode Latch")
+        self.decode_out = LatchIF("Decode-Issue Latch")
+        self.packet_if = ForwardingIF(name="decode_forward_if")
+        self.decode = DecodeStage(
+            name="Decode Stage",
+            behind_latch=self.decode_in,
+            ahead_latch=self.decode_out,
+            prf=self.prf,
+            fust=fust,
+            csr_table=self.csr_table,
+            kernel_base_ptrs=self.kernel_base_ptrs,
+            forward_ifs_write={"Decode_Scheduler_Pckt": self.packet_if},
+        )
+
+        # warp whose packet is running; turns pass in warp order
+        self.current_warp = 0
+        self._launch_blocks()
+
+    @property
+    def finished(self) -> bool:
+        if self.tbs is not None:
+            return self.tbs.kern_finished
+        return not self.launch_latch.valid and not self._live_warps()
+
+    def _warp(self, warp_id: int):
+        return self.scheduler.warp_table[warp_id // 2].warps[warp_id % 2]
+
+    def _live_warps(self) -> list:
+        return [w for w in range(self.scheduler.warp_count) if self._warp(w).state != WarpState.HALT]
+
+    def _launch_blocks(self) -> None:
+        """Hand the scheduler every block the TBS will give this SM right now."""
+        if self.tbs is not None:
+            self.tbs.compute()
+        while self.launch_latch.valid:
+            self.scheduler.tbs_init()
+            if self.tbs is not None:
+                self.tbs.compute()
+
+    def _retire_blocks(self) -> None:
+        """Report the resident blocks as done once all their warps have halted (the flush_complete path)."""
+        sched = self.scheduler
+        sched.system_finished = True
+        sched.halt_sent = True
+        sched.reset_allocation()
+        if self.tbs is not None:
+            self.finish_if.push(list(self.csr_table.active_blks))
+            self.tbs.compute()
+        self.csr_table.reset_csr()
+        self.current_warp = 0
+        self._launch_blocks()
+
+    def run(self, max_instructions: Optional[int] = None) -> int:
+        """Execute until the kernel finishes or max_instructions have run; returns how many ran."""
+        executed = 0
+        while max_instructions is None or executed < max_instructions:
+            live = self._live_warps()
+            if not live:
+                if self.finished:
+                    break
+                if self.tbs is not None and not self.csr_table.active_blks:
+                    # nothing resident and nothing launched: the cycle-accurate SM would spin forever too
+                    raise RuntimeError(f"{len(self.tbs.blocks_not_sent)} thread blocks left but none fits on the SM")
+                self._retire_blocks()
+                continue
+
+            if self.current_warp not in live:
+                self.current_warp = next((w for w in live if w > self.current_warp), live[0])
+
+            end_of_packet = self.step(self.current_warp)
+            executed += 1
+            if end_of_packet or self._warp(self.current_warp).state == WarpState.HALT:
+                self.current_warp = next((w for w in live if w > self.current_warp), live[0])
+        return executed
+
+    def step(self, warp_id: int) -> bool:
+        """Fetch, decode, execute and write back one instruction of a warp; True at the end of its packet."""
+        warp = self._warp(warp_id)
+        group = self.scheduler.warp_table[warp_id // 2]
+
+        if self.on_fetch is not None:
+            self.on_fetch(warp_id, warp.pc)
+        instr = self.scheduler.make_instruction(warp_id // 2, warp_id, warp.pc)
+        instr.packet = int.from_bytes(self.mem.read(warp.pc, 4), "little")
+        warp.pc += 4
+
+        self.decode_in.push(instr)
+        self.decode.compute()
+        instr = self.decode_out.pop()
+        end_of_packet = self.packet_if.pop()["type"] == DecodeType.EOP
+
+        # issue: operand reads
+        if instr.num_operands >= 1:
+            instr.rdat1 = self.rf.read_warp_gran(warp_id, instr.rs1)
+        if instr.num_operands == 2:
+            instr.rdat2 = self.rf.read_warp_gran(warp_id, instr.rs2)
+
+        self._execute(instr)
+        self.instructions += 1
+        if _trace.debug:
+            _trace.debug(f"warp {warp_id} pc {instr.pc:#010x} {instr.opcode} predicate {instr.predicate:#010x}")
+
+        # jumps redirect the warp the way the Branch_Scheduler forwarding IF does
+        jump = self.jump_if.pop()
+        if jump is not None:
+            warp.pc = jump["dest"]
+
+        if instr.opcode == H_Op.HALT:
+            new_mask = instr.active_mask & ~instr.predicate & FULL_MASK
+            if warp_id % 2 == 0:
+                group.halt_mask_even &= new_mask
+                dead = group.halt_mask_even == 0
+            else:
+                group.halt_mask_odd &= new_mask
+                dead = group.halt_mask_odd == 0
+            if dead:
+                self.scheduler.set_warp_state(1 << warp_id, WarpState.HALT)
+            if group.halt_mask_even == 0 and group.halt_mask_odd == 0:
+                self.scheduler.set_group_halt(warp_id // 2, True)
+        else:
+            self._write_back(instr)
+        return end_of_packet
+
+    def _execute(self, instr: Instruction) -> None:
+        unit = self.units[instr.intended_FU]
+        if isinstance(unit, ArithmeticSubUnit):
+            if instr.opcode not in unit.SUPPORTED_OPS[unit.type_]:
+                raise ValueError(f"{unit.name} does not support operation {instr.opcode}")
+            unit._evaluate(instr)
+        elif isinstance(unit, (Branch, Jump)):
+            unit.data = instr
+            unit.compute()
+            unit.data = None
+        elif instr.opcode in _LDST_ACCESS:
+            self._load_store(instr)
+        else:
+            raise ValueError(f"Functional mode does not support operation {instr.opcode} (the LSU does not complete it either)")
+
+    def _load_store(self, instr: Instruction) -> None:
+        """Each active lane in order, with the D-cache's word/half/byte semantics."""
+        size, is_store = _LDST_ACCESS[instr.opcode]
+        size_mask = SIZE_MASKS[size]
+        for lane in np.flatnonzero(mask_to_lanes(instr.predicate)).tolist():
+            addr = int(instr.rdat1[lane]) + instr.imm
+            word_addr = addr & ~0x3
+            # a word access ignores the byte offset, as the cache indexes by word
+            shift = 0 if size == "word" else (addr & 0x3) * 8
+            word = int.from_bytes(self.mem.read(word_addr, 4), "little")
+            if is_store:
+                mask = size_mask << shift
+                store_value = int(instr.rdat2[lane]) & size_mask
+                word = ((word & ~mask) | ((store_value << shift) & mask)) & 0xFFFFFFFF
+                self.mem.write(word_addr, word.to_bytes(4, "little"), 4, verbose=False)
+            else:
+                instr.wdat[lane] = (word >> shift) & size_mask
+
+    def _write_back(self, instr: Instruction) -> None:
+        # BEQ/BNE write their whole result predicate; everything else only its active lanes
+        if instr.opcode == B_Op.BEQ or instr.opcode == B_Op.BNE:
+            lane_mask = FULL_MASK
+        else:
+            lane_mask = instr.predicate
+        if not lane_mask:
+            return
+
+        if instr.target_regfile == "pred_regfile":
+            self.prf.write_predicate_masked(
+                prf_wr_en=1,
+                prf_wr_wsel=instr.warp_id,
+                prf_wr_psel=instr.dest_pred,
+                prf_wr_data=instr.wdat_pred,
+                lane_mask=lane_mask,
+            )
+        else:
+            self.rf.write_warp_gran(warp_id=instr.warp_id, dest_operand=instr.rd, data=instr.wdat, mask=lane_mask)
+
+    def hand_off(self, sm: SM) -> None:
+        """Copy the architectural state into a freshly built SM so it continues cycle-accurately.
+
+        Register files, memory, the CSR table, the warp table and the TBS block
+        bookkeeping are copied; caches start cold and nothing is in flight.
+        """
+        if sm.cycle != 0:
+            raise ValueError(f"{sm.name} has already run {sm.cycle} cycles; hand off to a freshly built SM")
+
+        pipeline = sm.pipeline
+        pipeline["pipeline_rf"].regs[...] = self.rf.regs
+        pipeline["prf"].reg_file[...] = self.prf.reg_file
+        pipeline["mem"].pages = {page_no: bytearray(page) for page_no, page in self.mem.pages.items()}
+
+        csr_table = pipeline["csr_table"]
+        csr_table.table = copy.deepcopy(self.csr_table.table)
+        csr_table.active_blks.clear()
+        csr_table.active_blks.update(self.csr_table.active_blks)
+
+        sched = pipeline["scheduler"]
+        for name in ("warp_table", "free_warp", "oldest", "unissued", "rr_index", "gto_index", "halt_sent", "system_finished"):
+            setattr(sched, name, copy.deepcopy(getattr(self.scheduler, name)))
+        for group in sched.warp_table:
+            for warp in group.warps:
+                warp.in_flight = 0
+                if warp.state != WarpState.HALT:
+                    warp.state = WarpState.READY
+                    warp.finished_packet = False
+        sched.sync_masks()
+
+        tbs = pipeline.get("tbs")
+        if tbs is not None and self.tbs is not None:
+            tbs.block_list = copy.deepcopy(self.tbs.block_list)
+            tbs.blocks_not_sent = list(self.tbs.blocks_not_sent)
+            tbs.blocks_done = list(self.tbs.blocks_done)
+            tbs.SMs[0].avail_warps = self.tbs.SMs[0].avail_warps
+            tbs.kern_finished = self.tbs.kern_finished
+        elif tbs is None:
+            # the single static block has already been launched here
+            sched.behind_latch.pop()
+
+        if _trace.info:
+            _trace.info(f"Handed off to {sm.name} after {self.instructions} instructions")
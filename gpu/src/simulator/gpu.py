@@ -0,0 +1,134 @@
+# this is the top level that puts several SMs behind one memory system.
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional
+
+# ── simulator imports ──────────────────────────────────────────────────────────
+from simulator.sm import SM
+from simulator.mem.dram import timing_for
+from simulator.mem.mem_controller import MemController
+from simulator.mem.memory import Mem
+from simulator.tbs.tbs import ThreadBlockScheduler
+from simulator.utils import trace
+from config import Settings, get_settings
+
+_trace = trace.get_channel("gpu")
+
+class GPU:
+    """N SM pipelines sharing one Mem, one MemController and one ThreadBlockScheduler.
+
+    The grid comes from the kernel header in the test file (as with
+    sm.enable_tbs = true). The TBS hands blocks to whichever SM has room and
+    takes them back when that SM's warps have halted and flushed; each SM talks
+    to the controller through its own port.
+    """
+
+    def __init__(self,
+        test_file: Path,
+        test_file_type: str = "bin",
+        config: Optional[Settings] = None,
+        config_path: Optional[Path] = None
+    ):
+        """Initialize the GPU.
+
+        Args:
+            test_file: Path to binary/hex test file
+            test_file_type: File format ("bin" or "hex")
+            config: Pre-loaded Settings (optional)
+            config_path: Path to config file (optional, uses default if not provided)
+        """
+        if config is None:
+            self.config = get_settings(config_path) if config_path else get_settings()
+        else:
+            self.config = config
+
+        self.test_file = test_file
+        self.test_file_type = test_file_type
+        self.num_sms = self.config.sm.num_sms
+
+        self.cycle = 0
+        self.finished = False
+
+        trace.configure_from_settings(self.config.trace)
+
+        threads_per_warp = self.config.sm.threads_per_warp
+
+        self.mem = Mem(
+            start_pc=self.config.memory.start_pc,
+            input_file=str(test_file),
+            fmt=test_file_type,
+            cache_dir=self.config.memory.image_cache_dir or None,
+        )
+        self.memc = MemController(
+            name="Mem_Controller",
+            ic_req_latch=None,
+            dc_req_latch=None,
+            ic_serve_latch=None,
+            dc_serve_latch=None,
+            mem_backend=self.mem,
+            latency=self.config.memory.latency,
+            policy=self.config.memory.policy,
+            max_inflight=self.config.memory.max_inflight,
+            completions_per_cycle=self.config.memory.completions_per_cycle,
+            queue_depth=self.config.memory.queue_depth,
+            timing=timing_for(self.config.memory),
+        )
+        self.tbs = ThreadBlockScheduler(
+            name="Thread_Block_Scheduler",
+            behind_latch=None,
+            ahead_latch=None,
+            forward_ifs_read={},
+            forward_ifs_write=None,
+            threads_per_sm=self.config.sm.num_warps * threads_per_warp,
+            min_thread_division=2 * threads_per_warp,
+            input_file=Path(test_file),
+        )
+        self.tbs.load()
+
+        self.sms: List[SM] = [self._build_sm(sm_no) for sm_no in range(self.num_sms)]
+
+    def _sm_config(self, sm_no: int) -> Settings:
+        sm_config = self.config.model_copy(deep=True)
+        sm_config.sm.sm_no = sm_no
+        if self.num_sms > 1:
+            # keep each SM's perf files apart
+            sm_config.perf_counter.output_dir = str(Path(self.config.perf_counter.output_dir) / f"SM_{sm_no}")
+        return sm_config
+
+    def _build_sm(self, sm_no: int) -> SM:
+        return SM(
+            test_file=self.test_file,
+            test_file_type=self.test_file_type,
+            config=self._sm_config(sm_no),
+            mem=self.mem,
+            memc=self.memc,
+            tbs=self.tbs,
+        )
+
+    def tick(self):
+        if self.finished:
+            if _trace.info:
+                _trace.info(f"Simulation finished in {self.cycle} cycles.")
+            return
+
+        # same stage order as SM.tick, with the shared units run once per cycle
+        for sm in self.sms:
+            sm.tick_before_memc()
+        self.memc.compute()
+        for sm in self.sms:
+            sm.tick_after_memc()
+        self.tbs.compute()
+
+        self.cycle += 1
+        self.finished = self.tbs.kern_finished
+
+    def finalize(self):
+        """Finalize simulation and output every SM's performance counter data."""
+        for sm in self.sms:
+            sm.finalize()
+
+    def dump_stats(self):
+        """Dump every SM's dcache 3C statistics."""
+        for sm in self.sms:
+            if "dcache" in sm.pipeline and hasattr(sm.pipeline["dcache"], "dump_stats"):
+                sm.pipeline["dcache"].dump_stats()
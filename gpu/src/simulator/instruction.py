@@ -1,70 +1,179 @@
-from dataclasses import dataclass, field
 from typing import Optional, Any, Dict, List
-from bitstring import Bits
+import numpy as np
 from common.custom_enums_multi import Op
 
-@dataclass
-class Instruction:
+# every per-instruction field, in constructor order
+_FIELDS = (
     # ----- required (no defaults) -----
-    # STRUCTURAL HAZARD WITH PRED REG FILE WRITE AND READ LATER ON
-    # INSTRUCTION JUST CONTAINS THE OPCODE INFORMATION
-    # discusss more later about this..
-    pc: Optional[Bits] = None
-    warp_id: Optional[int] = None
-    warp_group_id: Optional[int] = None
-    num_operands: Optional[int] = None
-
+    "pc", "warp_id", "warp_group_id", "num_operands",
     # ----- fields populated by decode ----
-    intended_FU: Optional[str] = None 
-    rs1: Optional[Bits] = None
-    rs2: Optional[Bits] = None
-    rd: Optional[Bits]= None
-    src_pred: Optional[Bits]= None
-    dest_pred: Optional[Bits]= None
-    predicate: Optional[Bits] = None
-    active_mask: Optional[Bits] = None
-    opcode: Optional[Op]= None
-    imm: Optional[Bits]= None
-    csr_value: Optional[Any] = None
-    csr_param: Optional[Any] = None
-    
-    packet: Optional[Bits] = None
-    issued_cycle: Optional[int] = None
-    wb_cycle: Optional[int] = None
-    wb_entry_cycle: Optional[int] = None
-    target_bank: int = None 
-    target_regfile: Optional[str] = None
-
-    rdat1: list[Bits] = field(default_factory=list)
-    rdat2: list[Bits] = field(default_factory=list)
-    wdat: list[Bits] = field(default_factory=list)
-    wdat_pred: list[Bits] = field(default_factory=list)
-
-
-    # ----- optional / with defaults (must come after ALL non-defaults) -----
-    # this is for instruction data memory responses, populated by the MemController
-    stage_entry: Dict[str, int] = field(default_factory=dict)
-    stage_exit:  Dict[str, int] = field(default_factory=dict)
-    fu_entries:  List[Dict]     = field(default_factory=list)
-    
-
-
-
-    
+    "intended_FU", "rs1", "rs2", "rd", "src_pred", "dest_pred",
+    "predicate",     # lane mask, lane i active <-> bit i
+    "active_mask",   # lane i <-> bit i
+    "opcode", "imm",  # imm is sign-extended
+    "csr_value", "csr_param",
+    "packet", "issued_cycle", "wb_cycle", "wb_entry_cycle", "target_bank", "target_regfile",
+    # per-thread warp data: np.uint32[32] (float lanes via .view(np.float32))
+    "rdat1", "rdat2", "wdat",
+    "wdat_pred",     # predicate result as a lane mask
+    # ----- timing metadata, None until the first mark_* while track_timing is on -----
+    "stage_entry", "stage_exit", "fu_entries",
+    # memory responses built by the MemController: "WRITE_DONE" once a store landed
+    "status",
+)
+
+# recycled records kept for reuse; beyond this many the rest are left to the GC
+_POOL_LIMIT = 4096
+
+
+class Instruction:
+    """
+    One warp instruction as it moves through the pipeline.
+
+    A plain __slots__ record: the scheduler allocates one per fetched warp
+    instruction, so there is no per-instance dict, and the stage/FU timing
+    metadata (stage_entry, stage_exit, fu_entries) is only allocated when
+    `Instruction.track_timing` is set, which the SM does when cycle tracing
+    is enabled.
+
+    Records are recycled: acquire() takes one from a free list (or makes
+    one) and initialises it like the constructor, and release() hands a
+    retired record back. The writeback stage releases every instruction it
+    retires, so a record must not be used after writeback.
+
+    Equality is identity, like any object; two instructions with the same
+    fields are still two instructions.
+    """
+
+    __slots__ = _FIELDS
+
+    track_timing: bool = False
+    _pool: List["Instruction"] = []
+
+    def __init__(
+        self,
+        pc: Optional[int] = None,
+        warp_id: Optional[int] = None,
+        warp_group_id: Optional[int] = None,
+        num_operands: Optional[int] = None,
+        intended_FU: Optional[str] = None,
+        rs1: Optional[int] = None,
+        rs2: Optional[int] = None,
+        rd: Optional[int] = None,
+        src_pred: Optional[int] = None,
+        dest_pred: Optional[int] = None,
+        predicate: Optional[int] = None,
+        active_mask: Optional[int] = None,
+        opcode: Optional[Op] = None,
+        imm: Optional[int] = None,
+        csr_value: Optional[Any] = None,
+        csr_param: Optional[Any] = None,
+        packet: Optional[Any] = None,
+        issued_cycle: Optional[int] = None,
+        wb_cycle: Optional[int] = None,
+        wb_entry_cycle: Optional[int] = None,
+        target_bank: int = None,
+        target_regfile: Optional[str] = None,
+        rdat1: Optional[np.ndarray] = None,
+        rdat2: Optional[np.ndarray] = None,
+        wdat: Optional[np.ndarray] = None,
+        wdat_pred: Optional[int] = None,
+        stage_entry: Optional[Dict[str, int]] = None,
+        stage_exit: Optional[Dict[str, int]] = None,
+        fu_entries: Optional[List[Dict]] = None,
+        status: Optional[str] = None,
+    ):
+        self.pc = pc
+        self.warp_id = warp_id
+        self.warp_group_id = warp_group_id
+        self.num_operands = num_operands
+        self.intended_FU = intended_FU
+        self.rs1 = rs1
+        self.rs2 = rs2
+        self.rd = rd
+        self.src_pred = src_pred
+        self.dest_pred = dest_pred
+        self.predicate = predicate
+        self.active_mask = active_mask
+        self.opcode = opcode
+        self.imm = imm
+        self.csr_value = csr_value
+        self.csr_param = csr_param
+        self.packet = packet
+        self.issued_cycle = issued_cycle
+        self.wb_cycle = wb_cycle
+        self.wb_entry_cycle = wb_entry_cycle
+        self.target_bank = target_bank
+        self.target_regfile = target_regfile
+        self.rdat1 = rdat1
+        self.rdat2 = rdat2
+        self.wdat = wdat
+        self.wdat_pred = wdat_pred
+        self.stage_entry = stage_entry
+        self.stage_exit = stage_exit
+        self.fu_entries = fu_entries
+        self.status = status
+
+    # ---------------- Pool ----------------
+    @classmethod
+    def acquire(cls, **fields: Any) -> "Instruction":
+        """An instruction initialised with `fields`, reusing a released record when there is one."""
+        pool = cls._pool
+        if not pool:
+            return cls(**fields)
+        inst = pool.pop()
+        inst.__init__(**fields)
+        return inst
+
+    @classmethod
+    def release(cls, inst: "Instruction") -> None:
+        """Return a retired instruction to the free list. Nothing may use it afterwards."""
+        pool = cls._pool
+        if len(pool) < _POOL_LIMIT:
+            # drop the operand arrays now rather than when the record is reused
+            inst.rdat1 = inst.rdat2 = inst.wdat = inst.packet = None
+            pool.append(inst)
+
+    # ---------------- Timing metadata ----------------
     def mark_stage_enter(self, stage: str, cycle: int):
+        if not self.track_timing:
+            return
+        if self.stage_entry is None:
+            self.stage_entry = {}
         self.stage_entry.setdefault(stage, cycle)
 
     def mark_stage_exit(self, stage: str, cycle: int):
+        if not self.track_timing:
+            return
+        if self.stage_exit is None:
+            self.stage_exit = {}
         self.stage_exit[stage] = cycle
 
-    def mark_fu_enter(self, fu: str, cycle: int):
+    def mark_fu_enter(self, fu: str, cycle: int, always: bool = False):
+        # `always`: recorded regardless of track_timing, for counters that need the entry cycle
+        if not (always or self.track_timing):
+            return
+        if self.fu_entries is None:
+            self.fu_entries = []
         self.fu_entries.append({"fu": fu, "enter": cycle, "exit": None})
 
     def mark_fu_exit(self, fu: str, cycle: int):
+        if not self.fu_entries:
+            return
         for e in reversed(self.fu_entries):
             if e["fu"] == fu and e["exit"] is None:
                 e["exit"] = cycle
                 return
 
     def mark_writeback(self, cycle: int):
-        self.wb_cycle = cycle
\ No newline at end of file
+        self.wb_cycle = cycle
+
+    def fu_entry_cycle(self, fu: str) -> Optional[int]:
+        """Cycle this instruction first entered `fu`, if that was recorded."""
+        for e in self.fu_entries or ():
+            if e["fu"] == fu:
+                return e["enter"]
+        return None
+
+    def __repr__(self) -> str:
+        return f"Instruction({', '.join(f'{name}={getattr(self, name)!r}' for name in _FIELDS)})"
@@ -1,35 +1,46 @@
 from dataclasses import dataclass, field
-from typing import Any, List
-from bitstring import Bits
+from typing import Optional
+import numpy as np
+from simulator.word import mask_to_lanes
 
 @dataclass
 class RegisterFile:
-    # Hierarchy: Bank(List), Warp(List), Operand(List), Threads(List), Data per thread (int)
+    # Single preallocated array indexed [bank, warp // banks, operand, thread]
     banks: int = 2
     warps: int = 32
     regs_per_warp: int = 64
     threads_per_warp: int = 32
-    regs: List[List[List[List[Bits]]]] = field(init=False)
+    regs: np.ndarray = field(init=False)
 
     def __post_init__(self):
         self.reset()
 
-    def write_warp_gran(self, warp_id: int, dest_operand: Bits, data: Bits) -> None:
-        if dest_operand.uint > 0:
-            self.regs[warp_id % self.banks][warp_id // 2][dest_operand.uint] = data
-
-    def write_thread_gran(self, warp_id: int, dest_operand: Bits, thread_id: int, data: Bits) -> None:
-        if dest_operand.uint > 0:
-            self.regs[warp_id % self.banks][warp_id // 2][dest_operand.uint][thread_id] = data
-
-    def read_warp_gran(self, warp_id: int, src_operand: Bits) -> Any:
-        return self.regs[warp_id % self.banks][warp_id // 2][src_operand.uint]
+    def _loc(self, warp_id: int, operand: int) -> tuple:
+        return (warp_id % self.banks, warp_id // self.banks, operand)
+
+    def write_warp_gran(self, warp_id: int, dest_operand: int, data: np.ndarray, mask: Optional[int] = None) -> None:
+        """Write a whole warp row in place; only the lanes set in ``mask`` (lane i = bit i) when given."""
+        if dest_operand > 0:
+            row = self.regs[self._loc(warp_id, dest_operand)]
+            full = (1 << self.threads_per_warp) - 1
+            if mask is None or mask & full == full:
+                np.copyto(row, data, casting="unsafe")
+            else:
+                np.copyto(row, data, casting="unsafe", where=mask_to_lanes(mask)[:self.threads_per_warp])
+
+    def write_thread_gran(self, warp_id: int, dest_operand: int, thread_id: int, data: int) -> None:
+        if dest_operand > 0:
+            self.regs[self._loc(warp_id, dest_operand) + (thread_id,)] = data
+
+    def read_warp_gran(self, warp_id: int, src_operand: int) -> np.ndarray:
+        """Zero-copy view of a warp row; later writes to the register show through it."""
+        return self.regs[self._loc(warp_id, src_operand)]
     
-    def read_thread_gran(self, warp_id: int, src_operand: Bits, thread_id: int) -> Any:
-        return self.regs[warp_id % self.banks][warp_id // 2][src_operand.uint][thread_id]
+    def read_thread_gran(self, warp_id: int, src_operand: int, thread_id: int) -> int:
+        return int(self.regs[self._loc(warp_id, src_operand) + (thread_id,)])
 
     def reset(self):
-        self.regs = [[[[Bits(uint=0, length=32) for _ in range(self.threads_per_warp)] for _ in range(self.regs_per_warp)] for _ in range(self.warps // self.banks)] for _ in range(self.banks)]
+        self.regs = np.zeros((self.banks, self.warps // self.banks, self.regs_per_warp, self.threads_per_warp), dtype=np.uint32)
 
     def dump(self, float_regs=None, file=None):
         """
@@ -56,17 +67,12 @@ class RegisterFile:
 
         active_warps_found = False
 
+        # 1. Find warps with ANY non-zero register in one pass over the array
+        warp_has_data = self.regs.any(axis=(2, 3))
+
         for w in range(self.warps):
-            # 1. Check if the ENTIRE warp is empty first
-            warp_is_empty = True
-            for r in range(self.regs_per_warp):
-                data = self.read_warp_gran(w, Bits(uint=r, length=32))
-                if any(x.uint != 0 for x in data):
-                    warp_is_empty = False
-                    break
-            
             # If the whole warp is 0, skip it entirely
-            if warp_is_empty:
+            if not warp_has_data[w % self.banks, w // self.banks]:
                 continue
 
             active_warps_found = True
@@ -75,7 +81,7 @@ class RegisterFile:
 
             # 2. Print EVERY register for this warp, even if it's 0
             for r in range(self.regs_per_warp):
-                vals = self.read_warp_gran(w, Bits(uint=r, length=32))
+                vals = self.read_warp_gran(w, r)
                 
                 print(f"  R{r:<2} (HEX):", file=out)
 
@@ -85,7 +91,7 @@ class RegisterFile:
                     chunk = vals[i : i + 8]
                     
                     # Format as zero-padded hex (e.g., 00000000)
-                    formatted = [f"{v.hex:>8}" for v in chunk]
+                    formatted = [f"{int(v):08x}" for v in chunk]
                     
                     # Print the row of 8 threads
                     print(f"    T{i:02d}-T{i+7:02d}: {' '.join(formatted)}", file=out)
@@ -114,5 +120,5 @@ if __name__ == "__main__":
     # order of args for read (thread granularity):  (warp_id, src_operand, thread_id, data)
 
     # regfile.write_thread_gran(3, 2, 0, 120394234)
-    regfile.write_warp_gran(2, Bits(uint=3, length=32), [Bits(uint=67, length=32), Bits(uint=41, length=32)])
-    print(regfile.regs[0][1][3])
\ No newline at end of file
+    regfile.write_warp_gran(2, 3, [67, 41])
+    print(regfile.regs[0, 1, 3])
\ No newline at end of file
@@ -68,6 +68,8 @@ class IssueStage(Stage):
         self.fust_latency_cycles = max(1, int(self.fust_latency_cycles))
 
         self.cycle = 0
+        # warp instructions sent to execute so far
+        self.issued_count = 0
 
     # ---------------------------
     # Public entry point (1→4)
@@ -142,6 +144,7 @@ class IssueStage(Stage):
             if self.fust[self.dispatched[0].intended_FU] == 0:
                 self.ahead_latch.push(self.dispatched[0])
                 self.dispatched = [] 
+                self.issued_count += 1
 
         self.cycle += 1
 
@@ -154,6 +157,15 @@ class IssueStage(Stage):
 
         return self.dispatched
 
+    def cycles_until_active(self) -> Optional[int]:
+        if (self.behind_latch.valid or self.ready_to_dispatch or self.dispatched
+                or self.staged_even is not None or self.staged_odd is not None or any(self.iBufferCapacity)):
+            return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        self.cycle += cycles
+
     # --------------------------------
     # (1) FUST dispatch (EVEN first)
     # --------------------------------
@@ -1,13 +1,11 @@
-from bitstring import Bits
-
 class KernelBasePointers:
     def __init__(self, max_kernels_per_SM):
         self.max_kernels_per_SM = max_kernels_per_SM
 
-        self.regs = [Bits(uint=0, length=32)]*self.max_kernels_per_SM
+        self.regs = [0]*self.max_kernels_per_SM
 
     def read(self, kernel_id):
         return self.regs[kernel_id]
     
-    def write(self, kernel_id, ptr: Bits):
+    def write(self, kernel_id, ptr: int):
         self.regs[kernel_id] = ptr
\ No newline at end of file
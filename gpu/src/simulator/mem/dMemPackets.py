@@ -1,9 +1,8 @@
 from typing import NamedTuple, Optional
-from bitstring import Bits
 from simulator.interfaces import LatchIF, ForwardingIF
 
 class dMemRequest(NamedTuple): # LDST -> D$
-    addr: Bits
+    addr: int
     write: bool # 1 for a write, 0 for a read
     pc: int
 
@@ -14,8 +13,8 @@ class dMemResponse(NamedTuple): # D$ -> LDST
     uuid: int
     req: dMemRequest
     is_secondary: bool
-    data: Optional[list[Bits]]
-    addr: Bits
+    data: Optional[list[int]]
+    addr: int
     pc: int
     
 
@@ -5,18 +5,21 @@ Python simulator for Lockup-Free Cache.
 
 import sys
 import os
-import logging
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Tuple
-from collections import deque
+from typing import Optional, List, Dict, Any, NamedTuple, Tuple, Union
+from collections import OrderedDict, deque
+import numpy as np
 from simulator.interfaces import LatchIF, ForwardingIF
+from simulator.instruction import Instruction
 from simulator.stage import Stage
 from simulator.mem_types import dMemResponse
 from simulator.utils.performance_counter.cache import CachePerfCount
 from simulator.utils.performance_counter.telemeter import Telemeter
+from simulator.utils.trace import get_channel
 
-@dataclass
-class DCacheAddr:
+_trace = get_channel("dcache")
+
+class DCacheAddr(NamedTuple):
     tag: int
     set_index: int
     bank_id: int
@@ -27,31 +30,17 @@ class DCacheAddr:
 
     @classmethod
     def from_int(cls, addr: int, cfg: Dict[str, Any]) -> "DCacheAddr":
-        addr_temp = addr
-
-        byte_offset = addr_temp & ((1 << cfg["byte_off_bit_len"]) - 1)
-        addr_temp >>= cfg["byte_off_bit_len"]
-
-        block_offset = addr_temp & ((1 << cfg["block_off_bit_len"]) - 1)
-        addr_temp >>= cfg["block_off_bit_len"]
-
-        bank_id = addr_temp & ((1 << cfg["bank_id_bit_len"]) - 1)
-        addr_temp >>= cfg["bank_id_bit_len"]
-
-        set_index = addr_temp & ((1 << cfg["set_index_bit_len"]) - 1)
-        addr_temp >>= cfg["set_index_bit_len"]
-
-        tag = addr_temp & ((1 << cfg["tag_bit_len"]) - 1)
-        block_addr_val = addr >> (cfg["byte_off_bit_len"] + cfg["block_off_bit_len"])
-
+        # shifts and masks are worked out once, in build_dcache_config
+        (byte_mask, block_shift, block_mask, bank_shift, bank_mask,
+         set_shift, set_mask, tag_shift, tag_mask) = cfg["addr_fields"]
         return cls(
-            tag=tag,
-            set_index=set_index,
-            bank_id=bank_id,
-            block_offset=block_offset,
-            byte_offset=byte_offset,
-            full_addr=addr,
-            block_addr_val=block_addr_val,
+            (addr >> tag_shift) & tag_mask,
+            (addr >> set_shift) & set_mask,
+            (addr >> bank_shift) & bank_mask,
+            (addr >> block_shift) & block_mask,
+            addr & byte_mask,
+            addr,
+            addr >> bank_shift,
         )
 
 
@@ -74,10 +63,10 @@ class DCacheFrame:
     valid: bool = False
     dirty: bool = False
     tag: int = 0
-    block: List[int] = field(default_factory=list)
+    block: Union[List[int], np.ndarray] = field(default_factory=list)
 
     def __post_init__(self):
-        if not self.block:
+        if len(self.block) == 0:
             self.block = [0] * self.block_size_words
 
 
@@ -90,7 +79,7 @@ class MSHREntry:
     write_status: List[bool] = field(default_factory=list)
     write_block: List[int] = field(default_factory=list)
     original_request: Optional[DCacheRequest] = None
-    cycles_to_ready: int = 0
+    ready_cycle: int = 0    # MSHR cycle at which the entry may be serviced
 
     def __post_init__(self):
         if not self.write_status:
@@ -99,6 +88,10 @@ class MSHREntry:
             self.write_block = [0] * self.block_size_words
 
 
+# store sizes -> the bits they cover in a word
+SIZE_MASKS = {'word': 0xFFFFFFFF, 'half': 0xFFFF, 'byte': 0xFF}
+
+
 def build_dcache_config(cache_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     cfg = dict(cache_config or {})
 
@@ -124,6 +117,19 @@ def build_dcache_config(cache_config: Optional[Dict[str, Any]] = None) -> Dict[s
         + cfg["byte_off_bit_len"]
     )
 
+    # Address split: [ Tag | Set | Bank | BlockOff | ByteOff ] as the byte mask, then (shift, mask) per field
+    block_shift = cfg["byte_off_bit_len"]
+    bank_shift = block_shift + cfg["block_off_bit_len"]
+    set_shift = bank_shift + cfg["bank_id_bit_len"]
+    tag_shift = set_shift + cfg["set_index_bit_len"]
+    cfg["addr_fields"] = (
+        (1 << cfg["byte_off_bit_len"]) - 1,
+        block_shift, (1 << cfg["block_off_bit_len"]) - 1,
+        bank_shift, (1 << cfg["bank_id_bit_len"]) - 1,
+        set_shift, (1 << cfg["set_index_bit_len"]) - 1,
+        tag_shift, (1 << cfg["tag_bit_len"]) - 1,
+    )
+
     # Legacy aliases still referenced in parts of the cache model.
     cfg["byte_off_bits"] = cfg["byte_off_bit_len"]
     cfg["block_off_bits"] = cfg["block_off_bit_len"]
@@ -138,10 +144,12 @@ class MSHRBuffer:
     def __init__(self, cfg: Dict[str, Any], bank_id: int = 0):
         self.cfg = cfg
         self.buffer = deque()   # The buffer containing all the requests
+        self.by_block: Dict[int, MSHREntry] = {}   # The same entries, keyed by block address
         self.max_size = cfg["mshr_buffer_len"]  # The number of latches in the buffer
         self.bank_stall = False     # If the bank needs to be stalled if the MSHR buffer is full
         self.bank_id = bank_id      # which bank the MSHR buffer belongs to
         self.block_size_words = cfg["block_size_words"]
+        self.now = 0    # Cycles seen so far; entries become ready at their ready_cycle
 
         # Generating a range of unqiue UUID for each MSHR buffer in a bank
         local_uuid_bits = cfg["uuid_size"] - cfg["bank_id_bit_len"]
@@ -152,27 +160,22 @@ class MSHRBuffer:
         self.last_issued_uuid = 0    # The last issued UUID
     
     def cycle(self):
-        """Ages the entry at the head of the queue."""
-        for entry in self.buffer:
-            if entry.cycles_to_ready > 0:
-                entry.cycles_to_ready -= 1
+        """Ages the entries in the queue."""
+        self.now += 1
                 
-        if self.buffer: # If the buffer is not empty
+        if self.buffer and _trace.debug: # If the buffer is not empty
             head_entry = self.buffer[0]
-            if head_entry.cycles_to_ready > 0:
-                logging.debug(f"MSHR(B{self.bank_id}): Entry {head_entry.uuid} waiting at head, {head_entry.cycles_to_ready} cycles left.")
+            if head_entry.ready_cycle > self.now:
+                _trace.debug(f"MSHR(B{self.bank_id}): Entry {head_entry.uuid} waiting at head, {head_entry.ready_cycle - self.now} cycles left.")
             else:
                 # This log is helpful to show when an entry becomes ready
-                logging.debug(f"MSHR(B{self.bank_id}): Entry {head_entry.uuid} is ready at head.")
+                _trace.debug(f"MSHR(B{self.bank_id}): Entry {head_entry.uuid} is ready at head.")
 
     def is_full(self) -> bool:  # If all the latches contain a miss request
         return len(self.buffer) >= self.max_size
 
     def find_secondary_miss(self, block_addr: int) -> Optional[MSHREntry]:  # If the miss request already exists in the buffer, return the existing entry
-        for entry in self.buffer:
-            if entry.block_addr_val == block_addr:
-                return entry
-        return None
+        return self.by_block.get(block_addr)
     
     def check_stall(self, bank_empty: bool) -> bool:    # Check if MSHR buffer is full AND bank is busy
         is_full = self.is_full()
@@ -192,7 +195,8 @@ class MSHRBuffer:
         secondary = self.find_secondary_miss(req.addr.block_addr_val)   # See if the current request is a secondary miss
         if secondary:   # If the entry for that address exists (secondary miss)
             # Handle secondary miss
-            logging.debug(f"MSHR(B{req.addr.bank_id}): Secondary miss for block 0x{req.addr.block_addr_val:X}")
+            if _trace.debug:
+                _trace.debug(f"MSHR(B{req.addr.bank_id}): Secondary miss for block 0x{req.addr.block_addr_val:X}")
             if req.rw_mode == 'write':  # If the current request is write
                 # Merge the changes of the secondary request
                 secondary.write_status[req.addr.block_offset] = True    # Overwrite the write status to be true
@@ -227,21 +231,23 @@ class MSHRBuffer:
             write_status=write_status,  # The write status (write or read)
             write_block=write_block,    # The data to be written
             original_request=req,    # The original request
-            cycles_to_ready=self.cfg["mshr_buffer_len"],
+            ready_cycle=self.now + self.cfg["mshr_buffer_len"],
         )
         self.buffer.append(entry)   # Append the current MSHR entry to the buffer
-        logging.debug(f"MSHR(B{req.addr.bank_id}): New primary miss (UUID {uuid}) for block 0x{req.addr.block_addr_val:X}")
+        self.by_block[entry.block_addr_val] = entry
+        if _trace.debug:
+            _trace.debug(f"MSHR(B{req.addr.bank_id}): New primary miss (UUID {uuid}) for block 0x{req.addr.block_addr_val:X}")
         return uuid, True   # Return the UUID and true because a new entry was added to the buffer
 
     def get_head(self) -> Optional[MSHREntry]:  # Get the oldest entry in the buffer if it exists
-        """MODIFIED: Gets the head entry ONLY if its timer is 0."""
-        if self.buffer and self.buffer[0].cycles_to_ready == 0:
+        """MODIFIED: Gets the head entry ONLY if its timer has run out."""
+        if self.buffer and self.buffer[0].ready_cycle <= self.now:
             return self.buffer[0]
         return None # Not ready or buffer is empty
         
     def pop_head(self):     # Pop the oldest entry of the buffer if it exists
         if self.buffer:
-            self.buffer.popleft()
+            del self.by_block[self.buffer.popleft().block_addr_val]
 
     def is_empty(self) -> bool:     # Check if the buffer is empty
         return len(self.buffer) == 0
@@ -261,13 +267,17 @@ class CacheBank:
         self.set_idx_bits = cfg["set_index_bit_len"]
         self.tag_bits = cfg["tag_bit_len"]
 
-        self.sets: List[List[DCacheFrame]] = [
-            [DCacheFrame(block_size_words=self.cfg["block_size_words"]) for _ in range(self.num_ways)]
-            for _ in range(self.num_sets)
-        ]
-        self.lru: List[List[int]] = [
-            list(range(self.num_ways)) for _ in range(self.num_sets)
-        ]
+        # Tag store: one row per set, one column per way
+        self.tags = np.zeros((self.num_sets, self.num_ways), dtype=np.uint32)
+        self.valid = np.zeros((self.num_sets, self.num_ways), dtype=bool)
+        self.dirty = np.zeros((self.num_sets, self.num_ways), dtype=bool)
+        # LRU: the way used longest ago has the smallest stamp; way 0 starts as the MRU
+        self.last_use = np.tile(-np.arange(1, self.num_ways + 1, dtype=np.int64), (self.num_sets, 1))
+        self.lru_clock = 0
+        # tag -> way for the valid lines of each set
+        self.tag_ways: List[Dict[int, int]] = [{} for _ in range(self.num_sets)]
+        # Block data, [set, way, word]
+        self.data = np.zeros((self.num_sets, self.num_ways, self.block_size_words), dtype=np.uint32)
         
         # FSM State
         self.state = 'START'    # The defautl state
@@ -295,50 +305,69 @@ class CacheBank:
         self.flush_way_idx = 0
         self.state = 'FLUSH'
         self.busy = True
-        logging.debug(f"Bank {self.bank_id}: Starting FLUSH")
+        if _trace.debug:
+            _trace.debug(f"Bank {self.bank_id}: Starting FLUSH")
 
     def _update_lru(self, set_index: int, way: int):
-        if way in self.lru[set_index]:
-            self.lru[set_index].remove(way)     # Remove the way from the list first
-        self.lru[set_index].insert(0, way)  # Insert the way at the 0th index to represent the MRU
+        self.lru_clock += 1
+        self.last_use[set_index, way] = self.lru_clock  # The way becomes the MRU
         
     def _get_lru_way(self, set_index: int) -> int:
-        return self.lru[set_index][-1]  # Get the LRU way (last of the list)
+        return int(np.argmin(self.last_use[set_index]))  # Get the LRU way (oldest stamp)
+
+    def _frame(self, set_index: int, way: int) -> DCacheFrame:
+        """Copy of one line of the tag store and its data."""
+        return DCacheFrame(
+            block_size_words=self.block_size_words,
+            valid=bool(self.valid[set_index, way]),
+            dirty=bool(self.dirty[set_index, way]),
+            tag=int(self.tags[set_index, way]),
+            block=self.data[set_index, way].copy(),
+        )
+
+    @property
+    def sets(self) -> List[List[DCacheFrame]]:
+        """Snapshot of the cache contents as frames (for dumps; writing to it does not change the cache)."""
+        return [[self._frame(s, w) for w in range(self.num_ways)] for s in range(self.num_sets)]
+
+    @property
+    def lru(self) -> List[List[int]]:
+        """Ways of each set from MRU to LRU (for dumps)."""
+        return [[int(w) for w in np.argsort(-row, kind="stable")] for row in self.last_use]
 
     def check_hit(self, addr: DCacheAddr, rw_mode: str, data: int, size: str = 'word', raw_addr: int = 0) -> Tuple[bool, int]:
         set_idx = addr.set_index    # The set index
-        tag = addr.tag      # The tag
+
+        i = self.tag_ways[set_idx].get(addr.tag)   # The way holding the tag, if the line is valid
+        if i is None:
+            return False, 0 # Return False (miss), and a 0
+
+        # The request hit in the cache
+        self._update_lru(set_idx, i)    # Update the lru to make the current way index to be the MRU
+        load_data = int(self.data[set_idx, i, addr.block_offset])  # Load the data from that specific word
         
-        for i in range(self.num_ways):  # Check through all the ways in the set
-            frame = self.sets[set_idx][i]   # Get the frame for that way
-            if frame.valid and frame.tag == tag:    # if the fram is valid and the tags match --> The request hit in the cache
-                self._update_lru(set_idx, i)    # Update the lru to make the current way index to be the MRU
-                load_data = frame.block[addr.block_offset]  # Load the data from that specific word
-                
-                if rw_mode == 'write':  # if it's a write request
-                    old_word = frame.block[addr.block_offset]
-                    new_word = old_word
-                    byte_offset = raw_addr & 0x3 # Get the bottom 2 bits
-                    
-                    if size == 'word':
-                        new_word = data
-                    elif size == 'half':
-                        # Shift data to correct position and Mask
-                        shift = byte_offset * 8
-                        mask = 0xFFFF << shift
-                        # Clear old bits, OR in new bits
-                        new_word = (old_word & ~mask) | ((data << shift) & mask)
-                    elif size == 'byte':
-                        shift = byte_offset * 8
-                        mask = 0xFF << shift
-                        new_word = (old_word & ~mask) | ((data << shift) & mask)
-
-                    frame.block[addr.block_offset] = new_word
-                    frame.dirty = True  # Mark the data as dirty
-                
-                return True, load_data  # Return True (hit), and the hit data
+        if rw_mode == 'write':  # if it's a write request
+            old_word = load_data
+            new_word = old_word
+            byte_offset = raw_addr & 0x3 # Get the bottom 2 bits
+            
+            if size == 'word':
+                new_word = data
+            elif size == 'half':
+                # Shift data to correct position and Mask
+                shift = byte_offset * 8
+                mask = 0xFFFF << shift
+                # Clear old bits, OR in new bits
+                new_word = (old_word & ~mask) | ((data << shift) & mask)
+            elif size == 'byte':
+                shift = byte_offset * 8
+                mask = 0xFF << shift
+                new_word = (old_word & ~mask) | ((data << shift) & mask)
+
+            self.data[set_idx, i, addr.block_offset] = new_word & 0xFFFFFFFF
+            self.dirty[set_idx, i] = True  # Mark the data as dirty
         
-        return False, 0 # Return False (miss), and a 0
+        return True, load_data  # Return True (hit), and the hit data
 
     def start_miss_service(self, mshr_entry: MSHREntry):
         """
@@ -349,7 +378,7 @@ class CacheBank:
         
         set_idx = mshr_entry.original_request.addr.set_index    # Get the set indes for the victim/MSHR
         victim_way = self._get_lru_way(set_idx)     # Find out the LRU way (victim)
-        self.latched_victim = self.sets[set_idx][victim_way]    # Latch the victim cache frame
+        self.latched_victim = self._frame(set_idx, victim_way)    # Latch the victim cache frame
         self.latched_victim_way = victim_way    # latch the victim way
         
         # Creating the pull buffer that will replace the victim
@@ -358,25 +387,41 @@ class CacheBank:
             valid=True,
             dirty=any(mshr_entry.write_status), # Dirty if the request writes to any of the blocks
             tag=mshr_entry.original_request.addr.tag,
-            block=[0] * self.cfg["block_size_words"]
+            block=np.zeros(self.block_size_words, dtype=np.uint32)
         )
         
         # Transition FSM
         if self.latched_victim.valid and self.latched_victim.dirty:     # if the victim is valid and dirty
             self.state = 'VICTIM_EJECT'     # Need to write back the data
-            logging.debug(f"Bank {self.bank_id}: Miss. Dirty victim. -> VICTIM_EJECT")
+            if _trace.debug:
+                _trace.debug(f"Bank {self.bank_id}: Miss. Dirty victim. -> VICTIM_EJECT")
         else:
             self.state = 'BLOCK_PULL'   # Otherwise, get the data from the RAM for the oldest missed request
-            logging.debug(f"Bank {self.bank_id}: Miss. Clean victim. -> BLOCK_PULL")
+            if _trace.debug:
+                _trace.debug(f"Bank {self.bank_id}: Miss. Clean victim. -> BLOCK_PULL")
         
         # 2. NOW, invalidate the line in the cache
-        self.sets[set_idx][victim_way].valid = False
+        if self.latched_victim.valid:
+            del self.tag_ways[set_idx][self.latched_victim.tag]
+        self.valid[set_idx, victim_way] = False
         return self.state
 
     def complete_mem_access(self, data):
         self.incoming_mem_data = data
         self.waiting_for_mem = False
 
+    def _merge_writes(self, block: np.ndarray) -> None:
+        """Merge the active MSHR entry's pending writes into a block being filled."""
+        req = self.active_mshr.original_request
+        base_mask = SIZE_MASKS.get(req.size, 0xFFFFFFFF)
+        shift = (req.addr_val & 0x3) * 8
+        mask = base_mask << shift
+        for i, written in enumerate(self.active_mshr.write_status):
+            if written:
+                data = self.active_mshr.write_block[i]
+                new_word = (int(block[i]) & ~mask) | (data << shift)
+                block[i] = new_word & 0xFFFFFFFF
+
     def cycle(self) -> Dict: # No longer takes ram_resp
         """
         Advances the cache bank FSM by one cycle.
@@ -413,40 +458,21 @@ class CacheBank:
                     }
                     self.mem_req_if.push(request)   # Push the request to memory
                     self.waiting_for_mem = True     # Wait for memory flag goes high
-                    print(f"Bank {self.bank_id}: Sent READ req to Memory for 0x{block_addr:X}")
+                    if _trace.debug:
+                        _trace.debug(f"Bank {self.bank_id}: Sent READ req to Memory for 0x{block_addr:X}")
                 else:
                     # Interface is busy, try again next cycle
                     pass
             
             # Data has arrived from the memory
             elif not self.waiting_for_mem and self.incoming_mem_data is not None:
-                logging.debug(f"Bank {self.bank_id}: BLOCK_PULL complete.")
-                raw_bytes = self.incoming_mem_data.tobytes()    # Convert the incoming data to bytes
-
-                for i in range(self.cfg["block_size_words"]):
-                    start = i * 4
-                    end = start + 4
-                    if (start < len(raw_bytes)):
-                        word_bytes = raw_bytes[start:end]
-                        ram_word = int.from_bytes(word_bytes, byteorder='little')
-                    else:
-                        ram_word = 0
-
-                    if (self.active_mshr.write_status[i]):
-                        req = self.active_mshr.original_request
-                        data = self.active_mshr.write_block[i]
-                        
-                        size_masks = {'word': 0xFFFFFFFF, 'half': 0xFFFF, 'byte': 0xFF}
-                        base_mask = size_masks.get(req.size, 0xFFFFFFFF)
-                        
-                        shift = (req.addr_val & 0x3) * 8
-                        mask = base_mask << shift
-                        
-                        new_word = (ram_word & ~mask) | (data << shift)
-
-                        self.fill_buffer.block[i] = new_word & 0xFFFFFFFF
-                    else:
-                        self.fill_buffer.block[i] = ram_word
+                if _trace.debug:
+                    _trace.debug(f"Bank {self.bank_id}: BLOCK_PULL complete.")
+                raw_bytes = bytes(self.incoming_mem_data)    # Memory returns the block as little-endian bytes
+                block_bytes = self.block_size_words * 4
+                # A short response leaves the missing words 0
+                self.fill_buffer.block[:] = np.frombuffer(raw_bytes[:block_bytes].ljust(block_bytes, b"\0"), dtype="<u4")
+                self._merge_writes(self.fill_buffer.block)
                 
                 self.incoming_mem_data = None
                 next_state = 'FINISH'
@@ -483,24 +509,18 @@ class CacheBank:
         
         # Finished victinm eject and block pull
         elif self.state == 'FINISH':
-            for i in range(self.cfg["block_size_words"]):
-                if (self.active_mshr.write_status[i]):
-                    req = self.active_mshr.original_request
-                    data = self.active_mshr.write_block[i]
-                    
-                    size_masks = {'word': 0xFFFFFFFF, 'half': 0xFFFF, 'byte': 0xFF}
-                    base_mask = size_masks.get(req.size, 0xFFFFFFFF)
-                    
-                    shift = (req.addr_val & 0x3) * 8
-                    mask = base_mask << shift
-                    
-                    # Merge it directly into the fill_buffer before committing
-                    new_word = (self.fill_buffer.block[i] & ~mask) | (data << shift)
-                    self.fill_buffer.block[i] = new_word & 0xFFFFFFFF
+            # Merge it directly into the fill_buffer before committing
+            self._merge_writes(self.fill_buffer.block)
 
             set_idx = self.active_mshr.original_request.addr.set_index  # Get the set
-            self.sets[set_idx][self.latched_victim_way] = self.fill_buffer  
-            self._update_lru(set_idx, self.latched_victim_way)
+            way = self.latched_victim_way
+            fill = self.fill_buffer
+            self.tags[set_idx, way] = fill.tag
+            self.valid[set_idx, way] = fill.valid
+            self.dirty[set_idx, way] = fill.dirty
+            self.data[set_idx, way] = fill.block
+            self.tag_ways[set_idx][fill.tag] = way
+            self._update_lru(set_idx, way)
 
             outputs['uuid_ready'] = True
             outputs['uuid_out'] = self.active_mshr.uuid
@@ -511,23 +531,17 @@ class CacheBank:
             next_state = 'START'
         
         elif self.state == 'FLUSH':
-            # 1. Scan for dirty lines
-            while self.flush_set_idx < self.num_sets:
-                frame = self.sets[self.flush_set_idx][self.flush_way_idx]
-                
-                if frame.valid and frame.dirty:
-                    # Found dirty line, pause scanning and go to WRITEBACK
-                    next_state = 'WRITEBACK'
-                    break 
-                else:
-                    # Clean or invalid, increment indices
-                    self.flush_way_idx += 1
-                    if self.flush_way_idx >= self.num_ways:
-                        self.flush_way_idx = 0
-                        self.flush_set_idx += 1
+            # 1. Scan for dirty lines, from the current position in set/way order
+            pos = self.flush_set_idx * self.num_ways + self.flush_way_idx
+            dirty_lines = np.flatnonzero((self.valid & self.dirty).ravel()[pos:])
             
-            # 2. If we scanned everything, go to HALT
-            if self.flush_set_idx >= self.num_sets:
+            if dirty_lines.size:
+                # Found dirty line, pause scanning and go to WRITEBACK
+                self.flush_set_idx, self.flush_way_idx = divmod(pos + int(dirty_lines[0]), self.num_ways)
+                next_state = 'WRITEBACK'
+            else:
+                # 2. If we scanned everything, go to HALT
+                self.flush_set_idx, self.flush_way_idx = self.num_sets, 0
                 next_state = 'HALT'
         
         elif self.state == 'WRITEBACK':
@@ -535,8 +549,7 @@ class CacheBank:
             if not self.waiting_for_mem and self.incoming_mem_data is None:
                 if self.mem_req_if.ready_for_push():
                     # 1. Get the tag from the specific line we are flushing
-                    victim_frame = self.sets[self.flush_set_idx][self.flush_way_idx]
-                    victim_tag = victim_frame.tag
+                    victim_tag = int(self.tags[self.flush_set_idx, self.flush_way_idx])
                     
                     # 2. Reconstruct the full byte address
                     # Addr = [ Tag | Set | Bank | BlockOff | ByteOff ]
@@ -551,19 +564,20 @@ class CacheBank:
                         "uuid": 0, # Dummy UUID for flush operations
                         "warp": self.bank_id, # Used for routing response back to this bank
                         "rw_mode": "write",
-                        "data": victim_frame.block, # The data to write back,
+                        "data": self.data[self.flush_set_idx, self.flush_way_idx].copy(), # The data to write back,
                         "src": "dcache"
                     }
 
                     self.mem_req_if.push(req_payload)
                     self.waiting_for_mem = True
-                    print(f"Bank {self.bank_id}: Flushing address 0x{addr:X}")
+                    if _trace.debug:
+                        _trace.debug(f"Bank {self.bank_id}: Flushing address 0x{addr:X}")
             
             # 2. Wait for Ack ("WRITE_DONE")
             elif not self.waiting_for_mem and (self.incoming_mem_data == "WRITE_DONE"):
                 self.incoming_mem_data = None
                 # Clear dirty bit so we don't flush it again
-                self.sets[self.flush_set_idx][self.flush_way_idx].dirty = False
+                self.dirty[self.flush_set_idx, self.flush_way_idx] = False
                 # Advance iterator
                 self.flush_way_idx += 1
                 if self.flush_way_idx >= self.num_ways:
@@ -656,7 +670,7 @@ class LockupFreeCacheStage(Stage):
         # Calculate total blocks: Cache Size / (Words per Block * Bytes per Word)
         bytes_per_block = self.cfg["block_size_words"] * self.cfg["word_size_bytes"]
         self.total_cache_blocks = self.cfg["cache_size"] // bytes_per_block
-        self.shadow_fa_queue = [] # Acts as our perfect Fully Associative LRU
+        self.shadow_fa_queue: OrderedDict[int, None] = OrderedDict() # Acts as our perfect Fully Associative LRU (MRU last)
         
         self.cycle_count = 0
         self.output_buffer = deque()
@@ -681,7 +695,8 @@ class LockupFreeCacheStage(Stage):
 
     def compute(self) -> None:
         self.cycle_count += 1   # Increment the cycle count by 1
-        logging.info(f"--- Cache Cycle {self.cycle_count} ---")
+        if _trace.debug:
+            _trace.debug(f"--- Cache Cycle {self.cycle_count} ---")
         self.stall = False
         self.behind_latch.forward_if.set_wait(0)
         input_data = None
@@ -695,7 +710,8 @@ class LockupFreeCacheStage(Stage):
         # Check for memory responses
         if (self.mem_resp_if.valid):
             resp = self.mem_resp_if.pop()
-            print(f"Cache: Received memory response: {resp}")
+            if _trace.debug:
+                _trace.debug(f"Cache: Received memory response: {resp}")
             if (resp):
                 target_bank_id = resp.warp_id
                 if resp.packet:
@@ -707,6 +723,8 @@ class LockupFreeCacheStage(Stage):
                     
                 if (target_bank_id is not None) and (0 <= target_bank_id < self.cfg["num_banks"]):
                     self.banks[target_bank_id].complete_mem_access(data)
+                # the controller built this record just to carry the response
+                Instruction.release(resp)
         
         # Advance all internal components ---
         bank_busy_signals = []  # A list of busy signal from each bank
@@ -736,7 +754,8 @@ class LockupFreeCacheStage(Stage):
                 uuid = bank_out['uuid_out'] # Get the UUID for the finished miss request
                 if uuid in self.active_misses:  # if UUID is in the active misses list
                     req = self.active_misses.pop(uuid)    # Pop the UUID from the active miss dictionary
-                    logging.info(f"Cache: Miss for UUID {uuid} (addr 0x{req.addr_val:X}) is complete.")
+                    if _trace.debug:
+                        _trace.debug(f"Cache: Miss for UUID {uuid} (addr 0x{req.addr_val:X}) is complete.")
                     self.mshrs[i].pop_head()    # Pop the oldest entry from the MSHR buffer of the ith bank
                     
                     self.output_buffer.append(dMemResponse(
@@ -754,7 +773,8 @@ class LockupFreeCacheStage(Stage):
             if bank.state == 'START' and not mshr.is_empty():   # If the bank state is START and the MSHR is not empty
                 mshr_head = mshr.get_head() # Get the oldest MSHR request
                 if mshr_head: # <-- MODIFIED: Check if get_head() returned a ready entry
-                    logging.info(f"Cache: Bank {i} is starting service for miss UUID {mshr_head.uuid}")
+                    if _trace.debug:
+                        _trace.debug(f"Cache: Bank {i} is starting service for miss UUID {mshr_head.uuid}")
                     bank.start_miss_service(mshr_head)
                     if bank.state == 'VICTIM_EJECT':
                         _is_eviction = True
@@ -768,7 +788,8 @@ class LockupFreeCacheStage(Stage):
 
         # Check for Flush/Halt Command from Input ---
         if input_data and getattr(input_data, 'halt', False):
-            print(f"Cache: Received HALT signal. Starting flush.")
+            if _trace.info:
+                _trace.info(f"Cache: Received HALT signal. Starting flush.")
             self.flushing = True
             self.stall = True # Stop accepting inputs immediately
             self.behind_latch.forward_if.set_wait(1)    # Set the wait signal high
@@ -787,7 +808,8 @@ class LockupFreeCacheStage(Stage):
             
             # If every bank has reached HALT state
             if all_halted:
-                print(f"Cache: Flush Complete.")
+                if _trace.info:
+                    _trace.info(f"Cache: Flush Complete.")
 
                 # Create the response
                 response = dMemResponse(
@@ -806,7 +828,8 @@ class LockupFreeCacheStage(Stage):
         # Handle new inputs ---
         if self.pending_request is None and not self.flushing:    # if not handling any request
             if (input_data):  
-                print(f"Cache: Received new request: {input_data}")
+                if _trace.debug:
+                    _trace.debug(f"Cache: Received new request: {input_data}")
                 self.pending_request = DCacheRequest(
                     addr_val = getattr(input_data, 'addr_val', 0),
                     rw_mode = getattr(input_data, 'rw_mode', 'read'),
@@ -828,7 +851,8 @@ class LockupFreeCacheStage(Stage):
             
                 if hit:
                     # This is Cycle 1 of the hit
-                    logging.info(f"Cache: HIT for addr 0x{req.addr_val:X}. Pipelining.")
+                    if _trace.debug:
+                        _trace.debug(f"Cache: HIT for addr 0x{req.addr_val:X}. Pipelining.")
                     _is_hit = True
                     formatted_data = self.calc_data_size(data, req.addr_val, req.size)
 
@@ -840,13 +864,15 @@ class LockupFreeCacheStage(Stage):
                     self.behind_latch.forward_if.set_wait(0)
                 else:
                     # This is a MISS
-                    logging.info(f"Cache: MISS for addr 0x{req.addr_val:X}")
+                    if _trace.debug:
+                        _trace.debug(f"Cache: MISS for addr 0x{req.addr_val:X}")
 
                     # This now works because bank_busy_signals was populated in Step 3
                     bank_empty = not bank_busy_signals[bank_id]
 
                     if mshr.check_stall(bank_empty):
-                        print(f"Cache: MSHR FULL for bank {bank_id}. Stalling pipeline.")
+                        if _trace.debug:
+                            _trace.debug(f"Cache: MSHR FULL for bank {bank_id}. Stalling pipeline.")
                         self.stall = True
                         self.behind_latch.forward_if.set_wait(1)
                     else:
@@ -876,10 +902,11 @@ class LockupFreeCacheStage(Stage):
                             # Now update the shadow queue AFTER classification
                             block_addr = req.addr.block_addr_val
                             if block_addr in self.shadow_fa_queue:
-                                self.shadow_fa_queue.remove(block_addr)
-                            self.shadow_fa_queue.insert(0, block_addr)
+                                self.shadow_fa_queue.move_to_end(block_addr)
+                            else:
+                                self.shadow_fa_queue[block_addr] = None
                             if len(self.shadow_fa_queue) > self.total_cache_blocks:
-                                self.shadow_fa_queue.pop()
+                                self.shadow_fa_queue.popitem(last=False)
 
                         self.output_buffer.append(dMemResponse(
                             type = 'MISS_ACCEPTED',
@@ -893,7 +920,8 @@ class LockupFreeCacheStage(Stage):
                         self.pending_request = None
         
             else: # else for 'if not self.hit_pipeline_busy'
-                logging.debug(f"Cache: Input stage stalled, hit pipeline is busy.")
+                if _trace.debug:
+                    _trace.debug(f"Cache: Input stage stalled, hit pipeline is busy.")
                 self.stall = True
                 self.behind_latch.forward_if.set_wait(1)
                 # We can't accept a new request (hit or miss) because the
@@ -936,16 +964,36 @@ class LockupFreeCacheStage(Stage):
             is_eviction=_is_eviction,
         )
     
+    def cycles_until_active(self) -> Optional[int]:
+        if (self.mem_resp_if.valid or self.behind_latch.valid or self.pending_request is not None
+                or self.flushing or self.output_buffer):
+            return 0
+        for bank, mshr in zip(self.banks, self.mshrs):
+            if bank.state != 'START' or any(bank.hit_pipeline) or not mshr.is_empty():
+                return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        self.cycle_count += cycles
+        self.perf_count.record_cycles(
+            cycles,
+            is_stalled=False,
+            is_busy=False,
+            is_hit=False,
+            is_miss=False,
+            is_eviction=False,
+        )
+    
     def dump_stats(self):
+        if not _trace.info:
+            return
         total_misses = self.compulsory_misses + self.conflict_misses + self.capacity_misses
-        print("\n" + "="*40)
-        print("   D-Cache 3 C's Miss Breakdown")
-        print("="*40)
+        lines = ["D-Cache 3 C's Miss Breakdown", "="*40]
         if total_misses > 0:
-            print(f"Total Primary Misses: {total_misses}")
-            print(f"  Compulsory: {self.compulsory_misses:6} ({(self.compulsory_misses/total_misses)*100:.1f}%)")
-            print(f"  Conflict:   {self.conflict_misses:6} ({(self.conflict_misses/total_misses)*100:.1f}%)")
-            print(f"  Capacity:   {self.capacity_misses:6} ({(self.capacity_misses/total_misses)*100:.1f}%)")
+            lines.append(f"Total Primary Misses: {total_misses}")
+            lines.append(f"  Compulsory: {self.compulsory_misses:6} ({(self.compulsory_misses/total_misses)*100:.1f}%)")
+            lines.append(f"  Conflict:   {self.conflict_misses:6} ({(self.conflict_misses/total_misses)*100:.1f}%)")
+            lines.append(f"  Capacity:   {self.capacity_misses:6} ({(self.capacity_misses/total_misses)*100:.1f}%)")
         else:
-            print("No misses recorded.")
-        print("="*40 + "\n")
+            lines.append("No misses recorded.")
+        _trace.info("\n".join(lines))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Time the D-cache stage inside a full SM run on a memory dump.
+
+Each program runs for up to --cycles cycles; the time spent in
+LockupFreeCacheStage.compute() is measured on its own. The fingerprint
+hashes every response the cache hands the LSU plus the final cycle count,
+register file and memory, so two trees running the same command must print
+the same fingerprint for the cache to be cycle-identical between them.
+
+By default the gemm and BFS (pass 0) dumps from benchmark/memory_dump run:
+
+    python3 -m simulator.mem.dcache_benchmark [--cycles N] [DUMP.hex ...]
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import hashlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+GPU_ROOT = Path(__file__).resolve().parents[3]
+REPO_ROOT = GPU_ROOT.parent
+DEFAULT_DUMPS = [
+    REPO_ROOT / "benchmark/memory_dump/gemm/gemmInput_memDump_t32_b32.hex",
+    REPO_ROOT / "benchmark/memory_dump/BFS/pass0/BFS_Input_pass0_t1024_b1.hex",
+]
+
+if str(GPU_ROOT) not in sys.path:
+    sys.path.insert(0, str(GPU_ROOT))
+
+from config import get_settings
+from simulator.sm import SM
+
+
+def _response_key(resp) -> tuple:
+    if resp is None:
+        return (None,)
+    req = resp.req
+    return (resp.type, resp.address, resp.uuid, resp.data, getattr(req, "addr_val", None), getattr(req, "rw_mode", None))
+
+
+def run(dump: Path, fmt: str, max_cycles: int, perf_dir: str) -> dict:
+    settings = get_settings(GPU_ROOT / "config.toml")
+    settings.perf_counter.output_dir = perf_dir
+    digest = hashlib.sha256()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim = SM(test_file=dump, test_file_type=fmt, config=settings)
+        dcache = sim.pipeline["dcache"]
+
+        lsu_if = dcache.forward_ifs_write[dcache.DCACHE_LSU_IF_NAME]
+        push = lsu_if.push
+
+        def recording_push(resp):
+            digest.update(repr(_response_key(resp)).encode())
+            return push(resp)
+
+        lsu_if.push = recording_push
+
+        compute = dcache.compute
+        dcache_time = 0.0
+
+        def timed_compute():
+            nonlocal dcache_time
+            start = time.perf_counter()
+            compute()
+            dcache_time += time.perf_counter() - start
+
+        dcache.compute = timed_compute
+
+        start = time.perf_counter()
+        while not sim.finished and sim.cycle < max_cycles:
+            sim.tick()
+        total_time = time.perf_counter() - start
+
+    mem = sim.pipeline["mem"]
+    digest.update(f"{sim.cycle}".encode())
+    digest.update(sim.pipeline["pipeline_rf"].regs.tobytes())
+    for page_no in sorted(mem.pages):
+        digest.update(page_no.to_bytes(8, "little"))
+        digest.update(bytes(mem.pages[page_no]))
+    perf = dcache.perf_count
+    return {
+        "cycles": sim.cycle,
+        "hits": perf.hit_count,
+        "misses": perf.miss_count,
+        "evictions": perf.eviction_count,
+        "dcache_s": dcache_time,
+        "total_s": total_time,
+        "fingerprint": digest.hexdigest()[:16],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time the D-cache stage on memory dumps")
+    parser.add_argument("dumps", type=Path, nargs="*", default=DEFAULT_DUMPS, help="Memory dumps to run (default: gemm and BFS pass 0)")
+    parser.add_argument("--fmt", choices=["bin", "hex"], default="hex", help="Format of the dumps (default: hex)")
+    parser.add_argument("--cycles", type=int, default=50_000, help="Cycle limit per dump (default: 50000)")
+    args = parser.parse_args()
+
+    print(f"{'dump':<36} {'cycles':>8} {'hits':>7} {'misses':>7} {'evict':>6} {'dcache us/cyc':>14} {'total s':>8}  fingerprint")
+    with tempfile.TemporaryDirectory() as perf_dir:
+        for dump in args.dumps:
+            r = run(dump, args.fmt, args.cycles, perf_dir)
+            per_cycle = r["dcache_s"] / max(1, r["cycles"]) * 1e6
+            print(f"{dump.name:<36} {r['cycles']:>8} {r['hits']:>7} {r['misses']:>7} {r['evictions']:>6} "
+                  f"{per_cycle:>14.2f} {r['total_s']:>8.1f}  {r['fingerprint']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
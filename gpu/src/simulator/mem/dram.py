@@ -0,0 +1,179 @@
+"""
+DRAM timing backend for the MemController.
+
+The fixed-latency model answers every request `latency` cycles after it
+starts. DramTiming instead tracks, per channel and bank, which row is open
+and when the bank and the channel's data bus are next free, and answers
+with the cycle the request's last burst leaves the bus:
+
+    row hit       tCAS                      (open page, same row)
+    row empty     tRCD + tCAS               (bank precharged)
+    row conflict  tRP + tRCD + tCAS         (another row open)
+
+followed by one tBURST per `burst_bytes` of the request on the channel's
+data bus. With the "closed" page policy every access precharges its bank
+afterwards (auto-precharge), so every request is a row empty and the bank
+is busy for tRP after its data.
+
+Addresses are interleaved row:bank:channel:column, so consecutive rows of
+`row_size` bytes go to consecutive channels, then banks. Data itself still
+lives in the flat Mem; only timing is modelled here. All times are in
+controller (core) cycles.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from simulator.utils.performance_counter.dram import DramBankPerfCount, DramChannelPerfCount
+
+if TYPE_CHECKING:
+    from simulator.utils.performance_counter.telemeter import Telemeter
+
+_CLOSED = -1    # open_row of a precharged bank
+
+
+@dataclass
+class DramBank:
+    open_row: int = _CLOSED
+    ready: int = 0        # first cycle the bank can take its next command
+    busy_until: int = 0   # end of the last access, for busy-cycle accounting
+
+
+@dataclass
+class DramChannel:
+    bus_free: int = 0     # first cycle the data bus is free
+
+
+class DramTiming:
+    """Bank/row-buffer timing of a multi-channel DRAM (see module docstring)."""
+
+    PAGE_POLICIES = ("open", "closed")
+
+    def __init__(
+        self,
+        channels: int = 2,
+        banks: int = 8,
+        row_size: int = 2048,
+        t_rcd: int = 14,
+        t_cas: int = 14,
+        t_rp: int = 14,
+        t_burst: int = 2,
+        burst_bytes: int = 32,
+        page_policy: str = "open",
+        name: str = "DRAM",
+    ):
+        if page_policy not in self.PAGE_POLICIES:
+            raise ValueError(f"[{name}] unknown page_policy {page_policy!r} (expected 'open' or 'closed')")
+        if min(channels, banks, row_size, burst_bytes) < 1 or min(t_rcd, t_cas, t_rp, t_burst) < 0:
+            raise ValueError(f"[{name}] channels, banks, row_size and burst_bytes must be >= 1, timings >= 0")
+        self.name = name
+        self.channels = int(channels)
+        self.banks = int(banks)
+        self.row_size = int(row_size)
+        self.t_rcd = int(t_rcd)
+        self.t_cas = int(t_cas)
+        self.t_rp = int(t_rp)
+        self.t_burst = int(t_burst)
+        self.burst_bytes = int(burst_bytes)
+        self.open_page = page_policy == "open"
+        self.page_policy = page_policy
+
+        self.bank_state: List[DramBank] = [DramBank() for _ in range(self.channels * self.banks)]
+        self.channel_state: List[DramChannel] = [DramChannel() for _ in range(self.channels)]
+
+        clock = lambda: 0
+        self.bank_perf: List[DramBankPerfCount] = [
+            DramBankPerfCount(f"{name}_ch{idx % self.channels}_bank{idx // self.channels}", clock)
+            for idx in range(self.channels * self.banks)
+        ]
+        self.channel_perf: List[DramChannelPerfCount] = [
+            DramChannelPerfCount(f"{name}_ch{ch}", clock) for ch in range(self.channels)
+        ]
+
+    @property
+    def nominal_latency(self) -> int:
+        """Unloaded latency of a one-burst request to a precharged bank."""
+        return self.t_rcd + self.t_cas + self.t_burst
+
+    @property
+    def min_latency(self) -> int:
+        """Fastest any request can finish: a one-burst hit on the open row with the bank and bus free."""
+        return self.t_cas + self.t_burst
+
+    def attach(self, clock: Callable[[], int], telemeter: Optional["Telemeter"] = None) -> None:
+        """Give the counters the controller's clock and register them with `telemeter`."""
+        for perf in (*self.bank_perf, *self.channel_perf):
+            perf.clock = clock
+            if telemeter is not None:
+                telemeter.register_unit(perf)
+
+    def locate(self, addr: int) -> Tuple[int, int, int]:
+        """(channel, bank index into bank_state, row) of a byte address."""
+        row_no = addr // self.row_size
+        channel = row_no % self.channels
+        bank = (row_no // self.channels) % self.banks
+        return channel, bank * self.channels + channel, row_no // (self.channels * self.banks)
+
+    def is_row_hit(self, addr: int) -> bool:
+        """True if `addr` falls in the row its bank has open (FR-FCFS "first ready")."""
+        _, bank, row = self.locate(addr)
+        return self.bank_state[bank].open_row == row
+
+    def access(self, addr: int, size: int, is_write: bool, now: int) -> int:
+        """Schedule one request issued at cycle `now`; returns the cycle its data is done."""
+        channel, idx, row = self.locate(addr)
+        bank = self.bank_state[idx]
+        bus = self.channel_state[channel]
+
+        start = max(now, bank.ready)
+        if bank.open_row == row:
+            outcome, command = "hit", self.t_cas
+        elif bank.open_row == _CLOSED:
+            outcome, command = "empty", self.t_rcd + self.t_cas
+        else:
+            outcome, command = "conflict", self.t_rp + self.t_rcd + self.t_cas
+
+        bursts = max(1, -(-size // self.burst_bytes))
+        data_start = max(start + command, bus.bus_free)
+        done = data_start + bursts * self.t_burst
+        bus.bus_free = done
+
+        if self.open_page:
+            bank.open_row = row
+            bank.ready = data_start      # next column command once this one's data is on the bus
+        else:
+            bank.ready = done + self.t_rp
+
+        perf = self.bank_perf[idx]
+        if perf.enabled:
+            if is_write:
+                perf.writes += 1
+            else:
+                perf.reads += 1
+            if outcome == "hit":
+                perf.row_hits += 1
+            elif outcome == "empty":
+                perf.row_empty += 1
+            else:
+                perf.row_conflicts += 1
+            perf.bytes += size
+            perf.busy_cycles += done - max(start, bank.busy_until)
+        bank.busy_until = max(bank.busy_until, done)
+
+        chan_perf = self.channel_perf[channel]
+        if chan_perf.enabled:
+            chan_perf.requests += 1
+            chan_perf.bytes += size
+            chan_perf.busy_cycles += done - data_start
+        return done
+
+
+def timing_for(memory_config) -> Optional[DramTiming]:
+    """The DramTiming a [memory] config section selects, or None for the fixed-latency backend."""
+    backend = memory_config.backend
+    if backend == "fixed":
+        return None
+    if backend == "dram":
+        return DramTiming(**memory_config.dram.model_dump())
+    raise ValueError(f"Unknown [memory] backend {backend!r} (expected 'fixed' or 'dram')")
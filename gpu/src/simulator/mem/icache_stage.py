@@ -8,7 +8,7 @@ sys.path.append(str(parent_dir))
 from simulator.interfaces import ForwardingIF, LatchIF
 from simulator.stage import Stage
 from simulator.instruction import Instruction
-from simulator.mem_types import ICacheEntry, MemRequest, FetchRequest, DecodeType
+from simulator.mem_types import MemRequest, FetchRequest, DecodeType
 from simulator.mem.memory import Mem
 from simulator.utils.performance_counter.cache import CachePerfCount
 from simulator.utils.performance_counter.telemeter import Telemeter
@@ -16,10 +16,35 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from collections import deque
 from datetime import datetime
-from bitstring import Bits
+from simulator.utils.trace import get_channel
+
+_trace = get_channel("icache")
 
 
 class ICacheStage(Stage):
+    """
+    Instruction cache between the scheduler and decode.
+
+    A miss fetches the whole line (`block_size` bytes) from the memory
+    controller in one request and holds the front end until that line
+    arrives. Tags, LRU stamps and instruction words live in flat lists
+    indexed by frame (set * associativity + way), the words of frame f at
+    f * words_per_line.
+
+    Prefetching (`prefetch`, `prefetch_degree` lines) follows the fetch PCs
+    the scheduler sends:
+      - "next_line": a demand miss on line B also requests B+1 .. B+degree
+      - "stream":    as next_line, and the first hit on a prefetched line B
+                     requests B+degree, so a running stream stays `degree`
+                     lines ahead
+    Prefetches go to memory only while no demand request is waiting, and
+    their responses fill the cache in whatever cycle they arrive. A demand
+    miss on a line whose prefetch is already in flight waits for it instead
+    of requesting it again.
+    """
+
+    PREFETCH_POLICIES = ("none", "next_line", "stream")
+
     def __init__(
         self,
         name: str,
@@ -49,8 +74,25 @@ class ICacheStage(Stage):
         self.block_size = cache_config.get("block_size", 64)
         self.assoc = cache_config.get("associativity", 4)
         self.num_sets = self.cache_size // (self.block_size * self.assoc)
-
-        self.cache = {i: [] for i in range(self.num_sets)}
+        if self.block_size % 4 or self.num_sets < 1:
+            raise ValueError(f"[{name}] block_size must be a multiple of 4 bytes and fit associativity ways in cache_size")
+        self.words_per_line = self.block_size // 4
+
+        # tag storage, one slot per frame; tag -1 is an invalid frame
+        num_frames = self.num_sets * self.assoc
+        self.tags: List[int] = [-1] * num_frames
+        self.last_used: List[int] = [0] * num_frames
+        self.prefetched: List[bool] = [False] * num_frames   # filled by a prefetch, not yet used
+        self.words: List[int] = [0] * (num_frames * self.words_per_line)
+
+        self.prefetch = cache_config.get("prefetch", "none")
+        self.prefetch_degree = cache_config.get("prefetch_degree", 0)
+        if self.prefetch not in self.PREFETCH_POLICIES:
+            raise ValueError(f"[{name}] unknown prefetch policy {self.prefetch!r} (expected one of {self.PREFETCH_POLICIES})")
+        if self.prefetch == "none":
+            self.prefetch_degree = 0
+        self.prefetch_queue: deque = deque()     # lines still to request
+        self.prefetch_inflight: set = set()      # lines requested, not yet filled
 
         self.mem_req_if = mem_req_if
         self.mem_resp_if = mem_resp_if
@@ -58,20 +100,40 @@ class ICacheStage(Stage):
         self.req_latched = False
 
         self.pending = False
+        self.pending_block = -1     # line the pending demand miss waits for
         self.pending_fetch: Optional[Instruction] = None
         self.stalled = False
         self.cycle = 0
 
     # ---------------- Cache helpers ----------------
-    def _fill_cache_line(self, set_idx: int, tag: int, data_bits):
-        ways = self.cache[set_idx]
-        if len(ways) < self.assoc:
-            ways.append(ICacheEntry(tag, data_bits, valid=True))
-        else:
-            victim = min(ways, key=lambda w: w.last_used)
-            victim.tag = tag
-            victim.data = data_bits
-            victim.valid = True
+    def _fill_line(self, block: int, packet: bytes, prefetched: bool) -> int:
+        """Install a line in its set (invalid way first, else LRU); returns its frame."""
+        set_idx = block % self.num_sets
+        tag = block // self.num_sets
+        base = set_idx * self.assoc
+        tags = self.tags
+        frame = -1
+        for f in range(base, base + self.assoc):
+            if tags[f] == tag:
+                frame = f   # already present (a demand fill racing a prefetch): refresh in place
+                break
+        if frame < 0:
+            frame = base
+            for f in range(base, base + self.assoc):
+                if tags[f] == -1:
+                    frame = f
+                    break
+                if self.last_used[f] < self.last_used[frame]:
+                    frame = f
+        tags[frame] = tag
+        self.last_used[frame] = self.cycle
+        self.prefetched[frame] = prefetched
+        wpl = self.words_per_line
+        start = frame * wpl
+        self.words[start:start + wpl] = [
+            int.from_bytes(packet[i:i + 4], "little") for i in range(0, wpl * 4, 4)
+        ]
+        return frame
 
     # sending ready/stalled signals to scheduler
     def _send_valid(self, val: bool, eop: bool, warp_id: int):
@@ -88,20 +150,77 @@ class ICacheStage(Stage):
         tag = block // self.num_sets
         return set_idx, tag, block
 
-    # lookup pc from the I$
-    def _lookup(self, pc_int: int):
-        set_idx, tag, _ = self._addr_decode(pc_int)
-        for line in self.cache[set_idx]:
-            if line.valid and line.tag == tag:
-                line.last_used = self.cycle
-                return line
-        return None
-
-    # putting into I$
-    def _fill_from_response(self, pc_int: int, data_bits):
-        set_idx, tag, _ = self._addr_decode(pc_int)
-        self._fill_cache_line(set_idx, tag, data_bits)
-        # print(f"[I    Cache] FILL complete: pc=0x{pc_int:X}")
+    def _frame_of(self, block: int) -> int:
+        """Frame holding `block`, or -1."""
+        tag = block // self.num_sets
+        base = (block % self.num_sets) * self.assoc
+        tags = self.tags
+        for f in range(base, base + self.assoc):
+            if tags[f] == tag:
+                return f
+        return -1
+
+    # lookup pc from the I$: the instruction word, or None on a miss
+    def _lookup(self, pc_int: int) -> Optional[int]:
+        block = pc_int // self.block_size
+        frame = self._frame_of(block)
+        if frame < 0:
+            return None
+        self.last_used[frame] = self.cycle
+        if self.prefetched[frame]:
+            # first demand use of a prefetched line
+            self.prefetched[frame] = False
+            self.perf_count.prefetch_useful += 1
+            if self.prefetch == "stream":
+                self._queue_prefetches(block + self.prefetch_degree, 1)
+        return self.words[frame * self.words_per_line + (pc_int % self.block_size) // 4]
+
+    # ---------------- Prefetcher ----------------
+    def _queue_prefetches(self, first_block: int, count: int) -> None:
+        for block in range(first_block, first_block + count):
+            if block in self.prefetch_inflight or block in self.prefetch_queue or self._frame_of(block) >= 0:
+                continue
+            self.prefetch_queue.append(block)
+
+    def _issue_prefetch(self) -> None:
+        """Send the next queued prefetch, if the memory request latch is free and no demand is waiting."""
+        while self.prefetch_queue and not self.req_latched and self.mem_req_if.ready_for_push():
+            block = self.prefetch_queue.popleft()
+            if self._frame_of(block) >= 0 or (self.pending and block == self.pending_block):
+                continue
+            block_base = block * self.block_size
+            self.mem_req_if.push({
+                "addr": block_base,
+                "size": self.block_size,
+                "uuid": block,
+                "pc": block_base,
+                "warp": 0,
+            })
+            self.prefetch_inflight.add(block)
+            self.perf_count.prefetch_issued += 1
+            return
+
+    def cycles_until_active(self) -> Optional[int]:
+        if self.mem_resp_if.valid or self.req_latched:
+            return 0
+        if self.prefetch_queue and self.mem_req_if.ready_for_push():
+            return 0
+        if self.pending:
+            # waiting on memory; the memory controller owns the countdown
+            return None
+        return 0 if self.behind_latch.valid else None
+
+    def skip_cycles(self, cycles: int) -> None:
+        if self.pending:
+            if _trace.debug:
+                _trace.debug(f"waiting on memory ({cycles} cycles skipped)")
+        self.perf_count.record_cycles(
+            cycles,
+            is_stalled=self.pending,
+            is_busy=self.pending,
+            is_hit=False,
+            is_miss=False,
+        )
 
     # ---------------- Main compute ----------------
     def compute(self):
@@ -111,34 +230,49 @@ class ICacheStage(Stage):
         _is_busy = False
         _is_stalled = False
 
+        # a line came back from memory: fill it, whichever request it answers
+        filled = -1
+        if self.mem_resp_if.valid:
+            resp = self.mem_resp_if.pop()
+            filled = int(resp.pc) // self.block_size
+            prefetched = filled in self.prefetch_inflight
+            self.prefetch_inflight.discard(filled)
+            self._fill_line(filled, resp.packet, prefetched and filled != self.pending_block)
+            if resp is not self.pending_fetch:
+                # a prefetch's response record, built by the controller; only the fetch itself travels on
+                Instruction.release(resp)
+
         # req in flight to memory
         if self.pending:
             _is_busy = True
-            # memory returns value
-            if self.mem_resp_if.valid:
-                resp = self.mem_resp_if.pop()
-
-                pc_int_resp = resp.pc.int if isinstance(resp.pc, Bits) else int(resp.pc)
-                data_bits = Bits(resp.packet)
-
-                self._fill_from_response(pc_int_resp, data_bits)
-
-                self._send_valid(True, data_bits[24], resp.warp_id)
+            # memory returns the line the demand miss waits for
+            if filled == self.pending_block:
+                fetch = self.pending_fetch
+                pc_int = int(fetch.pc)
+                frame = self._frame_of(filled)
+                word = self.words[frame * self.words_per_line + (pc_int % self.block_size) // 4]
+                fetch.packet = word
+
+                self._send_valid(True, bool((word >> 31) & 1), fetch.warp_id)
                 self.pending = False
+                self.pending_block = -1
+                self.pending_fetch = None
                 if self.ahead_latch.ready_for_push():
-                    self.ahead_latch.push(resp)
+                    self.ahead_latch.push(fetch)
                 else:
                     _is_stalled = True
 
             # still pending — stalled waiting on memory
             else:
-                print(f"[I$] waiting on memory")
+                if _trace.debug:
+                    _trace.debug(f"waiting on memory")
                 _is_stalled = True
                 self._send_valid(False, False, 0)
 
                 if self.req_latched:
                     if self.mem_req_if.ready_for_push():
-                        print("[I$] Memrequest ACCEPTED by Memory")
+                        if _trace.debug:
+                            _trace.debug("Memrequest ACCEPTED by Memory")
                         self.mem_req_if.push(self.req)
                         self.req_latched = False
 
@@ -147,15 +281,15 @@ class ICacheStage(Stage):
             if self.behind_latch.valid:
                 _is_busy = True
                 fetch = self.behind_latch.pop()
-                pc_int = fetch.pc.int if isinstance(fetch.pc, Bits) else int(fetch.pc)
+                pc_int = int(fetch.pc)
 
-                line_lookup = self._lookup(pc_int)
+                word = self._lookup(pc_int)
 
                 # in the cache — hit
-                if line_lookup:
+                if word is not None:
                     _is_hit = True
-                    self._send_valid(True, line_lookup.data[24], fetch.warp_id)
-                    fetch.packet = line_lookup.data
+                    self._send_valid(True, bool((word >> 31) & 1), fetch.warp_id)
+                    fetch.packet = word
 
                     if self.ahead_latch.ready_for_push():
                         self.ahead_latch.push(fetch)
@@ -168,30 +302,47 @@ class ICacheStage(Stage):
                     self._send_valid(False, False, 0)
                     self.pending = True
 
-                    set_idx, tag, block = self._addr_decode(pc_int)
-                    block_base = block * self.block_size
-                    self.req = {
-                        "addr": block_base,
-                        "size": self.block_size,
-                        "uuid": block,
-                        "pc": pc_int,
-                        "warp": fetch.warp_id,
-                        "warpGroup": fetch.warp_group_id,
-                        "inst": fetch
-                    }
-
-                    if self.mem_req_if.ready_for_push():
-                        print("[I$] Memrequest ACCEPTED by Memory")
-                        self.mem_req_if.push(self.req)
-                        self.req_latched = False
+                    block = pc_int // self.block_size
+                    self.pending_block = block
+                    self.pending_fetch = fetch
+                    if self.prefetch_degree:
+                        self._queue_prefetches(block + 1, self.prefetch_degree)
+
+                    if block in self.prefetch_inflight:
+                        # a prefetch already asked for this line; wait for it
+                        self.prefetch_inflight.discard(block)
+                        self.perf_count.prefetch_late += 1
+                        if _trace.debug:
+                            _trace.debug("Miss on a line being prefetched, waiting for it")
                     else:
-                        print("[I$] Memrequest STALLED due tobusy memory")
-                        self.req_latched = True
+                        block_base = block * self.block_size
+                        self.req = {
+                            "addr": block_base,
+                            "size": self.block_size,
+                            "uuid": block,
+                            "pc": pc_int,
+                            "warp": fetch.warp_id,
+                            "warpGroup": fetch.warp_group_id,
+                            "inst": fetch
+                        }
+
+                        if self.mem_req_if.ready_for_push():
+                            if _trace.debug:
+                                _trace.debug("Memrequest ACCEPTED by Memory")
+                            self.mem_req_if.push(self.req)
+                            self.req_latched = False
+                        else:
+                            if _trace.debug:
+                                _trace.debug("Memrequest STALLED due to busy memory")
+                            self.req_latched = True
 
             # scheduler not fetching and no pending request — idle
             else:
                 self._send_valid(True, False, 0)
 
+        if self.prefetch_queue:
+            self._issue_prefetch()
+
         self.perf_count.record_cycle(
             is_stalled=_is_stalled,
             is_busy=_is_busy,
@@ -200,4 +351,4 @@ class ICacheStage(Stage):
         )
 
         self.cycle += 1
-        return
\ No newline at end of file
+        return
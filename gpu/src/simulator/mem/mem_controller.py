@@ -9,103 +9,189 @@ from simulator.stage import Stage
 from simulator.instruction import Instruction
 from simulator.mem_types import MemRequest
 from simulator.mem.memory import Mem
+from simulator.mem.dram import DramTiming
+from simulator.word import FULL_MASK
 from typing import Any, Dict, Optional, Deque, Tuple, TYPE_CHECKING
-from bitstring import Bits
+from collections import deque
+from dataclasses import dataclass, field
+import heapq
+import numpy as np
 
 if TYPE_CHECKING:
     from simulator.utils.performance_counter.telemeter import Telemeter
 
 
+@dataclass
+class MemPort:
+    """One SM's connection to the controller: I$/D$ request latches in, response latches out."""
+    ic_req_latch: LatchIF
+    dc_req_latch: LatchIF
+    ic_serve_latch: LatchIF
+    dc_serve_latch: LatchIF
+    # RR toggle: 0 prefer I$, 1 prefer D$
+    rr: int = 0
+    # per-source FIFOs of accepted requests (only used when queue_depth > 0)
+    ic_queue: Deque[dict] = field(default_factory=deque)
+    dc_queue: Deque[dict] = field(default_factory=deque)
+
+
 class MemController(Stage):
     """
-    MemController (NO request queues; pure latch-based backpressure)
+    Pipelined fixed-latency memory controller.
 
     Key semantics:
-    - No pending_ic/pending_dc buffering inside the controller.
-    - Controller only POPs an input latch when it can immediately start servicing
-      the request (capacity gate via max_inflight).
-    - If controller is busy, it does NOT pop, so the input latch stays valid and
-      upstream naturally stalls via LatchIF.ready_for_push() == False.
-    - Fixed latency model using inflight requests with countdown.
-    - Completes at most ONE request per cycle (pushes one response) to the correct
-      response latch (ic_serve_latch or dc_serve_latch).
-    - policy: "rr" or "icache_prio" controls arbitration when both latches valid.
+    - Up to max_inflight requests are serviced at once; each completes
+      `latency` cycles after it starts. Inflight requests sit in a min-heap
+      keyed on their completion cycle, so aging costs nothing per cycle.
+    - At most ONE request starts per cycle. When max_inflight requests are
+      outstanding the controller does not take new requests, and upstream
+      stalls on its request latch (LatchIF.ready_for_push() == False).
+    - Up to completions_per_cycle requests complete per cycle, in completion
+      order; a request whose response latch (ic_serve_latch or dc_serve_latch)
+      is still full waits, and so does everything due after it.
+    - queue_depth = 0: no buffering, the controller only POPs an input latch
+      when it can start that request this cycle. queue_depth > 0: each port
+      has an I$ and a D$ FIFO of that depth, filled from the latches whenever
+      they have room, and requests start from the FIFO heads.
+    - policy: "rr" or "icache_prio" controls arbitration when both I$ and D$
+      have a request waiting. "fr_fcfs" (DRAM timing only) starts the oldest
+      waiting request that hits an open row, else the oldest request; with
+      queue_depth > 0 it looks at every queued request, not just the heads.
+    - timing: None for the fixed `latency`, or a DramTiming that decides each
+      request's completion cycle from bank, row buffer and data bus state.
+    - Each SM attaches through its own MemPort (add_port); ports are picked
+      round-robin and responses return on the port the request came from.
+
+    The defaults (1 inflight, 1 completion per cycle, no queues) model an
+    unpipelined memory that serves one request at a time.
     """
 
     def __init__(
         self,
         name: str,
-        ic_req_latch: LatchIF,
-        dc_req_latch: LatchIF,
-        ic_serve_latch: LatchIF,
-        dc_serve_latch: LatchIF,
+        ic_req_latch: Optional[LatchIF],
+        dc_req_latch: Optional[LatchIF],
+        ic_serve_latch: Optional[LatchIF],
+        dc_serve_latch: Optional[LatchIF],
         mem_backend: Mem,
         latency: int = 5,
         policy: str = "rr",
         max_inflight: int = 1,  # <= set to 1 for "no queueing" semantics
         telemeter: Optional["Telemeter"] = None,
+        completions_per_cycle: int = 1,
+        queue_depth: int = 0,
+        timing: Optional[DramTiming] = None,
     ):
         self.name = name
-        self.ic_req_latch = ic_req_latch
-        self.dc_req_latch = dc_req_latch
-        self.ic_serve_latch = ic_serve_latch
-        self.dc_serve_latch = dc_serve_latch
         self.mem_backend = mem_backend
 
+        # one port per SM; the constructor latches (if any) are port 0
+        self.ports: list[MemPort] = []
+        if ic_req_latch is not None or dc_req_latch is not None:
+            self.add_port(ic_req_latch, dc_req_latch, ic_serve_latch, dc_serve_latch)
+
         self.latency = int(latency)
         self.policy = str(policy)
         self.max_inflight = int(max_inflight)
+        self.completions_per_cycle = int(completions_per_cycle)
+        self.queue_depth = int(queue_depth)
+        self.timing = timing
+        if self.policy not in ("rr", "icache_prio", "fr_fcfs"):
+            raise ValueError(f"[{self.name}] unknown policy {self.policy!r} (expected 'rr', 'icache_prio' or 'fr_fcfs')")
+        if self.policy == "fr_fcfs" and self.timing is None:
+            raise ValueError(f"[{self.name}] policy 'fr_fcfs' needs the DRAM timing backend")
+        if self.max_inflight < 1 or self.completions_per_cycle < 1 or self.queue_depth < 0:
+            raise ValueError(f"[{self.name}] max_inflight and completions_per_cycle must be >= 1, queue_depth >= 0")
+
+        if self.timing is not None:
+            # caches size their latency estimates from this; DRAM reports its unloaded row-miss latency
+            self.latency = self.timing.nominal_latency
+            self.timing.attach(lambda: self.cycle, telemeter)
 
         if telemeter is not None:
             telemeter.publish(self.name, "latency", self.latency)
 
-        # inflight requests being serviced by memory backend
-        self.inflight: list[MemRequest] = []
+        # requests being serviced by the memory backend: (completion cycle, start order, request)
+        self.completions: list[tuple[int, int, MemRequest]] = []
+        self.cycle = 0      # cycles computed (or skipped) so far
+        self.started = 0    # requests started so far, breaks completion-cycle ties in start order
+        self.arrivals = 0   # requests queued so far, the age FR-FCFS orders by
+
+        # RR pointer over ports; the I$/D$ toggle lives on each port
+        self.port_rr = 0
+
+    def add_port(
+        self,
+        ic_req_latch: LatchIF,
+        dc_req_latch: LatchIF,
+        ic_serve_latch: LatchIF,
+        dc_serve_latch: LatchIF,
+    ) -> int:
+        """Attach another SM's I$/D$ request and response latches. Returns the port index."""
+        self.ports.append(MemPort(ic_req_latch, dc_req_latch, ic_serve_latch, dc_serve_latch))
+        return len(self.ports) - 1
+
+    # port 0 aliases, kept for single-SM callers
+    @property
+    def ic_req_latch(self) -> LatchIF:
+        return self.ports[0].ic_req_latch
+
+    @property
+    def dc_req_latch(self) -> LatchIF:
+        return self.ports[0].dc_req_latch
 
-        # RR toggle: 0 prefer I$, 1 prefer D$
-        self.rr = 0
+    @property
+    def ic_serve_latch(self) -> LatchIF:
+        return self.ports[0].ic_serve_latch
+
+    @property
+    def dc_serve_latch(self) -> LatchIF:
+        return self.ports[0].dc_serve_latch
+
+    @property
+    def inflight(self) -> list[MemRequest]:
+        """Requests being serviced, in completion order."""
+        return [req for _, _, req in sorted(self.completions)]
 
     # -----------------------------
     # Helpers
     # -----------------------------
-    def _payload_to_bits(self, payload, size_hint: int) -> tuple[Bits, int]:
+    def _payload_to_bytes(self, payload, size_hint: int) -> tuple[bytes, int]:
         if payload is None:
             raise ValueError("Write request missing data")
 
-        if isinstance(payload, Bits):
-            return payload, len(payload.tobytes())
-
         if isinstance(payload, (bytes, bytearray)):
             b = bytes(payload)
-            return Bits(bytes=b), len(b)
+            return b, len(b)
+
+        if isinstance(payload, np.ndarray):
+            b = payload.astype("<u4", copy=False).tobytes()
+            return b, len(b)
 
         if isinstance(payload, int):
             n = int(size_hint) if int(size_hint) > 0 else 4
             b = int(payload).to_bytes(n, "little", signed=False)
-            return Bits(bytes=b), len(b)
+            return b, len(b)
 
         if isinstance(payload, list):
             bb = bytearray()
             for w in payload:
                 bb.extend(int(w).to_bytes(4, "little", signed=False))
-            return Bits(bytes=bytes(bb)), len(bb)
+            return bytes(bb), len(bb)
 
         raise TypeError(f"Unsupported write payload type: {type(payload)}")
 
     def _build_min_inst(self, req_info: dict):
-        pc_raw = req_info.get("pc", 0)
-        pc_bits = pc_raw if isinstance(pc_raw, Bits) else Bits(uint=int(pc_raw), length=32)
-
-        return Instruction(
-            pc=pc_bits,
+        return Instruction.acquire(
+            pc=int(req_info.get("pc", 0)),
             intended_FU=req_info.get("intended_FU", None),
             warp_id=req_info.get("warp_id", req_info.get("warp_id", 0)),
             warp_group_id=req_info.get("warp_group_id", req_info.get("warp_group_id", None)),
             opcode=req_info.get("opcode", None),
-            rs1=req_info.get("rs1", Bits(uint=0, length=5)),
-            rs2=req_info.get("rs2", Bits(uint=0, length=5)),
-            rd=req_info.get("rd", Bits(uint=0, length=5)),
-            predicate = [Bits(uint=1, length=1) for i in range(32)]
+            rs1=req_info.get("rs1", 0),
+            rs2=req_info.get("rs2", 0),
+            rd=req_info.get("rd", 0),
+            predicate=FULL_MASK
         )
 
     # compatibility fix for naming conventions used across tests
@@ -135,38 +221,104 @@ class MemController(Stage):
         Choose one request directly from input latches (no internal request queues).
         IMPORTANT: Only call this when you are ready to accept and start service
         this cycle, because it POPs the chosen latch.
+
+        Ports are served round-robin; within a port the I$/D$ choice follows
+        `policy`.
         """
-        ic_valid = bool(self.ic_req_latch and self.ic_req_latch.valid)
-        dc_valid = bool(self.dc_req_latch and self.dc_req_latch.valid)
+        if self.policy == "fr_fcfs":
+            return self._pick_fr_fcfs()
+        num_ports = len(self.ports)
+        for offset in range(num_ports):
+            port_idx = (self.port_rr + offset) % num_ports
+            chosen = self._pick_from_port(self.ports[port_idx])
+            if chosen is not None:
+                chosen["port"] = port_idx
+                self.port_rr = (port_idx + 1) % num_ports
+                return chosen
+        return None
+
+    def _pick_from_port(self, port: "MemPort") -> Optional[dict]:
+        if self.queue_depth:
+            ic_valid = bool(port.ic_queue)
+            dc_valid = bool(port.dc_queue)
+        else:
+            ic_valid = bool(port.ic_req_latch and port.ic_req_latch.valid)
+            dc_valid = bool(port.dc_req_latch and port.dc_req_latch.valid)
 
         if not ic_valid and not dc_valid:
             return None
 
         if self.policy == "icache_prio":
-            if ic_valid:
-                raw = self.ic_req_latch.pop()
-                return self._normalize_req(raw, "icache")
-            raw = self.dc_req_latch.pop()
-            return self._normalize_req(raw, "dcache")
+            return self._take(port, "icache" if ic_valid else "dcache")
 
         # Default: RR when both valid
         if ic_valid and dc_valid:
-            if self.rr == 0:
-                raw = self.ic_req_latch.pop()
-                chosen = self._normalize_req(raw, "icache")
-            else:
-                raw = self.dc_req_latch.pop()
-                chosen = self._normalize_req(raw, "dcache")
-            self.rr ^= 1
+            chosen = self._take(port, "icache" if port.rr == 0 else "dcache")
+            port.rr ^= 1
             return chosen
 
         # Only one side valid
-        if ic_valid:
-            raw = self.ic_req_latch.pop()
-            return self._normalize_req(raw, "icache")
-        raw = self.dc_req_latch.pop()
+        return self._take(port, "icache" if ic_valid else "dcache")
 
-        return self._normalize_req(raw, "dcache")
+    def _pick_fr_fcfs(self) -> Optional[dict]:
+        """
+        First-ready, first-come first-served: the oldest waiting request whose
+        row is open in its bank, else the oldest waiting request. Queued
+        requests are ordered by arrival; requests still in the latches by the
+        port round-robin, I$ before D$.
+        """
+        best = None     # (row miss, age, port index, source, position in FIFO)
+        num_ports = len(self.ports)
+        order = 0
+        for offset in range(num_ports):
+            port_idx = (self.port_rr + offset) % num_ports
+            port = self.ports[port_idx]
+            for src, queue, latch in (("icache", port.ic_queue, port.ic_req_latch), ("dcache", port.dc_queue, port.dc_req_latch)):
+                if self.queue_depth:
+                    waiting = [(req["arrival"], req) for req in queue]
+                elif latch is not None and latch.valid:
+                    waiting = [(order, latch.payload)]
+                    order += 1
+                else:
+                    continue
+                for position, (age, req) in enumerate(waiting):
+                    key = (not self.timing.is_row_hit(int(req["addr"])), age, port_idx, src, position)
+                    if best is None or key < best:
+                        best = key
+        if best is None:
+            return None
+
+        _, _, port_idx, src, position = best
+        port = self.ports[port_idx]
+        if self.queue_depth:
+            queue = port.ic_queue if src == "icache" else port.dc_queue
+            chosen = queue[position]
+            del queue[position]
+        else:
+            chosen = self._take(port, src)
+        chosen["port"] = port_idx
+        self.port_rr = (port_idx + 1) % num_ports
+        return chosen
+
+    def _take(self, port: "MemPort", src: str) -> dict:
+        """Remove the oldest waiting request of `src` from the port (its FIFO, or its latch)."""
+        if self.queue_depth:
+            return (port.ic_queue if src == "icache" else port.dc_queue).popleft()
+        latch = port.ic_req_latch if src == "icache" else port.dc_req_latch
+        return self._normalize_req(latch.pop(), src)
+
+    def _fill_queues(self) -> None:
+        """Move requests from the input latches into the per-source FIFOs while they have room."""
+        depth = self.queue_depth
+        for port in self.ports:
+            if port.ic_req_latch is not None and port.ic_req_latch.valid and len(port.ic_queue) < depth:
+                port.ic_queue.append(self._normalize_req(port.ic_req_latch.pop(), "icache"))
+                port.ic_queue[-1]["arrival"] = self.arrivals
+                self.arrivals += 1
+            if port.dc_req_latch is not None and port.dc_req_latch.valid and len(port.dc_queue) < depth:
+                port.dc_queue.append(self._normalize_req(port.dc_req_latch.pop(), "dcache"))
+                port.dc_queue[-1]["arrival"] = self.arrivals
+                self.arrivals += 1
 
     def _try_start_one_request(self) -> None:
         """
@@ -174,7 +326,7 @@ class MemController(Stage):
         Backpressure is implemented by refusing to POP input latches when
         inflight capacity is full.
         """
-        if len(self.inflight) >= self.max_inflight:
+        if len(self.completions) >= self.max_inflight:
             return  # busy => do not pop => latch stays valid => upstream stalls
 
         req_info = self._pick_from_inputs()
@@ -183,7 +335,7 @@ class MemController(Stage):
 
         inst = req_info.get("inst", None) or self._build_min_inst(req_info)
 
-        pc_int = inst.pc.int if isinstance(inst.pc, Bits) else int(inst.pc)
+        pc_int = int(inst.pc)
         warp_id = req_info.get("warp_id", getattr(inst, "warp", 0))
 
         # print(f"[MemController] Starting MemReq", req_info)
@@ -201,32 +353,38 @@ class MemController(Stage):
 
         mem_req.inst = inst
         mem_req.src = req_info.get("src", None)
+        mem_req.port = req_info["port"]
 
-        self.inflight.append(mem_req)
-
-    def _age_inflight(self) -> None:
-        for req in self.inflight:
-            req.remaining -= 1
+        if self.timing is None:
+            ready = self.cycle + self.latency
+        else:
+            ready = self.timing.access(mem_req.addr, mem_req.size, mem_req.rw_mode == "write", self.cycle)
+        heapq.heappush(self.completions, (ready, self.started, mem_req))
+        self.started += 1
 
-    def _complete_one_if_ready(self) -> None:
+    def _complete_ready(self) -> None:
         """
-        Complete at most one ready request (remaining <= 0) and push its response.
-        If the corresponding response latch is not ready, we do NOT complete this cycle
-        (keeps request inflight), which naturally backpressures completion.
+        Complete up to completions_per_cycle due requests, in completion order,
+        pushing each response. If the next one's response latch is not ready,
+        it stays inflight and nothing after it completes this cycle, which
+        naturally backpressures completion.
         """
-        for req in list(self.inflight):
-            if req.remaining > 0:
-                continue
+        completions = self.completions
+        for _ in range(self.completions_per_cycle):
+            if not completions or completions[0][0] > self.cycle:
+                return
+            req = completions[0][2]
 
             inst = getattr(req, "inst", None)
             src = getattr(req, "src", None)
+            port = self.ports[req.port]
 
             if src == "icache":
-                if not self.ic_serve_latch.ready_for_push():
-                    break
+                if not port.ic_serve_latch.ready_for_push():
+                    return
             elif src == "dcache":
-                if not self.dc_serve_latch.ready_for_push():
-                    break
+                if not port.dc_serve_latch.ready_for_push():
+                    return
             else:
                 raise KeyError(f"[MemController] Missing/invalid src: {src}")
 
@@ -234,23 +392,39 @@ class MemController(Stage):
                 inst = self._build_min_inst({"pc": req.pc, "uuid": req.uuid, "warp_id": req.warp_id})
 
             if req.rw_mode == "write":
-                data_bits, nbytes = self._payload_to_bits(req.data, req.size)
-                self.mem_backend.write(req.addr, data_bits, nbytes)
+                data_bytes, nbytes = self._payload_to_bytes(req.data, req.size)
+                self.mem_backend.write(req.addr, data_bytes, nbytes)
                 # should try to return an instruction type here
                 inst.status = "WRITE_DONE"
                 resp = inst
             else:
-                data_bits = self.mem_backend.read(req.addr, req.size)
-                inst.packet = data_bits
+                inst.packet = self.mem_backend.read(req.addr, req.size)
                 resp = inst
 
             if src == "icache":
-                self.ic_serve_latch.push(resp)
+                port.ic_serve_latch.push(resp)
             elif src == "dcache":
-                self.dc_serve_latch.push(resp)
+                port.dc_serve_latch.push(resp)
+
+            heapq.heappop(completions)
+
+    def cycles_until_active(self) -> Optional[int]:
+        can_start = len(self.completions) < self.max_inflight
+        for port in self.ports:
+            if port.ic_queue or port.dc_queue:
+                if can_start:
+                    return 0
+            ic_waiting = port.ic_req_latch is not None and port.ic_req_latch.valid
+            dc_waiting = port.dc_req_latch is not None and port.dc_req_latch.valid
+            if (ic_waiting or dc_waiting) and (can_start or self.queue_depth):
+                return 0
+        if not self.completions:
+            return None
+        # the next request completes in the compute where the cycle count reaches its completion cycle
+        return max(0, self.completions[0][0] - self.cycle - 1)
 
-            self.inflight.remove(req)
-            break  # ONE completion per cycle
+    def skip_cycles(self, cycles: int) -> None:
+        self.cycle += cycles
 
     # -----------------------------
     # Main compute
@@ -259,10 +433,14 @@ class MemController(Stage):
         # print("[MemController] compute: inflight =", len(self.inflight))
         
         # 1) progress outstanding work
-        self._age_inflight()
+        self.cycle += 1
+
+        # 2) complete whatever is due (if response latches allow)
+        self._complete_ready()
 
-        # 2) complete at most one (if response latch allows)
-        self._complete_one_if_ready()
+        # 3) take new requests into the per-source FIFOs
+        if self.queue_depth:
+            self._fill_queues()
 
-        # 3) accept/start at most one new request, ONLY if capacity allows
+        # 4) accept/start at most one new request, ONLY if capacity allows
         self._try_start_one_request()
\ No newline at end of file
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Pre-parsed binary memory images.
+
+The text program images (`addr bits` per line for .bin, `addr 0xword` for
+.hex) are parsed once into a compact file that later runs can memory-map:
+
+    header     "<8sIII6I32s4x" (80 bytes)
+               magic, version, number of runs, has_kernel_header,
+               kernel header words, sha256 of the source
+    run table  number of runs x "<QQ" (start address, length in bytes)
+    payload    the runs' bytes back to back, little endian
+
+A run is a stretch of consecutive words from the source, kept in file order
+so later lines still overwrite earlier ones when loaded. The kernel header
+is what the Thread Block Scheduler reads from lines 3-8 of the source.
+
+Convert by hand with:
+    python3 -m simulator.mem.mem_image program.bin program.cmem [--fmt bin|hex]
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+IMAGE_MAGIC = b"CARDIMG\x00"
+IMAGE_VERSION = 1
+IMAGE_SUFFIX = ".cmem"
+
+_HEADER = struct.Struct("<8sIII6I32s4x")
+_RUN = struct.Struct("<QQ")
+
+# lines of the source holding start pc, bdim, gdim, kdim, argument pc, argument size
+KERNEL_HEADER_LINES = range(3, 9)
+
+
+@dataclass
+class MemImage:
+    """A program image: (address, bytes) runs plus the kernel header, if the source had one."""
+    runs: List[Tuple[int, memoryview]] = field(default_factory=list)
+    kernel_header: Optional[Tuple[int, ...]] = None
+    source_hash: bytes = b"\x00" * 32
+    _mmap: Optional[mmap.mmap] = field(default=None, repr=False)
+
+    def close(self) -> None:
+        """Drop the runs and unmap the file they point into."""
+        for _, data in self.runs:
+            if isinstance(data, memoryview):
+                data.release()
+        self.runs = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "MemImage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def is_image_file(path: Path) -> bool:
+    with Path(path).open("rb") as f:
+        return f.read(len(IMAGE_MAGIC)) == IMAGE_MAGIC
+
+
+def parse_kernel_header_value(raw: str) -> int:
+    if raw.startswith("0x") or raw.startswith("0X"):
+        return int(raw, 16)
+    return int(raw, 2)
+
+
+def read_kernel_header(path: Path) -> Tuple[int, ...]:
+    """Kernel header words from lines 3-8 of a text image (or from a binary image's header)."""
+    path = Path(path)
+    if is_image_file(path):
+        with read_image(path) as image:
+            if image.kernel_header is None:
+                raise ValueError(f"{path} has no kernel header")
+            return image.kernel_header
+
+    with path.open("r") as file:
+        lines = [next(file).strip() for _ in range(KERNEL_HEADER_LINES.stop)]
+    return tuple(parse_kernel_header_value(lines[i].split()[1]) for i in KERNEL_HEADER_LINES)
+
+
+def parse_text_image(path: Path, fmt: str = "bin") -> MemImage:
+    """Parse a text .bin/.hex program image into runs of consecutive words."""
+    path = Path(path)
+    runs: List[Tuple[int, bytearray]] = []
+    run_end = None
+    header_raw: List[str] = []
+
+    with path.open("r", encoding="utf-8") as f:
+        for line_no, raw in enumerate(f, start=1):
+            if line_no - 1 in KERNEL_HEADER_LINES:
+                parts = raw.split()
+                header_raw.append(parts[1] if len(parts) > 1 else "")
+
+            for marker in ("//", "#"):
+                i = raw.find(marker)
+                if i != -1:
+                    raw = raw[:i]
+
+            line = raw.strip().replace("_", "")
+            if not line:
+                continue
+
+            parts = line.split()
+
+            if len(parts) != 2:
+                raise ValueError(
+                    f"Line {line_no}: expected 'addr data' format"
+                )
+
+            addr = int(parts[0], 0)
+
+            bits = parts[1]
+
+            if fmt == "hex":
+                word = int(bits, 16)
+
+            elif fmt == "bin":
+
+                if len(bits) != 32:
+                    raise ValueError(
+                        f"Line {line_no}: expected 32 bits, got {bits}"
+                    )
+
+                word = int(bits, 2)
+
+            else:
+                raise ValueError("Unknown format")
+
+            data = (word & 0xFFFFFFFF).to_bytes(4, "little")
+            if addr == run_end:
+                runs[-1][1].extend(data)
+            else:
+                runs.append((addr, bytearray(data)))
+            run_end = addr + 4
+
+    kernel_header = None
+    try:
+        if len(header_raw) == len(KERNEL_HEADER_LINES):
+            kernel_header = tuple(parse_kernel_header_value(raw) for raw in header_raw)
+    except ValueError:
+        # not every image is a kernel (unit tests, raw memory dumps)
+        kernel_header = None
+
+    return MemImage(
+        runs=[(addr, memoryview(data)) for addr, data in runs],
+        kernel_header=kernel_header,
+        source_hash=source_hash(path, fmt),
+    )
+
+
+def source_hash(path: Path, fmt: str) -> bytes:
+    h = hashlib.sha256()
+    h.update(f"{IMAGE_VERSION}:{fmt}:".encode())
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def write_image(image: MemImage, path: Path) -> None:
+    """Write an image; goes through a temporary file so readers never see a partial one."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = image.kernel_header or (0,) * len(KERNEL_HEADER_LINES)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(_HEADER.pack(
+            IMAGE_MAGIC, IMAGE_VERSION, len(image.runs),
+            int(image.kernel_header is not None), *header, image.source_hash,
+        ))
+        for addr, data in image.runs:
+            f.write(_RUN.pack(addr, len(data)))
+        for _, data in image.runs:
+            f.write(data)
+    os.replace(tmp, path)
+
+
+def read_image(path: Path) -> MemImage:
+    """Memory-map a binary image; its runs are views into the mapping until close()."""
+    with Path(path).open("rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, num_runs, has_header, *rest = _HEADER.unpack_from(mm, 0)
+    if magic != IMAGE_MAGIC:
+        mm.close()
+        raise ValueError(f"{path} is not a memory image")
+    if version != IMAGE_VERSION:
+        mm.close()
+        raise ValueError(f"{path}: image version {version}, expected {IMAGE_VERSION}")
+    header, digest = tuple(rest[:-1]), rest[-1]
+
+    view = memoryview(mm)
+    runs = []
+    table = _HEADER.size
+    offset = table + num_runs * _RUN.size
+    for i in range(num_runs):
+        addr, length = _RUN.unpack_from(mm, table + i * _RUN.size)
+        runs.append((addr, view[offset:offset + length]))
+        offset += length
+    view.release()
+
+    return MemImage(
+        runs=runs,
+        kernel_header=header if has_header else None,
+        source_hash=digest,
+        _mmap=mm,
+    )
+
+
+def load_image(path: Path, fmt: str = "bin", cache_dir: Optional[Path] = None) -> MemImage:
+    """Load a program image from a binary image, or from text through the cache.
+
+    With a cache_dir, a text source is parsed once and its image stored under
+    the hash of the source contents; later loads of the same contents map the
+    cached image instead of parsing.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Program file not found: {path}")
+    if is_image_file(path):
+        return read_image(path)
+    if cache_dir is None:
+        return parse_text_image(path, fmt)
+
+    cached = Path(cache_dir).expanduser() / f"{source_hash(path, fmt).hex()}{IMAGE_SUFFIX}"
+    if cached.exists():
+        return read_image(cached)
+    image = parse_text_image(path, fmt)
+    write_image(image, cached)
+    return image
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert a text .bin/.hex program image to a binary memory image")
+    parser.add_argument("input", type=Path, help="Text program image")
+    parser.add_argument("output", type=Path, help=f"Binary image to write (conventionally *{IMAGE_SUFFIX})")
+    parser.add_argument("--fmt", choices=["bin", "hex"], default="bin", help="Format of the text image (default: bin)")
+    args = parser.parse_args()
+
+    image = parse_text_image(args.input, args.fmt)
+    write_image(image, args.output)
+    nbytes = sum(len(data) for _, data in image.runs)
+    print(f"Wrote {args.output}: {len(image.runs)} runs, {nbytes} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,106 +1,131 @@
 # Memory.py — Fully Patched for ICache + MemController correctness
 import sys
 from pathlib import Path
+from collections.abc import MutableMapping
 import atexit
-from bitstring import Bits
+from typing import Optional
+import numpy as np
 
-class Mem:
-    def __init__(self, start_pc: int, input_file: str, fmt: str = "bin"):
-        self.memory: dict[int, int] = {}
-        self.format = fmt
-        self.start_pc = int(start_pc)
+from simulator.mem.mem_image import load_image
+from simulator.utils.trace import get_channel
 
-        p = Path(input_file)
-        if not p.exists():
-            raise FileNotFoundError(f"Program file not found: {p}")
+_trace = get_channel("memory")
 
-        addr = self.start_pc
-        endianness = "little"
+# Memory is kept as 4 KiB pages, allocated the first time something is written to them
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
 
-        with p.open("r", encoding="utf-8") as f:
-            for line_no, raw in enumerate(f, start=1):
 
-                for marker in ("//", "#"):
-                    i = raw.find(marker)
-                    if i != -1:
-                        raw = raw[:i]
+class _ByteView(MutableMapping):
+    """Byte-addressed dict view of a Mem's pages (the old `Mem.memory` interface).
 
-                line = raw.strip().replace("_", "")
-                if not line:
-                    continue
+    Every byte of an allocated page is present; deleting a byte zeroes it.
+    """
 
-                parts = line.split()
+    def __init__(self, mem: "Mem"):
+        self._mem = mem
 
-                if len(parts) != 2:
-                    raise ValueError(
-                        f"Line {line_no}: expected 'addr data' format"
-                    )
+    def __getitem__(self, addr: int) -> int:
+        page = self._mem.pages.get(int(addr) >> PAGE_BITS)
+        if page is None:
+            raise KeyError(addr)
+        return page[int(addr) & PAGE_MASK]
 
-                addr = int(parts[0], 0)
+    def __setitem__(self, addr: int, val: int) -> None:
+        self._mem.write(int(addr), bytes([int(val) & 0xFF]), 1, verbose=False)
 
-                bits = parts[1]
+    def __delitem__(self, addr: int) -> None:
+        if int(addr) >> PAGE_BITS not in self._mem.pages:
+            raise KeyError(addr)
+        self._mem.pages[int(addr) >> PAGE_BITS][int(addr) & PAGE_MASK] = 0
 
-                if self.format == "hex":
-                    word = int(bits, 16)
+    def __iter__(self):
+        for page_no in sorted(self._mem.pages):
+            yield from range(page_no << PAGE_BITS, (page_no + 1) << PAGE_BITS)
 
-                elif self.format == "bin":
+    def __len__(self) -> int:
+        return len(self._mem.pages) * PAGE_SIZE
 
-                    if len(bits) != 32:
-                        raise ValueError(
-                            f"Line {line_no}: expected 32 bits, got {bits}"
-                        )
+    def clear(self) -> None:
+        self._mem.pages.clear()
 
-                    word = int(bits, 2)
 
-                else:
-                    raise ValueError("Unknown format")
-
-                # little endian write
-                b0 = (word >> 0) & 0xFF
-                b1 = (word >> 8) & 0xFF
-                b2 = (word >> 16) & 0xFF
-                b3 = (word >> 24) & 0xFF
+class Mem:
+    def __init__(self, start_pc: int, input_file: str, fmt: str = "bin", cache_dir: Optional[str] = None):
+        # page number -> PAGE_SIZE bytes; untouched pages read as zero
+        self.pages: dict[int, bytearray] = {}
+        self.format = fmt
+        self.start_pc = int(start_pc)
 
-                self.memory[addr + 0] = b0
-                self.memory[addr + 1] = b1
-                self.memory[addr + 2] = b2
-                self.memory[addr + 3] = b3
+        # text images go through the image cache when one is configured
+        with load_image(Path(input_file), fmt, cache_dir) as image:
+            for addr, data in image.runs:
+                self._store(addr, data)
 
         atexit.register(self.dump_on_exit)
 
-    def read(self, addr: int, size: int = 4) -> Bits:
-        byte_addr = int(addr)
-        data = bytes(self.memory.get(byte_addr + i, 0) & 0xFF for i in range(int(size)))
-        word = int.from_bytes(data, "little")
-        print(f"[Memory] Returning data: {word:08x} from base address: {addr:08x}")
-        return Bits(bytes=data)
-
-    def write(self, addr: int, data: Bits, bytes_t: int):
+    @property
+    def memory(self) -> _ByteView:
+        return _ByteView(self)
+
+    def _store(self, addr: int, data: bytes) -> None:
+        # split at page boundaries; each piece is one slice assignment
+        pos = 0
+        while pos < len(data):
+            page_no, off = divmod(addr + pos, PAGE_SIZE)
+            n = min(len(data) - pos, PAGE_SIZE - off)
+            page = self.pages.get(page_no)
+            if page is None:
+                page = self.pages[page_no] = bytearray(PAGE_SIZE)
+            page[off:off + n] = data[pos:pos + n]
+            pos += n
+
+    def _load(self, addr: int, size: int) -> bytes:
+        off = addr & PAGE_MASK
+        if off + size <= PAGE_SIZE:
+            # word and cache-line reads stay inside one page: a single slice
+            page = self.pages.get(addr >> PAGE_BITS)
+            return bytes(size) if page is None else memoryview(page)[off:off + size].tobytes()
+
+        chunks = []
+        pos = 0
+        while pos < size:
+            page_no, off = divmod(addr + pos, PAGE_SIZE)
+            n = min(size - pos, PAGE_SIZE - off)
+            page = self.pages.get(page_no)
+            chunks.append(bytes(n) if page is None else memoryview(page)[off:off + n].tobytes())
+            pos += n
+        return b"".join(chunks)
+
+    def read(self, addr: int, size: int = 4) -> bytes:
+        data = self._load(int(addr), int(size))
+        if _trace.debug:
+            _trace.debug(f"Returning data: {int.from_bytes(data, 'little'):08x} from base address: {addr:08x}")
+        return data
+
+    def write(self, addr: int, data: bytes, bytes_t: int, verbose: bool = True):
         byte_addr = int(addr)
-        b = data.tobytes()[:int(bytes_t)]
+        b = bytes(data)[:int(bytes_t)]
         # print(f"[Memory] Writing data: {data:08x} to base address: {addr:08x} ")
-        for i, val in enumerate(b):
-            self.memory[byte_addr + i] = val & 0xFF
-        check_data = self.read(addr, 4).uint
-        print(f"[Memory] Written {check_data:08x} to base address: {addr:08x}")
+        self._store(byte_addr, b)
+        if verbose and _trace.debug:
+            check_data = int.from_bytes(self._load(byte_addr, 4), "little")
+            _trace.debug(f"Written {check_data:08x} to base address: {addr:08x}")
     def dump_on_exit(self):
         try:
             self.dump("memsim.hex")
         except Exception:
-            print("[Mem] dump failed")
+            if _trace.warning:
+                _trace.warning("dump failed")
 
     def dump(self, path="memsim.hex"):
-        if not self.memory:
+        if not self.pages:
             return
-        word_bases = {addr & ~0x3 for addr in self.memory.keys()}
         with open(path, "w", encoding="utf-8") as f:
-            for base in sorted(word_bases):
-                b0 = self.memory.get(base + 0, 0)
-                b1 = self.memory.get(base + 1, 0)
-                b2 = self.memory.get(base + 2, 0)
-                b3 = self.memory.get(base + 3, 0)
-                if (b0 | b1 | b2 | b3) == 0:
-                    continue  # skip all-zero words
-
-                word = b0 | (b1 << 8) | (b2 << 16) | (b3 << 24)
-                f.write(f"{base:#010x} {word:#010x}\n")
\ No newline at end of file
+            # only touched pages, in address order
+            for page_no in sorted(self.pages):
+                words = np.frombuffer(self.pages[page_no], dtype="<u4")
+                page_base = page_no << PAGE_BITS
+                for idx in np.flatnonzero(words):  # skip all-zero words
+                    f.write(f"{page_base + 4 * int(idx):#010x} {int(words[idx]):#010x}\n")
@@ -3,12 +3,10 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from collections import deque
 from typing import NamedTuple
-from bitstring import Bits
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from collections import deque
-from bitstring import Bits 
 from enum import Enum
 from pathlib import Path
 import sys
@@ -161,7 +159,7 @@ class DecodeType:
 @dataclass
 class ICacheEntry:
     tag: int
-    data: Bits
+    data: int
     valid: bool = True
     last_used: int = 0
 
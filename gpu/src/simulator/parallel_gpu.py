@@ -0,0 +1,555 @@
+# this is the multi-SM top level with every SM pipeline in its own worker process.
+from __future__ import annotations
+import multiprocessing as mp
+import sys
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, List, Optional, Tuple
+
+# ── simulator imports ──────────────────────────────────────────────────────────
+from simulator.gpu import GPU
+from simulator.interfaces import ForwardingIF, LatchIF
+from simulator.mem.mem_controller import MemController, MemPort
+from simulator.mem.memory import Mem, PAGE_BITS
+from simulator.sm import SM
+from simulator.utils import trace
+from config import Settings
+
+_trace = trace.get_channel("gpu")
+
+# request/response sources, in the order the controller fills a port's FIFOs
+_SOURCES = ("icache", "dcache")
+
+
+def _lookahead(memc: MemController) -> int:
+    """Cycles between a request starting and the earliest cycle its response can come back."""
+    latency = memc.latency if memc.timing is None else memc.timing.min_latency
+    # a response is never returned in the cycle its request starts
+    return max(1, latency)
+
+
+class _WriteJournal:
+    """The controller's view of the memory while its completions run ahead of the kernel's last known cycle.
+
+    Remembers what each write overwrote, so the writes of cycles the serial
+    GPU never got to can be taken back.
+    """
+
+    def __init__(self, mem: Mem):
+        self.mem = mem
+        self.cycle = 0      # cycle the controller is completing requests for
+        # (cycle, addr, bytes overwritten, pages the write allocated)
+        self.entries: Deque[Tuple[int, int, bytes, list]] = deque()
+
+    def read(self, addr: int, size: int = 4) -> bytes:
+        return self.mem.read(addr, size)
+
+    def write(self, addr: int, data: bytes, bytes_t: int, verbose: bool = True):
+        addr = int(addr)
+        size = len(bytes(data)[:int(bytes_t)])
+        pages = range(addr >> PAGE_BITS, ((addr + size - 1) >> PAGE_BITS) + 1) if size else ()
+        allocated = [page_no for page_no in pages if page_no not in self.mem.pages]
+        self.entries.append((self.cycle, addr, self.mem.read(addr, size), allocated))
+        self.mem.write(addr, data, bytes_t, verbose)
+
+    def forget(self, cycle: int) -> None:
+        """Drop the entries of cycles before `cycle`; those writes happened in the serial run too."""
+        while self.entries and self.entries[0][0] < cycle:
+            self.entries.popleft()
+
+    def undo(self, cycle: int) -> None:
+        """Take back the writes of `cycle` and later, newest first."""
+        while self.entries and self.entries[-1][0] >= cycle:
+            _, addr, old, allocated = self.entries.pop()
+            self.mem.write(addr, old, len(old), verbose=False)
+            for page_no in allocated:
+                del self.mem.pages[page_no]
+
+
+class _SharedUnitStub:
+    """Stands in for the parent's MemController and ThreadBlockScheduler inside a worker.
+
+    The SM registers its port and launch/finish interfaces here exactly as it
+    would with the real shared units; the worker then trades their traffic
+    with the parent.
+    """
+
+    def __init__(self, name: str, latency: int, kernel_arg_ptr: int):
+        self.name = name
+        self.latency = latency
+        # the DRAM counters stay with the parent's controller
+        self.timing = None
+        self.kernel_arg_ptr = kernel_arg_ptr
+        self.port: Optional[MemPort] = None
+        self.launch_latch: Optional[LatchIF] = None
+        self.finish_if: Optional[ForwardingIF] = None
+
+    def add_port(self, ic_req_latch, dc_req_latch, ic_serve_latch, dc_serve_latch) -> int:
+        self.port = MemPort(ic_req_latch, dc_req_latch, ic_serve_latch, dc_serve_latch)
+        return 0
+
+    def add_SM(self, launch_latch=None, finish_if=None) -> int:
+        self.launch_latch = launch_latch
+        self.finish_if = finish_if
+        return 0
+
+
+class _EpochSM:
+    """Worker side: one SM, run ahead of the parent for as long as nothing it has not been told can reach it.
+
+    Besides the SM's own state it only needs:
+      - the responses the controller returns to it before `known_until`,
+        which the parent works out ahead of time,
+      - how full its I$/D$ FIFOs in the controller can be: a request that
+        finds room is taken for certain, whatever the other SMs do,
+      - the TBS's launches and block-finish pops, which the parent only
+        sends at the cycle they happen.
+    """
+
+    def __init__(self, gpu: "ParallelGPU", sm_no: int):
+        memc = gpu.memc
+        self.stub = _SharedUnitStub(memc.name, memc.latency, gpu.tbs.kernel_arg_ptr)
+        self.sm = SM(
+            test_file=gpu.test_file,
+            test_file_type=gpu.test_file_type,
+            config=gpu._sm_config(sm_no),
+            # the forked copy of the memory is never touched here; the parent's
+            # controller is the only reader and writer
+            mem=gpu.mem,
+            memc=self.stub,
+            tbs=self.stub,
+        )
+        port = self.stub.port
+        self.req_latches = (port.ic_req_latch, port.dc_req_latch)
+        self.serve_latches = (port.ic_serve_latch, port.dc_serve_latch)
+        self.queue_depth = memc.queue_depth
+        self.lookahead = _lookahead(memc)
+
+        self.cycle = 0              # cycles finished
+        self.outstanding = 0        # requests the controller has taken and not answered yet
+        self.paused = False         # stopped at the controller step of self.cycle
+        # (cycle, source, response) from the parent, in cycle order
+        self.deliveries: Deque[Tuple[int, int, Any]] = deque()
+
+    def run(self, launched, finish_popped: bool, popped, deliveries: list, known_until: int,
+            horizon: Optional[int], queued: List[int]) -> tuple:
+        """Apply what the parent sent and run until the SM needs something the parent does not know yet."""
+        stub = self.stub
+        if launched is not None:
+            stub.launch_latch.push(launched)
+        if finish_popped:
+            stub.finish_if.pop()
+        self.deliveries.extend(deliveries)
+
+        fills = []
+        if self.paused:
+            # the parent has run the controller step this SM stopped at
+            self.paused = False
+            for latch, taken in zip(self.req_latches, popped):
+                if taken:
+                    latch.pop()
+                    self.outstanding += 1
+            self._tick_after_memc()
+            if stub.finish_if.payload:
+                return self._report(fills)
+
+        # every response before known_until answers a request taken before this
+        # run; one taken now comes back no earlier than `lookahead` cycles later
+        unanswered = self.outstanding
+        first_fill = None
+        queued = list(queued)
+        while horizon is None or self.cycle < horizon:
+            cycle = self.cycle
+            if cycle >= known_until and (unanswered or (first_fill is not None and cycle >= first_fill + self.lookahead)):
+                break
+            self.sm.tick_before_memc()
+
+            while self.deliveries and self.deliveries[0][0] == cycle:
+                _, src, resp = self.deliveries.popleft()
+                latch = self.serve_latches[src]
+                if not latch.ready_for_push():
+                    # the parent assumed the cache drained its response latch last cycle
+                    raise RuntimeError(f"[ParallelGPU] {self.sm.name} {_SOURCES[src]} response latch still full at cycle {cycle}")
+                latch.push(resp)
+                unanswered -= 1
+
+            waiting = [latch.valid for latch in self.req_latches]
+            if any(valid and queued[src] >= self.queue_depth for src, valid in enumerate(waiting)):
+                # whether the controller takes this request now depends on the other SMs
+                self.paused = True
+                break
+            for src, latch in enumerate(self.req_latches):
+                if waiting[src]:
+                    fills.append((cycle, src, latch.pop()))
+                    queued[src] += 1
+                    if first_fill is None:
+                        first_fill = cycle
+
+            self._tick_after_memc()
+            if stub.finish_if.payload:
+                # the TBS reclaims the block this cycle and may hand this SM another
+                break
+
+        self.outstanding = unanswered + len(fills)
+        return self._report(fills)
+
+    def _tick_after_memc(self) -> None:
+        self.sm.tick_after_memc()
+        self.cycle += 1
+
+    def _report(self, fills: list) -> tuple:
+        pending = None
+        if self.paused:
+            pending = tuple(latch.payload if latch.valid else None for latch in self.req_latches)
+        return (
+            self.cycle,
+            pending,
+            fills,
+            self.outstanding,
+            self.stub.launch_latch.ready_for_push(),
+            self.stub.finish_if.payload or None,
+        )
+
+
+def _sm_worker(conn, gpu: "ParallelGPU", sm_no: int) -> None:
+    """Worker loop: one SM, run an epoch at a time by the parent."""
+    try:
+        worker = _EpochSM(gpu, sm_no)
+        conn.send(("ok", None))
+
+        while True:
+            msg = conn.recv()
+            op = msg[0]
+            if op == "run":
+                conn.send(("ok", worker.run(*msg[1:])))
+            elif op == "finalize":
+                worker.sm.finalize()
+                conn.send(("ok", None))
+            elif op == "dump_stats":
+                if hasattr(worker.sm.pipeline["dcache"], "dump_stats"):
+                    worker.sm.pipeline["dcache"].dump_stats()
+                conn.send(("ok", None))
+            elif op == "close":
+                conn.send(("ok", None))
+                return
+            else:
+                raise ValueError(f"[ParallelGPU] unknown worker command: {op}")
+    except EOFError:
+        # parent went away
+        return
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+@dataclass
+class _SMWorker:
+    """Parent-side handle: the pipe to one worker, its controller port and TBS proxies, and where it has got to."""
+    sm_no: int
+    process: Any
+    conn: Any
+    port: MemPort
+    launch_latch: LatchIF
+    finish_if: ForwardingIF
+    cycle: int = 0
+    outstanding: int = 0
+    # request latches at the controller step of `cycle`, while stopped there
+    pending: Optional[tuple] = None
+    # requests taken without the controller's say, not arbitrated yet: (cycle, source, request)
+    fills: Deque[tuple] = field(default_factory=deque)
+    # state after the last cycle it finished, for the TBS step of that cycle
+    launch_ready: bool = True
+    finish_payload: Any = None
+    # for the next run: the controller's answer to `pending`, responses, TBS effects
+    popped: Optional[tuple] = None
+    deliveries: list = field(default_factory=list)
+    launched: Optional[Any] = None
+    finish_popped: bool = False
+
+
+class ParallelGPU(GPU):
+    """The GPU top level with each SM pipeline running in a forked worker process.
+
+    The parent keeps the shared Mem, MemController and ThreadBlockScheduler and
+    wires them to proxy latches, one set per SM. Workers run epochs of many
+    cycles and the parent then replays the controller and the TBS cycle by
+    cycle on what they did, exactly as the serial GPU would have. A worker can
+    run ahead as long as:
+
+      - responses: every request takes at least `latency` cycles (the DRAM
+        row-hit time with the dram backend), so once the controller has
+        arbitrated cycle t, all responses up to t + latency are known and are
+        handed out in advance. An SM with nothing outstanding needs none.
+      - requests: with memory.queue_depth > 0 the controller moves a request
+        from its latch into that SM's FIFO whenever the FIFO has room, and the
+        other SMs can only empty it. An SM counting its FIFO as full stops at
+        the controller step instead, until the parent has arbitrated it; with
+        queue_depth = 0 that is every request.
+      - blocks: the TBS can only launch a block on an SM with room, so such an
+        SM runs one cycle at a time, and an SM stops at the end of a cycle in
+        which it reports a finished block. An SM without blocks stays behind
+        the ones that still have some, so nothing runs past the kernel's end.
+
+    Cycle counts, memory and perf summaries are the same as the serial GPU.
+    """
+
+    def __init__(self,
+        test_file: Path,
+        test_file_type: str = "bin",
+        config: Optional[Settings] = None,
+        config_path: Optional[Path] = None
+    ):
+        """Initialize the GPU and start one worker per SM.
+
+        Args:
+            test_file: Path to binary/hex test file
+            test_file_type: File format ("bin" or "hex")
+            config: Pre-loaded Settings (optional)
+            config_path: Path to config file (optional, uses default if not provided)
+        """
+        if "fork" not in mp.get_all_start_methods():
+            raise RuntimeError("[ParallelGPU] needs the 'fork' start method")
+        self._ctx = mp.get_context("fork")
+        self._closed = False
+        super().__init__(test_file, test_file_type, config, config_path)
+        for worker in self.sms:
+            self._recv(worker)
+
+        self._lookahead = _lookahead(self.memc)
+        self._max_inflight = self.memc.max_inflight
+        # cycles whose arbitration (FIFO fill and request start) has been replayed
+        self._arbitrated = 0
+        # cycles whose completions have been run, up to `lookahead` ahead of arbitration
+        self._completed = 0
+        # (cycle, count) of completions run ahead of arbitration
+        self._early: Deque[Tuple[int, int]] = deque()
+        self._journal = _WriteJournal(self.mem)
+        self.memc.mem_backend = self._journal
+        self._complete_ahead()
+
+    def _build_sm(self, sm_no: int) -> _SMWorker:
+        ic_req, dc_req = LatchIF(name=f"SM{sm_no} ICache-Mem Proxy"), LatchIF(name=f"SM{sm_no} DCache-Mem Proxy")
+        ic_serve, dc_serve = LatchIF(name=f"SM{sm_no} Mem-ICache Proxy"), LatchIF(name=f"SM{sm_no} Mem-DCache Proxy")
+        launch_latch = LatchIF(name=f"SM{sm_no} TBS-WS Proxy")
+        finish_if = ForwardingIF(name=f"SM{sm_no} scheduler_tbs_if Proxy")
+        # same registration order as GPU, so port and SM indices match
+        port_idx = self.memc.add_port(ic_req, dc_req, ic_serve, dc_serve)
+        self.tbs.add_SM(launch_latch=launch_latch, finish_if=finish_if)
+
+        # anything still buffered would be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_sm_worker, args=(child_conn, self, sm_no), daemon=True)
+        process.start()
+        child_conn.close()
+        return _SMWorker(sm_no, process, parent_conn, self.memc.ports[port_idx], launch_latch, finish_if)
+
+    def _recv(self, worker: _SMWorker):
+        try:
+            status, data = worker.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"[ParallelGPU] SM {worker.sm_no} worker exited unexpectedly") from None
+        if status == "error":
+            raise RuntimeError(f"[ParallelGPU] SM {worker.sm_no} worker failed:\n{data}")
+        return data
+
+    def _broadcast(self, *msg) -> list:
+        for worker in self.sms:
+            worker.conn.send(msg)
+        return [self._recv(worker) for worker in self.sms]
+
+    # -----------------------------
+    # What an SM may do without the others
+    # -----------------------------
+    def _may_get_block(self, sm_no: int) -> bool:
+        tbs = self.tbs
+        return any(tbs.SMs[sm_no].can_give_threads(tbs.block_list[bidx].bdim) for bidx in tbs.blocks_not_sent)
+
+    def _holds_blocks(self, sm_no: int, done: set) -> bool:
+        return any(blk.assigned_sm == sm_no and blk.bidx not in done for blk in self.tbs.block_list)
+
+    def _horizon(self, sm_no: int) -> Optional[int]:
+        """First cycle the SM must not start before the parent has caught up, or None for no limit."""
+        if self._may_get_block(sm_no):
+            # the TBS decides between every SM with room in the same cycle
+            return self.cycle + 1
+        done = set(self.tbs.blocks_done)
+        if not self.tbs.blocks_not_sent and not self._holds_blocks(sm_no, done):
+            # idle for the rest of the kernel, which ends no earlier than the cycle a
+            # busy SM is in, or the one it reported its blocks finished in
+            busy = [w.cycle if w.finish_payload is not None else w.cycle + 1
+                    for w in self.sms if w.sm_no != sm_no and self._holds_blocks(w.sm_no, done)]
+            return max(busy, default=self.cycle + 1)
+        return None
+
+    def _can_run(self, worker: _SMWorker, horizon: Optional[int]) -> bool:
+        if worker.pending is not None or worker.finish_payload is not None:
+            # waiting on the controller step or the TBS step of its cycle
+            return False
+        if horizon is not None and worker.cycle >= horizon:
+            return False
+        outstanding = worker.outstanding + sum(worker.popped or ())
+        return worker.cycle < self._completed or outstanding == 0
+
+    # -----------------------------
+    # Replaying the shared units
+    # -----------------------------
+    def _arbitrate(self, cycle: int) -> None:
+        """The controller's FIFO fill and request start for `cycle`, on the requests the SMs had waiting."""
+        memc = self.memc
+        for worker in self.sms:
+            requests = [None, None]
+            while worker.fills and worker.fills[0][0] == cycle:
+                _, src, req = worker.fills.popleft()
+                requests[src] = req
+            if worker.pending is not None and worker.cycle == cycle:
+                requests = list(worker.pending)
+            for latch, req in zip((worker.port.ic_req_latch, worker.port.dc_req_latch), requests):
+                latch.clear_all()
+                if req is not None:
+                    latch.push(req)
+
+        # completions already run for later cycles still count as inflight now
+        while self._early and self._early[0][0] <= cycle:
+            self._early.popleft()
+        memc.max_inflight = self._max_inflight - sum(count for _, count in self._early)
+        memc.cycle = cycle + 1
+        try:
+            if memc.queue_depth:
+                memc._fill_queues()
+            memc._try_start_one_request()
+        finally:
+            memc.max_inflight = self._max_inflight
+
+        for worker in self.sms:
+            left = (worker.port.ic_req_latch.valid, worker.port.dc_req_latch.valid)
+            if worker.pending is not None and worker.cycle == cycle:
+                worker.popped = tuple(req is not None and not still for req, still in zip(worker.pending, left))
+                worker.pending = None
+            elif any(left):
+                raise RuntimeError(f"[ParallelGPU] controller left an SM {worker.sm_no} request in its latch at cycle {cycle}")
+            worker.port.ic_req_latch.clear_all()
+            worker.port.dc_req_latch.clear_all()
+
+        self._arbitrated = cycle + 1
+        self._complete_ahead()
+
+    def _complete_ahead(self) -> None:
+        """Run the controller's completions as far as they can no longer change, collecting each SM's responses."""
+        memc = self.memc
+        until = self._arbitrated + self._lookahead
+        while self._completed < until:
+            cycle = self._completed
+            memc.cycle = cycle + 1
+            self._journal.cycle = cycle
+            before = len(memc.completions)
+            memc._complete_ready()
+            if len(memc.completions) < before:
+                self._early.append((cycle, before - len(memc.completions)))
+            for worker in self.sms:
+                for src, latch in enumerate((worker.port.ic_serve_latch, worker.port.dc_serve_latch)):
+                    if latch.valid:
+                        worker.deliveries.append((cycle, src, latch.pop()))
+            self._completed += 1
+        memc.cycle = self._arbitrated
+
+    def _schedule_blocks(self, cycle: int) -> None:
+        """The TBS step of `cycle`, on the launch latches and finish reports the SMs ended it with."""
+        for worker in self.sms:
+            worker.launch_latch.clear_all()
+            worker.finish_if.payload = None
+            if worker.cycle == cycle + 1:
+                worker.launch_latch.valid = not worker.launch_ready
+                worker.finish_if.payload = worker.finish_payload
+            elif self._may_get_block(worker.sm_no):
+                raise RuntimeError(f"[ParallelGPU] SM {worker.sm_no} ran past cycle {cycle} with room for a block")
+            else:
+                # no room for a block; the TBS sends it nothing
+                worker.launch_latch.valid = True
+        reported = [worker.finish_if.payload is not None for worker in self.sms]
+
+        self.tbs.compute()
+
+        for idx, worker in enumerate(self.sms):
+            if worker.launch_latch.payload is not None:
+                worker.launched = worker.launch_latch.payload
+            if reported[idx] and worker.finish_if.payload is None:
+                worker.finish_popped = True
+                worker.finish_payload = None
+
+        self.cycle = cycle + 1
+        self.finished = self.tbs.kern_finished
+        self._journal.forget(self.cycle)
+
+    def _replay(self) -> None:
+        """Replay the controller and the TBS for every cycle all SMs have got through."""
+        while not self.finished:
+            cycle = self.cycle
+            if self._arbitrated == cycle:
+                if not all(w.cycle > cycle or w.pending is not None for w in self.sms):
+                    return
+                self._arbitrate(cycle)
+            if not all(w.cycle > cycle for w in self.sms):
+                return
+            self._schedule_blocks(cycle)
+
+    def _run_workers(self) -> None:
+        running = []
+        for worker in self.sms:
+            horizon = self._horizon(worker.sm_no)
+            if not self._can_run(worker, horizon):
+                continue
+            queued = [len(worker.port.ic_queue), len(worker.port.dc_queue)]
+            for _, src, _ in worker.fills:
+                queued[src] += 1
+            worker.conn.send(("run", worker.launched, worker.finish_popped, worker.popped,
+                              worker.deliveries, self._completed, horizon, queued))
+            worker.launched = None
+            worker.finish_popped = False
+            worker.popped = None
+            worker.deliveries = []
+            running.append(worker)
+        if not running:
+            raise RuntimeError(f"[ParallelGPU] no SM can advance at cycle {self.cycle}")
+
+        for worker in running:
+            worker.cycle, worker.pending, fills, worker.outstanding, worker.launch_ready, worker.finish_payload = self._recv(worker)
+            worker.fills.extend(fills)
+
+    def tick(self):
+        """Advance by at least one cycle: run the workers' next epoch, then replay the shared units behind them."""
+        if self.finished:
+            if _trace.info:
+                _trace.info(f"Simulation finished in {self.cycle} cycles.")
+            return
+
+        start = self.cycle
+        self._replay()
+        while self.cycle == start and not self.finished:
+            self._run_workers()
+            self._replay()
+
+    def finalize(self):
+        """Finalize simulation and have every worker output its SM's performance counter data."""
+        # the serial GPU stopped before completing anything due after its last cycle
+        self._journal.undo(self.cycle)
+        self._broadcast("finalize")
+
+    def dump_stats(self):
+        """Dump every SM's dcache 3C statistics."""
+        self._broadcast("dump_stats")
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._closed:
+            return
+        self._closed = True
+        self._broadcast("close")
+        for worker in self.sms:
+            worker.process.join()
+            worker.conn.close()
@@ -0,0 +1,472 @@
+"""
+SimPoint-style sampled simulation of a kernel on one SM.
+
+    profile    a functional pass (FunctionalSM) cuts the kernel into intervals
+               of `interval` warp instructions and records a basic-block vector
+               per interval from the PC stream the ICache would see
+    cluster    the vectors are normalised, randomly projected and grouped with
+               k-means; the number of clusters is picked by BIC
+    simulate   the intervals closest to each centroid are simulated
+               cycle-accurately, each from a checkpoint of its start
+               (functional fast-forward and hand-off), after `warmup`
+               instructions of detailed warm-up that are not measured
+    estimate   per-cluster CPI and miss rates, weighted by each cluster's share
+               of the instructions, give cycles, IPC and miss rates; the error
+               bounds are 95% intervals of that stratified estimate
+
+test_cardinal.py runs this with --sample (or [sampling] enabled = true) and
+writes the estimates into the run's perf summary Parquet.
+"""
+from __future__ import annotations
+import atexit
+import copy
+import hashlib
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import polars as pl
+
+from simulator.functional import FunctionalSM
+from simulator.mem.mem_image import source_hash
+from simulator.sm import SM
+from simulator.utils import trace
+from config import Settings
+
+_trace = trace.get_channel("sampling")
+
+# two-sided 95% normal quantile for the error bounds
+_Z95 = 1.96
+
+# settings sections that shape the SM a checkpoint was taken from
+_CHECKPOINT_SECTIONS = ("sm", "memory", "kernel", "icache", "dcache", "functional_units",
+                        "writeback", "register_file", "predicate_register_file", "mmio")
+
+
+@dataclass
+class Sample:
+    """One interval simulated cycle-accurately; counts cover the measured part only."""
+    interval: int
+    cluster: int
+    instructions: int
+    cycles: int
+    dcache_accesses: int
+    dcache_misses: int
+    icache_accesses: int
+    icache_misses: int
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def cpi(self) -> float:
+        return self.cycles / self.instructions if self.instructions else 0.0
+
+    def per_instruction(self, count: int) -> float:
+        return count / self.instructions if self.instructions else 0.0
+
+
+@dataclass
+class SampledEstimate:
+    """Whole-kernel estimates; each *_error is the half-width of a 95% interval."""
+    cycles: float
+    cycles_error: float
+    ipc: float
+    ipc_error: float
+    dcache_miss_rate: float
+    dcache_miss_rate_error: float
+    icache_miss_rate: float
+    icache_miss_rate_error: float
+    instructions: int
+    intervals: int
+    clusters: int
+    simulated_intervals: int
+    simulated_instructions: int
+    simulated_cycles: int
+
+    def summary_row(self) -> Dict[str, Any]:
+        """The estimate as a perf summary row (unit_name "SimPoint")."""
+        return {
+            "unit_name": "SimPoint",
+            "estimated_cycles": self.cycles,
+            "estimated_cycles_error": self.cycles_error,
+            "ipc": self.ipc,
+            "ipc_error": self.ipc_error,
+            "dcache_miss_rate": self.dcache_miss_rate,
+            "dcache_miss_rate_error": self.dcache_miss_rate_error,
+            "icache_miss_rate": self.icache_miss_rate,
+            "icache_miss_rate_error": self.icache_miss_rate_error,
+            "total_instructions": self.instructions,
+            "intervals": self.intervals,
+            "clusters": self.clusters,
+            "simulated_intervals": self.simulated_intervals,
+            "simulated_instructions": self.simulated_instructions,
+            "simulated_cycles": self.simulated_cycles,
+        }
+
+
+# ── clustering ─────────────────────────────────────────────────────────────────
+
+def project(bbvs: np.ndarray, dims: int, seed: int) -> np.ndarray:
+    """Normalise each vector to sum 1 and randomly project it down to `dims` dimensions."""
+    totals = bbvs.sum(axis=1, keepdims=True)
+    points = bbvs / np.maximum(totals, 1)
+    if points.shape[1] <= dims:
+        return points
+    rng = np.random.default_rng(seed)
+    return points @ rng.uniform(-1.0, 1.0, size=(points.shape[1], dims))
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+    return distances.argmin(axis=1)
+
+
+def kmeans(points: np.ndarray, k: int, seed: int, iterations: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    """k-means with k-means++ seeding; returns (labels, centroids) without empty clusters."""
+    rng = np.random.default_rng(seed)
+    centroids = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        d2 = ((points[:, None, :] - np.array(centroids)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        if d2.sum() == 0:
+            break
+        centroids.append(points[rng.choice(len(points), p=d2 / d2.sum())])
+    centroids = np.array(centroids)
+
+    for _ in range(iterations):
+        labels = _nearest(points, centroids)
+        moved = np.array([points[labels == c].mean(axis=0) if np.any(labels == c) else centroids[c]
+                          for c in range(len(centroids))])
+        if np.allclose(moved, centroids):
+            break
+        centroids = moved
+
+    labels = _nearest(points, centroids)
+    used = np.unique(labels)
+    return np.searchsorted(used, labels), centroids[used]
+
+
+def bic(points: np.ndarray, labels: np.ndarray, centroids: np.ndarray) -> float:
+    """Bayesian information criterion of a clustering (spherical Gaussians, as in X-means)."""
+    r, m = points.shape
+    k = len(centroids)
+    if r <= k:
+        return -math.inf
+    variance = max(float(((points - centroids[labels]) ** 2).sum()) / (m * (r - k)), 1e-12)
+    log_likelihood = 0.0
+    for size in np.bincount(labels, minlength=k):
+        if size:
+            log_likelihood += (size * math.log(size) - size * math.log(r)
+                               - size * m / 2 * math.log(2 * math.pi * variance)
+                               - (size - k) / 2)
+    # free parameters: k - 1 mixing weights, k * m centroid coordinates, one variance
+    parameters = (k - 1) + k * m + 1
+    return log_likelihood - parameters / 2 * math.log(r)
+
+
+def choose_clusters(points: np.ndarray, max_clusters: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Smallest clustering whose BIC reaches 90% of the range seen over k = 1..max_clusters."""
+    if len(points) == 1:
+        return np.zeros(1, dtype=int), points.copy()
+    candidates = []
+    for k in range(1, min(max_clusters, len(points) - 1) + 1):
+        labels, centroids = kmeans(points, k, seed)
+        candidates.append((bic(points, labels, centroids), labels, centroids))
+    scores = [score for score, _, _ in candidates]
+    threshold = min(scores) + 0.9 * (max(scores) - min(scores))
+    _, labels, centroids = next(c for c in candidates if c[0] >= threshold)
+    return labels, centroids
+
+
+def _stratified(values: Dict[int, List[float]], weights: Dict[int, float], sizes: Dict[int, int]) -> tuple[float, float]:
+    """Stratified mean of per-cluster samples and the half-width of its 95% interval.
+
+    Clusters with a single sample borrow the pooled within-cluster variance of
+    the others (or the variance across all samples when none has two).
+    """
+    mean = sum(weights[c] * float(np.mean(v)) for c, v in values.items())
+    within = [float(np.var(v, ddof=1)) for v in values.values() if len(v) > 1]
+    everything = [x for v in values.values() for x in v]
+    if within:
+        fallback = float(np.mean(within))
+    else:
+        fallback = float(np.var(everything, ddof=1)) if len(everything) > 1 else 0.0
+
+    variance = 0.0
+    for c, v in values.items():
+        n = len(v)
+        s2 = float(np.var(v, ddof=1)) if n > 1 else fallback
+        variance += weights[c] ** 2 * s2 / n * max(0.0, 1 - n / sizes[c])
+    return mean, _Z95 * math.sqrt(variance)
+
+
+# ── sampled run ────────────────────────────────────────────────────────────────
+
+class SampledSimulation:
+    """Profile, cluster and sample one kernel, then extrapolate its performance.
+
+    run() does all of it and returns the estimate; `functional` then holds the
+    state at the end of the kernel (its memory is the run's output) and
+    `samples` the intervals that were simulated.
+    """
+
+    def __init__(self,
+        test_file: Path,
+        test_file_type: str = "bin",
+        config: Optional[Settings] = None,
+        max_cycles: Optional[int] = None,
+    ):
+        self.test_file = Path(test_file)
+        self.test_file_type = test_file_type
+        self.config = config
+        self.sampling = config.sampling
+        self.max_cycles = max_cycles
+
+        # per-sample SMs only need summaries
+        self.sample_config = copy.deepcopy(config)
+        self.sample_config.perf_counter.trace_enabled = False
+        self.sample_config.perf_counter.summary_only = True
+        self.sample_config.perf_counter.flight_recorder_enabled = False
+
+        self.functional: Optional[FunctionalSM] = None
+        self.bbvs: Optional[np.ndarray] = None
+        self.lengths: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+        self.samples: List[Sample] = []
+        self.summary_path: Optional[Path] = None
+
+    # profile
+    def profile(self) -> None:
+        """Run the kernel functionally, collecting one basic-block vector per interval."""
+        functional = FunctionalSM(self.test_file, self.test_file_type, config=self.config)
+        columns: Dict[int, int] = {}
+        counts: Dict[int, int] = {}
+        last_pc: Dict[int, int] = {}
+        block: Dict[int, int] = {}
+
+        def on_fetch(warp_id: int, pc: int) -> None:
+            # a basic block starts wherever a warp's PC does not follow on from its last one
+            if last_pc.get(warp_id) != pc - 4:
+                block[warp_id] = columns.setdefault(pc, len(columns))
+            last_pc[warp_id] = pc
+            column = block[warp_id]
+            counts[column] = counts.get(column, 0) + 1
+
+        functional.on_fetch = on_fetch
+        rows, lengths = [], []
+        while not functional.finished:
+            executed = functional.run(max_instructions=self.sampling.interval)
+            if executed == 0:
+                break
+            rows.append(dict(counts))
+            lengths.append(executed)
+            counts.clear()
+        functional.on_fetch = None
+
+        self.bbvs = np.zeros((len(rows), max(1, len(columns))))
+        for i, row in enumerate(rows):
+            for column, count in row.items():
+                self.bbvs[i, column] = count
+        self.lengths = np.array(lengths, dtype=np.int64)
+        self.functional = functional
+        if _trace.info:
+            _trace.info(f"{functional.instructions} instructions, {len(rows)} intervals, {len(columns)} basic blocks")
+
+    # cluster
+    def pick_samples(self) -> Dict[int, List[int]]:
+        """Cluster the intervals; returns cluster -> intervals to simulate, closest to the centroid first."""
+        points = project(self.bbvs, self.sampling.projection_dims, self.sampling.seed)
+        labels, centroids = choose_clusters(points, self.sampling.max_clusters, self.sampling.seed)
+        self.labels = labels
+        picks = {}
+        for c in range(len(centroids)):
+            members = np.flatnonzero(labels == c)
+            order = np.argsort(((points[members] - centroids[c]) ** 2).sum(axis=1), kind="stable")
+            picks[c] = [int(i) for i in members[order[:self.sampling.samples_per_cluster]]]
+        return picks
+
+    # simulate
+    def _checkpoint_path(self, start: int) -> Optional[Path]:
+        if not self.sampling.checkpoint_dir:
+            return None
+        shape = {name: getattr(self.config, name) for name in _CHECKPOINT_SECTIONS}
+        h = hashlib.sha256(source_hash(self.test_file, self.test_file_type))
+        h.update(json.dumps({k: v.model_dump(mode="json") for k, v in shape.items()}, sort_keys=True).encode())
+        return Path(self.sampling.checkpoint_dir) / f"{self.test_file.stem}_{h.hexdigest()[:12]}_{start}.ckpt"
+
+    def _sample_sm(self, start: int, fast_forward: Optional[FunctionalSM]) -> tuple[SM, Optional[FunctionalSM]]:
+        """A detailed SM at warp instruction `start`, from its checkpoint when there is one."""
+        path = self._checkpoint_path(start)
+        if path is not None and path.exists():
+            sim = SM.from_checkpoint(path, config=self.sample_config)
+        else:
+            # starts come in increasing order, so one functional run serves them all
+            if fast_forward is None:
+                fast_forward = FunctionalSM(self.test_file, self.test_file_type, config=self.config)
+            fast_forward.run(max_instructions=start - fast_forward.instructions)
+            sim = SM(test_file=self.test_file, test_file_type=self.test_file_type, config=self.sample_config)
+            fast_forward.hand_off(sim)
+            if path is not None:
+                sim.save_checkpoint(path)
+        # the memory image at exit belongs to the full run, not to samples
+        atexit.unregister(sim.pipeline["mem"].dump_on_exit)
+        return sim, fast_forward
+
+    def _run_until(self, sim: SM, issued: int) -> None:
+        issue = sim.pipeline["issue"]
+        while not sim.finished and issue.issued_count < issued:
+            if self.max_cycles is not None and sim.cycle >= self.max_cycles:
+                raise RuntimeError(f"sample hit the cycle limit of {self.max_cycles}")
+            sim.tick()
+
+    @staticmethod
+    def _cache_counts(sim: SM) -> tuple[int, int, int, int]:
+        dcache = sim.pipeline["dcache"].perf_count
+        icache = sim.pipeline["icache"].perf_count
+        return (dcache.hit_count + dcache.miss_count, dcache.miss_count,
+                icache.hit_count + icache.miss_count, icache.miss_count)
+
+    def simulate(self, picks: Dict[int, List[int]]) -> None:
+        """Simulate every picked interval, in program order."""
+        starts = np.concatenate(([0], np.cumsum(self.lengths)[:-1]))
+        cluster_of = {i: c for c, intervals in picks.items() for i in intervals}
+        fast_forward = None
+        for i in sorted(cluster_of):
+            start, length = int(starts[i]), int(self.lengths[i])
+            warm_start = max(0, start - self.sampling.warmup)
+            sim, fast_forward = self._sample_sm(warm_start, fast_forward)
+            if self.summary_path is None:
+                self.summary_path = sim.telemeter.summary_path
+
+            self._run_until(sim, start - warm_start)
+            cycle, issued = sim.cycle, sim.pipeline["issue"].issued_count
+            sim.telemeter.reset_counters()
+            before = self._cache_counts(sim)
+            self._run_until(sim, start - warm_start + length)
+            after = self._cache_counts(sim)
+
+            sample = Sample(
+                interval=i,
+                cluster=cluster_of[i],
+                instructions=sim.pipeline["issue"].issued_count - issued,
+                cycles=sim.cycle - cycle,
+                dcache_accesses=after[0] - before[0],
+                dcache_misses=after[1] - before[1],
+                icache_accesses=after[2] - before[2],
+                icache_misses=after[3] - before[3],
+                rows=sim.telemeter.summary_rows(),
+            )
+            self.samples.append(sample)
+            if _trace.info:
+                _trace.info(f"interval {i} (cluster {sample.cluster}): {sample.instructions} instructions "
+                            f"in {sample.cycles} cycles, CPI {sample.cpi:.2f}")
+
+    # estimate
+    def _cluster_stats(self) -> tuple[Dict[int, float], Dict[int, int]]:
+        """Each cluster's share of the instructions, and its number of intervals."""
+        total = int(self.lengths.sum())
+        weights, sizes = {}, {}
+        for c in np.unique(self.labels):
+            members = self.labels == c
+            weights[int(c)] = int(self.lengths[members].sum()) / total
+            sizes[int(c)] = int(members.sum())
+        return weights, sizes
+
+    def estimate(self) -> SampledEstimate:
+        weights, sizes = self._cluster_stats()
+
+        def per_cluster(metric) -> Dict[int, List[float]]:
+            values: Dict[int, List[float]] = {}
+            for sample in self.samples:
+                values.setdefault(sample.cluster, []).append(metric(sample))
+            return values
+
+        # a cluster whose samples all ran past the end of the kernel has nothing to say
+        measured = {c for c, v in per_cluster(lambda s: s.instructions).items() if sum(v) > 0}
+        weights = {c: w for c, w in weights.items() if c in measured}
+        scale = sum(weights.values())
+        weights = {c: w / scale for c, w in weights.items()}
+
+        def stratified(metric) -> tuple[float, float]:
+            values = {c: v for c, v in per_cluster(metric).items() if c in measured}
+            return _stratified(values, weights, sizes)
+
+        def miss_rate(accesses, misses) -> tuple[float, float]:
+            # ratio of the two per-instruction estimates; its error comes from the
+            # residual misses - rate * accesses (the usual ratio-estimator variance)
+            per_instr, _ = stratified(lambda s: s.per_instruction(accesses(s)))
+            if not per_instr:
+                return 0.0, 0.0
+            rate = stratified(lambda s: s.per_instruction(misses(s)))[0] / per_instr
+            _, residual_error = stratified(lambda s: s.per_instruction(misses(s) - rate * accesses(s)))
+            return rate, residual_error / per_instr
+
+        instructions = int(self.lengths.sum())
+        cpi, cpi_error = stratified(lambda s: s.cpi)
+        dcache, dcache_error = miss_rate(lambda s: s.dcache_accesses, lambda s: s.dcache_misses)
+        icache, icache_error = miss_rate(lambda s: s.icache_accesses, lambda s: s.icache_misses)
+        return SampledEstimate(
+            cycles=instructions * cpi,
+            cycles_error=instructions * cpi_error,
+            ipc=1 / cpi if cpi else 0.0,
+            ipc_error=cpi_error / cpi ** 2 if cpi else 0.0,
+            dcache_miss_rate=dcache,
+            dcache_miss_rate_error=dcache_error,
+            icache_miss_rate=icache,
+            icache_miss_rate_error=icache_error,
+            instructions=instructions,
+            intervals=len(self.lengths),
+            clusters=len(sizes),
+            simulated_intervals=len(self.samples),
+            simulated_instructions=sum(s.instructions for s in self.samples),
+            simulated_cycles=sum(s.cycles for s in self.samples),
+        )
+
+    def extrapolated_rows(self) -> List[Dict[str, Any]]:
+        """Per-unit summary rows scaled up to the whole kernel.
+
+        Counts are scaled by instructions per cluster, rates averaged with the
+        cluster weights; anything else comes from the heaviest cluster's first sample.
+        """
+        weights, _ = self._cluster_stats()
+        instructions = int(self.lengths.sum())
+        by_cluster: Dict[int, List[Sample]] = {}
+        for sample in self.samples:
+            if sample.instructions:
+                by_cluster.setdefault(sample.cluster, []).append(sample)
+        if not by_cluster:
+            return []
+        scale = sum(weights[c] for c in by_cluster)
+        weights = {c: weights[c] / scale for c in by_cluster}
+        reference = by_cluster[max(by_cluster, key=weights.get)][0]
+
+        rows = []
+        for u, ref_row in enumerate(reference.rows):
+            row = {}
+            for key, ref_value in ref_row.items():
+                if isinstance(ref_value, bool) or not isinstance(ref_value, (int, float)):
+                    row[key] = ref_value
+                elif isinstance(ref_value, int):
+                    row[key] = int(round(sum(
+                        weights[c] * instructions * sum(s.rows[u][key] for s in samples) / sum(s.instructions for s in samples)
+                        for c, samples in by_cluster.items())))
+                else:
+                    row[key] = sum(weights[c] * float(np.mean([s.rows[u][key] for s in samples]))
+                                   for c, samples in by_cluster.items())
+            rows.append(row)
+        return rows
+
+    def run(self) -> SampledEstimate:
+        self.profile()
+        picks = self.pick_samples()
+        self.simulate(picks)
+        return self.estimate()
+
+    def write_summary(self, estimate: SampledEstimate) -> Optional[Path]:
+        """Write the extrapolated unit rows plus the SimPoint row where a full run writes its summary."""
+        if not self.config.perf_counter.enabled or self.summary_path is None:
+            return None
+        rows = self.extrapolated_rows() + [estimate.summary_row()]
+        pl.from_dicts(rows, infer_schema_length=None).write_parquet(str(self.summary_path))
+        return self.summary_path
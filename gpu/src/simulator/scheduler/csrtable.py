@@ -1,6 +1,5 @@
 from dataclasses import dataclass, field
 from typing import Any, List
-from bitstring import Bits
 
 @dataclass
 class CsrTable:
@@ -31,15 +30,15 @@ class CsrTable:
         self.table = [[0, 0, 0] for _ in range(self.warps)]
         self.active_blks.clear()
 
-    def dump(self):
-        print(f"\n{'='*80}")
-        print(f"{'CSR TABLE DUMP':^80}")
-        print(f"{'='*80}")
-        print(f"---------\n")
-        print(f"Warp id: base_id | tb_id | tb_size")
+    def dump(self, file=None):
+        print(f"\n{'='*80}", file=file)
+        print(f"{'CSR TABLE DUMP':^80}", file=file)
+        print(f"{'='*80}", file=file)
+        print(f"---------\n", file=file)
+        print(f"Warp id: base_id | tb_id | tb_size", file=file)
 
         for w in range(self.warps):
-            print(f"Warp {w}: {self.table[w][0]} | {self.table[w][1]} | {self.table[w][2]}\n")
+            print(f"Warp {w}: {self.table[w][0]} | {self.table[w][1]} | {self.table[w][2]}\n", file=file)
 
-        print(f"\n")
+        print(f"\n", file=file)
         
\ No newline at end of file
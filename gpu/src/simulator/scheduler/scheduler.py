@@ -1,10 +1,11 @@
-from builtins import all, print
+from builtins import all
+import io
 from collections import deque
 from dataclasses import dataclass, field
 from typing import List, Any, Optional, Dict
 from enum import Enum
 from pathlib import Path
-from bitstring import Bits
+from simulator.word import FULL_MASK
 from common.custom_enums_multi import H_Op, I_Op
 from simulator.mem_types import DecodeType
 from simulator.instruction import Instruction
@@ -15,9 +16,24 @@ import math
 from simulator.interfaces import ForwardingIF, LatchIF
 from simulator.utils.performance_counter.scheduler import SchedulerPerfCount as PerfCount
 from simulator.utils.performance_counter.telemeter import Telemeter
+from simulator.utils.trace import get_channel
 
-# comment/uncomment for printing out debug info
-# print = lambda *args, **kwargs: None
+_trace = get_channel("scheduler")
+
+# warp state -> name of the SchedulerStage bitmask holding the warps in it
+_STATE_MASKS = {
+    WarpState.READY: "ready_warps",
+    WarpState.STALL: "stalled_warps",
+    WarpState.HALT: "halted_warps",
+    WarpState.BARRIER: "barrier_warps",
+}
+
+def _find_first_set(mask: int, start: int) -> int:
+    # lowest set bit at or after `start`, wrapping around to bit 0; -1 if mask is empty
+    ahead = mask >> start
+    if ahead:
+        return start + (ahead & -ahead).bit_length() - 1
+    return (mask & -mask).bit_length() - 1
 
 class SchedulerStage(Stage):
     def __init__(self, *args, csrtable, warp_count: int = 32, warp_size: float = 32, policy: str = "RR", telemeter: Telemeter, **kwargs):
@@ -33,15 +49,27 @@ class SchedulerStage(Stage):
         self.start_flush: bool = False
 
         # warp table
-        self.warp_table: List[WarpGroup] = [WarpGroup(group_id=id, warps=[Warp(pc=0, id=id*2, finished_packet=True), Warp(pc=0, id=id*2+1, finished_packet=True)], halt_mask_even=Bits(uint=0x0, length=32), halt_mask_odd=Bits(uint=0x0, length=32)) for id in range(self.num_groups)]
+        self.warp_table: List[WarpGroup] = [WarpGroup(group_id=id, warps=[Warp(pc=0, id=id*2, finished_packet=True), Warp(pc=0, id=id*2+1, finished_packet=True)], halt_mask_even=0, halt_mask_odd=0) for id in range(self.num_groups)]
         self.warp_init: int = 0
 
+        # warp table mirrored as bitmasks, bit w <-> warp w (group g owns bits 2g and 2g+1);
+        # only set_warp_state/set_finished_packet/set_group_halt may change the mirrored fields
+        self._all_warps: int = (1 << (2 * self.num_groups)) - 1
+        self._even_warps: int = self._all_warps // 3           # 0b0101...: one bit per group
+        self.ready_warps: int = 0
+        self.stalled_warps: int = 0
+        self.halted_warps: int = self._all_warps
+        self.barrier_warps: int = 0
+        self.finished_warps: int = self._all_warps             # finished_packet
+        self.busy_warps: int = 0                               # in_flight > 0
+        self.halted_groups: int = self._all_warps              # both bits of every group with halt == 1
+
         # initialization
         self.free_warp: int = 0
 
-        # gto index queues
+        # gto issue order: groups that have issued, oldest first, and a mask (bit 2g) of those that have not
         self.oldest: List[int] = []
-        self.unissued: List[int] = [group for group in range(self.num_groups)]
+        self.unissued: int = self._even_warps
 
         # scheduler bookkeeping
         self.rr_index: int = 0
@@ -64,17 +92,90 @@ class SchedulerStage(Stage):
         self.perf_count = PerfCount(name=self.name)
         self.telemeter.register_unit(self.perf_count)
 
-    def dump(self):
-        print(f"\n{'='*80}")
-        print(f"{'WARPGROUP TABLE DUMP':^80}")
-        print(f"{'='*80}")
-        print(f"---------\n")
-        print(f"Warp id: base_id | tb_id | tb_size")
+    def dump(self, file=None):
+        print(f"\n{'='*80}", file=file)
+        print(f"{'WARPGROUP TABLE DUMP':^80}", file=file)
+        print(f"{'='*80}", file=file)
+        print(f"---------\n", file=file)
+        print(f"Warp id: base_id | tb_id | tb_size", file=file)
+
+        for group in self.warp_table:
+            print(f"group: {group.group_id}, halt: {group.halt}, issue: {bool(self.ready_warps >> (2 * group.group_id) & 3)}", file=file)
+            print(f"    warp: {group.warps[0].id}, state: {group.warps[0].state}, halt_mask: {group.halt_mask_even:#010x}, pc: {group.warps[0].pc}, in_flight: {group.warps[0].in_flight}, finished_packet: {group.warps[0].finished_packet}", file=file)
+            print(f"    warp: {group.warps[1].id}, state: {group.warps[1].state}, halt_mask: {group.halt_mask_odd:#010x}, pc: {group.warps[1].pc}, in_flight: {group.warps[1].in_flight}, finished_packet: {group.warps[1].finished_packet}\n", file=file)
+
+    def _trace_tables(self, title: str) -> None:
+        # CSR and warp tables as one debug message
+        out = io.StringIO()
+        self.csrtable.dump(file=out)
+        self.dump(file=out)
+        _trace.debug(f"{title}{out.getvalue()}")
+
+    # ---------------- Warp table masks ----------------
+    def set_warp_state(self, warps: int, state: WarpState) -> None:
+        """Move every warp in the `warps` bitmask to `state`, in the table and the masks."""
+        name = _STATE_MASKS[state]
+        current = getattr(self, name)
+        changed = warps & ~current
+        if not changed:
+            return
+        keep = ~changed
+        self.ready_warps &= keep
+        self.stalled_warps &= keep
+        self.halted_warps &= keep
+        self.barrier_warps &= keep
+        setattr(self, name, current | changed)
+        while changed:
+            low = changed & -changed
+            warp = low.bit_length() - 1
+            self.warp_table[warp >> 1].warps[warp & 1].state = state
+            changed ^= low
+
+    def set_finished_packet(self, warps: int, finished: bool) -> None:
+        """Set finished_packet of every warp in the `warps` bitmask."""
+        if finished:
+            changed = warps & ~self.finished_warps
+            self.finished_warps |= changed
+        else:
+            changed = warps & self.finished_warps
+            self.finished_warps &= ~changed
+        while changed:
+            low = changed & -changed
+            warp = low.bit_length() - 1
+            self.warp_table[warp >> 1].warps[warp & 1].finished_packet = finished
+            changed ^= low
+
+    def set_group_halt(self, group: int, halted: bool) -> None:
+        self.warp_table[group].halt = int(halted)
+        if halted:
+            self.halted_groups |= 3 << (2 * group)
+        else:
+            self.halted_groups &= ~(3 << (2 * group))
 
+    def sync_masks(self) -> None:
+        """Rebuild the masks from the warp table, after it was written directly (e.g. restored)."""
+        for name in _STATE_MASKS.values():
+            setattr(self, name, 0)
+        self.finished_warps = self.busy_warps = self.halted_groups = 0
         for group in self.warp_table:
-            print(f"group: {group.group_id}, halt: {group.halt}, issue: {group.issue}")
-            print(f"    warp: {group.warps[0].id}, state: {group.warps[0].state}, halt_mask: {group.halt_mask_even}, pc: {group.warps[0].pc}, in_flight: {group.warps[0].in_flight}, finished_packet: {group.warps[0].finished_packet}")
-            print(f"    warp: {group.warps[1].id}, state: {group.warps[1].state}, halt_mask: {group.halt_mask_odd}, pc: {group.warps[1].pc}, in_flight: {group.warps[1].in_flight}, finished_packet: {group.warps[1].finished_packet}\n")
+            if group.halt == 1:
+                self.halted_groups |= 3 << (2 * group.group_id)
+            for parity, warp in enumerate(group.warps):
+                bit = 1 << (2 * group.group_id + parity)
+                name = _STATE_MASKS[warp.state]
+                setattr(self, name, getattr(self, name) | bit)
+                if warp.finished_packet:
+                    self.finished_warps |= bit
+                if warp.in_flight:
+                    self.busy_warps |= bit
+
+    def reset_allocation(self) -> None:
+        """Forget the warp allocation and issue order once every resident block has finished."""
+        self.free_warp = 0
+        self.rr_index = 0
+        self.gto_index = 0
+        self.oldest = []
+        self.unissued = self._even_warps
 
     # creating instruction class 
     def make_instruction(self, group, warp, pc):
@@ -83,7 +184,7 @@ class SchedulerStage(Stage):
         else:            
             active_mask = self.warp_table[group].halt_mask_odd 
 
-        inst = Instruction(pc=Bits(uint=pc, length=32), warp_id=warp, warp_group_id=group, active_mask=active_mask)
+        inst = Instruction.acquire(pc=pc, warp_id=warp, warp_group_id=group, active_mask=active_mask)
         return inst 
     
     # pushing to latch 
@@ -99,7 +200,8 @@ class SchedulerStage(Stage):
 
         # TODO: simulate (num warps + (2 or 1 depending on how tbs works) cycles to init)
         tb_id, tb_size, start_pc = self.behind_latch.pop()
-        print("receive")
+        if _trace.info:
+            _trace.info(f"Received block {tb_id}: size {tb_size}, start pc {start_pc:#x}")
 
         # print(f"\n FUCKING TBS SHIT:\n")
         # print(f"{tb_id, tb_size, start_pc}\n\n")
@@ -109,50 +211,51 @@ class SchedulerStage(Stage):
         self.halt_sent = False
         self.system_finished = False
 
-        # WILL NEED TO CHANGE FOR FUTURE ITERATIONS, BLOCK SIZE != 1024 AND # OF BLOCKS != 1
-        gto_init = self.unissued.pop(0)
-        self.oldest.append(gto_init)
+        # blocks start on a fresh warp group so a group's halt/issue state belongs to one block
+        if self.free_warp % 2 == 1:
+            self.free_warp += 1
+
+        gto_init = self.free_warp // 2
+        if self.unissued >> (2 * gto_init) & 1:
+            self.unissued &= ~(1 << (2 * gto_init))
+            self.oldest.append(gto_init)
 
         temp_tb_size = tb_size
         for _ in range(math.ceil(tb_size / self.warp_size)):
             self.warp_table[self.free_warp // 2].warps[self.free_warp % 2].pc = start_pc
-            self.warp_table[self.free_warp // 2].warps[self.free_warp % 2].state = WarpState.READY
-            self.warp_table[self.free_warp // 2].warps[self.free_warp % 2].finished_packet = False
+            self.set_warp_state(1 << self.free_warp, WarpState.READY)
+            self.set_finished_packet(1 << self.free_warp, False)
 
             if self.free_warp % 2 == 0:
-                # TODO: CHECK THIS SHIT AFTER U FINISH COLLISION
-                self.warp_table[self.free_warp // 2].issue = True
                 if temp_tb_size - 32 >= 0:
-                    self.warp_table[self.free_warp // 2].halt_mask_even = Bits(uint=0xffffffff, length=32)
+                    self.warp_table[self.free_warp // 2].halt_mask_even = FULL_MASK
                 else:
                     mask_even = 0
                     for i in range(32):
                         mask_even |= (i < temp_tb_size) << i
-                    self.warp_table[self.free_warp // 2].halt_mask_even = Bits(uint=mask_even, length=32)
-                self.warp_table[self.free_warp // 2].halt = 0
+                    self.warp_table[self.free_warp // 2].halt_mask_even = mask_even
+                self.set_group_halt(self.free_warp // 2, False)
                 self.warp_table[self.free_warp // 2].last_issue_even = False
             else:
                 if temp_tb_size - 32 == 0:
-                    self.warp_table[self.free_warp // 2].halt_mask_odd = Bits(uint=0xffffffff, length=32)
+                    self.warp_table[self.free_warp // 2].halt_mask_odd = FULL_MASK
                 else:
                     mask_odd = 0
                     for i in range(32):
                         mask_odd |= (i < temp_tb_size) << i
-                    self.warp_table[self.free_warp // 2].halt_mask_odd = Bits(uint=mask_odd, length=32)
+                    self.warp_table[self.free_warp // 2].halt_mask_odd = mask_odd
             temp_tb_size -= 32
             
             self.csrtable.write_data(self.free_warp, base_id, tb_id, tb_size)
             base_id += self.warp_size
             self.free_warp += 1
         
-        print(f"CSR TABLE DUMP INITIALIZED FOR TBID#{tb_id}")
-        self.csrtable.dump()
-        print(f"WARP TABLE DUMP INITIALIZED FOR TBID#{tb_id}")
-        self.dump()  
+        if _trace.debug:
+            self._trace_tables(f"TABLES INITIALIZED FOR TBID#{tb_id}")
 
     def halt(self):
         # Kai Ze: only fire when at least one warp has been initialized, and only once
-        if not self.halt_sent and self.free_warp > 0 and all(group.halt == 1 for group in self.warp_table):
+        if not self.halt_sent and self.free_warp > 0 and self.halted_groups == self._all_warps:
                 # print("RECEIVED HALT FOR ALL WARPS, ENABLING DCACHE FLUSH.")
             self.forward_ifs_write["Scheduler_LDST"].push({"halt": True})
             self.halt_sent = True
@@ -169,28 +272,25 @@ class SchedulerStage(Stage):
         # move to halt function later
         ldst_ctrl = self.forward_ifs_read["LDST_Scheduler"].pop()
         if ldst_ctrl is not None and ldst_ctrl.get("flush_complete"):
-            print("Scheduler: Received halt")
+            if _trace.info:
+                _trace.info("Received halt")
             self.system_finished = True
-            self.free_warp = 0
-            self.rr_index = 0
-            self.gto_index = 0
-            self.oldest = []
-            self.unissued = [group for group in range(self.num_groups)]
-
-            print("CSR TABLE DUMP AT HALT:")
-            self.csrtable.dump()
-            print("WARP TABLE DUMP AT HALT:")
-            self.dump()
+            self.reset_allocation()
+
+            if _trace.debug:
+                self._trace_tables("TABLES AT HALT:")
             ## TODO: will need to expand for non 1024 size tb in cx02
-            self.forward_ifs_write["Scheduler_TBS"].push(list(self.csrtable.active_blks))
+            # no TBS to tell when the SM runs its single configured block
+            if "Scheduler_TBS" in self.forward_ifs_write:
+                self.forward_ifs_write["Scheduler_TBS"].push(list(self.csrtable.active_blks))
             self.csrtable.reset_csr()
             
             # TODO: plug in reset signals to the reg file and pred reg 
 
         # if im getting my odd warp EOP out of my i$
         if self.eop:
-            self.warp_table[self.warp_id // 2].warps[self.warp_id % 2].state = WarpState.STALL
-            self.warp_table[self.warp_id // 2].warps[self.warp_id % 2].finished_packet = True
+            self.set_warp_state(1 << self.warp_id, WarpState.STALL)
+            self.set_finished_packet(1 << self.warp_id, True)
 
         # change pc for branch
         if jump_ctrl is not None:
@@ -198,71 +298,55 @@ class SchedulerStage(Stage):
         
         # check all my things in the issue
         if issue_ctrl is not None:
+            full = 0
             for ibuffer in range(self.num_groups):
-                if self.warp_table[ibuffer].halt != 1:
-                    # i buffer full, stop issuing
-                    if issue_ctrl[ibuffer] == 1:
-                        if self.warp_table[ibuffer].warps[0].state != WarpState.HALT:
-                            self.warp_table[ibuffer].warps[0].state = WarpState.STALL
-                        if self.warp_table[ibuffer].warps[1].state != WarpState.HALT:
-                            self.warp_table[ibuffer].warps[1].state = WarpState.STALL
-
-                    # i buffer opens up but you can only issue to it if you haven't finished scheduling ur current packet
-                    else:
-                        for warp in self.warp_table[ibuffer].warps:
-                            if not warp.finished_packet and warp.state != WarpState.HALT:
-                                warp.state = WarpState.READY
+                if issue_ctrl[ibuffer] == 1:
+                    full |= 3 << (2 * ibuffer)
+            live = self._all_warps & ~self.halted_groups & ~self.halted_warps
+
+            # i buffer full, stop issuing
+            self.set_warp_state(full & live, WarpState.STALL)
+
+            # i buffer opens up but you can only issue to it if you haven't finished scheduling ur current packet
+            self.set_warp_state(~full & live & ~self.finished_warps, WarpState.READY)
 
         # decrement my in flight counter and go back to ready
         if not len(writeback_ctrl) == 0:
-            # print("hello")
-
             # multiple writebacks can happen in the same cycle so we need to loop through all of them and apply the changes to the warp table accordingly
             for data in writeback_ctrl:
                 group = data["warp_group_id"]
                 warp_id = data["warp_id"]
                 new_mask = data["new_mask"]
-
-                # print(f"Group: {group}, Warp ID: {warp_id}, New Mask: {new_mask}")
+                bit = 1 << (2 * group + warp_id % 2)
+                warp = self.warp_table[group].warps[warp_id % 2]
 
                 # TODO: change this later so it can decrement the inflight counter as many times for the number of writebacks the buffer was able to do.
-                self.warp_table[group].warps[warp_id % 2].in_flight -= 1
+                warp.in_flight -= 1
+                if warp.in_flight == 0:
+                    self.busy_warps &= ~bit
 
                 if new_mask is not None:
                     if warp_id % 2 == 0:
                         self.warp_table[group].halt_mask_even &= new_mask
-                        print(f"even mask: {new_mask}\n")
-                        even_dead = self.warp_table[group].halt_mask_even.uint == 0
-                        if even_dead:
-                            self.warp_table[group].warps[0].state = WarpState.HALT
-
+                        if _trace.debug:
+                            _trace.debug(f"even mask: {new_mask:#010x}")
+                        dead = self.warp_table[group].halt_mask_even == 0
                     else:
                         self.warp_table[group].halt_mask_odd &= new_mask
-                        print(f"odd mask: {new_mask}\n")
-                        odd_dead  = self.warp_table[group].halt_mask_odd.uint == 0
-                        if odd_dead:
-                            self.warp_table[group].warps[1].state = WarpState.HALT
-
-                # if self.warp_table[group].halt_mask_even.uint == 0 and self.warp_table[group].halt_mask_odd.uint == 0:
-                if (self.warp_table[group].halt_mask_even.uint == 0
-                    and self.warp_table[group].halt_mask_odd.uint == 0
-                    and all(warp.in_flight == 0 for warp in self.warp_table[group].warps)):
-                    self.warp_table[group].halt = 1
-
-                if self.warp_table[group].warps[warp_id % 2].in_flight == 0:
-                    if self.warp_table[group].warps[warp_id % 2].state != WarpState.HALT:
-                        self.warp_table[group].warps[warp_id % 2].state = WarpState.READY
-                        self.warp_table[group].warps[warp_id % 2].finished_packet = False
-                    
-                    # else:
-                    #     self.warp_table[group].halt = 1
-        
-        # setting stall for warpgroup if BOTH warps in group are stalled
-        for group in self.warp_table:
-            if group.warps[0].state == WarpState.READY or group.warps[1].state == WarpState.READY:
-                group.issue = True
-            else:
-                group.issue = False
+                        if _trace.debug:
+                            _trace.debug(f"odd mask: {new_mask:#010x}")
+                        dead = self.warp_table[group].halt_mask_odd == 0
+                    if dead:
+                        self.set_warp_state(bit, WarpState.HALT)
+
+                if (self.warp_table[group].halt_mask_even == 0
+                    and self.warp_table[group].halt_mask_odd == 0
+                    and not self.busy_warps >> (2 * group) & 3):
+                    self.set_group_halt(group, True)
+
+                if warp.in_flight == 0 and not self.halted_warps & bit:
+                    self.set_warp_state(bit, WarpState.READY)
+                    self.set_finished_packet(bit, False)
 
     # fetching warp from group
     def fetch(self, warp_group: WarpGroup):
@@ -274,8 +358,10 @@ class SchedulerStage(Stage):
             if warp_group.warps[0].state == WarpState.READY:
                 instr = self.make_instruction(warp_group.group_id, (warp_group.group_id * 2), warp_group.warps[0].pc)
                 warp_group.warps[0].in_flight += 1
+                self.busy_warps |= 1 << (warp_group.group_id * 2)
                 warp_group.warps[0].pc += 4
-                print(f"[Scheduler] Issuing an instruction for warp group: {instr.warp_group_id}, warp: {instr.warp_id}, pc: {instr.pc}, state: {warp_group.warps[0].state}")
+                if _trace.debug:
+                    _trace.debug(f"Issuing an instruction for warp group: {instr.warp_group_id}, warp: {instr.warp_id}, pc: {instr.pc}, state: {warp_group.warps[0].state}")
                 self.push_instruction(instr)
             return 
         
@@ -288,65 +374,66 @@ class SchedulerStage(Stage):
             if warp_group.warps[1].state == WarpState.READY:
                 instr = self.make_instruction(warp_group.group_id, (warp_group.group_id * 2) + 1, warp_group.warps[1].pc)
                 warp_group.warps[1].in_flight += 1
+                self.busy_warps |= 2 << (warp_group.group_id * 2)
                 warp_group.warps[1].pc += 4
-                print(f"[Scheduler] Issuing an instruction for warp group: {instr.warp_group_id}, warp: {instr.warp_id}, pc: {instr.pc}, state: {warp_group.warps[1].state}")
+                if _trace.debug:
+                    _trace.debug(f"Issuing an instruction for warp group: {instr.warp_group_id}, warp: {instr.warp_id}, pc: {instr.pc}, state: {warp_group.warps[1].state}")
                 self.push_instruction(instr)
             return
         return
 
-    # round robin policy 
+    def _issuable_groups(self) -> int:
+        # bit 2g set <-> group g has a ready warp
+        return (self.ready_warps | self.ready_warps >> 1) & self._even_warps
+
+    # round robin policy: first issuable group from rr_index on
     def round_robin(self):
-        for _ in range(self.num_groups):
-            # print(len(self.warp_table))
-            warp_group = self.warp_table[self.rr_index]
-
-            # if we can fetch this warp group
-            if warp_group.issue:
-                self.fetch(warp_group=warp_group)
-                return True
-                
-            else:
-                self.rr_index = (self.rr_index + 1) % self.num_groups
+        slot = _find_first_set(self._issuable_groups(), 2 * self.rr_index)
 
         # nothing can fetch here
-        return False # NONE
+        if slot < 0:
+            return False # NONE
 
-    # greedy policy WIP
-    def greedy_oldest(self):
-        # local bookeeping metrics
-        oldest_max = len(self.oldest)
-        oldest_idx = 0
-        unissued_idx = 0
-        oldest_stall = False
-
-        # check to see if current group is good for issue
-        for _ in range(self.num_groups):
-            warp_group = self.warp_table[self.gto_index]
-            oldest_stall = True if oldest_max == oldest_idx else False
-
-            # if we can fetch this warp group
-            if warp_group.issue:
-                self.fetch(warp_group=warp_group)
-
-                # if we picked out of the unissued list
-                if oldest_stall:
-                    self.oldest.append(self.unissued.pop(unissued_idx - 1))
-                return True
-            
-            else:
-                # look through greedy
-                if not oldest_stall:
-                    self.gto_index = self.oldest[oldest_idx]
-                    oldest_idx += 1
+        self.rr_index = slot >> 1
+        self.fetch(warp_group=self.warp_table[self.rr_index])
+        return True
 
-                # look through unissued
-                else:
-                    self.gto_index = self.unissued[unissued_idx]
-                    unissued_idx += 1
-                
+    # greedy-then-oldest policy: stay on the current group while it can issue, then the
+    # oldest issuable group that has issued before, then the lowest-numbered one that has not
+    def greedy_oldest(self):
+        issuable = self._issuable_groups()
 
         # nothing can fetch here
-        return False
+        if not issuable:
+            return False
+
+        if not issuable >> (2 * self.gto_index) & 1:
+            group = next((group for group in self.oldest if issuable >> (2 * group) & 1), None)
+            if group is None:
+                slot = _find_first_set(issuable & self.unissued, 0)
+                group = slot >> 1
+                self.unissued &= ~(1 << slot)
+                self.oldest.append(group)
+            self.gto_index = group
+
+        self.fetch(warp_group=self.warp_table[self.gto_index])
+        return True
+
+    def cycles_until_active(self) -> Optional[int]:
+        if self.behind_latch.valid:
+            return 0
+
+        # halt() would fire this cycle
+        if not self.halt_sent and self.free_warp > 0 and self.halted_groups == self._all_warps:
+            return 0
+
+        # nothing issuable now, and collision() would not wake anything with the idle issue flags
+        if self.ready_warps or self._all_warps & ~self.halted_groups & ~self.halted_warps & ~self.finished_warps:
+            return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        self.perf_count.record_cycles(cycles, is_stalled=False, is_busy=True, WarpTable=self.warp_table)
 
     # warp scheduler compute method
     def compute(self):
@@ -1,16 +1,13 @@
 # this is a class that builds the sm flow and framework setup.
 from __future__ import annotations
-from contextlib import redirect_stdout
-from dataclasses import dataclass
-import math
 from pathlib import Path
-from typing import List, Optional
-from bitstring import Bits
+from typing import Optional
 
 # ── simulator imports ──────────────────────────────────────────────────────────
 from simulator.interfaces import LatchIF, ForwardingIF
 from simulator.instruction import Instruction
 from simulator.mem_types import DecodeType
+from simulator.stage import earliest_wakeup
 from simulator.execute.stage import ExecuteStage, FunctionalUnitConfig
 from simulator.execute.functional_unit import MemBranchJumpUnitConfig, IntUnitConfig, FpUnitConfig, SpecialUnitConfig
 from simulator.writeback.stage import WritebackStage, WritebackBufferConfig, RegisterFileConfig, PredicateRegisterFileConfig
@@ -22,6 +19,7 @@ from simulator.scheduler.scheduler import SchedulerStage
 from simulator.mem.icache_stage import ICacheStage
 from simulator.mem.dcache import LockupFreeCacheStage
 from simulator.execute.functional_sub_unit import Ldst_Fu
+from simulator.mem.dram import timing_for
 from simulator.mem.mem_controller import MemController
 from simulator.mem.memory import Mem
 from simulator.decode.decode_class import DecodeStage
@@ -29,14 +27,93 @@ from simulator.decode.predicate_reg_file import PredicateRegFile
 from simulator.utils.performance_counter import PerfConfig, Telemeter
 from simulator.utils.performance_counter.predicate_reg_file import PredicateRegFilePerfCount
 from simulator.tbs.tbs import ThreadBlockScheduler
+from simulator.utils import trace
+from simulator import checkpoint
 from config import Settings, get_settings
 
+_trace = trace.get_channel("sm")
+
+
+def build_functional_unit_config(settings: Settings) -> FunctionalUnitConfig:
+    """Build FunctionalUnitConfig from Settings.functional_units configuration.
+
+    Converts the nested functional unit configuration from the Settings object
+    into the structured FunctionalUnitConfig format used by the functional units.
+
+    Returns
+    -------
+    FunctionalUnitConfig
+        Structured configuration with all sub-configs
+    """
+    fu_cfg = settings.functional_units
+
+    # Create individual unit configs from nested settings
+    int_config = IntUnitConfig(
+        alu_count=fu_cfg.int_unit.alu_count,
+        mul_count=fu_cfg.int_unit.mul_count,
+        div_count=fu_cfg.int_unit.div_count,
+        alu_latency=fu_cfg.int_unit.alu_latency,
+        mul_latency=fu_cfg.int_unit.mul_latency,
+        div_latency=fu_cfg.int_unit.div_latency,
+    )
+
+    fp_config = FpUnitConfig(
+        alu_count=fu_cfg.fp_unit.alu_count,
+        mul_count=fu_cfg.fp_unit.mul_count,
+        div_count=fu_cfg.fp_unit.div_count,
+        sqrt_count=fu_cfg.fp_unit.sqrt_count,
+        alu_latency=fu_cfg.fp_unit.alu_latency,
+        mul_latency=fu_cfg.fp_unit.mul_latency,
+        div_latency=fu_cfg.fp_unit.div_latency,
+        sqrt_latency=fu_cfg.fp_unit.sqrt_latency,
+    )
+
+    special_config = SpecialUnitConfig(
+        trig_count=fu_cfg.special_unit.trig_count,
+        inv_sqrt_count=fu_cfg.special_unit.inv_sqrt_count,
+        conv_count=fu_cfg.special_unit.conv_count,
+        trig_latency=fu_cfg.special_unit.trig_latency,
+        inv_sqrt_latency=fu_cfg.special_unit.inv_sqrt_latency,
+        conv_latency=fu_cfg.special_unit.conv_latency,
+    )
+
+    membranchjump_config = MemBranchJumpUnitConfig(
+        ldst_count=fu_cfg.membranchjump_unit.ldst_count,
+        branch_count=fu_cfg.membranchjump_unit.branch_count,
+        jump_count=fu_cfg.membranchjump_unit.jump_count,
+        ldst_buffer_size=fu_cfg.membranchjump_unit.ldst_buffer_size,
+        ldst_queue_size=fu_cfg.membranchjump_unit.ldst_queue_size,
+        block_size_words=fu_cfg.membranchjump_unit.block_size_words,
+        word_size_bytes=fu_cfg.membranchjump_unit.word_size_bytes,
+    )
+
+    # Create and return the FunctionalUnitConfig
+    return FunctionalUnitConfig(
+        int_unit_count=fu_cfg.int_unit_count,
+        fp_unit_count=fu_cfg.fp_unit_count,
+        special_unit_count=fu_cfg.special_unit_count,
+        membranchjump_unit_count=fu_cfg.membranchjump_unit_count,
+        int_config=int_config,
+        fp_config=fp_config,
+        special_config=special_config,
+        membranchjump_config=membranchjump_config,
+        differential_check=fu_cfg.differential_check,
+    )
+
+
 class SM:
+    # stages that take part in event-driven skipping (ldst is ticked inside ex)
+    EVENT_STAGES = ("wb", "ex", "dcache", "issue", "decode", "memc", "icache", "scheduler", "tbs")
+
     def __init__(self, 
         test_file: Path,
         test_file_type: str = "bin",
         config: Optional[Settings] = None,
-        config_path: Optional[Path] = None
+        config_path: Optional[Path] = None,
+        *,
+        mem: Optional[Mem] = None,
+        memc: Optional[MemController] = None,
+        tbs: Optional[ThreadBlockScheduler] = None,
     ):
         """Initialize Streaming Multiprocessor.
         
@@ -45,6 +122,9 @@ class SM:
             test_file_type: File format ("bin" or "hex")
             config: Pre-loaded Settings (optional)
             config_path: Path to config file (optional, uses default if not provided)
+            mem, memc, tbs: Memory, memory controller and thread block scheduler
+                shared by a GPU (optional). The SM attaches to them through its own
+                ports instead of building private ones; the owner ticks them.
         """
         # Load configuration
         if config is None:
@@ -63,12 +143,27 @@ class SM:
         # Initialize simulation state
         self.cycle = 0
         self.finished = False
+
+        self.shared_mem = mem
+        self.shared_memc = memc
+        self.shared_tbs = tbs
+
+        # a GPU owning the shared units has already set tracing up for all its SMs
+        if memc is None:
+            trace.configure_from_settings(self.config.trace)
         
         # Initialize Telemeter based on configuration
         self.telemeter = self._create_telemeter()
+        # per-stage/FU entry and exit cycles on every instruction are only worth keeping for traces
+        Instruction.track_timing = self.telemeter.config.is_tracing_enabled()
         
         # Build the pipeline
         self.pipeline = self._build_pipeline()
+
+        # Event-driven mode jumps over cycles in which every stage is only counting
+        # down; per-cycle traces and flight-recorder triggers need every cycle ticked.
+        self.event_driven = self.config.sm.event_driven and not self._telemeter_needs_every_cycle()
+        self.skipped_cycles = 0
     
     def _create_telemeter(self) -> Telemeter:
         """Create and configure the Telemeter based on PerfCounterConfig."""
@@ -95,6 +190,7 @@ class SM:
                 end=perf_cfg.trace_end_cycle,
                 enabled_units=enabled_units,
                 buffer_limit=perf_cfg.buffer_limit,
+                writer_depth=perf_cfg.trace_writer_depth,
             )
         else:
             # Fallback to summary only
@@ -102,70 +198,14 @@ class SM:
         
         return Telemeter(perf_config, output_dir=str(output_dir), output_prefix=perf_cfg.output_prefix)
     
+    def _telemeter_needs_every_cycle(self) -> bool:
+        perf_config = self.telemeter.config
+        flight_recorder = perf_config.flight_recorder
+        return perf_config.is_tracing_enabled() or (flight_recorder is not None and bool(flight_recorder.triggers))
+
     def _build_functional_unit_config(self) -> FunctionalUnitConfig:
-        """Build FunctionalUnitConfig from Settings.functional_units configuration.
-        
-        Converts the nested functional unit configuration from the Settings object
-        into the structured FunctionalUnitConfig format used by the functional units.
-        
-        Returns
-        -------
-        FunctionalUnitConfig
-            Structured configuration with all sub-configs
-        """
-        fu_cfg = self.config.functional_units
-        
-        # Create individual unit configs from nested settings
-        int_config = IntUnitConfig(
-            alu_count=fu_cfg.int_unit.alu_count,
-            mul_count=fu_cfg.int_unit.mul_count,
-            div_count=fu_cfg.int_unit.div_count,
-            alu_latency=fu_cfg.int_unit.alu_latency,
-            mul_latency=fu_cfg.int_unit.mul_latency,
-            div_latency=fu_cfg.int_unit.div_latency,
-        )
-        
-        fp_config = FpUnitConfig(
-            alu_count=fu_cfg.fp_unit.alu_count,
-            mul_count=fu_cfg.fp_unit.mul_count,
-            div_count=fu_cfg.fp_unit.div_count,
-            sqrt_count=fu_cfg.fp_unit.sqrt_count,
-            alu_latency=fu_cfg.fp_unit.alu_latency,
-            mul_latency=fu_cfg.fp_unit.mul_latency,
-            div_latency=fu_cfg.fp_unit.div_latency,
-            sqrt_latency=fu_cfg.fp_unit.sqrt_latency,
-        )
-        
-        special_config = SpecialUnitConfig(
-            trig_count=fu_cfg.special_unit.trig_count,
-            inv_sqrt_count=fu_cfg.special_unit.inv_sqrt_count,
-            conv_count=fu_cfg.special_unit.conv_count,
-            trig_latency=fu_cfg.special_unit.trig_latency,
-            inv_sqrt_latency=fu_cfg.special_unit.inv_sqrt_latency,
-            conv_latency=fu_cfg.special_unit.conv_latency,
-        )
-        
-        membranchjump_config = MemBranchJumpUnitConfig(
-            ldst_count=fu_cfg.membranchjump_unit.ldst_count,
-            branch_count=fu_cfg.membranchjump_unit.branch_count,
-            jump_count=fu_cfg.membranchjump_unit.jump_count,
-            ldst_buffer_size=fu_cfg.membranchjump_unit.ldst_buffer_size,
-            ldst_queue_size=fu_cfg.membranchjump_unit.ldst_queue_size,
-            block_size_words=fu_cfg.membranchjump_unit.block_size_words,
-            word_size_bytes=fu_cfg.membranchjump_unit.word_size_bytes,
-        )
-        
-        # Create and return the FunctionalUnitConfig
-        return FunctionalUnitConfig(
-            int_unit_count=fu_cfg.int_unit_count,
-            fp_unit_count=fu_cfg.fp_unit_count,
-            special_unit_count=fu_cfg.special_unit_count,
-            membranchjump_unit_count=fu_cfg.membranchjump_unit_count,
-            int_config=int_config,
-            fp_config=fp_config,
-            special_config=special_config,
-            membranchjump_config=membranchjump_config,
-        )
+        """Build FunctionalUnitConfig from Settings.functional_units configuration."""
+        return build_functional_unit_config(self.config)
     
     def _build_writeback_configs(self):
         """Build writeback configs from Settings.
@@ -266,7 +306,7 @@ class SM:
 
         # Forwarding IFs - only create scheduler_tbs_fwif if TBS is enabled
         forwarding_ifs = {}
-        if enable_tbs:
+        if enable_tbs or self.shared_tbs is not None:
             scheduler_tbs_fwif = ForwardingIF(name="scheduler_tbs_if")
             forwarding_ifs["scheduler_tbs_fwif"] = scheduler_tbs_fwif
         
@@ -290,22 +330,47 @@ class SM:
         num_preds = self.config.sm.num_preds
         
         # Initialize memory
-        mem = Mem(start_pc=start_pc, input_file=str(self.test_file), fmt=self.test_file_type)
+        if self.shared_mem is not None:
+            mem = self.shared_mem
+        else:
+            mem = Mem(
+                start_pc=start_pc,
+                input_file=str(self.test_file),
+                fmt=self.test_file_type,
+                cache_dir=self.config.memory.image_cache_dir or None,
+            )
                 
         # Memory controller — instantiated before cache stages so that
         # telemeter.publish("Mem_Controller", "latency", ...) is called before
         # ICacheStage and LockupFreeCacheStage call telemeter.receive().
-        memc = MemController(
-            name="Mem_Controller",
-            ic_req_latch=icache_mem_req_if,
-            dc_req_latch=dcache_mem_latch,
-            ic_serve_latch=mem_icache_resp_if,
-            dc_serve_latch=mem_dcache_latch,
-            mem_backend=mem,
-            latency=mem_latency,
-            policy="rr",
-            telemeter=self.telemeter,
-        )
+        if self.shared_memc is not None:
+            memc = self.shared_memc
+            port_idx = memc.add_port(
+                ic_req_latch=icache_mem_req_if,
+                dc_req_latch=dcache_mem_latch,
+                ic_serve_latch=mem_icache_resp_if,
+                dc_serve_latch=mem_dcache_latch,
+            )
+            self.telemeter.publish(memc.name, "latency", memc.latency)
+            if memc.timing is not None and port_idx == 0:
+                # the DRAM is shared too; its counters are reported with the first SM
+                memc.timing.attach(lambda: memc.cycle, self.telemeter)
+        else:
+            memc = MemController(
+                name="Mem_Controller",
+                ic_req_latch=icache_mem_req_if,
+                dc_req_latch=dcache_mem_latch,
+                ic_serve_latch=mem_icache_resp_if,
+                dc_serve_latch=mem_dcache_latch,
+                mem_backend=mem,
+                latency=mem_latency,
+                policy=mem_policy,
+                max_inflight=self.config.memory.max_inflight,
+                telemeter=self.telemeter,
+                completions_per_cycle=self.config.memory.completions_per_cycle,
+                queue_depth=self.config.memory.queue_depth,
+                timing=timing_for(self.config.memory),
+            )
 
         # D-Cache stage
         dcache_stage = LockupFreeCacheStage(
@@ -328,7 +393,11 @@ class SM:
         
         # Create TBS only if enabled
         tbs = None
-        if enable_tbs:
+        if self.shared_tbs is not None:
+            # the GPU's TBS has already loaded the kernel; register as one of its SMs
+            self.shared_tbs.add_SM(launch_latch=tbs_ws_if, finish_if=forwarding_ifs["scheduler_tbs_fwif"])
+            kernel_pointer_addr = self.shared_tbs.kernel_arg_ptr
+        elif enable_tbs:
             scheduler_tbs_fwif = forwarding_ifs["scheduler_tbs_fwif"]
             tbs = ThreadBlockScheduler(
                 name="Thread_Block_Scheduler",
@@ -338,6 +407,8 @@ class SM:
                     "Scheduler_TBS": scheduler_tbs_fwif
                 },
                 forward_ifs_write=None,
+                threads_per_sm=warp_count * self.config.sm.threads_per_warp,
+                min_thread_division=2 * self.config.sm.threads_per_warp,
                 input_file=self.test_file
             )
 
@@ -350,7 +421,7 @@ class SM:
 
         # Build scheduler forward_ifs_write based on TBS mode
         scheduler_fwif_write = {"Scheduler_LDST": scheduler_ldst_fwif}
-        if enable_tbs:
+        if "scheduler_tbs_fwif" in forwarding_ifs:
             scheduler_fwif_write["Scheduler_TBS"] = forwarding_ifs["scheduler_tbs_fwif"]
 
         scheduler_stage = SchedulerStage(
@@ -387,9 +458,6 @@ class SM:
             num_preds_per_warp=num_preds,
             num_warps=warp_count
         )
-        for warp in range(warp_count):
-            for pred in range(num_preds):
-                prf.reg_file[warp][pred] = [True] * self.config.sm.threads_per_warp
 
         prf_perf_count = PredicateRegFilePerfCount(
             name="PredicateRegFile",
@@ -400,7 +468,7 @@ class SM:
             self.telemeter.register_unit(prf_perf_count)
 
         kernel_base_ptrs = KernelBasePointers(max_kernels_per_SM=1)
-        kernel_base_ptrs.write(0, Bits(uint=kernel_pointer_addr, length=32))
+        kernel_base_ptrs.write(0, kernel_pointer_addr)
 
         decode_stage = DecodeStage(
             name="Decode Stage",
@@ -501,33 +569,81 @@ class SM:
 
     def tick(self):
         if self.finished:
-            print(f"Simulation finished in {self.cycle} cycles.")
+            if _trace.info:
+                _trace.info(f"Simulation finished in {self.cycle} cycles.")
             return
-        print("here")
+        if _trace.debug:
+            _trace.debug(f"{self.name} cycle {self.cycle}")
+        self.tick_before_memc()
+        self.pipeline["memc"].compute()
+        self.tick_after_memc()
+        if "tbs" in self.pipeline:
+            self.pipeline["tbs"].compute()
+            self.finished = self.pipeline["tbs"].kern_finished
+        else:
+            # without a TBS the block pushed at build time is the whole kernel
+            self.finished = self.pipeline["scheduler"].system_finished
+
+        if self.event_driven and not self.finished:
+            self._skip_idle_cycles()
+
+    # A cycle is split around the memory controller so a GPU can run every SM's
+    # request side, then the shared controller once, then every SM's response side.
+    def tick_before_memc(self):
         self.pipeline["wb"].tick()
         self.pipeline["ex"].tick()
         self.pipeline["ex"].compute()
         self.pipeline["dcache"].compute()
         self.pipeline["issue"].compute()
         self.pipeline["decode"].compute()
-        self.pipeline["memc"].compute()
+
+    def tick_after_memc(self):
         self.pipeline["icache"].compute()
         self.pipeline["scheduler"].compute()
-        if "tbs" in self.pipeline:
-            self.pipeline["tbs"].compute()
-        
+
         self.pipeline["prf_perf_count"].sample(self.pipeline["prf"])
 
         self.cycle += 1
-        self.finished = self.pipeline["tbs"].kern_finished
+
+    def _skip_idle_cycles(self):
+        """Advance past the run of idle cycles before the next stage wakes up.
+
+        Every stage reports how many upcoming cycles it would spend only counting
+        down or recording an idle perf cycle; if none needs the next cycle, all of
+        them are advanced by the smallest such count in one jump. The skipped
+        cycles are accounted for exactly, so sm.cycle and the perf summaries
+        match a plain cycle-by-cycle run.
+        """
+        stages = [self.pipeline[name] for name in self.EVENT_STAGES if name in self.pipeline]
+        cycles = earliest_wakeup(stage.cycles_until_active() for stage in stages)
+        # None: nothing is counting down, so there is nothing to jump to
+        if not cycles:
+            return
+
+        for stage in stages:
+            stage.skip_cycles(cycles)
+        self.pipeline["prf_perf_count"].sample(self.pipeline["prf"], cycles=cycles)
+
+        self.cycle += cycles
+        self.skipped_cycles += cycles
     
+    def save_checkpoint(self, path: Path) -> None:
+        """Write the whole simulation state to `path` (format in simulator.checkpoint)."""
+        checkpoint.save_checkpoint(self, path)
+
+    @classmethod
+    def from_checkpoint(cls, path: Path, config: Optional[Settings] = None) -> "SM":
+        """Build an SM from a checkpoint, by default with the settings it was saved with."""
+        return checkpoint.load_checkpoint(path, cls, config)
+
     def finalize(self):
         """Finalize simulation and output performance counter data."""
         if self.telemeter:
             try:
                 self.telemeter.finalize()
-                print(f"Performance counter data written to {self.config.perf_counter.output_dir}/")
+                if _trace.info:
+                    _trace.info(f"Performance counter data written to {self.config.perf_counter.output_dir}/")
             except Exception as e:
-                print(f"Error finalizing performance counters: {e}")
-                import traceback
-                traceback.print_exc()
+                if _trace.error:
+                    _trace.error(f"Error finalizing performance counters: {e}", exc_info=True)
+        trace.flush()
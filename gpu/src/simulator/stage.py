@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Iterable
 from simulator.interfaces import LatchIF, ForwardingIF
 
 @dataclass
@@ -25,6 +25,33 @@ class Stage:
         # default computation, subclassess will override this
         return input_data
 
+    # event-driven SM kernel hooks, see SM._skip_idle_cycles
+    def cycles_until_active(self) -> Optional[int]:
+        '''
+        Number of upcoming cycles in which this stage would only repeat its idle
+        bookkeeping (count down timers, record an idle perf cycle). 0 means the
+        stage must be ticked this cycle; None means it is idle until another stage
+        hands it work. Stages that do not override this are always ticked.
+        '''
+        return 0
+
+    def skip_cycles(self, cycles: int) -> None:
+        '''
+        Advance the stage by `cycles` idle cycles without ticking it. Only called
+        when cycles_until_active() allowed at least that many.
+        '''
+        raise NotImplementedError(f"{self.name} does not support skipping idle cycles")
+
+def earliest_wakeup(counts: Iterable[Optional[int]]) -> Optional[int]:
+    '''Combine cycles_until_active() results: 0 if any unit is active, else the soonest countdown (None if all idle).'''
+    wake = None
+    for count in counts:
+        if count == 0:
+            return 0
+        if count is not None and (wake is None or count < wake):
+            wake = count
+    return wake
+
 # helper function for dumping memory
 def dump_bytes(mem, base, n=4):
     for i in range(n):
@@ -3,14 +3,18 @@ from dataclasses import dataclass, field
 from typing import List, Any, Optional, Dict
 from enum import Enum
 from pathlib import Path
-from bitstring import Bits
 from simulator.mem_types import DecodeType
 from simulator.instruction import Instruction
 from simulator.warp import WarpState, WarpGroup
 from simulator.interfaces import ForwardingIF, LatchIF
 from simulator.stage import Stage
 from simulator.scheduler.csrtable import CsrTable
+from simulator.mem.mem_image import read_kernel_header
+from simulator.utils.trace import get_channel
 import math
+
+_trace = get_channel("tbs")
+
 @dataclass
 class ThreadBlockRecord:
     bidx: int
@@ -45,9 +49,12 @@ class SMRecord:
 
 class ThreadBlockScheduler(Stage):
     """
-    TBS is only configured for single SM operation.
-    - To Change: Need to touch sending/recieving using forward latch
-                    Probably shouldn't be a Stage
+    Hands the kernel's thread blocks out to SMs and reclaims them on completion.
+    - Each SM is registered with add_SM(), giving the latch its warp scheduler
+      receives blocks on and the forwarding IF it reports finished blocks on.
+      Without arguments, this stage's own ahead_latch / "Scheduler_TBS" IF are
+      used (single SM).
+    - At most one block is sent per SM per cycle (one block fits in the latch).
     """
     
     
@@ -66,12 +73,16 @@ class ThreadBlockScheduler(Stage):
         
         # SM list, tracks availability
         self.SMs: list[SMRecord] = []
+        # per-SM block launch latches and block-finished forwarding IFs
+        self.sm_launch_latches: list[LatchIF] = []
+        self.sm_finish_ifs: list[ForwardingIF] = []
 
         # input file
         self.input_file: Path = input_file
 
         # kernel info
         self.kern_finished = False
+        self.kernel_arg_ptr = 0
 
     def load(self):
         """
@@ -83,24 +94,14 @@ class ThreadBlockScheduler(Stage):
         values[4] = argument pc IMPLEMENTED ELSEWHERE RIGHT NOW
         values[5] = argument size (bytes to fetch from argument struct) CURRENTLY NOT IN USE
         """
-        values: list[int] = []
-
-        with self.input_file.open("r") as file:
-            lines: list[str] = [next(file).strip() for _ in range(9)]
-
-            for line in lines[3:9]:
-                parts: list[str] = line.split()
+        # lines 3-8 of a text image, or the header of a binary memory image
+        values: list[int] = list(read_kernel_header(self.input_file))
 
-                raw: str = parts[1]
-
-                if raw.startswith("0x") or raw.startswith("0X"):
-                    values.append(int(raw, 16))
-                else:
-                    values.append(int(raw, 2))
-
-        print(f"Start pc: {values[0]:#x}")
+        if _trace.info:
+            _trace.info(f"Start pc: {values[0]:#x}")
 
         self.init_kernel(kdim=values[3], bdim=values[1], spc=values[0], apc=values[4])
+        self.kernel_arg_ptr = values[4]
 
         return values[4] # returns kerneral argument pointer (apc)
     
@@ -121,9 +122,12 @@ class ThreadBlockScheduler(Stage):
                 kdim -= bdim
         return
     
-    def add_SM(self) -> None:
-        availability = self.threads_per_sm // self.min_thread_division
+    def add_SM(self, launch_latch: Optional[LatchIF] = None, finish_if: Optional[ForwardingIF] = None) -> int:
+        """Register an SM; returns its index. Defaults to this stage's own interfaces."""
         self.SMs.append(SMRecord(self.threads_per_sm, self.min_thread_division))
+        self.sm_launch_latches.append(launch_latch if launch_latch is not None else self.ahead_latch)
+        self.sm_finish_ifs.append(finish_if if finish_if is not None else self.forward_ifs_read["Scheduler_TBS"])
+        return len(self.SMs) - 1
 
     def append_block(self, bdim: int, spc: int, apc: int = 0) -> None:
         bidx = len(self.block_list)
@@ -131,7 +135,8 @@ class ThreadBlockScheduler(Stage):
         self.blocks_not_sent.append(bidx)
     
     def can_send_blk_to_sm(self, bidx, smidx: int = 0):
-        return self.SMs[smidx].avail_warps >= math.ceil(self.block_list[bidx].bdim / self.min_thread_division)
+        return (self.SMs[smidx].can_give_threads(self.block_list[bidx].bdim)
+                and self.sm_launch_latches[smidx].ready_for_push())
     
     def send_blk_to_sm(self, bidx, smidx: int = 0):
         # Occupy
@@ -141,7 +146,7 @@ class ThreadBlockScheduler(Stage):
         self.send_output(self.block_list[bidx])
 
     def send_output(self, blk):
-        self.ahead_latch.push((blk.bidx, blk.bdim, blk.spc))
+        self.sm_launch_latches[blk.assigned_sm].push((blk.bidx, blk.bdim, blk.spc))
     
     def finish_blk(self, bidx, smidx: int = 0):
         # De-occupy
@@ -152,16 +157,29 @@ class ThreadBlockScheduler(Stage):
         if len(self.block_list) == len(self.blocks_done):
             self.kern_finished = True
 
-    def compute(self):
+    def cycles_until_active(self) -> Optional[int]:
+        if any(finish_if.payload for finish_if in self.sm_finish_ifs):
+            return 0
         for bidx in self.blocks_not_sent:
+            for smidx, _ in enumerate(self.SMs):
+                if self.can_send_blk_to_sm(bidx, smidx):
+                    return 0
+        return None
+
+    def skip_cycles(self, cycles: int) -> None:
+        pass
+
+    def compute(self):
+        # blocks go out in order, each to the first SM with room and an empty launch latch
+        for bidx in list(self.blocks_not_sent):
             for smidx, _ in enumerate(self.SMs):
                 if self.can_send_blk_to_sm(bidx, smidx):
                     self.send_blk_to_sm(bidx, smidx)
-                    ## NOTE: Launch bandwidth not restricted.
-                    
-        ## TODO: ADD RECIEVE. ASK WARPSCHEDULER. OTHERWISE CAN ONLY SEND 1 WARP.
-        if self.forward_ifs_read["Scheduler_TBS"].payload:
-            for bidx in self.forward_ifs_read["Scheduler_TBS"].pop():
-                self.finish_blk(bidx)
-            self.kernel_finished()
-            # self.SMs[0].working = False
+                    break
+
+        # the warp scheduler reports its blocks once all of its warps have halted and flushed
+        for smidx, finish_if in enumerate(self.sm_finish_ifs):
+            if finish_if.payload:
+                for bidx in finish_if.pop():
+                    self.finish_blk(bidx, smidx)
+                self.kernel_finished()
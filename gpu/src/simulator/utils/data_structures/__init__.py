@@ -4,6 +4,7 @@ Data structures for GPU simulator.
 
 from .circular_buffer import CircularBuffer
 from .compact_queue import CompactQueue
+from .pipeline_queue import PipelineQueue
 from .stack import Stack
 
-__all__ = ['CircularBuffer', 'CompactQueue', 'Stack']
+__all__ = ['CircularBuffer', 'CompactQueue', 'PipelineQueue', 'Stack']
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the buffer structures behind the execute and writeback stages.
+
+Two access patterns, replayed from pre-generated random event streams:
+
+    execute    one ArithmeticSubUnit pipeline per cycle: advance(in) when the
+               EX/WB latch is free, otherwise compact(in) unless full, then
+               read the tail entry the way compute() does
+    writeback  one WritebackBuffer per cycle: push when an instruction arrives
+               and there is room, pop when the buffer is picked for writeback,
+               then the occupancy/capacity/entry reads of the perf counters
+
+Only CompactQueue and PipelineQueue implement the pipeline semantics, so the
+execute pattern runs on those two; writeback runs on all four structures.
+Before timing, PipelineQueue is replayed against CompactQueue on the same
+streams and every observable result compared.
+
+Run with:
+    python3 -m simulator.utils.data_structures.benchmark [--cycles N] [--lengths 2 4 8 16]
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from simulator.utils.data_structures.circular_buffer import CircularBuffer
+from simulator.utils.data_structures.compact_queue import CompactQueue
+from simulator.utils.data_structures.pipeline_queue import PipelineQueue
+from simulator.utils.data_structures.stack import Stack
+
+# (incoming entry or None, output stalled / buffer selected for writeback)
+Events = List[Tuple[object, bool]]
+
+
+class _Entry:
+    __slots__ = ("n",)
+
+    def __init__(self, n: int):
+        self.n = n
+
+
+def make_events(cycles: int, p_in: float, p_flag: float, seed: int) -> Events:
+    rng = random.Random(seed)
+    return [(_Entry(i) if rng.random() < p_in else None, rng.random() < p_flag) for i in range(cycles)]
+
+
+def _tail(queue) -> object:
+    return queue.snoop_tail() if isinstance(queue, PipelineQueue) else queue.queue[-1]
+
+
+def _is_full(buf) -> bool:
+    return buf.is_full() if callable(buf.is_full) else buf.is_full
+
+
+def _entries(buf) -> list:
+    if isinstance(buf, PipelineQueue):
+        return list(buf)
+    if isinstance(buf, CompactQueue):
+        return [entry for entry in buf.queue if entry is not None]
+    if isinstance(buf, Stack):
+        return list(buf.items)
+    return [entry for entry in buf.buffer if entry is not None]
+
+
+def run_execute(queue, events: Events) -> list:
+    """The ArithmeticSubUnit.tick()/compute() sequence; returns what left the pipeline."""
+    out = []
+    for data, stalled in events:
+        if not stalled:
+            out.append(queue.advance(data))
+        elif not queue.is_full:
+            queue.compact(data)
+        _tail(queue)
+    return out
+
+
+def run_writeback(buf, events: Events) -> list:
+    """The WritebackBuffer.tick() sequence; returns what was popped."""
+    out = []
+    for data, selected in events:
+        if selected:
+            out.append(buf.pop())
+        if data is not None and not _is_full(buf):
+            buf.push(data)
+        len(buf)
+        _entries(buf)
+    return out
+
+
+def check_equivalence(length: int, events: Events) -> None:
+    """Replay both queue implementations step by step and compare everything observable."""
+    ref = CompactQueue(length=length, type_=_Entry)
+    new = PipelineQueue(length=length, type_=_Entry)
+    for cycle, (data, flag) in enumerate(events):
+        # compact() on a full queue is exercised too: both must drop the entry
+        op = "advance" if flag else "compact"
+        got = (getattr(ref, op)(data), getattr(new, op)(data))
+        first = next((i for i, entry in enumerate(ref.queue) if entry is not None), None)
+        state_ref = (ref.queue, ref.is_full, ref.is_empty(), len(ref), ref.snoop(), ref.queue[-1], first)
+        state_new = (new.queue, new.is_full, new.is_empty(), len(new), new.snoop(), new.snoop_tail(), new.first_occupied())
+        if got[0] is not got[1] or state_ref != state_new:
+            raise AssertionError(
+                f"length {length}, cycle {cycle}, {op}: CompactQueue {got[0]} {state_ref}, "
+                f"PipelineQueue {got[1]} {state_new}"
+            )
+
+
+def _time(factory: Callable[[], object], runner: Callable, events: Events, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        buf = factory()
+        start = time.perf_counter()
+        runner(buf, events)
+        best = min(best, time.perf_counter() - start)
+    return best / len(events) * 1e9
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the execute/writeback buffer structures")
+    parser.add_argument("--cycles", type=int, default=100_000, help="Cycles per pattern (default: 100000)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[2, 4, 8, 16], help="Buffer lengths to try")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best is reported (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # arrivals on most cycles, back-pressure on a third of them
+    execute_events = make_events(args.cycles, p_in=0.7, p_flag=0.3, seed=args.seed)
+    writeback_events = make_events(args.cycles, p_in=0.5, p_flag=0.5, seed=args.seed + 1)
+
+    for length in args.lengths:
+        check_equivalence(length, execute_events[:20_000])
+        check_equivalence(length, writeback_events[:20_000])
+    print(f"PipelineQueue matches CompactQueue for lengths {args.lengths}")
+
+    structures: Dict[str, Callable[[int], object]] = {
+        "CompactQueue": lambda n: CompactQueue(length=n, type_=_Entry),
+        "PipelineQueue": lambda n: PipelineQueue(length=n, type_=_Entry),
+        "CircularBuffer": lambda n: CircularBuffer(capacity=n - 1, type_=_Entry),
+        "Stack": lambda n: Stack(capacity=n - 1, type_=_Entry),
+    }
+    patterns = [
+        ("execute", run_execute, execute_events, ["CompactQueue", "PipelineQueue"]),
+        ("writeback", run_writeback, writeback_events, list(structures)),
+    ]
+
+    print(f"\n{'pattern':<10} {'length':>6} {'structure':<15} {'ns/cycle':>10} {'vs CompactQueue':>16}")
+    for pattern, runner, events, names in patterns:
+        for length in args.lengths:
+            baseline = None
+            for name in names:
+                ns = _time(lambda: structures[name](length), runner, events, args.repeat)
+                baseline = baseline or ns
+                print(f"{pattern:<10} {length:>6} {name:<15} {ns:>10.1f} {baseline / ns:>15.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+from typing import Any, Iterator, List, Optional
+
+class PipelineQueue:
+    """
+    Fixed-length pipeline queue with the same behaviour as CompactQueue, without moving entries.
+
+    Logical slot 0 is the head (the entry that leaves on the next advance) and
+    slot length - 1 the tail (where new entries land). The slots live in a ring
+    starting at `head`, so advancing only moves the head index, and bit i of
+    `occupied` is set while logical slot i holds an entry, so is_full, is_empty
+    and len() are integer tests instead of scans.
+    """
+    def __init__(self, length: int, type_: type):
+        self.slots: List[Any] = [None] * length
+        self.length = length
+        self.capacity = length - 1  # For compatibility with buffer interface
+        self.type_ = type_
+        self.head = 0
+        self.occupied = 0
+        self._full_mask = (1 << length) - 1
+        self._tail_bit = 1 << (length - 1)
+
+    def compact(self, data=None) -> None:
+        '''
+        Compacts 'None' entries in queue without popping head
+        '''
+        self.check_type(data)
+
+        occupied = self.occupied
+        if occupied == self._full_mask:
+            return
+
+        length = self.length
+        slots = self.slots
+        head = self.head
+
+        # Add new data at the end (replacing whatever sits in the tail slot, as CompactQueue does)
+        slots[(head + length - 1) % length] = data
+        occupied &= ~self._tail_bit
+        if data is not None:
+            occupied |= self._tail_bit
+
+        # Entries already packed against the head: nothing moves
+        if occupied & (occupied + 1) == 0:
+            self.occupied = occupied
+            return
+
+        # Shift every entry forward into the first free slot, keeping their order
+        dst = (occupied ^ (occupied + 1)).bit_length() - 1  # first free slot
+        for src in range(dst + 1, length):
+            if occupied >> src & 1:
+                src_idx = (head + src) % length
+                slots[(head + dst) % length] = slots[src_idx]
+                slots[src_idx] = None
+                dst += 1
+        self.occupied = (1 << dst) - 1
+
+    def advance(self, data=None):
+        '''
+        Advances all entries in queue
+        Returns popped head
+        '''
+        self.check_type(data)
+
+        head = self.head
+        out_data = self.slots[head]
+        # the slot the head leaves becomes the new tail
+        self.slots[head] = data
+        head += 1
+        self.head = 0 if head == self.length else head
+        self.occupied >>= 1
+        if data is not None:
+            self.occupied |= self._tail_bit
+
+        return out_data
+
+    def advance_empty(self, cycles: int) -> None:
+        '''
+        Same as `cycles` calls to advance(None) when the first `cycles` slots are empty
+        '''
+        if cycles >= self.length:
+            self.clear()
+            return
+        for i in range(cycles):
+            self.slots[(self.head + i) % self.length] = None
+        self.head = (self.head + cycles) % self.length
+        self.occupied >>= cycles
+
+    def push(self, data) -> None:
+        """
+        Add data to the queue using compact method.
+        Wrapper for buffer interface compatibility.
+        """
+        self.compact(data)
+
+    def pop(self, data=None):
+        '''
+        Pops the head of the queue (alias for advance)
+        '''
+        return self.advance(data)
+
+    def snoop(self):
+        '''
+        Returns the head of the queue without advancing
+        '''
+        return self.slots[self.head]
+
+    def snoop_tail(self):
+        '''
+        Returns the tail of the queue (the entry that came in last)
+        '''
+        return self.slots[self.head - 1]
+
+    def first_occupied(self) -> Optional[int]:
+        '''
+        Logical index of the entry closest to the head, None when the queue is empty
+        '''
+        occupied = self.occupied
+        if not occupied:
+            return None
+        return (occupied & -occupied).bit_length() - 1
+
+    def is_empty(self):
+        '''
+        Indicates whether queue is empty
+        '''
+        return not self.occupied & 1
+
+    @property
+    def is_full(self):
+        '''
+        Indicates whether queue can compact and add a new entry
+        '''
+        return self.occupied == self._full_mask
+
+    def clear(self) -> None:
+        self.slots = [None] * self.length
+        self.head = 0
+        self.occupied = 0
+
+    @property
+    def queue(self) -> List[Any]:
+        """The entries in logical order, head first (CompactQueue's list)"""
+        return self.slots[self.head:] + self.slots[:self.head]
+
+    @queue.setter
+    def queue(self, entries: List[Any]) -> None:
+        self.slots = list(entries)
+        self.head = 0
+        self.occupied = sum(1 << i for i, entry in enumerate(self.slots) if entry is not None)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the entries present, head first"""
+        return iter([entry for entry in self.queue if entry is not None])
+
+    def __len__(self):
+        """Return the number of non-None entries in the queue"""
+        return self.occupied.bit_count()
+
+    def check_type(self, data):
+        if not isinstance(data, self.type_) and data is not None:
+            raise TypeError(f"Data type {type(data)} does not match queue type {self.type_}")
@@ -11,6 +11,9 @@ Tracked metrics
 hit_count       : int  – cycles a request was served from the cache
 miss_count      : int  – cycles a primary miss was accepted into MSHR / memory
 eviction_count  : int  – cycles a dirty line was evicted (writeback initiated)
+prefetch_issued : int  – prefetch requests sent to memory (ICache prefetcher)
+prefetch_useful : int  – prefetched lines later hit by a demand fetch
+prefetch_late   : int  – demand misses on a line whose prefetch was still in flight
 
 Derived statistics (computed in finalize())
 -------------------------------------------
@@ -20,6 +23,9 @@ miss_rate           : float – miss_count / total_accesses
 avg_service_latency : float – hit_rate * hit_latency + miss_rate * mem_latency
                               Average cycles from request received in cache to
                               response ready in cache.
+prefetch_accuracy   : float – (prefetch_useful + prefetch_late) / prefetch_issued
+prefetch_coverage   : float – prefetch_useful / (prefetch_useful + miss_count),
+                              the share of would-be misses the prefetcher removed
 """
 
 from __future__ import annotations
@@ -44,6 +50,7 @@ class CachePerfCount(PerfCounterBase):
         )
 
     All boolean kwargs default to False so callers only pass what changed.
+    The prefetch_* counters are incremented directly by the prefetcher.
     """
 
     def __init__(self, name: str, hit_latency: int = 1, mem_latency: int = 0) -> None:
@@ -51,6 +58,9 @@ class CachePerfCount(PerfCounterBase):
         self.hit_count: int = 0
         self.miss_count: int = 0
         self.eviction_count: int = 0
+        self.prefetch_issued: int = 0
+        self.prefetch_useful: int = 0
+        self.prefetch_late: int = 0
         self.hit_latency: int = hit_latency
         self.mem_latency: int = mem_latency
 
@@ -86,9 +96,17 @@ class CachePerfCount(PerfCounterBase):
             "hit_rate": hit_rate,
             "miss_rate": miss_rate,
             "avg_service_latency": avg_service_latency,
+            "prefetch_issued": self.prefetch_issued,
+            "prefetch_useful": self.prefetch_useful,
+            "prefetch_late": self.prefetch_late,
+            "prefetch_accuracy": self._safe_div(self.prefetch_useful + self.prefetch_late, self.prefetch_issued),
+            "prefetch_coverage": self._safe_div(self.prefetch_useful, self.prefetch_useful + self.miss_count),
         }
 
     def _reset_unit_counters(self) -> None:
         self.hit_count = 0
         self.miss_count = 0
         self.eviction_count = 0
+        self.prefetch_issued = 0
+        self.prefetch_useful = 0
+        self.prefetch_late = 0
@@ -0,0 +1,106 @@
+"""
+DramBankPerfCount / DramChannelPerfCount
+----------------------------------------
+Performance counters for the DRAM timing backend (simulator.mem.dram).
+
+DRAM is not a pipeline stage: it sees one event per request rather than one
+per cycle, so these counters are updated by DramTiming.access() and take
+their cycle window from the memory controller's clock when they finalize,
+instead of from record_cycle().  busy_cycles is the time the bank (or the
+channel's data bus) was occupied by requests.
+
+Tracked metrics (per bank, unit_name "DRAM_ch<c>_bank<b>")
+-----------------------------------------------------------
+reads, writes     : int – requests served by the bank
+row_hits          : int – requests to the open row (column access only)
+row_empty         : int – requests to a precharged bank (activate + column)
+row_conflicts     : int – requests that closed another row first
+bytes             : int – bytes transferred
+
+Tracked metrics (per channel, unit_name "DRAM_ch<c>")
+------------------------------------------------------
+requests, bytes   : int – everything that crossed the channel's data bus
+
+Derived statistics (computed in finalize())
+-------------------------------------------
+row_hit_rate          : float – row_hits / requests (bank)
+bandwidth_bytes_per_cycle : float – bytes / total_cycles
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from simulator.utils.performance_counter.perf_counter_base import PerfCounterBase
+
+
+class _DramPerfCount(PerfCounterBase):
+    """Event-driven counter whose cycle window is read from `clock`."""
+
+    def __init__(self, name: str, clock: Callable[[], int]) -> None:
+        super().__init__(name)
+        self.clock = clock
+        self.window_start: int = 0
+        self.bytes: int = 0
+
+    def finalize(self) -> dict[str, Any]:
+        self.total_cycles = max(0, self.clock() - self.window_start)
+        self.busy_cycles = min(self.busy_cycles, self.total_cycles)
+        self.idle_cycles = self.total_cycles - self.busy_cycles
+        return super().finalize()
+
+    def _reset_unit_counters(self) -> None:
+        self.window_start = self.clock()
+        self.bytes = 0
+
+
+class DramBankPerfCount(_DramPerfCount):
+    """Row-buffer outcomes and traffic of one DRAM bank."""
+
+    def __init__(self, name: str, clock: Callable[[], int]) -> None:
+        super().__init__(name, clock)
+        self.reads: int = 0
+        self.writes: int = 0
+        self.row_hits: int = 0
+        self.row_empty: int = 0
+        self.row_conflicts: int = 0
+
+    def _extra_summary(self) -> dict[str, Any]:
+        requests = self.reads + self.writes
+        return {
+            "reads": self.reads,
+            "writes": self.writes,
+            "row_hits": self.row_hits,
+            "row_empty": self.row_empty,
+            "row_conflicts": self.row_conflicts,
+            "row_hit_rate": self._safe_div(self.row_hits, requests),
+            "bytes": self.bytes,
+            "bandwidth_bytes_per_cycle": self._safe_div(self.bytes, self.total_cycles),
+        }
+
+    def _reset_unit_counters(self) -> None:
+        super()._reset_unit_counters()
+        self.reads = 0
+        self.writes = 0
+        self.row_hits = 0
+        self.row_empty = 0
+        self.row_conflicts = 0
+
+
+class DramChannelPerfCount(_DramPerfCount):
+    """Data-bus traffic of one DRAM channel."""
+
+    def __init__(self, name: str, clock: Callable[[], int]) -> None:
+        super().__init__(name, clock)
+        self.requests: int = 0
+
+    def _extra_summary(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "bandwidth_bytes_per_cycle": self._safe_div(self.bytes, self.total_cycles),
+        }
+
+    def _reset_unit_counters(self) -> None:
+        super()._reset_unit_counters()
+        self.requests = 0
@@ -1,9 +1,12 @@
 import pandas as pd
 from typing import Any
-from bitstring import Bits
 from common.custom_enums_multi import Op
 from simulator.instruction import Instruction
+from simulator.word import FULL_MASK
 from simulator.utils.performance_counter.perf_counter_base import PerfCounterBase
+from simulator.utils.trace import get_channel
+
+_trace = get_channel("perf")
 
 class ExecutePerfCount(PerfCounterBase):
     def __init__(self, name: str):
@@ -35,12 +38,14 @@ class ExecutePerfCount(PerfCounterBase):
         # Convert instruction counts: Op enum -> string, filter out None
         instr_counts_str = {}
         if None in self.instruction_counts:
-            print(f"Warning: {self.unit_name} has instruction_counts[None]={self.instruction_counts[None]}, filtering out")
+            if _trace.warning:
+                _trace.warning(f"{self.unit_name} has instruction_counts[None]={self.instruction_counts[None]}, filtering out")
         for opcode, count in self.instruction_counts.items():
             if opcode is None:
                 continue
             if count is None:
-                print(f"Warning: {self.unit_name} instruction_counts[{opcode}] is None, filtering out")
+                if _trace.warning:
+                    _trace.warning(f"{self.unit_name} instruction_counts[{opcode}] is None, filtering out")
                 continue
             opcode_str = opcode.name if hasattr(opcode, 'name') else str(opcode)
             instr_counts_str[opcode_str] = count
@@ -48,12 +53,14 @@ class ExecutePerfCount(PerfCounterBase):
         # Convert overflow counts: Op enum -> string, filter out None
         overflow_counts_str = {}
         if None in self.overflow_counts:
-            print(f"Warning: {self.unit_name} has overflow_counts[None]={self.overflow_counts[None]}, filtering out")
+            if _trace.warning:
+                _trace.warning(f"{self.unit_name} has overflow_counts[None]={self.overflow_counts[None]}, filtering out")
         for opcode, count in self.overflow_counts.items():
             if opcode is None:
                 continue
             if count is None:
-                print(f"Warning: {self.unit_name} overflow_counts[{opcode}] is None, filtering out")
+                if _trace.warning:
+                    _trace.warning(f"{self.unit_name} overflow_counts[{opcode}] is None, filtering out")
                 continue
             opcode_str = opcode.name if hasattr(opcode, 'name') else str(opcode)
             overflow_counts_str[opcode_str] = count
@@ -75,6 +82,11 @@ class ExecutePerfCount(PerfCounterBase):
             "overflow_summary": overflow_summary,
             "overflow_details": overflow_details_str,
         }
+
+    def _reset_unit_counters(self) -> None:
+        self.instruction_counts = {}
+        self.overflow_counts = {}
+        self.overflow_details = []
     
 class BranchPerfCount(ExecutePerfCount):
     def __init__(self, name: str):
@@ -83,14 +95,12 @@ class BranchPerfCount(ExecutePerfCount):
         self.non_divergent_branches: int = 0
         self.total_branches: int = 0
 
-    def record_branch(self, wdat_pred: list) -> None:
-        """Call after compute() with the wdat_pred result to classify the branch."""
+    def record_branch(self, wdat_pred: int) -> None:
+        """Call after compute() with the wdat_pred lane mask to classify the branch."""
         if wdat_pred is None:
             return
         self.total_branches += 1
-        all_one = all(b == Bits(uint=1, length=1) for b in wdat_pred)
-        all_zero = all(b == Bits(uint=0, length=1) for b in wdat_pred)
-        if all_one or all_zero:
+        if wdat_pred in (0, FULL_MASK):
             self.non_divergent_branches += 1
         else:
             self.divergent_branches += 1
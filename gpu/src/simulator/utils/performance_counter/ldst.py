@@ -4,6 +4,9 @@ from typing import Any
 from common.custom_enums_multi import Op
 from simulator.instruction import Instruction
 from simulator.utils.performance_counter.perf_counter_base import PerfCounterBase
+from simulator.utils.trace import get_channel
+
+_trace = get_channel("perf")
 
 
 class LdstPerfCount(PerfCounterBase):
@@ -21,7 +24,6 @@ class LdstPerfCount(PerfCounterBase):
         super().__init__(name)
         self.instruction_counts: dict[Op, int] = {}
         self.instruction_latencies: dict[Op, list[int]] = {}  # Track latencies per opcode
-        self.current_instruction_cycle: dict[int, int] = {}  # Map instruction ID to entry cycle
         self.q_occupancy_history: list[int] = []  # Queue occupancy per cycle
         self.q_full_cycles: int = 0  # Cycles where queue was full
         
@@ -41,15 +43,10 @@ class LdstPerfCount(PerfCounterBase):
         **kwargs : Any additional parameters
         """
         if instr is not None:
-            if self.unit_name not in [entry['fu'] for entry in instr.fu_entries]:
+            if instr.fu_entry_cycle(self.unit_name) is None:
                 # Track instruction count
-                instr.mark_fu_enter(self.unit_name, cycle)  # Mark the instruction with the cycle it entered this unit
+                instr.mark_fu_enter(self.unit_name, cycle, always=True)  # Mark the instruction with the cycle it entered this unit
                 self.instruction_counts[instr.opcode] = self.instruction_counts.get(instr.opcode, 0) + 1
-            
-            # Track instruction entry (use id() as unique identifier)
-            instr_id = id(instr)
-            if instr_id not in self.current_instruction_cycle and cycle is not None:
-                self.current_instruction_cycle[instr_id] = cycle
         else:
             self.instruction_counts[None] = self.instruction_counts.get(None, 0) + 1
         
@@ -59,6 +56,17 @@ class LdstPerfCount(PerfCounterBase):
         # Track full cycles
         if q_occupancy >= q_capacity:
             self.q_full_cycles += 1
+
+    def _record_unit_cycles(self, cycles: int, *, instr: Instruction, q_occupancy: int = 0, q_capacity: int = 1, **kwargs) -> None:
+        """Bulk form of _record_unit_cycle; only idle (instr=None) cycles are skipped in bulk."""
+        if instr is not None:
+            super()._record_unit_cycles(cycles, instr=instr, q_occupancy=q_occupancy, q_capacity=q_capacity, **kwargs)
+            return
+
+        self.instruction_counts[None] = self.instruction_counts.get(None, 0) + cycles
+        self.q_occupancy_history.extend([q_occupancy] * cycles)
+        if q_occupancy >= q_capacity:
+            self.q_full_cycles += cycles
     
     def record_instruction_completion(self, instr: Instruction, completion_cycle: int) -> None:
         """Record when an instruction completes (call when moving to wb_buffer).
@@ -73,21 +81,22 @@ class LdstPerfCount(PerfCounterBase):
         if instr is None:
             return
             
-        instr_id = id(instr)
-        
-        # Calculate latency if we have entry cycle
-        if instr_id in self.current_instruction_cycle:
-            entry_cycle = self.current_instruction_cycle[instr_id]
+        # Entry cycle is the one marked on the instruction when it first reached this unit
+        entry_cycle = instr.fu_entry_cycle(self.unit_name)
+        if entry_cycle is not None:
             latency = completion_cycle - entry_cycle
             
             # Track latency for this opcode
             if instr.opcode not in self.instruction_latencies:
                 self.instruction_latencies[instr.opcode] = []
             self.instruction_latencies[instr.opcode].append(latency)
-            
-            # Clean up entry tracking
-            del self.current_instruction_cycle[instr_id]
     
+    def _reset_unit_counters(self) -> None:
+        self.instruction_counts = {}
+        self.instruction_latencies = {}
+        self.q_occupancy_history = []
+        self.q_full_cycles = 0
+
     def _extra_summary(self) -> dict[str, Any]:
         """Convert tracked metrics to JSON-serializable format for Parquet export.
         
@@ -105,12 +114,14 @@ class LdstPerfCount(PerfCounterBase):
         # Convert instruction counts: Op enum -> string, filter out None
         instr_counts_str = {}
         if None in self.instruction_counts:
-            print(f"Warning: {self.unit_name} has instruction_counts[None]={self.instruction_counts[None]}, filtering out")
+            if _trace.warning:
+                _trace.warning(f"{self.unit_name} has instruction_counts[None]={self.instruction_counts[None]}, filtering out")
         for opcode, count in self.instruction_counts.items():
             if opcode is None:
                 continue
             if count is None:
-                print(f"Warning: {self.unit_name} instruction_counts[{opcode}] is None, filtering out")
+                if _trace.warning:
+                    _trace.warning(f"{self.unit_name} instruction_counts[{opcode}] is None, filtering out")
                 continue
             opcode_str = opcode.name if hasattr(opcode, 'name') else str(opcode)
             instr_counts_str[opcode_str] = count
@@ -301,12 +301,17 @@ class PerfConfig:
                           still collecting summary counters.
     buffer_limit        : Number of trace rows to accumulate in memory before
                           flushing to Parquet.  Default 100,000.
+    writer_depth        : Flushed trace buffers a background thread may
+                          still be writing before the next flush waits for
+                          it (1 = double-buffered).  0 writes each flush
+                          synchronously in the simulation thread.
     flight_recorder     : Optional flight-recorder configuration.  When None,
                           the flight-recorder feature is disabled.
     """
     enabled_units: Set[str] = field(default_factory=set)
     trace_range: Tuple[int, int] = (0, 0)
     buffer_limit: int = 100_000
+    writer_depth: int = 1
     flight_recorder: Optional[FlightRecorderConfig] = None
 
     # ------------------------------------------------------------------
@@ -337,12 +342,14 @@ class PerfConfig:
         enabled_units: Set[str] = None,
         buffer_limit: int = 100_000,
         flight_recorder: FlightRecorderConfig = None,
+        writer_depth: int = 1,
     ) -> PerfConfig:
         """Collect both summary counters and cycle-level traces."""
         return cls(
             enabled_units=enabled_units or set(),
             trace_range=(start, end),
             buffer_limit=buffer_limit,
+            writer_depth=writer_depth,
             flight_recorder=flight_recorder,
         )
 
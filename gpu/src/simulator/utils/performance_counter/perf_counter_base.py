@@ -10,6 +10,10 @@ Inherit from this class and override the two extension hooks:
     - _extra_summary()              – return a dict of any additional derived
                                       stats to merge into the finalize output.
 
+Units whose per-cycle bookkeeping can be done in bulk may also override
+_record_unit_cycles(cycles, **kwargs), which record_cycles() uses when the SM
+skips a run of identical idle cycles (see SM event-driven mode).
+
 Typical usage in a pipeline stage
 ----------------------------------
     class MyUnitPerfCount(PerfCounterBase):
@@ -133,6 +137,38 @@ class PerfCounterBase(ABC):
 
         self._record_unit_cycle(is_stalled=is_stalled, is_busy=is_busy, **kwargs)
 
+    def record_cycles(
+        self,
+        cycles: int,
+        *,
+        is_stalled: bool,
+        is_busy: bool,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Record `cycles` consecutive cycles that all carry the same signals.
+
+        Equivalent to calling record_cycle() `cycles` times with identical
+        arguments; used by the event-driven SM kernel to account for idle
+        cycles it skips over in one jump.
+        """
+        if not self.enabled or cycles <= 0:
+            return
+
+        self._finalized = False
+
+        self.total_cycles += cycles
+
+        if is_stalled:
+            self.stall_cycles += cycles
+
+        if is_busy:
+            self.busy_cycles += cycles
+        else:
+            self.idle_cycles += cycles
+
+        self._record_unit_cycles(cycles, is_stalled=is_stalled, is_busy=is_busy, **kwargs)
+
     # ------------------------------------------------------------------
     # Extension hooks
     # ------------------------------------------------------------------
@@ -145,6 +181,16 @@ class PerfCounterBase(ABC):
         are forwarded here.  The base implementation is intentionally a no-op.
         """
 
+    def _record_unit_cycles(self, cycles: int, **kwargs: Any) -> None:
+        """
+        Bulk form of _record_unit_cycle() for `cycles` identical cycles.
+
+        The default replays _record_unit_cycle() once per cycle, which is
+        always exact; override when the unit can update its counters in O(1).
+        """
+        for _ in range(cycles):
+            self._record_unit_cycle(**kwargs)
+
     def _extra_summary(self) -> dict[str, Any]:
         """
         Override in subclasses to add unit-specific derived stats to the
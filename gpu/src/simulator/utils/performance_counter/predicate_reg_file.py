@@ -53,23 +53,14 @@ class PredicateRegFilePerfCount(PerfCounterBase):
                          separately, but that adds per-warp counters out of
                          scope here.
         """
-        occupied_slots = 0
-        any_warp_full = False
-        for warp_preds in pred_reg_file.reg_file:
-            warp_occupied = 0
-            for mask in warp_preds:
-                if not all(mask):
-                    warp_occupied += 1
-            occupied_slots += warp_occupied
-            if warp_occupied == self.num_preds_per_warp:
-                any_warp_full = True
-        return occupied_slots, any_warp_full
-
-    def sample(self, pred_reg_file, **kwargs) -> None:
-        """Compute occupancy from reg file and record the cycle."""
+        return pred_reg_file.occupancy()
+
+    def sample(self, pred_reg_file, cycles: int = 1, **kwargs) -> None:
+        """Compute occupancy from reg file and record the cycle (or `cycles` identical cycles)."""
         occupied, any_warp_full = self.compute_occupancy(pred_reg_file)
         is_busy = occupied > 0
-        self.record_cycle(
+        self.record_cycles(
+            cycles,
             is_stalled=False,
             is_busy=is_busy,
             occupied_slots=occupied,
@@ -87,6 +78,12 @@ class PredicateRegFilePerfCount(PerfCounterBase):
         if any_warp_full:
             self.full_cycles += 1
 
+    def _record_unit_cycles(self, cycles: int, *, occupied_slots: int = 0, any_warp_full: bool = False, **_kwargs) -> None:
+        normalized = self._safe_div(occupied_slots, self.total_slots)
+        self._occupancy_samples.extend([normalized] * cycles)
+        if any_warp_full:
+            self.full_cycles += cycles
+
     def _extra_summary(self) -> dict[str, Any]:
         n = len(self._occupancy_samples)
         avg_occupancy = self._safe_div(sum(self._occupancy_samples), n)
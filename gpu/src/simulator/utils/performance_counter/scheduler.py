@@ -18,8 +18,18 @@ class SchedulerPerfCount(PerfCounterBase):
         self.std_dev.append(statistics.pstdev(pcs))
         self.range.append(max(pcs) - min(pcs))
 
+    def _record_unit_cycles(self, cycles: int, *, WarpTable: List[WarpGroup], **kwargs: Any) -> None:
+        # the warp table does not change across skipped cycles, so every sample is the same
+        pcs = [warp.pc for group in WarpTable for warp in group.warps]
+        self.std_dev.extend([statistics.pstdev(pcs)] * cycles)
+        self.range.extend([max(pcs) - min(pcs)] * cycles)
+
         # return super()._record_unit_cycle(**kwargs)
     
+    def _reset_unit_counters(self) -> None:
+        self.range = []
+        self.std_dev = []
+
     def _extra_summary(self) -> dict[str, Any]:
         return {
             "std_dev": self.std_dev,
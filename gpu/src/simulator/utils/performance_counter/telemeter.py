@@ -9,21 +9,26 @@ The Telemeter owns two distinct data streams:
    integer/float stats every cycle.  At simulation end, finalize() collects
    all units into a single summary Parquet file.
 
-2. **Cycle-level traces** — arbitrary key/value rows emitted by units via
-   record_trace().  Rows are buffered in a List[Dict] and flushed to Parquet
-   when the buffer reaches PerfConfig.buffer_limit.
+2. **Cycle-level traces** — key/value rows emitted by units via
+   record_trace().  Each unit's rows are buffered column by column in
+   preallocated Python lists, one per column, and converted to typed Arrow
+   arrays only when written (see trace_buffer.py); when PerfConfig.buffer_limit rows are
+   buffered they are written as one row group of traces.parquet through a
+   single streaming Parquet writer.  Units declare their columns with
+   declare_trace_fields(); undeclared columns take the type of their first
+   value.
 
 Flight Recorder (triggered tracing)
 ------------------------------------
 When PerfConfig.flight_recorder is set, a collections.deque of depth
 pre_stall_depth acts as a circular pre-trigger buffer.  Every call to
-record_trace() appends to the deque instead of the main buffer while
+record_trace() appends to the deque instead of the trace buffers while
 tracing is in its normal (non-triggered) state.
 
 Call trigger_flight_recorder(unit_name, cycle) when a stall is detected.
-This commits the entire deque to the main buffer and puts the telemeter
+This commits the entire deque to the trace buffers and puts the telemeter
 into "post-trigger" mode, where it captures the next post_stall_cycles
-cycles directly into the main buffer before returning to circular-buffer mode.
+cycles directly into the trace buffers before returning to circular-buffer mode.
 
 Typical wiring inside a tick() method
 --------------------------------------
@@ -55,6 +60,12 @@ import polars as pl
 
 from simulator.utils.performance_counter.perf_config import PerfConfig, SnapshotScope, TriggerConfig
 from simulator.utils.performance_counter.perf_counter_base import PerfCounterBase
+from simulator.utils.performance_counter.trace_buffer import (
+    BackgroundTraceWriter,
+    TraceSchema,
+    TraceWriter,
+    UnitTraceBuffer,
+)
 
 
 class Telemeter:
@@ -78,11 +89,11 @@ class Telemeter:
         # Registered PerfCounterBase instances keyed by unit name
         self._units: Dict[str, PerfCounterBase] = {}
 
-        # Cycle-level trace buffer
-        self._trace_buffer: List[Dict[str, Any]] = []
-        # Maps (cycle, unit_name) -> row index in _trace_buffer for merge-on-write
-        self._trace_buffer_index: Dict[tuple[int, str], int] = {}
-        self._trace_file_index: int = 0   # incremented each flush (for multi-part files)
+        # Cycle-level trace buffers, one per emitting unit, sharing one column schema
+        self._trace_schema = TraceSchema()
+        self._trace_buffers: Dict[str, UnitTraceBuffer] = {}
+        self._trace_rows: int = 0   # rows buffered across all units since the last flush
+        self._trace_writer: Optional[TraceWriter] = None   # opened by the first flush (see PerfConfig.writer_depth)
 
         # Flight recorder state
         self._fr_deque: Optional[deque] = None
@@ -124,6 +135,11 @@ class Telemeter:
         unit.enabled = self.config.is_unit_enabled(unit.unit_name)
         self._units[unit.unit_name] = unit
 
+    def reset_counters(self) -> None:
+        """Zero every registered unit's counters (e.g. at the end of a warm-up)."""
+        for unit in self._units.values():
+            unit.reset()
+
     def get_unit(self, unit_name: str) -> Optional[PerfCounterBase]:
         """Return the registered counter for a unit, or None."""
         return self._units.get(unit_name)
@@ -212,6 +228,20 @@ class Telemeter:
         """
         self._snapshot_providers[name] = provider
 
+    def declare_trace_fields(self, **fields: type) -> None:
+        """
+        Declare the type (bool, int, float or str) of trace columns.
+
+        Call this at construction time for every field a unit passes to
+        record_trace().  Undeclared fields are typed by their first non-None
+        value, which only works for fields that show up before the first
+        flush; Enum values are stored by name in str columns.
+
+            telemeter.declare_trace_fields(warp_id=int, opcode=str, is_stalled=bool)
+        """
+        for name, type_ in fields.items():
+            self._trace_schema.declare(name, type_)
+
     # ------------------------------------------------------------------
     # Hot-path: trace active check
     # ------------------------------------------------------------------
@@ -239,34 +269,25 @@ class Telemeter:
         building the dict on inactive cycles.
 
         The row is appended to the flight-recorder deque (if configured and
-        not currently in post-trigger capture mode) or directly to the main
-        buffer.  Auto-flushes when the buffer reaches PerfConfig.buffer_limit.
+        not currently in post-trigger capture mode) or directly to the unit's
+        trace buffer.  Auto-flushes when PerfConfig.buffer_limit rows are
+        buffered.
 
         Parameters
         ----------
         cycle     : Current simulation cycle number.
         unit_name : Name of the emitting unit (used as a column value).
-        **fields  : Arbitrary key/value pairs; keys become column names in
-                    the output Parquet.  Use snake_case.
+        **fields  : Key/value pairs; keys become column names in the output
+                    Parquet (see declare_trace_fields).  Use snake_case.
         """
-        row: Dict[str, Any] = {"cycle": cycle, "unit_name": unit_name, **fields}
-
-        if self._fr_deque is not None and not self._fr_active:
-            # Pre-trigger: rotate through the circular buffer (all units)
-            self._fr_deque.append(row)
-        elif self._fr_active and self._is_unit_captured(unit_name):
-            # Post-trigger capture window: only route captured units to main buffer
-            self._append_or_merge_trace_row(row)
-            if len(self._trace_buffer) >= self.config.buffer_limit:
+        if self._fr_deque is None or (self._fr_active and self._is_unit_captured(unit_name)):
+            # No flight recorder, or a captured unit inside the post-trigger window
+            self._append_trace_row(cycle, unit_name, fields)
+            if self._trace_rows >= self.config.buffer_limit:
                 self.flush_traces()
-        elif self._fr_deque is not None:
-            # Post-trigger window but this unit is not in capture_units: keep rotating
-            self._fr_deque.append(row)
         else:
-            # No flight recorder configured: straight to main buffer
-            self._append_or_merge_trace_row(row)
-            if len(self._trace_buffer) >= self.config.buffer_limit:
-                self.flush_traces()
+            # Pre-trigger, or a unit outside capture_units: rotate through the circular buffer
+            self._fr_deque.append((cycle, unit_name, fields))
 
     # ------------------------------------------------------------------
     # Flight recorder
@@ -301,21 +322,19 @@ class Telemeter:
         Empty _active_capture_units means all units are captured."""
         return not self._active_capture_units or unit_name in self._active_capture_units
 
-    def _append_or_merge_trace_row(self, row: Dict[str, Any]) -> None:
+    def _append_trace_row(self, cycle: int, unit_name: str, fields: Dict[str, Any]) -> None:
         """
-        Append a new row to the trace buffer, or merge into an existing row
-        with the same (cycle, unit_name).
+        Append a row to the unit's trace buffer, or merge it into the unit's
+        last row when that is for the same cycle.
 
         Merge rule: later values overwrite earlier values for duplicate keys,
-        while preserving any previously written keys not present in `row`.
+        while preserving any previously written keys not present in `fields`.
         """
-        key = (int(row["cycle"]), str(row["unit_name"]))
-        idx = self._trace_buffer_index.get(key)
-        if idx is None:
-            self._trace_buffer_index[key] = len(self._trace_buffer)
-            self._trace_buffer.append(row)
-            return
-        self._trace_buffer[idx].update(row)
+        buffer = self._trace_buffers.get(unit_name)
+        if buffer is None:
+            buffer = self._trace_buffers[unit_name] = UnitTraceBuffer(unit_name, self._trace_schema)
+        if buffer.append(cycle, fields):
+            self._trace_rows += 1
 
     def check_triggers(self, unit_name: str, cycle: int, **fields: Any) -> None:
         """
@@ -356,13 +375,13 @@ class Telemeter:
                     rows_to_commit = [
                         r for r in self._fr_deque
                         if not trigger.capture_units
-                        or r["unit_name"] in trigger.capture_units
+                        or r[1] in trigger.capture_units
                     ]
                     pre_capture_rows = len(rows_to_commit)
                     if rows_to_commit:
-                        pre_capture_start_cycle = rows_to_commit[0]["cycle"]
-                    for r in rows_to_commit:
-                        self._append_or_merge_trace_row(r)
+                        pre_capture_start_cycle = rows_to_commit[0][0]
+                    for r_cycle, r_unit, r_fields in rows_to_commit:
+                        self._append_trace_row(r_cycle, r_unit, r_fields)
                     self._fr_deque.clear()
                 if not trigger.capture_units:
                     capture_all = True
@@ -450,10 +469,8 @@ class Telemeter:
             if provider is None:
                 continue
             scope: Optional[SnapshotScope] = self._active_snapshot_scopes.get(name)
-            state = provider(scope)
-            row: Dict[str, Any] = {"cycle": cycle, "unit_name": name, **state}
-            self._append_or_merge_trace_row(row)
-        if len(self._trace_buffer) >= self.config.buffer_limit:
+            self._append_trace_row(cycle, name, provider(scope))
+        if self._trace_rows >= self.config.buffer_limit:
             self.flush_traces()
 
     # ------------------------------------------------------------------
@@ -462,55 +479,44 @@ class Telemeter:
 
     def flush_traces(self) -> None:
         """
-        Flush the in-memory trace buffer to a new Parquet part file.
+        Write the buffered trace rows as one row group of traces.parquet.
 
-        Each flush produces an independent file:
-            traces_part_0000.parquet
-            traces_part_0001.parquet
-            ...
+        The first flush opens the file, with every trace column declared or
+        seen so far as its schema; later flushes append row groups to the
+        same writer, and finalize() closes it.  Rows within a row group are
+        in cycle order.
 
-        This avoids the read-back overhead of appending to an existing
-        Parquet file (Parquet has no native append; the alternative is a
-        full read → concat → rewrite which is O(total rows) per flush).
-
-        At analysis time, read all parts in one shot:
-            pl.read_parquet("perf_out/traces_*.parquet")
-        or via DuckDB/Parquet Visualizer:
-            SELECT * FROM read_parquet('perf_out/traces_*.parquet')
+        With PerfConfig.writer_depth > 0 the row group is written by a
+        background thread while recording continues into a second set of
+        buffers; the flush only waits when the thread is still busy with
+        writer_depth earlier flushes.
         """
-        if not self._trace_buffer:
+        if not self._trace_rows:
             return
 
-        df = pl.from_dicts(self._trace_buffer)
-        path = self.output_dir / f"traces_part_{self._trace_file_index:04d}.parquet"
-        df.write_parquet(str(path))
-        self._trace_buffer.clear()
-        self._trace_buffer_index.clear()
-        self._trace_file_index += 1
+        if self._trace_writer is None:
+            path = self.output_dir / "traces.parquet"
+            if self.config.writer_depth > 0:
+                self._trace_writer = BackgroundTraceWriter(path, self._trace_schema, self.config.writer_depth)
+            else:
+                self._trace_writer = TraceWriter(path, self._trace_schema)
+        self._trace_buffers = self._trace_writer.submit(self._trace_buffers)
+        self._trace_rows = 0
 
     def finalize(self) -> None:
         """
         End-of-simulation teardown:
-          1. Flush any remaining trace rows.
-          2. Combine all trace part files into a single traces.parquet.
-          3. Finalize all registered unit counters.
-          4. Write a combined summary Parquet.
+          1. Flush any remaining trace rows, wait for the background writer
+             to drain, and close traces.parquet.
+          2. Finalize all registered unit counters.
+          3. Write a combined summary Parquet.
 
         Call this exactly once after the simulation loop exits.
         """
-        # Flush any remaining buffered rows
         self.flush_traces()
-
-        # Combine all part files into one traces.parquet and delete the parts
-        part_files = sorted(self.output_dir.glob("traces_part_*.parquet"))
-        if part_files:
-            df_traces = pl.read_parquet(
-                [str(p) for p in part_files],
-                allow_missing_columns=True,  # parts may have different column sets
-            )
-            df_traces.write_parquet(str(self.output_dir / "traces.parquet"))
-            for part in part_files:
-                part.unlink()
+        if self._trace_writer is not None:
+            self._trace_writer.close()
+            self._trace_writer = None
 
         # Write trigger summary: one config row per registered trigger +
         # one event row per runtime fire, combined into trigger_summary.parquet.
@@ -541,18 +547,24 @@ class Telemeter:
         if not self._units:
             return
 
-        # Collect summaries from all registered units
-        rows = [unit.finalize() for unit in self._units.values()]
-        df = pl.from_dicts(rows)
-        # Use output_prefix in filename if provided
-        filename = f"{self.output_prefix}_perf_summary.parquet" if self.output_prefix else "perf_summary.parquet"
-        summary_path = self.output_dir / filename
-        df.write_parquet(str(summary_path))
+        df = pl.from_dicts(self.summary_rows())
+        df.write_parquet(str(self.summary_path))
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """One summary dict per registered unit, in registration order."""
+        return [unit.finalize() for unit in self._units.values()]
 
     # ------------------------------------------------------------------
     # Introspection
     # ------------------------------------------------------------------
 
+    @property
+    def summary_path(self) -> Path:
+        """Where finalize() writes the per-unit summary Parquet."""
+        # Use output_prefix in filename if provided
+        filename = f"{self.output_prefix}_perf_summary.parquet" if self.output_prefix else "perf_summary.parquet"
+        return self.output_dir / filename
+
     @property
     def registered_units(self) -> List[str]:
         """Names of all registered units."""
@@ -561,7 +573,7 @@ class Telemeter:
     @property
     def trace_buffer_size(self) -> int:
         """Number of rows currently in the in-memory trace buffer."""
-        return len(self._trace_buffer)
+        return self._trace_rows
 
     def __repr__(self) -> str:
         return (
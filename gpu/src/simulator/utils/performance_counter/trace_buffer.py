@@ -0,0 +1,261 @@
+"""
+Trace buffers
+-------------
+Columnar storage for cycle-level trace rows, used by the Telemeter.
+
+Every trace column has a type, either declared up front through
+Telemeter.declare_trace_fields() or taken from the first value a unit
+records for it.  Each unit buffers its rows in one preallocated slot list
+per column (None is null); the lists grow geometrically and are reused
+after every flush, so recording a row is one store per field, and each
+column is converted to a typed Arrow array only when it is written.
+Plain lists rather than NumPy arrays: a NumPy item store costs several
+times a list store, which is most of the per-row cost here.
+
+TraceSchema is shared by all units and becomes the schema of traces.parquet
+once the first row group is written; a column that first shows up after
+that raises, so units that trace late should declare their fields.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed once trace rows are written
+    pa = pq = None
+
+_KINDS: Dict[type, str] = {bool: "bool", int: "int", float: "float", str: "str"}
+
+_INITIAL_CAPACITY = 256
+
+
+def _infer_kind(value: Any) -> str:
+    """Column kind for a value seen before its column was declared."""
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, (int, np.integer)) and not isinstance(value, Enum):
+        return "int"
+    if isinstance(value, (float, np.floating)):
+        return "float"
+    return "str"
+
+
+def _as_str(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    return value.name if isinstance(value, Enum) else str(value)
+
+
+def _arrow_type(kind: str):
+    return {"bool": pa.bool_(), "int": pa.int64(), "float": pa.float64(), "str": pa.string()}[kind]
+
+
+class TraceSchema:
+    """Name -> kind of every trace column, in first-seen order."""
+
+    def __init__(self) -> None:
+        self.kinds: Dict[str, str] = {}
+        self.units: Dict[str, int] = {}   # unit -> rank by first trace row, orders rows within a cycle
+        self.locked: bool = False   # set once traces.parquet has been opened
+
+    def declare(self, name: str, type_: type) -> None:
+        kind = _KINDS.get(type_)
+        if kind is None:
+            raise TypeError(f"Trace field '{name}' has unsupported type {type_!r}; use bool, int, float or str")
+        self._add(name, kind)
+
+    def kind_for(self, name: str, value: Any) -> str:
+        """Kind of column `name`, adding it (typed from `value`) if it is new."""
+        kind = self.kinds.get(name)
+        if kind is None:
+            kind = _infer_kind(value)
+            self._add(name, kind)
+        return kind
+
+    def _add(self, name: str, kind: str) -> None:
+        existing = self.kinds.get(name)
+        if existing == kind:
+            return
+        if existing is not None:
+            raise ValueError(f"Trace field '{name}' is already a {existing} column, cannot redeclare it as {kind}")
+        if self.locked:
+            raise ValueError(
+                f"Trace field '{name}' first appeared after traces.parquet was opened; "
+                f"declare it with Telemeter.declare_trace_fields() before the first flush"
+            )
+        self.kinds[name] = kind
+
+    def arrow_schema(self):
+        return pa.schema(
+            [("cycle", pa.int64()), ("unit_name", pa.string())]
+            + [(name, _arrow_type(kind)) for name, kind in self.kinds.items()]
+        )
+
+
+class UnitTraceBuffer:
+    """Trace rows of one unit, one preallocated slot list per column."""
+
+    def __init__(self, unit_name: str, schema: TraceSchema) -> None:
+        self.unit_name = unit_name
+        self.schema = schema
+        self.rank = schema.units.setdefault(unit_name, len(schema.units))
+        self.capacity = _INITIAL_CAPACITY
+        self.rows = 0
+        self.cycles: List[int] = [0] * self.capacity
+        self.columns: Dict[str, List[Any]] = {}   # None slots are nulls
+
+    def append(self, cycle: int, fields: Dict[str, Any]) -> bool:
+        """
+        Store one row; returns False when it merged into the previous row.
+
+        A row for the same cycle as the unit's last one is merged into it:
+        later values overwrite earlier ones, fields it does not set are kept.
+        """
+        rows = self.rows
+        if rows and self.cycles[rows - 1] == cycle:
+            row = rows - 1
+        else:
+            if rows == self.capacity:
+                self._grow()
+            row = rows
+            self.cycles[row] = cycle
+            self.rows = rows + 1
+
+        columns = self.columns
+        for name, value in fields.items():
+            slots = columns.get(name)
+            if slots is None:
+                if value is None and name not in self.schema.kinds:
+                    continue  # typed by its first real value; until then the rows are null
+                self.schema.kind_for(name, value)
+                slots = columns[name] = [None] * self.capacity
+            slots[row] = value
+        return row == rows
+
+    def _grow(self) -> None:
+        extra = self.capacity
+        self.capacity += extra
+        self.cycles.extend([0] * extra)
+        for slots in self.columns.values():
+            slots.extend([None] * extra)
+
+    def to_arrow(self, schema) -> "pa.Table":
+        """The buffered rows as a table with every column of `schema` (missing ones null)."""
+        rows = self.rows
+        arrays = [
+            pa.array(self.cycles[:rows], type=pa.int64()),
+            pa.repeat(pa.scalar(self.unit_name, pa.string()), rows),
+        ]
+        for field in list(schema)[2:]:
+            slots = self.columns.get(field.name)
+            if slots is None:
+                arrays.append(pa.nulls(rows, type=field.type))
+                continue
+            values = slots[:rows]
+            if field.type == pa.string():
+                values = [_as_str(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def clear(self) -> None:
+        rows = self.rows
+        for slots in self.columns.values():
+            slots[:rows] = [None] * rows
+        self.rows = 0
+
+
+class TraceWriter:
+    """Streams trace row groups into one Parquet file, in the caller's thread."""
+
+    def __init__(self, path, schema: TraceSchema) -> None:
+        if pq is None:
+            raise ImportError("Cycle-level traces are written with pyarrow; install it with `pip install pyarrow`")
+        self.path = path
+        schema.locked = True
+        self.schema = schema.arrow_schema()
+        self._writer = pq.ParquetWriter(str(path), self.schema, compression="zstd")
+
+    def write(self, buffers: List[UnitTraceBuffer]) -> None:
+        """Write every non-empty buffer as one row group, in cycle order."""
+        buffers = sorted((buffer for buffer in buffers if buffer.rows), key=lambda buffer: buffer.rank)
+        tables = [buffer.to_arrow(self.schema) for buffer in buffers]
+        if not tables:
+            return
+        table = pa.concat_tables(tables).sort_by("cycle")
+        self._writer.write_table(table, row_group_size=table.num_rows)
+
+    def submit(self, buffers: Dict[str, UnitTraceBuffer]) -> Dict[str, UnitTraceBuffer]:
+        """Write a set of unit buffers; returns the set to fill next (the same one, emptied)."""
+        self.write(list(buffers.values()))
+        for buffer in buffers.values():
+            buffer.clear()
+        return buffers
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class BackgroundTraceWriter(TraceWriter):
+    """
+    A TraceWriter whose row groups are converted, compressed and written on
+    a background thread.
+
+    The simulation hands over a full set of unit buffers and carries on
+    filling an empty one.  `depth` sets may be queued or being written at
+    once; submitting another blocks until the thread hands one back, which
+    bounds the memory held to depth + 1 sets (depth 1 is double buffering).
+    An error on the thread is raised from the next submit() or close().
+    """
+
+    def __init__(self, path, schema: TraceSchema, depth: int = 1) -> None:
+        # opened here so the schema is locked before the thread sees a row
+        super().__init__(path, schema)
+        self._pending: "queue.Queue[Optional[Dict[str, UnitTraceBuffer]]]" = queue.Queue()
+        self._free: "queue.Queue[Dict[str, UnitTraceBuffer]]" = queue.Queue()
+        for _ in range(depth):
+            self._free.put({})
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, buffers: Dict[str, UnitTraceBuffer]) -> Dict[str, UnitTraceBuffer]:
+        self._raise_error()
+        self._pending.put(buffers)
+        spare = self._free.get()   # back-pressure: waits while `depth` sets are in flight
+        self._raise_error()
+        return spare
+
+    def close(self) -> None:
+        """Write everything submitted so far, stop the thread and close the file."""
+        self._pending.put(None)
+        self._thread.join()
+        super().close()
+        self._raise_error()
+
+    def _run(self) -> None:
+        while True:
+            buffers = self._pending.get()
+            if buffers is None:
+                return
+            try:
+                if self._error is None:
+                    self.write(list(buffers.values()))
+            except BaseException as e:  # handed to the simulation thread
+                self._error = e
+            finally:
+                # always hand the set back so the simulation never waits on a dead writer
+                for buffer in buffers.values():
+                    buffer.clear()
+                self._free.put(buffers)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Trace writer thread failed: {self._error}") from self._error
@@ -79,6 +79,25 @@ class WritebackPerfCount(PerfCounterBase):
         # Track writeback cycles
         if writeback_this_cycle:
             self.writeback_cycles += 1
+
+    def _record_unit_cycles(
+        self,
+        cycles: int,
+        *,
+        buffer_occupancy: int = 0,
+        buffer_capacity: int = 1,
+        stored_this_cycle: bool = False,
+        writeback_this_cycle: bool = False,
+        **kwargs
+    ) -> None:
+        """Bulk form of _record_unit_cycle for `cycles` identical cycles."""
+        self.occupancy_history.extend([buffer_occupancy] * cycles)
+        if buffer_occupancy >= buffer_capacity:
+            self.full_cycles += cycles
+        if stored_this_cycle:
+            self.store_cycles += cycles
+        if writeback_this_cycle:
+            self.writeback_cycles += cycles
     
     def record_instruction_latency(self, entry_cycle: int, exit_cycle: int) -> None:
         """Record latency for an instruction that exited the buffer.
@@ -0,0 +1,193 @@
+"""
+Per-unit leveled tracing for the simulator.
+
+Each unit gets a channel once, at import time:
+
+    _trace = get_channel("dcache")
+
+and guards every message with the level it belongs to:
+
+    if _trace.debug:
+        _trace.debug(f"Bank {bank_id}: Flushing address 0x{addr:X}")
+
+A channel's level attributes (error, warning, info, debug) hold the emit
+function while that level is enabled and None while it is not, so a disabled
+message costs one attribute check and its f-string is never built.
+
+Levels and the output file come from the [trace] section of config.toml and
+are applied by configure(); channels created before or after that call pick
+the settings up. Underneath, channel "x" is the stdlib logger "cardinal.x".
+
+A harness running several simulations wraps each in run_log(), which sends
+every channel to that run's own log file for its duration, whatever output
+the simulator configures in between.
+"""
+from __future__ import annotations
+import logging
+import sys
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Union
+
+ROOT_LOGGER = "cardinal"
+
+LEVELS: Dict[str, int] = {
+    "off": logging.CRITICAL + 10,
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "debug": logging.DEBUG,
+}
+
+_FORMAT = "%(levelname)-7s %(unit)-10s %(message)s"
+
+
+class TraceChannel:
+    """One unit's trace output; see the module docstring for the call-site idiom."""
+    __slots__ = ("unit", "logger", "error", "warning", "info", "debug")
+
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{unit}")
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read the enabled levels after the configuration changed."""
+        extra = {"unit": self.unit}
+        for name in ("error", "warning", "info", "debug"):
+            level = LEVELS[name]
+            enabled = self.logger.isEnabledFor(level)
+            setattr(self, name, partial(self.logger.log, level, extra=extra) if enabled else None)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    # looks sys.stdout up per record, so output redirected after configure() still lands there
+    def emit(self, record: logging.LogRecord) -> None:
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+_channels: Dict[str, TraceChannel] = {}
+_unit_levels: Dict[str, str] = {}
+_handler: Optional[logging.Handler] = None
+# set by run_log(): these replace _handler until the run ends
+_run_handlers: List[logging.Handler] = []
+
+
+def get_channel(unit: str) -> TraceChannel:
+    """The channel for a unit, created on first use."""
+    channel = _channels.get(unit)
+    if channel is None:
+        channel = _channels[unit] = TraceChannel(unit)
+    return channel
+
+
+def _active_handlers() -> List[logging.Handler]:
+    if _run_handlers:
+        return list(_run_handlers)
+    return [_handler] if _handler is not None else []
+
+
+def _set_handler(handler: logging.Handler) -> None:
+    global _handler
+    root = logging.getLogger(ROOT_LOGGER)
+    if _handler is not None:
+        root.removeHandler(_handler)
+        _handler.close()
+    handler.setFormatter(logging.Formatter(_FORMAT))
+    root.addHandler(handler)
+    _handler = handler
+
+
+def configure(
+    default_level: str = "warning",
+    units: Optional[Mapping[str, str]] = None,
+    output_file: Optional[str] = None,
+) -> None:
+    """Apply trace levels and pick the output.
+
+    Args:
+        default_level: Level for units without an entry in units ("off", "error", "warning", "info" or "debug")
+        units: Per-unit level overrides, keyed by channel name
+        output_file: File to write the trace to (truncated); stdout when empty or None.
+            Ignored inside run_log().
+    """
+    units = dict(units or {})
+    for level in (default_level, *units.values()):
+        if level not in LEVELS:
+            raise ValueError(f"[trace] unknown level '{level}', expected one of {list(LEVELS)}")
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LEVELS[default_level])
+    # the trace has its own output; don't repeat it through the root logger
+    root.propagate = False
+
+    for unit in set(_unit_levels) - set(units):
+        logging.getLogger(f"{ROOT_LOGGER}.{unit}").setLevel(logging.NOTSET)
+    for unit, level in units.items():
+        logging.getLogger(f"{ROOT_LOGGER}.{unit}").setLevel(LEVELS[level])
+    _unit_levels.clear()
+    _unit_levels.update(units)
+
+    # inside run_log() the run's log keeps the output; don't create (and truncate) another file
+    if not _run_handlers:
+        if output_file:
+            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            _set_handler(logging.FileHandler(output_file, mode="w", encoding="utf-8"))
+        else:
+            _set_handler(_StdoutHandler())
+
+    for channel in _channels.values():
+        channel.refresh()
+
+
+def configure_from_settings(trace_config) -> None:
+    """configure() from the [trace] section of the settings."""
+    configure(
+        default_level=trace_config.default_level,
+        units=trace_config.units,
+        output_file=trace_config.output_file,
+    )
+
+
+@contextmanager
+def run_log(path: Union[str, Path], echo: bool = False) -> Iterator[None]:
+    """Send all trace output to path (truncated) until the block exits.
+
+    Args:
+        path: The run's log file
+        echo: Also write the output to stdout
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handlers: List[logging.Handler] = [logging.FileHandler(path, mode="w", encoding="utf-8")]
+    if echo:
+        handlers.append(_StdoutHandler())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    outer = list(_run_handlers)
+    for handler in _active_handlers():
+        root.removeHandler(handler)
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(_FORMAT))
+        root.addHandler(handler)
+    _run_handlers[:] = handlers
+    try:
+        yield
+    finally:
+        for handler in handlers:
+            root.removeHandler(handler)
+            handler.close()
+        _run_handlers[:] = outer
+        for handler in _active_handlers():
+            root.addHandler(handler)
+
+
+def flush() -> None:
+    for handler in _active_handlers():
+        handler.flush()
+
+
+# until configure() runs: warnings and errors, to stdout
+configure()
@@ -1,7 +1,7 @@
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import List
-from bitstring import Bits
+from simulator.word import FULL_MASK
 
 class WarpState(Enum):
     READY = "ready"
@@ -23,8 +23,8 @@ class WarpGroup:
     group_id: int
     halt: int = 1
     last_issue_even: bool = False
-    issue: bool = False 
 
-    halt_mask_even: Bits = field(default_factory=lambda: Bits(uint=(1 << 32) - 1, length=32))
-    halt_mask_odd: Bits = field(default_factory=lambda: Bits(uint=(1 << 32) - 1, length=32))
+    # lane i <-> bit i
+    halt_mask_even: int = FULL_MASK
+    halt_mask_odd: int = FULL_MASK
   
\ No newline at end of file
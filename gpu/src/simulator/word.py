@@ -0,0 +1,61 @@
+"""Word-level value helpers shared by the SM datapath.
+
+Scalars (pc, register indices, immediates, csr values, warp masks) are plain
+Python ints.  Per-thread warp data (``rdat1``/``rdat2``/``wdat``) is a 32-lane
+``numpy.uint32`` vector; float and signed views are taken with
+``.view(np.float32)`` / ``.view(np.int32)`` so no per-lane objects are built.
+Lane masks are ints with lane ``i`` in bit ``i``.
+
+``bitstring.Bits`` is only used at debug/print boundaries through ``to_bits``.
+"""
+import numpy as np
+from bitstring import Bits
+
+WARP_SIZE = 32
+WORD_MASK = 0xFFFFFFFF
+FULL_MASK = (1 << WARP_SIZE) - 1
+
+
+def sign_extend(value: int, width: int) -> int:
+    """Interpret the low ``width`` bits of ``value`` as a two's complement int."""
+    value &= (1 << width) - 1
+    sign = 1 << (width - 1)
+    return (value ^ sign) - sign
+
+
+def warp_zeros() -> np.ndarray:
+    """A fresh all-zero 32-lane word vector."""
+    return np.zeros(WARP_SIZE, dtype=np.uint32)
+
+
+def warp_fill(value: int) -> np.ndarray:
+    """A fresh 32-lane word vector with every lane set to ``value``."""
+    return np.full(WARP_SIZE, value & WORD_MASK, dtype=np.uint32)
+
+
+def f32_bits(value: float) -> int:
+    """IEEE-754 single precision bit pattern of ``value`` (inf on overflow)."""
+    with np.errstate(over="ignore"):
+        return int(np.array(value, dtype=np.float32).view(np.uint32))
+
+
+def bits_f32(word: int) -> float:
+    """Float value of a 32-bit IEEE-754 bit pattern."""
+    return float(np.array(word & WORD_MASK, dtype=np.uint32).view(np.float32))
+
+
+def mask_to_lanes(mask: int) -> np.ndarray:
+    """Expand a 32-bit lane mask into a bool vector (lane ``i`` = bit ``i``)."""
+    packed = np.array([mask & FULL_MASK], dtype="<u4").view(np.uint8)
+    return np.unpackbits(packed, bitorder="little").astype(bool)
+
+
+def lanes_to_mask(lanes) -> int:
+    """Pack a 32-entry bool vector back into a lane mask."""
+    packed = np.packbits(np.asarray(lanes, dtype=bool), bitorder="little")
+    return int(packed.view("<u4")[0])
+
+
+def to_bits(value: int, length: int = 32) -> Bits:
+    """Debug helper: render an int word as ``Bits`` for printing."""
+    return Bits(uint=value & ((1 << length) - 1), length=length)
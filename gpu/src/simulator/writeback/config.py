@@ -10,7 +10,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, Union, Optional, Tuple, List
-from bitstring import Bits
 
 # Enums for Writeback Buffer Configuration
 class WritebackBufferCount(Enum):
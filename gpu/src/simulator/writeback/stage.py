@@ -4,7 +4,6 @@ from dataclasses import dataclass
 from typing import Dict
 
 from aenum import Enum
-from bitstring import Bits
 from common.custom_enums_multi import H_Op, I_Op, B_Op, P_Op, S_Op
 from simulator.issue.regfile import RegisterFile
 from simulator.decode.predicate_reg_file import PredicateRegFile
@@ -12,6 +11,8 @@ from simulator.instruction import Instruction
 from simulator.stage import Stage
 from simulator.interfaces import LatchIF, ForwardingIF
 from simulator.writeback.writeback_buffer import WritebackBuffer
+from simulator.word import FULL_MASK
+from simulator.utils.trace import get_channel
 from simulator.writeback.config import (
     WritebackBufferCount,
     WritebackBufferSize,
@@ -24,6 +25,8 @@ from simulator.writeback.config import (
 )
 from typing import Union, Optional, Tuple, List
 
+_trace = get_channel("writeback")
+
 class WritebackStage(Stage):
     def __init__(self, 
         wb_config: WritebackBufferConfig, 
@@ -68,13 +71,22 @@ class WritebackStage(Stage):
     def tick(self) -> None:
         self._write_to_reg_file()
         self._update_halt_mask_and_decrement_counter()
+        self._release_retired()
         self.values_to_writeback = self.wb_buffer.tick()
         if self.values_to_writeback is not None and len(self.values_to_writeback) != self.total_banks:
-            # print(f"Error: Expected {self.total_banks} banks, but got {len(self.values_to_writeback)}")
-            print(f"Num total banks (reg + pred): {self.total_banks}")
-            print(f"Dict length: {len(self.values_to_writeback)}")
-            raise ValueError("Number of banks in values_to_writeback does not match total_banks.")
+            raise ValueError(
+                f"Number of banks in values_to_writeback does not match total_banks: "
+                f"expected {self.total_banks} (reg + pred), got {len(self.values_to_writeback)}."
+            )
         
+    def cycles_until_active(self) -> Optional[int]:
+        if any(instr is not None for instr in self.values_to_writeback.values()):
+            return 0
+        return None if self.wb_buffer.is_idle() else 0
+
+    def skip_cycles(self, cycles: int) -> None:
+        self.wb_buffer.skip_cycles(cycles)
+
     def get_data(self):
         raise NotImplementedError()
     
@@ -87,13 +99,13 @@ class WritebackStage(Stage):
         for bank_name, instr in self.values_to_writeback.items():
             if instr is None:
                 continue
-            print(instr.pc)
+            if _trace.debug:
+                _trace.debug(f"Retiring pc: {instr.pc:#x} warp: {instr.warp_id}")
             if instr.opcode == H_Op.HALT:
-                print("HALT OPCODE")
                 #check if the instruction is predicated, if it is then we only want to update the halt mask for the threads that are active based on the predicate bits, if it is not predicated then we want to update the halt mask for all threads in the warp
-                pred_bits = Bits(bin=''.join(p.bin for p in instr.predicate))
-                new_mask = instr.active_mask & ~pred_bits
-                print(new_mask)
+                new_mask = instr.active_mask & ~instr.predicate & FULL_MASK
+                if _trace.debug:
+                    _trace.debug(f"HALT warp: {instr.warp_id} new mask: {new_mask:#010x}")
             else:
                 new_mask = None
             
@@ -105,6 +117,14 @@ class WritebackStage(Stage):
         else:
             raise ValueError("Forward IF to Scheduler is not set up in WritebackStage.")
         
+    def _release_retired(self):
+        # this cycle's instructions are done; hand their records back for reuse
+        released = []
+        for instr in (self.values_to_writeback or {}).values():
+            if instr is not None and not any(instr is r for r in released):
+                released.append(instr)
+                Instruction.release(instr)
+
     def _write_to_reg_file(self):
         if self.values_to_writeback is None:
             return
@@ -114,58 +134,59 @@ class WritebackStage(Stage):
             if instr.opcode == H_Op.HALT:
                 continue
             
-            for i in range(32):
-                if instr.predicate[i].bin == "0" and instr.opcode != B_Op.BEQ and instr.opcode != B_Op.BNE:
-                    continue
-                
-                if isinstance(instr.target_bank, int):
-                    if instr.target_regfile is not None and "pred" in instr.target_regfile:
-                        # write to predicate reg file
-                
-                        self.pred_reg_file.write_predicate_thread_gran(
-                            prf_wr_en=1,
-                            prf_wr_wsel=instr.warp_id,
-                            prf_wr_psel=instr.dest_pred,
-                            prf_wr_tsel=i,
-                            prf_wr_data=(instr.wdat_pred[i])
-                        )
-                        if instr.warp_id == 0 and i == 0:
-                            print(instr)
-                            print()
-                    elif instr.target_regfile is not None:
-                        # write to normal reg file
-                        self.reg_file.write_thread_gran(
-                            dest_operand=instr.rd,
-                            data=instr.wdat[i],
-                            thread_id=i,
-                            warp_id=instr.warp_id
-                        )
-                    else:
-                        raise ValueError("For BUFFER_PER_BANK scheme, target_bank must be an integer (or string) and target_regfile must be specified to determine the correct buffer.")
-                    
-                elif isinstance(instr.target_bank, str):
-                    if "pred" in instr.target_bank:
-                        # write to pred reg file
-                        self.pred_reg_file.write_predicate_thread_gran(
-                            prf_wr_en=1,
-                            prf_wr_wsel=instr.warp_id,
-                            prf_wr_psel=instr.pred_dest,
-                            prf_wr_tsel=i,
-                            prf_wr_data=(instr.wdat_pred[i])
-                        )
-                    else:
-                        # write to normal reg file
-                        self.reg_file.write_thread_gran(
-                            dest_operand=instr.rd,
-                            data=instr.wdat[i],
-                            thread_id=i,
-                            warp_id=instr.warp_id
-                        )
-                        if instr.warp_id == 0 and i == 0:
-                            print(instr)
-                            print()
+            # BEQ/BNE write their whole result predicate; everything else only its active lanes
+            if instr.opcode == B_Op.BEQ or instr.opcode == B_Op.BNE:
+                lane_mask = FULL_MASK
+            else:
+                lane_mask = instr.predicate
+            if not lane_mask:
+                continue
+
+            if isinstance(instr.target_bank, int):
+                if instr.target_regfile is not None and "pred" in instr.target_regfile:
+                    # write to predicate reg file
+                    self.pred_reg_file.write_predicate_masked(
+                        prf_wr_en=1,
+                        prf_wr_wsel=instr.warp_id,
+                        prf_wr_psel=instr.dest_pred,
+                        prf_wr_data=instr.wdat_pred,
+                        lane_mask=lane_mask
+                    )
+                    if instr.warp_id == 0 and lane_mask & 1 and _trace.debug:
+                        _trace.debug(f"{instr}\n")
+                elif instr.target_regfile is not None:
+                    # write to normal reg file
+                    self.reg_file.write_warp_gran(
+                        warp_id=instr.warp_id,
+                        dest_operand=instr.rd,
+                        data=instr.wdat,
+                        mask=lane_mask
+                    )
                 else:
-                    raise ValueError("For BUFFER_PER_BANK scheme, target_bank must be an integer (or string) and target_regfile must be specified to determine the correct buffer.")              
+                    raise ValueError("For BUFFER_PER_BANK scheme, target_bank must be an integer (or string) and target_regfile must be specified to determine the correct buffer.")
+
+            elif isinstance(instr.target_bank, str):
+                if "pred" in instr.target_bank:
+                    # write to pred reg file
+                    self.pred_reg_file.write_predicate_masked(
+                        prf_wr_en=1,
+                        prf_wr_wsel=instr.warp_id,
+                        prf_wr_psel=instr.pred_dest,
+                        prf_wr_data=instr.wdat_pred,
+                        lane_mask=lane_mask
+                    )
+                else:
+                    # write to normal reg file
+                    self.reg_file.write_warp_gran(
+                        warp_id=instr.warp_id,
+                        dest_operand=instr.rd,
+                        data=instr.wdat,
+                        mask=lane_mask
+                    )
+                    if instr.warp_id == 0 and lane_mask & 1 and _trace.debug:
+                        _trace.debug(f"{instr}\n")
+            else:
+                raise ValueError("For BUFFER_PER_BANK scheme, target_bank must be an integer (or string) and target_regfile must be specified to determine the correct buffer.")
 
     def finalize_perf_counts(self, directory: str = ".") -> dict:
         """Finalize and export all performance counters for writeback buffers.
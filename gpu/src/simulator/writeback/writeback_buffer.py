@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-from bitstring import Bits
 from simulator.utils.data_structures.circular_buffer import CircularBuffer
-from simulator.utils.data_structures.compact_queue import CompactQueue
+from simulator.utils.data_structures.pipeline_queue import PipelineQueue
 from simulator.utils.data_structures.stack import Stack
 from typing import Any, Dict, Optional, Union, List
 from common.custom_enums_multi import H_Op, I_Op, B_Op, P_Op, S_Op
@@ -52,9 +51,9 @@ class WritebackBuffer:
             
         elif buffer_config.structure == WritebackBufferStructure.QUEUE:
             if buffer_config.size_scheme == WritebackBufferSize.FIXED:
-                self.buffers = {name: CompactQueue(length=buffer_config.size, type_=Instruction) for name in buffer_names}
+                self.buffers = {name: PipelineQueue(length=buffer_config.size, type_=Instruction) for name in buffer_names}
             elif buffer_config.size_scheme == WritebackBufferSize.VARIABLE:
-                self.buffers = {name: CompactQueue(length=buffer_config.size[name], type_=Instruction) for name in buffer_names}
+                self.buffers = {name: PipelineQueue(length=buffer_config.size[name], type_=Instruction) for name in buffer_names}
             else:
                 raise ValueError("Invalid WritebackBufferSize configuration for QUEUE")
         
@@ -158,8 +157,8 @@ class WritebackBuffer:
         for buffer in self.buffers.values():
             # Clear based on buffer type
             if hasattr(buffer, 'queue'):
-                # CompactQueue
-                buffer.queue = [None for _ in range(buffer.length)]
+                # PipelineQueue
+                buffer.clear()
             elif hasattr(buffer, 'items'):
                 # Stack
                 buffer.items = []
@@ -211,14 +210,7 @@ class WritebackBuffer:
             store_this_cycle = False
             
             buffer_occupancy = len(buffer)
-            
-            # Get buffer capacity based on buffer type
-            if hasattr(buffer, 'capacity'):
-                buffer_capacity = buffer.capacity + 1  # +1 because capacity is stored as (size - 1)
-            elif hasattr(buffer, 'length'):
-                buffer_capacity = buffer.length
-            else:
-                buffer_capacity = len(buffer) + 1
+            buffer_capacity = self._buffer_capacity(buffer)
 
             # Check if this buffer was selected for writeback this cycle
             for bank_name, source_buffer_name in writeback_sources.items():
@@ -239,7 +231,7 @@ class WritebackBuffer:
             # Get instructions in buffer for age tracking
             instructions_in_buffer = []
             if hasattr(buffer, 'queue'):
-                instructions_in_buffer = [instr for instr in buffer.queue if instr is not None]
+                instructions_in_buffer = list(buffer)
             elif hasattr(buffer, 'items'):
                 instructions_in_buffer = [instr for instr in buffer.items if instr is not None]
             elif hasattr(buffer, 'buffer'):
@@ -256,6 +248,36 @@ class WritebackBuffer:
                 instructions_in_buffer=instructions_in_buffer
             )
                             
+    @staticmethod
+    def _buffer_capacity(buffer) -> int:
+        # Get buffer capacity based on buffer type
+        if hasattr(buffer, 'capacity'):
+            return buffer.capacity + 1  # +1 because capacity is stored as (size - 1)
+        elif hasattr(buffer, 'length'):
+            return buffer.length
+        else:
+            return len(buffer) + 1
+
+    def is_idle(self) -> bool:
+        """True when every buffer is empty and no FSU latch holds an instruction."""
+        return all(len(buffer) == 0 for buffer in self.buffers.values()) and \
+            all(latch.snoop() is None for latch in self.behind_latches.values())
+
+    def skip_cycles(self, cycles: int) -> None:
+        """Account for `cycles` idle ticks (see is_idle) without running them."""
+        for buffer_name, buffer in self.buffers.items():
+            self.perf_counts[buffer_name].record_cycles(
+                cycles,
+                is_stalled=False,
+                is_busy=False,
+                buffer_occupancy=0,
+                buffer_capacity=self._buffer_capacity(buffer),
+                stored_this_cycle=False,
+                writeback_this_cycle=False,
+                instructions_in_buffer=[]
+            )
+        self.cycle += cycles
+
     def _get_values_from_buffers(self, buffers_to_writeback: Dict[str, Any]) -> tuple[Dict, Dict]:
         """Get values from buffers and track which buffers they came from.
         
@@ -280,9 +302,6 @@ class WritebackBuffer:
                         if buf_obj is buffer:
                             writeback_sources[bank] = buffer_name
                             break
-                    
-                    for i in range(32):
-                        values[bank].wdat[i] = None if values[bank].predicate[i].bin == "0" else values[bank].wdat[i]
 
         return values, writeback_sources
 
@@ -14,7 +14,8 @@ Arguments:
                           - bin: Use pre-compiled .bin files
                           
   --truth {emu|exp}       Ground truth source to compare against
-                          - emu: Run emulator as golden model
+                          - emu: Run emulator as golden model (or the in-process
+                            functional SM, see test_parameters.golden_model)
                           - exp: Compare against pre-generated expected files
                           
   pattern                 Optional search pattern for test files
@@ -25,6 +26,10 @@ Arguments:
   --debug-dual-output     Write debug output to both terminal and file
                           (use with --debug-file)
 
+  --sample                Estimate performance from SimPoint-style samples
+                          instead of simulating the whole kernel (see the
+                          [sampling] section of config.toml)
+
 Examples:
   # Test assembly files against emulator output (compile & compare)
   python3 test_cardinal.py --src assembly --truth emu
@@ -50,6 +55,9 @@ Examples:
   # Test with debug output to both terminal and file
   python3 test_cardinal.py --src bin --truth exp --debug-file test_debug.log --debug-dual-output
 
+  # Estimate cycles, IPC and miss rates from a sampled simulation
+  python3 test_cardinal.py --src bin --truth exp program/vertex.bin --sample
+
 Debugging:
   If a test fails, check the 'test_diffs/' directory for detailed
   logs, expected vs. actual hex dumps, and diff results.
@@ -65,15 +73,17 @@ Debugging:
 
 import argparse
 import csv
+import json
+import multiprocessing
 import os
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
-import io
 import toml
-from contextlib import redirect_stdout, redirect_stderr
+from contextlib import nullcontext
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -82,12 +92,22 @@ from config import get_settings, ProgramConfig
 
 # Import SM class from simulator
 from simulator.sm import SM
+from simulator.gpu import GPU
+from simulator.parallel_gpu import ParallelGPU
+from simulator.functional import FunctionalSM
+from simulator.sampling import SampledSimulation
+from simulator.utils import trace
 
 import builtins
 
 # This turns off ALL print statements in the whole codebase
 # builtins.print = lambda *args, **kwargs: None
 
+_trace = trace.get_channel("runner")
+
+# Channels raised to info in each run's log, so it records what the run reported
+_RUN_LOG_UNITS = ("runner", "sm", "gpu", "dcache")
+
 # Colors for terminal output
 class Colors:
     RED = '\033[0;31m'
@@ -138,82 +158,6 @@ class DebugLogger:
         self.close()
 
 
-class SimulatorOutputCapture:
-    """Captures simulator stdout/stderr with optional dual output to terminal and file."""
-    
-    def __init__(self, output_file: Optional[Path] = None, dual_output: bool = False):
-        """Initialize simulator output capture.
-        
-        Args:
-            output_file: Optional file to write simulator output to
-            dual_output: If True, also print to terminal (in addition to file)
-        """
-        self.output_file = output_file
-        self.dual_output = dual_output
-        self.file_handle = None
-        self.original_stdout = None
-        self.original_stderr = None
-        
-        if self.output_file:
-            self.output_file.parent.mkdir(parents=True, exist_ok=True)
-            self.file_handle = open(self.output_file, 'w')
-    
-    def start_capture(self):
-        """Start capturing stdout/stderr."""
-        self.original_stdout = sys.stdout
-        self.original_stderr = sys.stderr
-        
-        if self.dual_output and self.output_file:
-            # Create a tee-like wrapper that writes to both file and original stdout
-            sys.stdout = self._TeeOutput(self.file_handle, self.original_stdout)
-            sys.stderr = self._TeeOutput(self.file_handle, self.original_stderr)
-        elif self.output_file:
-            # File only
-            sys.stdout = self.file_handle
-            sys.stderr = self.file_handle
-        # else: no capture, keep original stdout/stderr
-    
-    def stop_capture(self):
-        """Stop capturing and restore original stdout/stderr."""
-        if self.original_stdout:
-            sys.stdout = self.original_stdout
-            self.original_stdout = None
-        if self.original_stderr:
-            sys.stderr = self.original_stderr
-            self.original_stderr = None
-        
-        if self.file_handle and not self.file_handle.closed:
-            self.file_handle.flush()
-    
-    def close(self):
-        """Close the output file."""
-        self.stop_capture()
-        if self.file_handle and not self.file_handle.closed:
-            self.file_handle.close()
-        self.file_handle = None
-    
-    def __del__(self):
-        """Cleanup on deletion."""
-        self.close()
-    
-    class _TeeOutput:
-        """Helper class that writes to both file and terminal."""
-        def __init__(self, file_handle, terminal):
-            self.file = file_handle
-            self.terminal = terminal
-        
-        def write(self, message):
-            self.file.write(message)
-            self.terminal.write(message)
-        
-        def flush(self):
-            self.file.flush()
-            self.terminal.flush()
-        
-        def isatty(self):
-            return self.terminal.isatty()
-
-
 @dataclass
 class TestResult:
     """Result of a test execution."""
@@ -224,6 +168,42 @@ class TestResult:
     error_log: Optional[str] = None
 
 
+# Columns of a sweep's summary.csv
+SWEEP_FIELDNAMES = [
+    "test_name",
+    "case_id",
+    "config_path",
+    "cycles",
+    "finished",
+    "passed",
+    "comparison_mode",
+    "comparison_checked",
+    "comparison_passed",
+    "output_dir",
+    "error",
+]
+
+# Per-case copy of the summary row; marks the case as done for --resume
+SWEEP_RESULT_FILE = "result.json"
+
+# Per-case log of everything the runner and the simulator report
+SWEEP_LOG_FILE = "sweep.log"
+
+# The runner each --jobs worker process uses, set by _init_sweep_worker
+_sweep_runner: Optional["GPUTestRunner"] = None
+
+
+def _init_sweep_worker(runner: "GPUTestRunner", emulator_lock) -> None:
+    global _sweep_runner
+    _sweep_runner = runner
+    _sweep_runner.emulator_lock = emulator_lock
+
+
+def _run_sweep_worker_case(test_file: Path, sim_input: Path, case: dict, run_dir: Path) -> dict:
+    """Run one sweep case in a worker."""
+    return _sweep_runner.run_sweep_case(test_file, sim_input, case, run_dir)
+
+
 class GPUTestRunner:
     """Main test runner class."""
     
@@ -244,6 +224,9 @@ class GPUTestRunner:
         sweep: bool = False,
         sweep_config: Optional[Path] = None,
         sweep_inputs: Optional[List[str]] = None,
+        jobs: int = 1,
+        resume: bool = False,
+        sample: bool = False,
     ):
         """Initialize the test runner."""
         if src is not None and src not in ("assembly", "bin"):
@@ -267,9 +250,14 @@ class GPUTestRunner:
         self.sweep = sweep
         self.sweep_config = sweep_config
         self.sweep_inputs = sweep_inputs or []
+        self.jobs = jobs
+        self.resume = resume
+        self.sample = sample
+        self.emulator_lock = nullcontext()
 
         self.last_sim_cycles = 0
         self.last_sim_finished = False
+        self.last_sim_error = ""
 
         if debug_file:
             debug_path = Path("results/debug") / debug_file
@@ -654,6 +642,9 @@ class GPUTestRunner:
         Returns:
             True if successful
         """
+        if self.settings.test_parameters.golden_model == "functional":
+            return self.run_functional_golden(input_file)
+
         temp_log = Path(self.settings.files.temp_cmd_log)
         
         # Resolve emulator script path
@@ -681,6 +672,32 @@ class GPUTestRunner:
         
         return returncode == 0
     
+    def run_functional_golden(self, input_file: str) -> bool:
+        """Run the in-process functional SM as the golden model.
+
+        The grid comes from the kernel header, as in the simulator, so the
+        threads/blocks passed to the emulator are not needed.
+
+        Args:
+            input_file: Input memory file
+
+        Returns:
+            True if the kernel ran to completion
+        """
+        memgolden = Path(self.settings.files.emu_output)
+        try:
+            golden = FunctionalSM(
+                test_file=Path(input_file),
+                test_file_type=self.settings.test_parameters.format,
+                config=self.settings,
+            )
+            golden.run()
+            golden.mem.dump(path=str(memgolden))
+        except Exception as e:
+            print(f"{Colors.RED}Functional golden model error:{Colors.NC} {e}")
+            return False
+        return golden.finished
+
     def _capture_stdout_to_file(self, test_name: str) -> Tuple[Path, any]:
         """Create a debug log file for test stdout capture.
         
@@ -705,94 +722,157 @@ class GPUTestRunner:
         config_path: Optional[Path] = None,
         output_dir: Optional[Path] = None,
     ) -> bool:
-        """Run the simulator using SM class."""
+        """Run the simulator using SM class, with everything it reports in its own log file."""
+        if test_name is None:
+            test_file_path = Path(input_file)
+            test_name = f"{test_file_path.stem}.{test_file_path.suffix.lstrip('.')}"
+
+        log_dir = output_dir if output_dir else Path("results/debug")
+        if self.enable_simulator_output and self.simulator_output_file:
+            output_file = log_dir / self.simulator_output_file
+        else:
+            output_file = log_dir / f"{test_name}_simulator.log"
+
+        with trace.run_log(output_file, echo=self.enable_simulator_output):
+            ok = self._simulate(input_file, test_name, config_path, output_dir)
+
+        if not ok:
+            print(f"{Colors.RED}Simulator error:{Colors.NC} {self.last_sim_error} (see {output_file})")
+        elif self.enable_simulator_output:
+            print(f"Simulator output written to {output_file}")
+        return ok
+
+    def _simulate(
+        self,
+        input_file: str,
+        test_name: str,
+        config_path: Optional[Path],
+        output_dir: Optional[Path],
+    ) -> bool:
+        """Build and run one simulation; reports go through the trace channels."""
+        self.last_sim_cycles = 0
+        self.last_sim_finished = False
+        self.last_sim_error = ""
         try:
-            if test_name is None:
-                test_file_path = Path(input_file)
-                test_name = f"{test_file_path.stem}.{test_file_path.suffix.lstrip('.')}"
+            import copy
+
+            if config_path is None:
+                settings = copy.deepcopy(self.settings)
+            else:
+                settings = copy.deepcopy(get_settings(config_path))
 
             if output_dir is not None:
                 output_dir.mkdir(parents=True, exist_ok=True)
-
-            if self.enable_simulator_output and self.simulator_output_file:
-                output_file = (output_dir / self.simulator_output_file) if output_dir else (Path("results/debug") / self.simulator_output_file)
+                settings.perf_counter.output_dir = str(output_dir / "perf_data")
             else:
-                log_dir = output_dir if output_dir else Path("results/debug")
-                log_dir.mkdir(parents=True, exist_ok=True)
-                output_file = log_dir / f"{test_name}_simulator.log"
-
-            output_capture = SimulatorOutputCapture(output_file, dual_output=self.enable_simulator_output)
-            output_capture.start_capture()
+                settings.perf_counter.output_dir = f"results/perf_data/{test_name}"
 
-            try:
-                import copy
+            settings.perf_counter.output_prefix = test_name
+            if self.sample:
+                settings.sampling.enabled = True
 
-                if config_path is None:
-                    settings = copy.deepcopy(self.settings)
-                else:
-                    settings = copy.deepcopy(get_settings(config_path))
+            # the run log carries the runner's and the simulator's reports, not only warnings
+            if trace.LEVELS[settings.trace.default_level] > trace.LEVELS["info"]:
+                for unit in _RUN_LOG_UNITS:
+                    settings.trace.units.setdefault(unit, "info")
+            trace.configure_from_settings(settings.trace)
 
-                if output_dir is not None:
-                    settings.perf_counter.output_dir = str(output_dir / "perf_data")
-                else:
-                    settings.perf_counter.output_dir = f"results/perf_data/{test_name}"
+            if output_dir is not None:
+                sim_output_path = output_dir / "memsim.hex"
+            else:
+                sim_output_path = Path(self.settings.files.sim_output)
 
-                settings.perf_counter.output_prefix = test_name
+            # sampled run: estimates instead of a full simulation, memory from the functional pass
+            if settings.sampling.enabled and settings.sm.num_sms == 1:
+                sampled = SampledSimulation(
+                    test_file=Path(input_file),
+                    test_file_type="bin",
+                    config=settings,
+                    max_cycles=self.max_cycles if self.enable_cycle_limit else None,
+                )
+                estimate = sampled.run()
+                sampled.write_summary(estimate)
+                if _trace.info:
+                    _trace.info(f"Sampled {estimate.simulated_intervals} of {estimate.intervals} intervals "
+                                f"({estimate.clusters} clusters, {estimate.simulated_instructions} of {estimate.instructions} instructions)")
+                    _trace.info(f"Estimated cycles: {estimate.cycles:.0f} +/- {estimate.cycles_error:.0f}, "
+                                f"IPC {estimate.ipc:.3f} +/- {estimate.ipc_error:.3f}")
+                    _trace.info(f"Estimated miss rates: dcache {estimate.dcache_miss_rate:.4f} +/- {estimate.dcache_miss_rate_error:.4f}, "
+                                f"icache {estimate.icache_miss_rate:.4f} +/- {estimate.icache_miss_rate_error:.4f}")
+
+                self.last_sim_cycles = round(estimate.cycles)
+                self.last_sim_finished = sampled.functional.finished
+                sampled.functional.mem.dump(path=str(sim_output_path))
+                return True
 
-                sm = SM(
+            # more than one SM: shared memory system and TBS behind the GPU top level
+            if settings.sm.num_sms > 1:
+                gpu_cls = ParallelGPU if settings.sm.parallel_sms else GPU
+                sim = gpu_cls(
                     test_file=Path(input_file),
                     test_file_type="bin",
                     config=settings,
                 )
+            else:
+                sim = SM(
+                    test_file=Path(input_file),
+                    test_file_type="bin",
+                    config=settings,
+                )
+                # skip the start of the kernel functionally, then simulate the rest
+                if settings.sm.fast_forward > 0:
+                    fast_forward = FunctionalSM(
+                        test_file=Path(input_file),
+                        test_file_type="bin",
+                        config=settings,
+                    )
+                    executed = fast_forward.run(max_instructions=settings.sm.fast_forward)
+                    fast_forward.hand_off(sim)
+                    if _trace.info:
+                        _trace.info(f"Fast-forwarded {executed} warp instructions before cycle-accurate simulation")
 
-                cycle = 0
+            try:
                 max_cycles = self.max_cycles if self.enable_cycle_limit else float('inf')
 
-                while cycle < max_cycles:
+                # sim.cycle rather than a local count: in event-driven mode one tick can cover several cycles
+                while sim.cycle < max_cycles:
                     # Check if scheduler indicates completion
-                    if sm.pipeline['tbs'].kern_finished:
+                    if sim.finished:
                         break
-                    
+
                     # Tick all pipeline stages
-                    sm.tick()
-                    cycle += 1
+                    sim.tick()
+
+                cycle = sim.cycle
 
                 if self.enable_cycle_limit and cycle >= self.max_cycles:
-                    print(f"Warning: Simulation hit max cycle limit of {self.max_cycles}")
+                    if _trace.warning:
+                        _trace.warning(f"Simulation hit max cycle limit of {self.max_cycles}")
 
-                sm.finalize()
+                sim.finalize()
 
                 # Dump the dcache 3C statistics if available
-                if "dcache" in sm.pipeline and hasattr(sm.pipeline["dcache"], "dump_stats"):
-                    sm.pipeline["dcache"].dump_stats()
+                if isinstance(sim, GPU):
+                    sim.dump_stats()
+                elif "dcache" in sim.pipeline and hasattr(sim.pipeline["dcache"], "dump_stats"):
+                    sim.pipeline["dcache"].dump_stats()
 
                 self.last_sim_cycles = cycle
-                self.last_sim_finished = sm.finished
-
-                if output_dir is not None:
-                    sim_output_path = output_dir / "memsim.hex"
-                else:
-                    sim_output_path = Path(self.settings.files.sim_output)
+                self.last_sim_finished = sim.finished
 
-                sm.pipeline["mem"].dump(path=str(sim_output_path))
-                return True
+                mem = sim.mem if isinstance(sim, GPU) else sim.pipeline["mem"]
+                mem.dump(path=str(sim_output_path))
             finally:
-                output_capture.stop_capture()
-                output_capture.close()
-                if self.enable_simulator_output:
-                    print(f"Simulator output written to {output_file}")
+                if isinstance(sim, ParallelGPU):
+                    sim.close()
+            return True
 
         except Exception as e:
             self.last_sim_cycles = 0
             self.last_sim_finished = False
-
-            if 'output_capture' in locals():
-                output_capture.stop_capture()
-                output_capture.close()
-
-            print(f"{Colors.RED}Simulator error:{Colors.NC} {e}")
-            import traceback
-            traceback.print_exc()
+            self.last_sim_error = str(e)
+            if _trace.error:
+                _trace.error(f"Simulator error: {e}", exc_info=True)
             return False
 
     def filter_hex_by_address_range(self, hex_file: Path, start_addr: int, end_addr: int, output_file: Path) -> None:
@@ -856,7 +936,8 @@ class GPUTestRunner:
             output_file.write_text(''.join(line + "\n" for _, line in filtered_lines))
             
         except Exception as e:
-            print(f"Error filtering hex file {hex_file}: {e}")
+            if _trace.error:
+                _trace.error(f"Error filtering hex file {hex_file}: {e}")
             # Write empty file on error
             output_file.write_text("")
     
@@ -945,21 +1026,22 @@ class GPUTestRunner:
         test_id = f"{test_file.stem}_t{threads}_b{blocks}"
 
         if self.truth == "emu":
-            if self.src == "bin":
+            if self.src in ("bin", "assembly"):
+                # sim_input rather than the shared meminit files, which the next test overwrites
                 emu_input = run_dir / f"{test_file.stem}_meminit.hex"
-                self.convert_bin_to_hex(test_file, emu_input)
-            elif self.src == "assembly":
-                emu_input = Path(self.settings.files.meminit)
+                self.convert_bin_to_hex(sim_input, emu_input)
             else:
                 return True, False, f"Unsupported src '{self.src}' for emulator comparison"
 
-            if not self.run_emulator(str(emu_input), threads, blocks):
-                return True, False, "Emulator run failed"
+            # the emulator works in fixed files; parallel sweep workers take turns
+            with self.emulator_lock:
+                if not self.run_emulator(str(emu_input), threads, blocks):
+                    return True, False, "Emulator run failed"
 
-            emu_output = Path(self.settings.files.emu_output)
-            run_emu_output = run_dir / "emugolden.hex"
-            if emu_output.exists():
-                run_emu_output.write_text(emu_output.read_text())
+                emu_output = Path(self.settings.files.emu_output)
+                run_emu_output = run_dir / "emugolden.hex"
+                if emu_output.exists():
+                    run_emu_output.write_text(emu_output.read_text())
 
             error_log = run_dir / f"{test_id}_error.log"
             matched = self.compare_outputs(run_emu_output, sim_output, error_log)
@@ -1438,6 +1520,46 @@ class GPUTestRunner:
 
         return False, None, f"Unsupported src '{self.src}' for sweep mode"
 
+    def run_sweep_case(self, test_file: Path, sim_input: Path, case: dict, run_dir: Path) -> dict:
+        """Run one (test, case) pair of a sweep and return its summary row."""
+        case_id = case["id"]
+        case_config = case["config_path"]
+        run_name = f"{test_file.stem}_{case_id}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+        (run_dir / "config.toml").write_text(case_config.read_text())
+
+        # one log per case, so parallel workers never share an output
+        with trace.run_log(run_dir / SWEEP_LOG_FILE, echo=self.enable_simulator_output):
+            ok = self._simulate(str(sim_input), run_name, case_config, run_dir)
+            compare_checked, compare_passed, compare_message = self.compare_sweep_outputs(
+                test_file=test_file,
+                sim_input=sim_input,
+                run_dir=run_dir,
+            )
+
+        passed = ok and self.last_sim_finished
+        if self.truth is not None:
+            passed = passed and bool(compare_checked) and bool(compare_passed)
+
+        row = {
+            "test_name": test_file.name,
+            "case_id": case_id,
+            "config_path": str(case_config),
+            "cycles": self.last_sim_cycles,
+            "finished": self.last_sim_finished,
+            "passed": passed,
+            "comparison_mode": self.truth or "",
+            "comparison_checked": compare_checked,
+            "comparison_passed": "" if compare_passed is None else compare_passed,
+            "output_dir": str(run_dir),
+            "error": (
+                f"Simulator run failed: {self.last_sim_error}"
+                if not ok else
+                compare_message
+            ),
+        }
+        return row
+
     def run_sweep(self) -> int:
         """Run simulator sweeps over one or more inputs and case configs."""
         output_root, cases = self.load_sweep_cases()
@@ -1452,23 +1574,41 @@ class GPUTestRunner:
         if not test_files:
             return 1
 
-        summary_rows = []
-
         print("=" * 40)
         print("      Starting GPU Sweep")
         print(f"      Source:      {self.src}")
         print(f"      Root:        {self.test_root}")
         print(f"      Inputs:      {patterns}")
         print(f"      Cases:       {len(cases)}")
+        print(f"      Jobs:        {self.jobs}")
         print(f"      Output Root: {output_root}")
         print("=" * 40)
 
+        # (test_file, sim_input, case, run_dir) for every case still to run
+        pending = []
+        # failed prepares, written to summary.csv before any case runs
+        prepare_rows = []
         for test_file in test_files:
+            runs = [(case, output_root / test_file.stem / case["id"]) for case in cases]
+            if self.resume:
+                done = [(case, run_dir) for case, run_dir in runs if (run_dir / SWEEP_RESULT_FILE).exists()]
+                for case, run_dir in done:
+                    with open(run_dir / SWEEP_RESULT_FILE) as f:
+                        row = json.load(f)
+                    print(f"{Colors.YELLOW}[DONE]{Colors.NC}     {test_file.name} :: {case['id']} ({row['cycles']} cycles)")
+                    if row["passed"]:
+                        self.pass_count += 1
+                    else:
+                        self.fail_count += 1
+                runs = [(case, run_dir) for case, run_dir in runs if (case, run_dir) not in done]
+                if not runs:
+                    continue
+
             prep_ok, sim_input, prep_error = self.prepare_sweep_input(test_file)
             if not prep_ok or sim_input is None:
                 print(f"{Colors.RED}[FAIL]{Colors.NC}     {test_file.name} (prepare failed)")
                 self.fail_count += 1
-                summary_rows.append({
+                prepare_rows.append({
                     "test_name": test_file.name,
                     "case_id": "PREPARE",
                     "config_path": "",
@@ -1480,77 +1620,58 @@ class GPUTestRunner:
                 })
                 continue
 
-            for case in cases:
-                case_id = case["id"]
-                case_config = case["config_path"]
-                run_dir = output_root / test_file.stem / case_id
-                run_name = f"{test_file.stem}_{case_id}"
-                run_dir.mkdir(parents=True, exist_ok=True)
-                (run_dir / "config.toml").write_text(case_config.read_text())
-
-                ok = self.run_simulator(
-                    input_file=str(sim_input),
-                    test_name=run_name,
-                    config_path=case_config,
-                    output_dir=run_dir,
-                )
-
-                compare_checked, compare_passed, compare_message = self.compare_sweep_outputs(
-                    test_file=test_file,
-                    sim_input=sim_input,
-                    run_dir=run_dir,
-                )
-
-                passed = ok and self.last_sim_finished
-                if self.truth is not None:
-                    passed = passed and bool(compare_checked) and bool(compare_passed)
+            if self.src == "assembly":
+                # the assembled image is rewritten for every test file; keep a copy per test
+                test_input = output_root / test_file.stem / sim_input.name
+                test_input.parent.mkdir(parents=True, exist_ok=True)
+                test_input.write_bytes(sim_input.read_bytes())
+                sim_input = test_input
 
-                if passed:
-                    print(f"{Colors.GREEN}[PASS]{Colors.NC}     {test_file.name} :: {case_id} ({self.last_sim_cycles} cycles)")
-                    self.pass_count += 1
-                else:
-                    detail = f" - {compare_message}" if compare_message else ""
-                    print(f"{Colors.RED}[FAIL]{Colors.NC}     {test_file.name} :: {case_id} ({self.last_sim_cycles} cycles){detail}")
-                    self.fail_count += 1
-
-                summary_rows.append({
-                    "test_name": test_file.name,
-                    "case_id": case_id,
-                    "config_path": str(case_config),
-                    "cycles": self.last_sim_cycles,
-                    "finished": self.last_sim_finished,
-                    "passed": passed,
-                    "comparison_mode": self.truth or "",
-                    "comparison_checked": compare_checked,
-                    "comparison_passed": "" if compare_passed is None else compare_passed,
-                    "output_dir": str(run_dir),
-                    "error": (
-                        "Simulator run failed"
-                        if not ok else
-                        compare_message
-                    ),
-                })
+            pending.extend((test_file, sim_input, case, run_dir) for case, run_dir in runs)
 
         summary_csv = output_root / "summary.csv"
-        fieldnames = [
-            "test_name",
-            "case_id",
-            "config_path",
-            "cycles",
-            "finished",
-            "passed",
-            "comparison_mode",
-            "comparison_checked",
-            "comparison_passed",
-            "output_dir",
-            "error",
-        ]
-        write_header = not summary_csv.exists() or summary_csv.stat().st_size == 0
-        with open(summary_csv, "a", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if self.resume:
+            # rebuilt from the result.json files, so cases being rerun don't leave a stale row behind
+            summary_file = open(summary_csv, "w", newline="")
+            writer = csv.DictWriter(summary_file, fieldnames=SWEEP_FIELDNAMES)
+            writer.writeheader()
+            for result_file in sorted(output_root.glob(f"*/*/{SWEEP_RESULT_FILE}")):
+                with open(result_file) as f:
+                    writer.writerow(json.load(f))
+        else:
+            write_header = not summary_csv.exists() or summary_csv.stat().st_size == 0
+            summary_file = open(summary_csv, "a", newline="")
+            writer = csv.DictWriter(summary_file, fieldnames=SWEEP_FIELDNAMES)
             if write_header:
                 writer.writeheader()
-            writer.writerows(summary_rows)
+        writer.writerows(prepare_rows)
+        summary_file.flush()
+
+        def record(row: dict, done: bool = True) -> None:
+            # rows go to summary.csv as each case finishes, so a killed sweep keeps them
+            detail = f" - {row['error']}" if row["error"] else ""
+            if row["passed"]:
+                print(f"{Colors.GREEN}[PASS]{Colors.NC}     {row['test_name']} :: {row['case_id']} ({row['cycles']} cycles)")
+                self.pass_count += 1
+            else:
+                print(f"{Colors.RED}[FAIL]{Colors.NC}     {row['test_name']} :: {row['case_id']} ({row['cycles']} cycles){detail}")
+                self.fail_count += 1
+            writer.writerow(row)
+            summary_file.flush()
+            if not done:
+                return
+            # only once the row is in summary.csv: this file marks the case as done for --resume
+            with open(Path(row["output_dir"]) / SWEEP_RESULT_FILE, "w") as f:
+                json.dump(row, f, indent=2)
+
+        try:
+            if self.jobs > 1:
+                self._run_sweep_cases_parallel(pending, record)
+            else:
+                for test_file, sim_input, case, run_dir in pending:
+                    record(self.run_sweep_case(test_file, sim_input, case, run_dir))
+        finally:
+            summary_file.close()
 
         self.debug_logger.close()
 
@@ -1562,6 +1683,47 @@ class GPUTestRunner:
 
         return 0 if self.fail_count == 0 else 1
 
+    def _run_sweep_cases_parallel(self, pending: list, record) -> None:
+        """Fan sweep cases out to --jobs worker processes, recording rows as they complete."""
+        ctx = multiprocessing.get_context("fork")
+        # forked workers would write out anything still buffered a second time
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=ctx,
+            initializer=_init_sweep_worker,
+            initargs=(self, ctx.Lock()),
+        ) as pool:
+            futures = {
+                pool.submit(_run_sweep_worker_case, test_file, sim_input, case, run_dir): (test_file, case, run_dir)
+                for test_file, sim_input, case, run_dir in pending
+            }
+            for future in as_completed(futures):
+                test_file, case, run_dir = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    # the row points at the case's output directory, which the worker may have died before creating
+                    run_dir.mkdir(parents=True, exist_ok=True)
+                    # no result.json: a crashed worker says nothing about the case, so --resume reruns it
+                    record({
+                        "test_name": test_file.name,
+                        "case_id": case["id"],
+                        "config_path": str(case["config_path"]),
+                        "cycles": 0,
+                        "finished": False,
+                        "passed": False,
+                        "comparison_mode": self.truth or "",
+                        "comparison_checked": False,
+                        "comparison_passed": "",
+                        "output_dir": str(run_dir),
+                        "error": f"Worker failed: {e}",
+                    }, done=False)
+                    continue
+                record(row)
+
     def run(self) -> int:
         """Run tests or sweep mode."""
         if self.sweep:
@@ -1683,6 +1845,18 @@ def main():
         '--sweep-inputs', nargs='+', default=None,
         help='One or more test file patterns/paths for sweep mode (e.g. unit/ program/pixel/)'
     )
+    parser.add_argument(
+        '--jobs', type=int, default=1,
+        help='Number of sweep cases to run at once in worker processes (sweep mode only, default: 1)'
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='Skip sweep cases that already have a result.json in their output directory'
+    )
+    parser.add_argument(
+        '--sample', action='store_true',
+        help='Estimate performance from SimPoint-style samples instead of a full simulation (single SM only)'
+    )
 
     args = parser.parse_args()
 
@@ -1708,6 +1882,8 @@ def main():
             parser.error("--src is required with --sweep")
         if args.sweep_config is None:
             parser.error("--sweep-config is required with --sweep")
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
 
         try:
             runner = GPUTestRunner(
@@ -1726,6 +1902,9 @@ def main():
                 sweep=True,
                 sweep_config=args.sweep_config,
                 sweep_inputs=args.sweep_inputs,
+                jobs=args.jobs,
+                resume=args.resume,
+                sample=args.sample,
             )
             sys.exit(runner.run())
         except Exception as e:
@@ -1742,7 +1921,8 @@ def main():
             args.src, args.truth, args.pattern, args.config, args.clean,
             args.skip_cleanup, args.enable_cycle_limit, args.max_cycles,
             args.debug_file, args.debug_dual_output,
-            args.enable_simulator_output, args.simulator_output_file
+            args.enable_simulator_output, args.simulator_output_file,
+            sample=args.sample,
         )
         sys.exit(runner.run())
     except Exception as e: